@@ -1,7 +1,11 @@
+import os
 from fathomapi.api.handler import handler as fathom_handler
 from fathomapi.api.flask_app import app
-# from datastores.ml_model_datastore import MLModelsDatastore
-# MLModelsDatastore.load_models()
+from datastores.ml_model_datastore import MLModelsDatastore
+from datastores.write_stats import write_stats
+from serialisable import FastJsonEncoder
+# start loading the models while the routes import and the first request is handled
+MLModelsDatastore.load_models(wait=False)
 
 from routes.workout_performance_data import app as performance_data_route
 from routes.active_recovery import app as active_recovery_routes
@@ -23,6 +27,24 @@ from routes.responsive_recovery import app as responsive_recovery_routes
 from routes.training_session import app as training_session_routes
 from routes.report_symptoms import app as report_symptoms_route
 
+# opt in to encoding responses with orjson, when it's installed
+if os.environ.get('FAST_JSON_RESPONSES', '') == 'TRUE':
+    app.json_encoder = type('FastAppJsonEncoder', (FastJsonEncoder, app.json_encoder), {})
+
+
+
+@app.before_request
+def start_write_stats():
+    write_stats.start_request()
+
+
+@app.after_request
+def annotate_write_stats(response):
+    # documents written vs skipped as unchanged by this request's puts
+    write_stats.annotate()
+    return response
+
+
 app.register_blueprint(performance_data_route, url_prefix='/performance_data')
 app.register_blueprint(active_recovery_routes, url_prefix='/active_recovery')
 app.register_blueprint(session_routes, url_prefix='/session')
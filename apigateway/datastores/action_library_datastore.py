@@ -1,25 +1,34 @@
 import os
 import json
 
+from datastores.library_snapshot import read_library
 from models.movement_actions import ExerciseAction
 from fathomapi.api.config import Config
 
 
+def compile_actions(all_actions):
+    return {action_id: ExerciseAction.json_deserialise(action_dict) for action_id, action_dict in all_actions.items()}
+
+
 class ActionLibraryDatastore(object):
     def get(self):
         return self._read_json()
 
+    def get_compiled(self):
+        """
+        ExerciseAction prototypes keyed by id, read from the library snapshot when there is one.  They are shared:
+        use ExerciseAction.copy for an action to change.
+        """
+        try:
+            return read_library(self._get_file_path(), compile_actions)
+        except FileNotFoundError:
+            print("Action library does not exist")
+            return {}
+
     def _read_json(self):
         actions = {}
         try:
-            file_name = Config.get('PROVIDER_INFO')['action_library_filename']
-        except KeyError:
-            print('Action library not defined or does not exist for this provider, using default')
-            file_name = 'actions_library.json'
-        try:
-            script_dir = os.path.dirname(__file__)
-            file_path = os.path.join(script_dir, '../models', file_name)
-            with open(file_path, 'r') as f:
+            with open(self._get_file_path(), 'r') as f:
                 all_actions = json.load(f)
             for action_id, action_dict in all_actions.items():
                 actions[action_id] = action_dict  # ExerciseAction.json_deserialise(action_dict)
@@ -28,3 +37,13 @@ class ActionLibraryDatastore(object):
             print("Action library does not exist")
 
         return actions
+
+    @staticmethod
+    def _get_file_path():
+        try:
+            file_name = Config.get('PROVIDER_INFO')['action_library_filename']
+        except KeyError:
+            print('Action library not defined or does not exist for this provider, using default')
+            file_name = 'actions_library.json'
+        script_dir = os.path.dirname(__file__)
+        return os.path.join(script_dir, '../models', file_name)
@@ -1,29 +1,53 @@
 from aws_xray_sdk.core import xray_recorder
 from config import get_mongo_collection
+from datastores.bulk_write_datastore import BulkWriteDatastore
+from datastores.field_update_datastore import FieldUpdateDatastore
 from models.stats import AthleteStats
+from models.metrics import AthleteMetric
 from fathomapi.utils.exceptions import InvalidSchemaException
 
 
-class AthleteStatsDatastore(object):
+class AthleteStatsDatastore(BulkWriteDatastore, FieldUpdateDatastore):
     def __init__(self, mongo_collection='athletestats'):
         self.mongo_collection = mongo_collection
+        self.request_cache = None
 
     @xray_recorder.capture('datastore.AthleteStatsDatastore.get')
     def get(self, athlete_id):
+        if self.request_cache is not None and not isinstance(athlete_id, list):
+            return self.request_cache.get(self.mongo_collection, athlete_id, lambda: self._query_mongodb(athlete_id))
         return self._query_mongodb(athlete_id)
 
-    def put(self, items):
-        if not isinstance(items, list):
-            items = [items]
-        try:
-            for item in items:
-                self._put_mongodb(item)
-        except Exception as e:
-            raise e
+    @xray_recorder.capture('datastore.AthleteStatsDatastore.get_metrics')
+    def get_metrics(self, athlete_ids):
+        """
+        Just the metrics of each athlete, by athlete_id, in one query.  Athletes without stats are left out.
+        """
+        mongo_collection = get_mongo_collection(self.mongo_collection)
+        query = {'athlete_id': {'$in': athlete_ids}}
+        projection = {'_id': 0, 'athlete_id': 1, 'metrics': 1}
+        athlete_metrics = {}
+        for mongo_result in mongo_collection.find(query, projection):
+            athlete_metrics[mongo_result['athlete_id']] = [AthleteMetric.json_deserialise(m) for m in mongo_result.get('metrics', [])]
+        return athlete_metrics
+
+    @xray_recorder.capture('datastore.AthleteStatsDatastore.update')
+    def update(self, athlete_id, set_fields=None, add_to_set=None, conditions=None):
+        """
+        Changes just the given fields of the athlete's stats; see FieldUpdateDatastore.  Returns whether the stats
+        exist (and meet conditions).
+        """
+        return self._update_mongodb({'athlete_id': athlete_id}, set_fields, add_to_set, conditions)
+
+    def _before_update(self, query):
+        if self.request_cache is not None:
+            self.request_cache.invalidate(self.mongo_collection, query['athlete_id'])
 
     def delete(self, athlete_id=None):
         if athlete_id is None:
             raise InvalidSchemaException("Need to provide athlete_id to delete")
+        if self.request_cache is not None:
+            self.request_cache.invalidate(self.mongo_collection)
         self._delete_mongodb(athlete_id=athlete_id)
 
     @xray_recorder.capture('datastore.AthleteStatsDatastore._query_mongodb')
@@ -34,7 +58,9 @@ class AthleteStatsDatastore(object):
             mongo_results = mongo_collection.find(query)
             athlete_stats_list = []
             for mongo_result in mongo_results:
-                athlete_stats_list.append(AthleteStats.json_deserialise(mongo_result))
+                athlete_stats = AthleteStats.json_deserialise(mongo_result)
+                athlete_stats.track_changes(mongo_result)
+                athlete_stats_list.append(athlete_stats)
 
             return athlete_stats_list
         else:
@@ -42,17 +68,22 @@ class AthleteStatsDatastore(object):
             mongo_result = mongo_collection.find_one(query)
 
             if mongo_result is not None:
-                return AthleteStats.json_deserialise(mongo_result)
+                athlete_stats = AthleteStats.json_deserialise(mongo_result)
+                athlete_stats.track_changes(mongo_result)
+                return athlete_stats
             else:
                 return None
 
-    @xray_recorder.capture('datastore.AthleteStatsDatastore._put_mongodb')
-    def _put_mongodb(self, item):
-        item = item.json_serialise()
+    @xray_recorder.capture('datastore.AthleteStatsDatastore.put')
+    def put(self, items, batch_size=None):
+        super().put(items, batch_size)
 
-        mongo_collection = get_mongo_collection(self.mongo_collection)
-        query = {'athlete_id': item['athlete_id']}
-        mongo_collection.replace_one(query, item, upsert=True)
+    def _before_put(self, item):
+        if self.request_cache is not None:
+            self.request_cache.invalidate(self.mongo_collection, item.athlete_id)
+
+    def _get_put_query(self, document):
+        return {'athlete_id': document['athlete_id']}
 
     @xray_recorder.capture('datastore.AthleteStatsDatastore._delete_mongodb')
     def _delete_mongodb(self, athlete_id):
@@ -0,0 +1,103 @@
+import abc
+from aws_xray_sdk.core import xray_recorder
+from config import get_mongo_collection
+from datastores.write_stats import write_stats
+from fathomapi.utils.exceptions import ApplicationException
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+from serialisable import Serialisable
+
+
+class BulkWriteException(ApplicationException):
+    def __init__(self, errors):
+        """
+        errors: list of {'index', 'code', 'message'}, index being the position of the item passed to put()
+        """
+        self.errors = errors
+        super().__init__(500, 'BulkWriteError', f'{len(errors)} item(s) could not be written')
+
+
+class BulkWriteDatastore(object, metaclass=abc.ABCMeta):
+    """
+    put() for datastores that upsert one document per item.  Items are sent as unordered batches of write
+    operations, so a put of n items costs ceil(n / batch_size) round trips instead of n.  A failed item doesn't stop
+    the rest from being written; once every batch has been sent the failures are raised together as a
+    BulkWriteException.
+
+    Each item is written as the operations _get_put_operations returns: a ReplaceOne of the whole document, or none
+    for a Serialisable item that hasn't changed since it was loaded or last written.
+
+    Subclasses set mongo_collection and implement _get_put_query(document), and override put() to capture it as
+    datastore.<Name>.put.
+    """
+    batch_size = 500
+
+    def put(self, items, batch_size=None):
+        if not isinstance(items, list):
+            items = [items]
+        self._bulk_put_mongodb(items, batch_size or self.batch_size)
+
+    @abc.abstractmethod
+    def _get_put_query(self, document):
+        """
+        Query matching the one stored document that document replaces, eg {'user_id': ..., 'date': ...}
+        """
+        pass
+
+    def _get_put_operations(self, item, document, query):
+        if isinstance(item, Serialisable) and not item.has_changed(document):
+            return []
+        return [ReplaceOne(query, document, upsert=True)]
+
+    def _before_put(self, item):
+        pass
+
+    def _after_put(self, item, document):
+        if isinstance(item, Serialisable):
+            item.track_changes(document)
+
+    @xray_recorder.capture('datastore.BulkWriteDatastore._bulk_put_mongodb')
+    def _bulk_put_mongodb(self, items, batch_size):
+        mongo_collection = get_mongo_collection(self.mongo_collection)
+        errors = []
+
+        for batch_start in range(0, len(items), batch_size):
+            # unordered writes give no guarantee between operations on the same document, so only the last
+            # occurrence of a document is sent, as it would have been the one left by sequential replace_one calls
+            documents = {}
+            for index in range(batch_start, min(batch_start + batch_size, len(items))):
+                document = items[index].json_serialise()
+                query = self._get_put_query(document)
+                documents[tuple(sorted(query.items()))] = (index, document, query)
+
+            indexes = []
+            operations = []
+            for index, document, query in documents.values():
+                item_operations = self._get_put_operations(items[index], document, query)
+                if len(item_operations) == 0:
+                    write_stats.record(self.mongo_collection, False)
+                    continue
+                self._before_put(items[index])
+                indexes.extend([index] * len(item_operations))
+                operations.extend(item_operations)
+            if len(operations) == 0:
+                continue
+
+            failed_indexes = set()
+            try:
+                mongo_collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get('writeErrors', []):
+                    failed_indexes.add(indexes[error['index']])
+                    errors.append({'index': indexes[error['index']],
+                                   'code': error.get('code'),
+                                   'message': error.get('errmsg')})
+
+            written_indexes = set(indexes) - failed_indexes
+            for index, document, query in documents.values():
+                if index in written_indexes:
+                    self._after_put(items[index], document)
+                    write_stats.record(self.mongo_collection, True)
+
+        if len(errors) > 0:
+            raise BulkWriteException(errors)
@@ -1,6 +1,8 @@
 import datetime
 from aws_xray_sdk.core import xray_recorder
 from config import get_mongo_collection
+from datastores.bulk_write_datastore import BulkWriteDatastore
+from datastores.field_update_datastore import FieldUpdateDatastore
 from fathomapi.utils.exceptions import InvalidSchemaException, NoSuchEntityException
 from models.daily_plan import DailyPlan
 from models.daily_readiness import DailyReadiness
@@ -8,25 +10,48 @@ from datastores.daily_readiness_datastore import DailyReadinessDatastore
 from utils import parse_date
 
 
-class DailyPlanDatastore(object):
+class DailyPlanDatastore(BulkWriteDatastore, FieldUpdateDatastore):
     def __init__(self, mongo_collection='dailyplan'):
         self.mongo_collection = mongo_collection
-
-    def get(self, user_id=None, start_date=None, end_date=None, day_of_week=None, stats_processing=False):
-        return self._query_mongodb(user_id, start_date, end_date, day_of_week, stats_processing)
-
-    def put(self, items):
-        if not isinstance(items, list):
-            items = [items]
-        try:
-            for item in items:
-                self._put_mongodb(item)
-        except Exception as e:
-            raise e
+        self.request_cache = None
+
+    def get(self, user_id=None, start_date=None, end_date=None, day_of_week=None, stats_processing=False, fields=None):
+        """
+        fields: plan document fields the caller reads (e.g. ['training_sessions']); only these are fetched from
+        Mongo, the rest of the returned plans keep their defaults.  stats_processing is shorthand for
+        DailyPlan.stats_processing_fields.
+        """
+        if stats_processing and fields is None:
+            fields = DailyPlan.stats_processing_fields
+        if (self.request_cache is not None and user_id is not None and not isinstance(user_id, list)
+                and start_date is not None and end_date is not None and day_of_week is None):
+            return self._query_request_cache(user_id, start_date, end_date, fields)
+        return self._query_mongodb(user_id, start_date, end_date, day_of_week, fields)
+
+    @xray_recorder.capture('datastore.DailyPlanDatastore.update')
+    def update(self, user_id, event_date, set_fields=None, add_to_set=None, conditions=None):
+        """
+        Changes just the given fields of the user's plan for event_date; see FieldUpdateDatastore.  Returns whether
+        the plan exists (and meets conditions).
+        """
+        return self._update_mongodb({'user_id': user_id, 'date': event_date}, set_fields, add_to_set, conditions)
+
+    @xray_recorder.capture('datastore.DailyPlanDatastore.mark_insights_read')
+    def mark_insights_read(self, user_id, event_date, trigger_type):
+        """
+        Marks the plan's unread insights of trigger_type read, one positional $set per insight.  Returns whether any
+        were marked.
+        """
+        marked = False
+        while self.update(user_id, event_date, set_fields={'insights.$.read': True},
+                          conditions={'insights': {'$elemMatch': {'trigger_type': trigger_type, 'read': {'$ne': True}}}}):
+            marked = True
+        return marked
 
     def delete(self, items=None, user_id=None, start_date=None, end_date=None):
         if items is None and user_id is None:
             raise InvalidSchemaException("Need to provide one of items and user_id")
+        self._invalidate_request_cache(None)
         if items is not None:
             if not isinstance(items, list):
                 items = [items]
@@ -35,8 +60,30 @@ class DailyPlanDatastore(object):
         else:
             self._delete_mongodb(item=items, user_id=user_id, start_date=start_date, end_date=end_date)
 
+    def _query_request_cache(self, user_id, start_date, end_date, fields):
+        # projected plans are cached separately from full plans
+        collection = self.mongo_collection
+        if fields is not None:
+            collection += ':' + ','.join(sorted(fields))
+
+        def load(query_start_date, query_end_date):
+            return self._query_mongodb(user_id, query_start_date, query_end_date, None, fields, default_plan=False)
+
+        ret = self.request_cache.get_range(collection, user_id, start_date, end_date, load,
+                                           lambda plan: plan.event_date, lambda plan: plan.event_date)
+
+        if len(ret) == 0:
+            plan = DailyPlan(event_date=end_date)
+            plan.user_id = user_id
+            ret.append(plan)
+        return ret
+
+    def _invalidate_request_cache(self, user_id):
+        if self.request_cache is not None:
+            self.request_cache.invalidate(self.mongo_collection, user_id)
+
     @xray_recorder.capture('datastore.DailyPlanDatastore._query_mongodb')
-    def _query_mongodb(self, user_id, start_date, end_date, day_of_week, stats_processing):
+    def _query_mongodb(self, user_id, start_date, end_date, day_of_week, fields, default_plan=True):
         mongo_collection = get_mongo_collection(self.mongo_collection)
         query = {}
         if isinstance(user_id, list):
@@ -47,29 +94,41 @@ class DailyPlanDatastore(object):
             query['date'] = {'$gte': start_date, '$lte': end_date}
         if day_of_week is not None:
             query['day_of_week'] = day_of_week
-        if stats_processing:
-            mongo_cursor = mongo_collection.find(query, {'date': 1, user_id: 1, 'training_sessions': 1, 'daily_readiness_survey': 1, 'symptoms': 1})
+        if fields is not None:
+            projection = {'_id': 0, 'date': 1, 'user_id': 1}
+            projection.update({field: 1 for field in fields})
+            mongo_cursor = mongo_collection.find(query, projection)
         else:
             mongo_cursor = mongo_collection.find(query)
         ret = []
 
         for plan in mongo_cursor:
-            daily_plan = DailyPlan.json_deserialise(plan, stats_processing)
-            daily_plan.daily_readiness_survey = _daily_readiness_from_mongo(plan.get('daily_readiness_survey', None), user_id)
+            daily_plan = DailyPlan.json_deserialise(plan)
+            if fields is None or 'daily_readiness_survey' in fields:
+                daily_plan.daily_readiness_survey = _daily_readiness_from_mongo(plan.get('daily_readiness_survey', None), daily_plan.user_id)
+            if fields is None:
+                daily_plan.track_changes(plan)
             ret.append(daily_plan)
 
-        if len(ret) == 0 and not isinstance(user_id, list):
+        if default_plan and len(ret) == 0 and not isinstance(user_id, list):
             plan = DailyPlan(event_date=end_date)
             plan.user_id = user_id
             # plan.last_sensor_sync = self.get_last_sensor_sync(user_id, end_date)
             ret.append(plan)
         return ret
 
-    @xray_recorder.capture('datastore.DailyPlanDatastore._put_mongodb')
-    def _put_mongodb(self, item):
-        collection = get_mongo_collection(self.mongo_collection)
-        query = {'user_id': item.user_id, 'date': item.event_date}
-        collection.replace_one(query, item.json_serialise(), upsert=True)
+    @xray_recorder.capture('datastore.DailyPlanDatastore.put')
+    def put(self, items, batch_size=None):
+        super().put(items, batch_size)
+
+    def _before_put(self, item):
+        self._invalidate_request_cache(item.user_id)
+
+    def _before_update(self, query):
+        self._invalidate_request_cache(query['user_id'])
+
+    def _get_put_query(self, document):
+        return {'user_id': document['user_id'], 'date': document['date']}
 
     @xray_recorder.capture('datastore.DailyPlanDatastore._delete_mongodb')
     def _delete_mongodb(self, item, user_id, start_date, end_date):
@@ -4,7 +4,7 @@ from datastores import post_session_survey_datastore, session_datastore
 from datastores import sleep_history_datastore
 from datastores import cleared_soreness_datastore
 from datastores import asymmetry_datastore
-from datastores import injury_risk_datastore, hist_injury_risk_datastore
+from datastores import injury_risk_datastore, hist_injury_risk_datastore, injury_risk_checkpoint_datastore
 from datastores import local_exercise_datastore
 
 from datastores import training_session_datastore
@@ -15,11 +15,13 @@ from datastores import movement_prep_datastore
 from datastores import mobility_wod_datastore
 from datastores import responsive_recovery_datastore
 from datastores import workout_datastore
+from datastores.request_cache import RequestCache
+from contextlib import contextmanager
 
 
 class DatastoreCollection(object):
 
-    def __init__(self):
+    def __init__(self, request_cache=False):
         self.athlete_stats_datastore = athlete_stats_datastore.AthleteStatsDatastore()
         self.completed_exercise_datastore = completed_exercise_datastore.CompletedExerciseDatastore()
         self.daily_plan_datastore = daily_plan_datastore.DailyPlanDatastore()
@@ -33,6 +35,7 @@ class DatastoreCollection(object):
         self.asymmetry_datastore = asymmetry_datastore.AsymmetryDatastore()
         self.injury_risk_datastore = injury_risk_datastore.InjuryRiskDatastore()
         self.hist_injury_risk_datastore = hist_injury_risk_datastore.HistInjuryRiskDatastore()
+        self.injury_risk_checkpoint_datastore = injury_risk_checkpoint_datastore.InjuryRiskCheckpointDatastore()
 
         self.training_session_datastore = training_session_datastore.TrainingSessionDatastore()
         self.workout_program_datastore = workout_program_datastore.WorkoutProgramDatastore()
@@ -42,3 +45,39 @@ class DatastoreCollection(object):
         self.mobility_wod_datastore = mobility_wod_datastore.MobilityWODDatastore()
         self.responsive_recovery_datastore = responsive_recovery_datastore.ResponsiveRecoveryDatastore()
         self.workout_datastore = workout_datastore.WorkoutDatastore()
+
+        self.request_cache = None
+        if request_cache:
+            self.enable_request_cache()
+
+    def get_request_cached_datastores(self):
+        return [self.daily_plan_datastore, self.training_session_datastore, self.athlete_stats_datastore,
+                self.injury_risk_datastore]
+
+    def enable_request_cache(self):
+        """
+        Share one identity map between the daily plan, training session, athlete stats and injury risk datastores, so
+        repeated and overlapping reads within a request hit Mongo once.  Objects returned from the cache are shared by
+        every reader in the request; writes through these datastores invalidate the documents they touch.
+        Call end_request_cache when the request is done (or use request_scope).
+        """
+        self.request_cache = RequestCache()
+        for datastore in self.get_request_cached_datastores():
+            datastore.request_cache = self.request_cache
+
+        return self.request_cache
+
+    def end_request_cache(self):
+        if self.request_cache is not None:
+            self.request_cache.annotate()
+        self.request_cache = None
+        for datastore in self.get_request_cached_datastores():
+            datastore.request_cache = None
+
+    @contextmanager
+    def request_scope(self):
+        request_cache = self.enable_request_cache()
+        try:
+            yield request_cache
+        finally:
+            self.end_request_cache()
@@ -0,0 +1,36 @@
+from config import get_mongo_collection
+
+
+class FieldUpdateDatastore(object):
+    """
+    update() changes a few fields of one document with $set and $addToSet, without reading the document or writing
+    the rest of it back.  Values are written as given, so they must already be in their serialised form.
+
+    Paths may use Mongo's positional operator: 'modalities.$.start_date_time' changes the first element matched by
+    an array condition in conditions.  Filtered positional paths ('insights.$[insight].read') need pymongo and
+    MongoDB 3.6, so aren't supported.
+
+    Subclasses set mongo_collection and call _update_mongodb with the query for their document.
+    """
+    def _before_update(self, query):
+        pass
+
+    def _update_mongodb(self, query, set_fields=None, add_to_set=None, conditions=None):
+        """
+        add_to_set: {path: list of values}, each value added to the array at path unless it's already there.
+        Returns whether a document matched.
+        """
+        update = {}
+        if set_fields:
+            update['$set'] = dict(set_fields)
+        if add_to_set:
+            update['$addToSet'] = {path: {'$each': list(values)} for path, values in add_to_set.items()}
+        if len(update) == 0:
+            return False
+
+        self._before_update(query)
+        if conditions is not None:
+            query = dict(query, **conditions)
+        mongo_collection = get_mongo_collection(self.mongo_collection)
+        result = mongo_collection.update_one(query, update)
+        return result.matched_count > 0
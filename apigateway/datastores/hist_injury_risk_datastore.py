@@ -1,10 +1,11 @@
 from aws_xray_sdk.core import xray_recorder
 from config import get_mongo_collection
+from datastores.bulk_write_datastore import BulkWriteDatastore
 
 from models.athlete_injury_risk import AthleteHistInjuryRisk
 
 
-class HistInjuryRiskDatastore(object):
+class HistInjuryRiskDatastore(BulkWriteDatastore):
     def __init__(self, mongo_collection='histinjuryrisk'):
         self.mongo_collection = mongo_collection
 
@@ -12,16 +13,6 @@ class HistInjuryRiskDatastore(object):
     def get(self, user_id):
         return self._query_mongodb(user_id)
 
-    @xray_recorder.capture('datastore.HistInjuryRiskDatastore.put')
-    def put(self, items):
-        if not isinstance(items, list):
-            items = [items]
-        try:
-            for item in items:
-                self._put_mongodb(item)
-        except Exception as e:
-            raise e
-
     @xray_recorder.capture('datastore.HistInjuryRiskDatastore._query_mongodb')
     def _query_mongodb(self, user_id):
         mongo_collection = get_mongo_collection(self.mongo_collection)
@@ -33,10 +24,9 @@ class HistInjuryRiskDatastore(object):
             return athlete_injury_risk.items
         return {}
 
-    @xray_recorder.capture('datastore.HistInjuryRiskDatastore._put_mongodb')
-    def _put_mongodb(self, item):
-        item = item.json_serialise()
+    @xray_recorder.capture('datastore.HistInjuryRiskDatastore.put')
+    def put(self, items, batch_size=None):
+        super().put(items, batch_size)
 
-        mongo_collection = get_mongo_collection(self.mongo_collection)
-        query = {'user_id': item['user_id']}
-        mongo_collection.replace_one(query, item, upsert=True)
+    def _get_put_query(self, document):
+        return {'user_id': document['user_id']}
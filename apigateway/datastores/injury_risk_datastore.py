@@ -1,27 +1,31 @@
 from aws_xray_sdk.core import xray_recorder
 from config import get_mongo_collection
+from datastores.bulk_write_datastore import BulkWriteDatastore
+from datastores.write_stats import write_stats
+from pymongo import ReplaceOne, UpdateOne
+from serialisable import get_content_hash
 
 from models.athlete_injury_risk import AthleteInjuryRisk
 
 
-class InjuryRiskDatastore(object):
+class InjuryRiskDatastore(BulkWriteDatastore):
+    """
+    Remembers the content of each body part side's entry in the documents it reads and writes during a request, so
+    a put of the same body part sides in the same order only $sets the entries that changed, or nothing at all.
+    """
     def __init__(self, mongo_collection='injuryrisk'):
         self.mongo_collection = mongo_collection
+        self.request_cache = None
+        # user_id: (write_stats.request_id, [(body part side, content hash of its injury risk)] as stored)
+        self.stored_items = {}
+        self._put_item_hashes = {}
 
     @xray_recorder.capture('datastore.InjuryRiskDatastore.get')
     def get(self, user_id):
+        if self.request_cache is not None:
+            return self.request_cache.get(self.mongo_collection, user_id, lambda: self._query_mongodb(user_id))
         return self._query_mongodb(user_id)
 
-    @xray_recorder.capture('datastore.InjuryRiskDatastore.put')
-    def put(self, items):
-        if not isinstance(items, list):
-            items = [items]
-        try:
-            for item in items:
-                self._put_mongodb(item)
-        except Exception as e:
-            raise e
-
     @xray_recorder.capture('datastore.InjuryRiskDatastore._query_mongodb')
     def _query_mongodb(self, user_id):
         mongo_collection = get_mongo_collection(self.mongo_collection)
@@ -30,13 +34,48 @@ class InjuryRiskDatastore(object):
         mongo_result = mongo_collection.find_one(query)
         if mongo_result is not None:
             athlete_injury_risk = AthleteInjuryRisk.json_deserialise(mongo_result)
+            self.stored_items[user_id] = (write_stats.request_id, self._get_item_hashes(mongo_result.get('items', [])))
             return athlete_injury_risk.items
+        self.stored_items.pop(user_id, None)
         return {}
 
-    @xray_recorder.capture('datastore.InjuryRiskDatastore._put_mongodb')
-    def _put_mongodb(self, item):
-        item = item.json_serialise()
+    @xray_recorder.capture('datastore.InjuryRiskDatastore.put')
+    def put(self, items, batch_size=None):
+        super().put(items, batch_size)
 
-        mongo_collection = get_mongo_collection(self.mongo_collection)
-        query = {'user_id': item['user_id']}
-        mongo_collection.replace_one(query, item, upsert=True)
+    def _before_put(self, item):
+        if self.request_cache is not None:
+            self.request_cache.invalidate(self.mongo_collection, item.user_id)
+
+    def _get_put_query(self, document):
+        return {'user_id': document['user_id']}
+
+    def _get_put_operations(self, item, document, query):
+        request_id, stored_hashes = self.stored_items.get(item.user_id, (None, None))
+        item_hashes = self._get_item_hashes(document['items'])
+        self._put_item_hashes[item.user_id] = item_hashes
+        if request_id != write_stats.request_id or len(stored_hashes) != len(item_hashes):
+            return [ReplaceOne(query, document, upsert=True)]
+
+        changed_items = {}
+        for index, ((stored_key, stored_hash), (key, item_hash)) in enumerate(zip(stored_hashes, item_hashes)):
+            if key != stored_key:
+                return [ReplaceOne(query, document, upsert=True)]
+            if item_hash != stored_hash:
+                changed_items[f'items.{index}.injury_risk'] = document['items'][index]['injury_risk']
+        if len(changed_items) == 0:
+            return []
+        if len(changed_items) * 2 > len(item_hashes):
+            return [ReplaceOne(query, document, upsert=True)]
+        return [UpdateOne(query, {'$set': changed_items})]
+
+    def _after_put(self, item, document):
+        item_hashes = self._put_item_hashes.pop(item.user_id, None)
+        if item_hashes is None:
+            item_hashes = self._get_item_hashes(document['items'])
+        self.stored_items[item.user_id] = (write_stats.request_id, item_hashes)
+
+    @staticmethod
+    def _get_item_hashes(items):
+        return [((item['body_part']['body_part_location'], item['body_part']['side']), get_content_hash(item['injury_risk']))
+                for item in items]
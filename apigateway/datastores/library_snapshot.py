@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+import pickle
+
+snapshot_extension = '.pickle'
+
+
+def read_library(file_path, compile_library):
+    """
+    Compiled library for the json file at file_path.  Loaded from the pickle snapshot next to the json when that
+    snapshot was written from the same json (see write_library_snapshot), otherwise compiled from the json.
+
+    compile_library: function(library json) returning the compiled library
+    """
+    with open(file_path, 'rb') as f:
+        source = f.read()
+    checksum = hashlib.sha1(source).hexdigest()
+
+    try:
+        with open(file_path + snapshot_extension, 'rb') as f:
+            snapshot = pickle.load(f)
+        if snapshot['checksum'] == checksum:
+            return snapshot['library']
+    except (OSError, EOFError, KeyError, AttributeError, ImportError, pickle.UnpicklingError):
+        # missing, or written by a version of the models that no longer loads
+        pass
+
+    return compile_library(json.loads(source))
+
+
+def write_library_snapshot(file_path, compile_library):
+
+    with open(file_path, 'rb') as f:
+        source = f.read()
+    snapshot = {'checksum': hashlib.sha1(source).hexdigest(),
+                'library': compile_library(json.loads(source))}
+    with open(file_path + snapshot_extension, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=4)
+
+
+if __name__ == '__main__':
+    # run from apigateway/ when building the bundle, so cold starts load the snapshots instead of parsing the json
+    from datastores.action_library_datastore import compile_actions
+    from datastores.movement_library_datastore import compile_movements
+
+    models_dir = os.path.join(os.path.dirname(__file__), '../models')
+    for file_name in sorted(os.listdir(models_dir)):
+        if file_name == 'actions_library.json':
+            write_library_snapshot(os.path.join(models_dir, file_name), compile_actions)
+        elif file_name.startswith('movement_library_') and file_name.endswith('.json'):
+            write_library_snapshot(os.path.join(models_dir, file_name), compile_movements)
+        else:
+            continue
+        print(f'wrote snapshot of {file_name}')
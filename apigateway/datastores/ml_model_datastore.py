@@ -1,9 +1,16 @@
+import hashlib
 import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future
 import boto3
 import joblib
 from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
 
 from fathomapi.api.config import Config
+from fathomapi.utils.exceptions import ApplicationException
 from fathomapi.utils.xray import xray_recorder
 
 model_bucket_name = Config.get('PROVIDER_INFO')['model_bucket']
@@ -11,21 +18,60 @@ _s3_config = TransferConfig(use_threads=False)
 hr_rpe_model_filename = Config.get('PROVIDER_INFO')['hr_rpe_model_filename']
 bodyweight_ratio_model_filename = Config.get('PROVIDER_INFO')['bodyweight_ratio_model_filename']
 
-_hr_rpe_model = None
-_bodyweight_model = None
+# model_filename: Future of the loaded model, shared by every thread asking for it while it loads
+_model_futures = {}
+_model_futures_lock = threading.Lock()
+_load_metrics = {}
+
+
+class S3ModelSource(object):
+    def __init__(self, bucket_name, prefix='plans'):
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+
+    def download_file(self, model_filename, file_location):
+        bucket = boto3.resource('s3').Bucket(self.bucket_name)
+        bucket.download_file(f"{self.prefix}/{model_filename}", file_location, Config=_s3_config)
+
+    def get_checksum(self, model_filename):
+        try:
+            checksum_object = boto3.resource('s3').Object(self.bucket_name, f"{self.prefix}/{model_filename}.sha256")
+            return checksum_object.get()['Body'].read().decode().split()[0]
+        except (ClientError, BotoCoreError):
+            # not published, or the bucket can't be reached (no credentials, no network)
+            return None
+
+
+class LocalModelSource(object):
+    """
+    Directory standing in for the model bucket, laid out the same way: <model_filename> and an optional
+    <model_filename>.sha256
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def download_file(self, model_filename, file_location):
+        shutil.copyfile(os.path.join(self.directory, model_filename), file_location)
+
+    def get_checksum(self, model_filename):
+        checksum_file = os.path.join(self.directory, f"{model_filename}.sha256")
+        if not os.path.exists(checksum_file):
+            return None
+        with open(checksum_file, 'r') as f:
+            return f.read().split()[0]
 
 
 class MLModelsDatastore(object):
+    # set MODEL_SOURCE_DIRECTORY to load models from a local directory instead of the model bucket
+    source = None
+
     @xray_recorder.capture('logic.MLModelsDatastore.get_hr_model')
     @classmethod
     def get_hr_model(cls):
         if os.environ.get('CODEBUILD_RUN', '') == 'TRUE':
             return None
         else:
-            global _hr_rpe_model
-            if _hr_rpe_model is None:
-                _hr_rpe_model = cls.download_and_load_model(hr_rpe_model_filename)
-            return _hr_rpe_model
+            return cls.get_model(hr_rpe_model_filename)
 
     @xray_recorder.capture('logic.MLModelsDatastore.get_bodyweight_ratio_model')
     @classmethod
@@ -33,30 +79,85 @@ class MLModelsDatastore(object):
         if os.environ.get('CODEBUILD_RUN', '') == 'TRUE':
             return None
         else:
-            global _bodyweight_model
-            if _bodyweight_model is None:
-                _bodyweight_model = cls.download_and_load_model(bodyweight_ratio_model_filename)
-            return _bodyweight_model
+            return cls.get_model(bodyweight_ratio_model_filename)
+
+    @classmethod
+    def get_model(cls, model_filename):
+        """
+        Loaded model, waiting for it if it's already being loaded by another thread (see load_models)
+        """
+        with _model_futures_lock:
+            model_future = _model_futures.get(model_filename)
+            load_here = model_future is None
+            if load_here:
+                model_future = Future()
+                _model_futures[model_filename] = model_future
+
+        if load_here:
+            try:
+                model_future.set_result(cls.download_and_load_model(model_filename))
+            except Exception as e:
+                # let the next request try again
+                with _model_futures_lock:
+                    del _model_futures[model_filename]
+                model_future.set_exception(e)
+
+        return model_future.result()
 
-    @xray_recorder.capture('logic.MLModelsDatastore.load_models')
     @classmethod
-    def load_models(cls):
+    def load_models(cls, wait=True):
+        """
+        Loads both models concurrently, each in its own thread.  With wait=False this returns straight away, so
+        a container can start loading them at import while it handles its first request.
+        """
         if os.environ.get('CODEBUILD_RUN', '') == 'TRUE':
-            pass
-        else:
-            global _hr_rpe_model
-            global _bodyweight_model
-            if _hr_rpe_model is None:
-                _hr_rpe_model = cls.download_and_load_model(hr_rpe_model_filename)
-                print('downloaded_hr_model')
-            if _bodyweight_model is None:
-                _bodyweight_model = cls.download_and_load_model(bodyweight_ratio_model_filename)
-                print('downloaded_bodyweight_model')
+            return
+        threads = [threading.Thread(target=cls._load_model_in_background, args=(model_filename,), daemon=True)
+                   for model_filename in [hr_rpe_model_filename, bodyweight_ratio_model_filename]]
+        for thread in threads:
+            thread.start()
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    @classmethod
+    def _load_model_in_background(cls, model_filename):
+        # nothing called from here is captured by xray, which has no segment outside the request thread
+        try:
+            cls.get_model(model_filename)
+        except Exception as e:
+            # get_model retries on the request thread, which reports the error
+            print(f'failed to load {model_filename}: {e}')
+
+    @staticmethod
+    def get_load_metrics():
+        return {model_filename: dict(metrics) for model_filename, metrics in _load_metrics.items()}
+
+    @classmethod
+    def get_source(cls):
+        if cls.source is not None:
+            return cls.source
+        if os.environ.get('MODEL_SOURCE_DIRECTORY', '') != '':
+            return LocalModelSource(os.environ['MODEL_SOURCE_DIRECTORY'])
+        return S3ModelSource(model_bucket_name)
 
     @classmethod
     def download_and_load_model(cls, model_filename):
-        cls.download_file(model_filename)
-        model = joblib.load(cls.file_location(model_filename))
+        start_time = time.time()
+        file_location, downloaded, checksum = cls.download_file(model_filename)
+        download_seconds = time.time() - start_time
+        # numpy arrays in uncompressed joblib files are memory-mapped rather than read in
+        model = joblib.load(file_location, mmap_mode='r')
+        _load_metrics[model_filename] = {
+            'source': 'download' if downloaded else 'cache',
+            'file_location': file_location,
+            'checksum': checksum,
+            'size_bytes': os.path.getsize(file_location),
+            'download_seconds': round(download_seconds, 3),
+            'load_seconds': round(time.time() - start_time - download_seconds, 3),
+            'thread': threading.current_thread().name
+        }
+        print(f'loaded {model_filename}: {_load_metrics[model_filename]}')
         return model
 
     @staticmethod
@@ -67,10 +168,58 @@ class MLModelsDatastore(object):
             file_location = f'/tmp/{model_filename}'
         return file_location
 
+    @staticmethod
+    def get_file_checksum(file_location):
+        sha256 = hashlib.sha256()
+        with open(file_location, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
     @classmethod
-    @xray_recorder.capture('logic.MLModelsDatastore.download_file')
     def download_file(cls, model_filename):
-        bucket = boto3.resource('s3').Bucket(model_bucket_name)
-        file_location = cls.file_location(model_filename)
-        if not os.path.exists(file_location):
-            bucket.download_file(f"plans/{model_filename}", file_location, Config=_s3_config)
+        """
+        Models are cached as <checksum>.joblib next to file_location, and file_location.sha256 records the checksum
+        of the current one, so a memory-mapped model file is never overwritten.  A cached model is only used if it
+        still matches its checksum and, where the source publishes one, the source's checksum.
+
+        Without a cached model, a model already at file_location itself (put there by the build, or by an older
+        container) is used as it is, unless the source publishes another checksum.
+
+        :return: (location of the verified model file, whether it had to be downloaded, its checksum)
+        """
+        source = cls.get_source()
+        pointer_location = cls.file_location(model_filename) + '.sha256'
+        cache_directory = os.path.dirname(pointer_location)
+
+        expected_checksum = source.get_checksum(model_filename)
+        cached_checksum = None
+        if os.path.exists(pointer_location):
+            with open(pointer_location, 'r') as f:
+                cached_checksum = f.read().strip()
+        if expected_checksum is None or expected_checksum == cached_checksum:
+            if cached_checksum is not None and len(cached_checksum) == 64:
+                cached_location = os.path.join(cache_directory, f'{cached_checksum}.joblib')
+                if os.path.exists(cached_location) and cls.get_file_checksum(cached_location) == cached_checksum:
+                    return cached_location, False, cached_checksum
+
+        if os.path.exists(cls.file_location(model_filename)):
+            checksum = cls.get_file_checksum(cls.file_location(model_filename))
+            if expected_checksum is None or checksum == expected_checksum:
+                return cls.file_location(model_filename), False, checksum
+
+        download_location = os.path.join(cache_directory, f'{model_filename}.{threading.get_ident()}.download')
+        source.download_file(model_filename, download_location)
+        checksum = cls.get_file_checksum(download_location)
+        if expected_checksum is not None and checksum != expected_checksum:
+            os.remove(download_location)
+            raise ApplicationException(500, 'ModelChecksumMismatch',
+                                       f'{model_filename} has checksum {checksum}, expected {expected_checksum}')
+
+        file_location = os.path.join(cache_directory, f'{checksum}.joblib')
+        os.replace(download_location, file_location)
+        with open(pointer_location + '.download', 'w') as f:
+            f.write(checksum)
+        os.replace(pointer_location + '.download', pointer_location)
+
+        return file_location, True, checksum
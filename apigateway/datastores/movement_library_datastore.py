@@ -2,26 +2,41 @@ import os
 import json
 from aws_xray_sdk.core import xray_recorder
 
+from datastores.library_snapshot import read_library
 from models.movement_actions import Movement
 from fathomapi.api.config import Config
 
 
+def compile_movements(all_movements):
+    return {mov_id: Movement.json_deserialise(movement_dict) for mov_id, movement_dict in all_movements.items()}
+
+
 class MovementLibraryDatastore(object):
     @xray_recorder.capture('datastores.MovementLibraryDatastore.get')
     def get(self):
         return self._read_json()
 
+    @xray_recorder.capture('datastores.MovementLibraryDatastore.get_compiled')
+    def get_compiled(self):
+        """
+        Movement prototypes keyed by id, read from the library snapshot when there is one.  They are shared:
+        use Movement.copy for a movement to change.
+        """
+        file_path = self._get_file_path()
+        if file_path is None:
+            return {}
+        try:
+            return read_library(file_path, compile_movements)
+        except FileNotFoundError:
+            print("Movement library does not exist for this provider")
+            return {}
+
     @xray_recorder.capture('datastores.MovementLibraryDatastore._read_json')
     def _read_json(self):
         movements = {}
-        try:
-            file_name = Config.get('PROVIDER_INFO')['movement_library_filename']
-        except KeyError:
-            print('Movement library not defined or does not exist for this provider')
-        else:
+        file_path = self._get_file_path()
+        if file_path is not None:
             try:
-                script_dir = os.path.dirname(__file__)
-                file_path = os.path.join(script_dir, '../models', file_name)
                 with open(file_path, 'r') as f:
                     all_movements = json.load(f)
 
@@ -31,3 +46,13 @@ class MovementLibraryDatastore(object):
                 print("Movement library does not exist for this provider")
 
         return movements
+
+    @staticmethod
+    def _get_file_path():
+        try:
+            file_name = Config.get('PROVIDER_INFO')['movement_library_filename']
+        except KeyError:
+            print('Movement library not defined or does not exist for this provider')
+            return None
+        script_dir = os.path.dirname(__file__)
+        return os.path.join(script_dir, '../models', file_name)
@@ -0,0 +1,116 @@
+from aws_xray_sdk.core import xray_recorder
+
+
+class RequestCache(object):
+    """
+    Identity map for the documents read while handling one request.
+
+    Point reads are keyed by (collection, key).  Range reads also remember which [start, end] windows have been
+    fetched for each (collection, key), so a read inside those windows is answered from memory and a read that
+    overlaps them fetches only the part not yet covered, as a single query.  Windows are compared the same way the
+    datastores compare them in Mongo (date and datetime strings).
+    """
+    def __init__(self):
+        self.items = {}
+        self.range_items = {}
+        self.windows = {}
+        self.hits = {}
+        self.misses = {}
+
+    def get(self, collection, key, loader):
+
+        if (collection, key) in self.items:
+            self.record(collection, True)
+            return self.items[(collection, key)]
+
+        self.record(collection, False)
+        item = loader()
+        self.items[(collection, key)] = item
+
+        return item
+
+    def get_range(self, collection, key, start, end, loader, get_id, get_date):
+        """
+        :param loader: function(start, end) returning the items in [start, end]
+        :param get_id: function(item) returning a value that identifies the document
+        :param get_date: function(item) returning the value compared against start and end
+        :return: cached items in [start, end], sorted by get_date
+        """
+        windows = self.windows.setdefault((collection, key), [])
+        items = self.range_items.setdefault((collection, key), {})
+
+        missing = self.get_missing_windows(windows, start, end)
+
+        if len(missing) == 0:
+            self.record(collection, True)
+        else:
+            self.record(collection, False)
+            query_start, query_end = missing[0][0], missing[-1][1]
+            for item in loader(query_start, query_end):
+                # keep the instance already handed out so every caller sees the same object
+                items.setdefault(get_id(item), item)
+            self.windows[(collection, key)] = self.merge_windows(windows + [(query_start, query_end)])
+
+        return sorted([item for item in items.values() if start <= get_date(item) <= end], key=get_date)
+
+    @staticmethod
+    def get_missing_windows(windows, start, end):
+
+        missing = []
+        current = start
+
+        for window_start, window_end in windows:
+            if window_end < current:
+                continue
+            if window_start > end:
+                break
+            if window_start > current:
+                missing.append((current, window_start))
+            current = max(current, window_end)
+            if current >= end:
+                return missing
+
+        missing.append((current, end))
+
+        return missing
+
+    @staticmethod
+    def merge_windows(windows):
+
+        merged = []
+
+        for window_start, window_end in sorted(windows):
+            if len(merged) > 0 and window_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], window_end))
+            else:
+                merged.append((window_start, window_end))
+
+        return merged
+
+    def invalidate(self, collection, key=None):
+        """
+        Also drops views of the collection, cached as '<collection>:<view>' (e.g. a projection)
+        """
+        for cache in [self.items, self.range_items, self.windows]:
+            for cache_key in list(cache.keys()):
+                if (cache_key[0] == collection or cache_key[0].startswith(collection + ':')) and (key is None or cache_key[1] == key):
+                    del cache[cache_key]
+
+    def record(self, collection, hit):
+
+        counts = self.hits if hit else self.misses
+        counts[collection] = counts.get(collection, 0) + 1
+
+    def annotate(self):
+
+        xray_recorder.put_annotation('request_cache_hits', sum(self.hits.values()))
+        xray_recorder.put_annotation('request_cache_misses', sum(self.misses.values()))
+        xray_recorder.put_metadata('request_cache', {'hits': self.hits, 'misses': self.misses})
+
+    def clear(self):
+
+        self.items = {}
+        self.range_items = {}
+        self.windows = {}
+        self.hits = {}
+        self.misses = {}
@@ -1,14 +1,16 @@
 from aws_xray_sdk.core import xray_recorder
 from config import get_mongo_collection
+from datastores.bulk_write_datastore import BulkWriteDatastore
 from fathomapi.utils.exceptions import InvalidSchemaException, NoSuchEntityException
-from utils import format_date, format_datetime
+from utils import format_date, format_datetime, parse_datetime
 
 from models.session import Session
 
 
-class TrainingSessionDatastore(object):
+class TrainingSessionDatastore(BulkWriteDatastore):
     def __init__(self, mongo_collection='trainingsession'):
         self.mongo_collection = mongo_collection
+        self.request_cache = None
 
     @xray_recorder.capture('datastore.TrainingSessionDatastore.get')
     def get(self, session_id=None, user_id=None, event_date_time=None, start_date_time=None, end_date_time=None, read_session_load_dict=True):
@@ -18,17 +20,22 @@ class TrainingSessionDatastore(object):
         start_date_time: datetime.datetime
         end_date_time: datetime.datetime
         """
+        if (self.request_cache is not None and session_id is None and user_id is not None and event_date_time is None
+                and start_date_time is not None and end_date_time is not None):
+            return self._query_request_cache(user_id, start_date_time, end_date_time, read_session_load_dict)
         return self._query_mongodb(session_id, user_id, event_date_time, start_date_time, end_date_time, read_session_load_dict)
 
-    @xray_recorder.capture('datastore.TrainingSessionDatastore.put')
-    def put(self, items):
-        if not isinstance(items, list):
-            items = [items]
-        try:
-            for item in items:
-                self._put_mongodb(item)
-        except Exception as e:
-            raise e
+    def _query_request_cache(self, user_id, start_date_time, end_date_time, read_session_load_dict):
+        # sessions read without their session_load_dict are cached separately from complete sessions
+        collection = self.mongo_collection + ('' if read_session_load_dict else ':summary')
+
+        def load(query_start, query_end):
+            return self._query_mongodb(None, user_id, None, parse_datetime(query_start), parse_datetime(query_end),
+                                       read_session_load_dict)
+
+        return self.request_cache.get_range(collection, user_id, format_datetime(start_date_time),
+                                            format_datetime(end_date_time), load, lambda session: session.id,
+                                            lambda session: format_datetime(session.event_date))
 
     @xray_recorder.capture('datastore.TrainingSessionDatastore._query_mongodb')
     def _query_mongodb(self, session_id, user_id, event_date_time, start_date_time, end_date_time, read_session_load_dict):
@@ -62,10 +69,13 @@ class TrainingSessionDatastore(object):
                     ret.append(Session.json_deserialise(session))
                 return ret
 
-    @xray_recorder.capture('datastore.TrainingSessionDatastore._put_mongodb')
-    def _put_mongodb(self, item):
-        item = item.json_serialise()
+    @xray_recorder.capture('datastore.TrainingSessionDatastore.put')
+    def put(self, items, batch_size=None):
+        super().put(items, batch_size)
 
-        mongo_collection = get_mongo_collection(self.mongo_collection)
-        query = {'session_id': item['session_id']}
-        mongo_collection.replace_one(query, item, upsert=True)
+    def _before_put(self, item):
+        if self.request_cache is not None:
+            self.request_cache.invalidate(self.mongo_collection, item.user_id)
+
+    def _get_put_query(self, document):
+        return {'session_id': document['session_id']}
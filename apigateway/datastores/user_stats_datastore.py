@@ -1,10 +1,11 @@
 from aws_xray_sdk.core import xray_recorder
 from config import get_mongo_collection
+from datastores.bulk_write_datastore import BulkWriteDatastore
 from models.user_stats import UserStats
 from fathomapi.utils.exceptions import InvalidSchemaException
 
 
-class UserStatsDatastore(object):
+class UserStatsDatastore(BulkWriteDatastore):
     def __init__(self, mongo_collection='athletestats'):
         self.mongo_collection = mongo_collection
 
@@ -16,15 +17,6 @@ class UserStatsDatastore(object):
         """
         return self._query_mongodb(athlete_id)
 
-    def put(self, items):
-        if not isinstance(items, list):
-            items = [items]
-        try:
-            for item in items:
-                self._put_mongodb(item)
-        except Exception as e:
-            raise e
-
     def delete(self, athlete_id=None):
         if athlete_id is None:
             raise InvalidSchemaException("Need to provide athlete_id to delete")
@@ -38,7 +30,9 @@ class UserStatsDatastore(object):
             mongo_results = mongo_collection.find(query)
             athlete_stats_list = []
             for mongo_result in mongo_results:
-                athlete_stats_list.append(UserStats.json_deserialise(mongo_result))
+                user_stats = UserStats.json_deserialise(mongo_result)
+                user_stats.track_changes(mongo_result)
+                athlete_stats_list.append(user_stats)
 
             return athlete_stats_list
         else:
@@ -46,17 +40,18 @@ class UserStatsDatastore(object):
             mongo_result = mongo_collection.find_one(query)
 
             if mongo_result is not None:
-                return UserStats.json_deserialise(mongo_result)
+                user_stats = UserStats.json_deserialise(mongo_result)
+                user_stats.track_changes(mongo_result)
+                return user_stats
             else:
                 return None
 
-    @xray_recorder.capture('datastore.UserStatsDatastore._put_mongodb')
-    def _put_mongodb(self, item):
-        item = item.json_serialise()
+    @xray_recorder.capture('datastore.UserStatsDatastore.put')
+    def put(self, items, batch_size=None):
+        super().put(items, batch_size)
 
-        mongo_collection = get_mongo_collection(self.mongo_collection)
-        query = {'athlete_id': item['athlete_id']}
-        mongo_collection.replace_one(query, item, upsert=True)
+    def _get_put_query(self, document):
+        return {'athlete_id': document['athlete_id']}
 
     @xray_recorder.capture('datastore.UserStatsDatastore._delete_mongodb')
     def _delete_mongodb(self, athlete_id):
@@ -1,12 +1,13 @@
 from aws_xray_sdk.core import xray_recorder
 from config import get_mongo_collection
+from datastores.bulk_write_datastore import BulkWriteDatastore
 from fathomapi.utils.exceptions import InvalidSchemaException, NoSuchEntityException
 from utils import format_date, format_datetime
 
 from models.planned_exercise import PlannedWorkout
 
 
-class WorkoutDatastore(object):
+class WorkoutDatastore(BulkWriteDatastore):
     def __init__(self, mongo_collection='workout'):
         self.mongo_collection = mongo_collection
 
@@ -20,16 +21,6 @@ class WorkoutDatastore(object):
         """
         return self._query_mongodb(program_id, event_date, start_date, end_date, json=json)
 
-    @xray_recorder.capture('datastore.WorkoutDatastore.put')
-    def put(self, items):
-        if not isinstance(items, list):
-            items = [items]
-        try:
-            for item in items:
-                self._put_mongodb(item)
-        except Exception as e:
-            raise e
-
     @xray_recorder.capture('datastore.WorkoutDatastore._query_mongodb')
     def _query_mongodb(self, program_id, event_date, start_date, end_date, json=False):
 
@@ -59,10 +50,9 @@ class WorkoutDatastore(object):
                 ret.append(PlannedWorkout.json_deserialise(session))
             return ret
 
-    @xray_recorder.capture('datastore.WorkoutDatastore._put_mongodb')
-    def _put_mongodb(self, item):
-        item = item.json_serialise()
+    @xray_recorder.capture('datastore.WorkoutDatastore.put')
+    def put(self, items, batch_size=None):
+        super().put(items, batch_size)
 
-        mongo_collection = get_mongo_collection(self.mongo_collection)
-        query = {'program_id': item['program_id']}
-        mongo_collection.replace_one(query, item, upsert=True)
+    def _get_put_query(self, document):
+        return {'program_id': document['program_id']}
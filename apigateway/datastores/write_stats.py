@@ -0,0 +1,34 @@
+from aws_xray_sdk.core import xray_recorder
+
+
+class WriteStats(object):
+    """
+    Documents written and skipped as unchanged by datastore puts, by collection, for the request being handled.
+
+    Datastores that remember what's stored (to write only what changed) only trust what they learnt during the
+    current request, identified by request_id, as other processes may write the same documents between requests.
+    """
+    def __init__(self):
+        self.request_id = 0
+        self.written = {}
+        self.skipped = {}
+
+    def start_request(self):
+
+        self.request_id += 1
+        self.written = {}
+        self.skipped = {}
+
+    def record(self, collection, written):
+
+        counts = self.written if written else self.skipped
+        counts[collection] = counts.get(collection, 0) + 1
+
+    def annotate(self):
+
+        xray_recorder.put_annotation('datastore_writes', sum(self.written.values()))
+        xray_recorder.put_annotation('datastore_writes_skipped', sum(self.skipped.values()))
+        xray_recorder.put_metadata('datastore_writes', {'written': self.written, 'skipped': self.skipped})
+
+
+write_stats = WriteStats()
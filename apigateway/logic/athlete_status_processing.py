@@ -126,7 +126,7 @@ class AthleteStatusProcessing(object):
         plans = self.daily_plan_store.get(user_id=self.user_id,
                                           start_date=self.typical_sessions_start_date,
                                           end_date=self.event_date,
-                                          stats_processing=True
+                                          fields=['training_sessions']
                                           )
         sessions = []
         for plan in plans:
@@ -0,0 +1,95 @@
+import abc
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class PredictionCache(object):
+    """
+    Least recently used cache of model predictions keyed on feature tuples.  Bound to one model so that reloading
+    the model doesn't serve predictions made by the previous one.
+    """
+    def __init__(self, model, max_size):
+        self.model = model
+        self.max_size = max_size
+        self.predictions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, features):
+        with self.lock:
+            prediction = self.predictions.get(features)
+            if prediction is not None:
+                self.predictions.move_to_end(features)
+            return prediction
+
+    def put(self, features, prediction):
+        with self.lock:
+            self.predictions[features] = prediction
+            self.predictions.move_to_end(features)
+            while len(self.predictions) > self.max_size:
+                self.predictions.popitem(last=False)
+
+    def __len__(self):
+        return len(self.predictions)
+
+
+class BatchPredictor(object, metaclass=abc.ABCMeta):
+    """
+    Runs a model once over every feature tuple of a batch that isn't already cached.
+
+    Subclasses implement get_feature_matrix and set the value returned when models are disabled (CODEBUILD_RUN).
+    """
+    cache_size = 4096
+    codebuild_prediction = None
+    decimals = 1
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, model):
+        self.model = model
+
+    @abc.abstractmethod
+    def get_feature_matrix(self, features_list):
+        """
+        2d array of the model's inputs, one row per feature tuple in features_list
+        """
+        pass
+
+    @property
+    def cache(self):
+        cache = self._caches.get(type(self))
+        if cache is None or cache.model is not self.model:
+            with self._caches_lock:
+                cache = self._caches.get(type(self))
+                if cache is None or cache.model is not self.model:
+                    cache = PredictionCache(self.model, self.cache_size)
+                    self._caches[type(self)] = cache
+        return cache
+
+    def predict_batch(self, features_list):
+        """
+        :param features_list: list of feature tuples, as returned by the subclass's get_features
+        :return: list of predictions, in the order of features_list
+        """
+        if os.environ.get('CODEBUILD_RUN', '') == 'TRUE':
+            return [self.codebuild_prediction for _ in features_list]
+
+        cache = self.cache
+        predictions = [cache.get(features) for features in features_list]
+        missing_features = list(OrderedDict.fromkeys(f for f, p in zip(features_list, predictions) if p is None))
+
+        if len(missing_features) > 0:
+            new_predictions = {}
+            for features, prediction in zip(missing_features, self.model.predict(self.get_feature_matrix(missing_features))):
+                if prediction < 0:
+                    prediction = 0
+                new_predictions[features] = round(prediction, self.decimals)
+                cache.put(features, new_predictions[features])
+            predictions = [p if p is not None else new_predictions[f] for f, p in zip(features_list, predictions)]
+
+        return predictions
+
+    @staticmethod
+    def to_matrix(rows, columns):
+        return np.array(rows, dtype=float).reshape(len(rows), columns)
@@ -1,6 +1,7 @@
-import os
+import numpy as np
 from datastores.ml_model_datastore import MLModelsDatastore
 from fathomapi.utils.xray import xray_recorder
+from logic.batch_predictor import BatchPredictor
 from models.movement_tags import Gender
 
 
@@ -16,11 +17,50 @@ all_prime_movers = [
     71, 72, 74, 75, 76, 78, 79, 81, 82, 83,
     84, 85, 122, 123, 124, 125, 126, 130, 131, 132
 ]
+prime_mover_priorities = ['first_prime_movers', 'second_prime_movers', 'third_prime_movers']
+# each prime mover has a prime_mover_, second_prime_mover_ and third_prime_mover_ column, in that order
+prime_mover_columns = {prime_mover: 3 * index for index, prime_mover in enumerate(all_prime_movers)}
+equipment_columns = {'barbells': 1, 'bodyweight': 2, 'cable': 3, 'dumbbells': 4, 'machine': 5}
 
 
-class BodyWeightRatioPredictor(object):
-    def __init__(self):
-        self.model = MLModelsDatastore.get_bodyweight_ratio_model()
+class BodyWeightRatioPredictor(BatchPredictor):
+    codebuild_prediction = .5
+    decimals = 3
+
+    def __init__(self, model=None):
+        super().__init__(model or MLModelsDatastore.get_bodyweight_ratio_model())
+
+    @staticmethod
+    def get_features(user_weight, gender, prime_movers, equipment):
+        """
+        :return: hashable (user_weight, equipment name, gender, prime mover column per priority) tuple
+        """
+        gender = 1.0 if gender.name == 'female' else 0.0
+        columns = tuple(tuple(sorted(prime_mover_columns[prime_mover] + priority
+                                     for prime_mover in prime_movers[priority_name] if prime_mover in prime_mover_columns))
+                        for priority, priority_name in enumerate(prime_mover_priorities))
+        return user_weight, equipment.name, gender, columns
+
+    def get_feature_matrix(self, features_list):
+        offset = len(non_prime_mover_features)
+        feature_matrix = np.zeros((len(features_list), offset + 3 * len(all_prime_movers)))
+        rows = []
+        columns = []
+        for row, (user_weight, equipment_name, gender, prime_mover_feature_columns) in enumerate(features_list):
+            feature_matrix[row, 0] = user_weight
+            feature_matrix[row, offset - 1] = gender
+            equipment_column = equipment_columns.get(equipment_name)
+            if equipment_column is not None:
+                feature_matrix[row, equipment_column] = 1.0
+            for priority_columns in prime_mover_feature_columns:
+                rows.extend([row] * len(priority_columns))
+                columns.extend(priority_columns)
+        feature_matrix[rows, np.array(columns, dtype=int) + offset] = 1.0
+        return feature_matrix
+
+    @xray_recorder.capture('logic.BodyWeightRatioPredictor.predict_bodyweight_ratios')
+    def predict_bodyweight_ratios(self, features_list):
+        return self.predict_batch(features_list)
 
     @xray_recorder.capture('logic.BodyWeightRatioPredictor.predict_bodyweight_ratio')
     def predict_bodyweight_ratio(self, user_weight, gender, prime_movers, equipment):
@@ -32,46 +72,13 @@ class BodyWeightRatioPredictor(object):
         :param equipment:
         :return:
         """
-        if os.environ.get('CODEBUILD_RUN', '') == 'TRUE':
-            return .5
-        else:
-            gender = 1.0 if gender.name == 'female' else 0.0
-            equipment_barbells = 0.0
-            equipment_bodyweight = 0.0
-            equipment_cable = 0.0
-            equipment_dumbbells = 0.0
-            equipment_machine = 0.0
-            if equipment.name == 'barbells':
-                equipment_barbells = 1.0
-            if equipment.name == 'bodyweight':
-                equipment_bodyweight = 1.0
-            if equipment.name == 'cable':
-                equipment_cable = 1.0
-            if equipment.name == 'dumbbells':
-                equipment_dumbbells = 1.0
-            if equipment.name == 'machine':
-                equipment_machine = 1.0
-            features = [user_weight, equipment_barbells, equipment_bodyweight, equipment_cable, equipment_dumbbells, equipment_machine, gender]
-            prime_movers_features = self.get_prime_movers_features(prime_movers)
-            features.extend(prime_movers_features)
-            predicted_ratio = self.model.predict([features])[0]
-            if predicted_ratio < 0:
-                predicted_ratio = 0
-            predicted_ratio = round(predicted_ratio, 3)
-            return predicted_ratio
+        return self.predict_batch([self.get_features(user_weight, gender, prime_movers, equipment)])[0]
 
     @classmethod
     def get_prime_movers_features(cls, prime_movers):
-        prime_mover_features = {}
-        for prime_mover in prime_movers['first_prime_movers']:
-            prime_mover_features[f"prime_mover_{prime_mover}"] = 1
-        for second_prime_mover in prime_movers['second_prime_movers']:
-            prime_mover_features[f"second_prime_mover_{second_prime_mover}"] = 1
-        for third_prime_mover in prime_movers['third_prime_movers']:
-            prime_mover_features[f"third_prime_mover_{third_prime_mover}"] = 1
-        all_prime_mover_features = []
-        for pm in all_prime_movers:
-            all_prime_mover_features.append(prime_mover_features.get(f"prime_mover_{pm}", 0))
-            all_prime_mover_features.append(prime_mover_features.get(f"second_prime_mover_{pm}", 0))
-            all_prime_mover_features.append(prime_mover_features.get(f"third_prime_mover_{pm}", 0))
-        return all_prime_mover_features
+        prime_mover_features = np.zeros(3 * len(all_prime_movers), dtype=int)
+        for priority, priority_name in enumerate(prime_mover_priorities):
+            columns = [prime_mover_columns[prime_mover] + priority
+                       for prime_mover in prime_movers[priority_name] if prime_mover in prime_mover_columns]
+            prime_mover_features[columns] = 1
+        return prime_mover_features.tolist()
@@ -121,6 +121,16 @@ class Calculators(object):
             perc = 35
         return perc / 100
 
+    @classmethod
+    def trimp_edwards(cls, zone_durations):
+        """
+        Edwards' summated heart rate zone TRIMP: minutes in each zone weighted by zone number
+
+        :param zone_durations: seconds spent in zones 1-5 (see HeartRateProcessing.get_zone_durations)
+        :return:
+        """
+        return sum((zone + 1) * duration / 60.0 for zone, duration in enumerate(zone_durations))
+
     @classmethod
     def vo2max_schembre(cls, age, weight, height, gender=Gender.female, activity_level=5):
         """
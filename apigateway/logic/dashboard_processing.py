@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+from fathomapi.utils.exceptions import ForbiddenException
+from fathomapi.utils.xray import xray_recorder
+from models.dashboard import TeamDashboardData, AthleteDashboardData
+import threading
+import time
+
+
+class DashboardProcessor(object):
+    """
+    Builds a coach's dashboard for several teams at once.  Each team's users service lookup and daily plan read
+    run on a bounded thread pool, and the metrics of every team's athletes come from a single athlete stats query.
+    stage_seconds holds the wall time of each stage; stages overlap, as plans are read while other teams are
+    still being looked up.
+    """
+    def __init__(self, coach_id, team_ids, event_date, users_service, datastore_collection, max_workers=8):
+        self.coach_id = coach_id
+        self.team_ids = team_ids
+        self.event_date = event_date
+        self.users_service = users_service
+        self.athlete_stats_datastore = datastore_collection.athlete_stats_datastore
+        self.daily_plan_datastore = datastore_collection.daily_plan_datastore
+        self.max_workers = max_workers
+        self.stage_seconds = {}
+        self._stage_times = {}
+        self._stage_times_lock = threading.Lock()
+        self._executor = None
+        self._team_info_futures = []
+        self._daily_plan_futures = []
+        self._trace_entity = None
+
+    def __enter__(self):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, 2 * len(self.team_ids))))
+        try:
+            self._trace_entity = xray_recorder.get_trace_entity()
+        except Exception:
+            self._trace_entity = None
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # don't leave queued reads running for a request that has failed
+        for future in self._team_info_futures + self._daily_plan_futures:
+            if future is not None:
+                future.cancel()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self.stage_seconds = {stage: round(end - start, 3) for stage, (start, end) in self._stage_times.items()}
+
+    @xray_recorder.capture('logic.DashboardProcessor.get_team_info')
+    def get_team_info(self):
+        """
+        Looks up every team, starting each team's daily plan read as soon as its users are known.  Raises the
+        first team's error, if any lookup fails.
+        """
+        self._daily_plan_futures = [None] * len(self.team_ids)
+        self._team_info_futures = [self._submit('team_info', self._get_team_info_and_plans, index, team_id)
+                                   for index, team_id in enumerate(self.team_ids)]
+        return [future.result() for future in self._team_info_futures]
+
+    @xray_recorder.capture('logic.DashboardProcessor.get_dashboard_data')
+    def get_dashboard_data(self, team_info):
+        user_ids = list({user_id: None for team_name, team_user_ids, users in team_info for user_id in team_user_ids})
+        athlete_metrics = self._timed('athlete_stats', self.athlete_stats_datastore.get_metrics, user_ids)
+        daily_plan_lists = [future.result() for future in self._daily_plan_futures]
+
+        start_time = time.time()
+        teams = []
+        for (team_name, team_user_ids, users), daily_plan_list in zip(team_info, daily_plan_lists):
+            team = TeamDashboardData(team_name)
+            team.get_compliance_data(team_user_ids, users, daily_plan_list)
+            # athletes in the order Mongo returned them, as when each team had its own query
+            team_user_id_set = set(team_user_ids)
+            for user_id, metrics in athlete_metrics.items():
+                if user_id in team_user_id_set:
+                    user_dict = users[user_id]
+                    athlete = AthleteDashboardData(user_dict['user_id'], user_dict['first_name'], user_dict['last_name'])
+                    athlete.aggregate(metrics)
+                    team.insert_user(athlete)
+                    team.athletes.append(athlete)
+            teams.append(team.json_serialise())
+        self._record_time('aggregate', start_time, time.time())
+        return teams
+
+    def _get_team_info_and_plans(self, index, team_id):
+        team_info = get_team_info(self.users_service, self.coach_id, team_id)
+        self._daily_plan_futures[index] = self._submit('daily_plans', self.daily_plan_datastore.get, team_info[1],
+                                                       start_date=self.event_date, end_date=self.event_date,
+                                                       fields=['daily_readiness_survey', 'sessions_planned', 'training_sessions'])
+        return team_info
+
+    def _submit(self, stage, function, *args, **kwargs):
+        return self._executor.submit(self._run_in_worker, stage, function, *args, **kwargs)
+
+    def _run_in_worker(self, stage, function, *args, **kwargs):
+        # xray keeps its segment per thread, so hand the request's segment to the worker
+        if self._trace_entity is not None:
+            xray_recorder.set_trace_entity(self._trace_entity)
+        try:
+            return self._timed(stage, function, *args, **kwargs)
+        finally:
+            if self._trace_entity is not None:
+                xray_recorder.clear_trace_entities()
+
+    def _timed(self, stage, function, *args, **kwargs):
+        start_time = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._record_time(stage, start_time, time.time())
+
+    def _record_time(self, stage, start_time, end_time):
+        with self._stage_times_lock:
+            if stage in self._stage_times:
+                start_time = min(start_time, self._stage_times[stage][0])
+                end_time = max(end_time, self._stage_times[stage][1])
+            self._stage_times[stage] = (start_time, end_time)
+
+
+def get_team_info(users_service, user_id, account_id):
+    response = users_service.call_apigateway_sync('GET', f"account/{account_id}/users")
+    user_ids = response['account']['users']
+    if user_id in user_ids:
+        raise ForbiddenException("Must be a coach to view the dashboard")
+    team_name = response['account']['name']
+    users = {}
+    for user in response['users']:
+        users[user['id']] = {'user_id': user['id'],
+                             'first_name': user['personal_data']['first_name'],
+                             'last_name': user['personal_data']['last_name']}
+    return team_name, user_ids, users
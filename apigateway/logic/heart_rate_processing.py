@@ -1,67 +1,88 @@
 # from models.heart_rate import HeartRateData, SessionHeartRate
 # from datetime import timedelta
-from utils import parse_datetime
+import numpy as np
+from utils import parse_datetimes
 
 
 class HeartRateProcessing(object):
+    zone_count = 5
+
     def __init__(self, user_age):
         self.user_age = user_age
 
-    def get_shrz(self, heart_rate_data):
-
-        # max_heart_rate = float(220) - float(self.user_age)  # Fox
-        max_heart_rate = float(208) - 0.7 * float(self.user_age)  # Tanaka
+    def get_max_heart_rate(self):
 
-        zone_1_duration = 0
-        zone_2_duration = 0
-        zone_3_duration = 0
-        zone_4_duration = 0
-        zone_5_duration = 0
+        # return float(220) - float(self.user_age)  # Fox
+        return float(208) - 0.7 * float(self.user_age)  # Tanaka
 
-        full_heart_data = self.extrapolate_heart_rate_data(heart_rate_data)
+    def get_shrz(self, heart_rate_data):
 
-        for h in full_heart_data:
-            if max_heart_rate * 0.5 <= float(h) < max_heart_rate * 0.6:
-                zone_1_duration += 1
-            elif max_heart_rate * 0.6 <= float(h) < max_heart_rate * 0.7:
-                zone_2_duration += 1
-            elif max_heart_rate * 0.7 <= float(h) < max_heart_rate * 0.8:
-                zone_3_duration += 1
-            elif max_heart_rate * 0.8 <= float(h) < max_heart_rate * 0.9:
-                zone_4_duration += 1
-            elif max_heart_rate * 0.9 <= float(h) <= max_heart_rate:
-                zone_5_duration += 1
+        heart_rates = self.get_heart_rate_array(heart_rate_data)
+        zone_durations = self.get_zone_durations_from_array(heart_rates)
 
-        zone_1_duration = zone_1_duration * 1
-        zone_2_duration = zone_2_duration * 2
-        zone_3_duration = zone_3_duration * 3
-        zone_4_duration = zone_4_duration * 4
-        zone_5_duration = zone_5_duration * 5
+        return self.get_shrz_from_zone_durations(zone_durations, len(heart_rates))
 
-        total_duration = zone_1_duration + zone_2_duration + zone_3_duration + zone_4_duration + zone_5_duration
+    def get_shrz_from_zone_durations(self, zone_durations, total_seconds):
+        """
+        :param zone_durations: seconds spent in each of zones 1-5
+        :param total_seconds: length of the session in seconds, including time outside the zones
+        :return: shrz score between 1 and 10
+        """
+        weighted_duration = float(np.dot(zone_durations, np.arange(1, self.zone_count + 1)))
 
-        total_possible_duration = len(full_heart_data) * 5
+        total_possible_duration = total_seconds * self.zone_count
 
-        shrz = round((total_duration / total_possible_duration) * 10, 2)
+        shrz = round((weighted_duration / total_possible_duration) * 10, 2)
 
         shrz = max(1, shrz)
 
         return shrz
 
-    def extrapolate_heart_rate_data(self, heart_rate_data):
+    def get_zone_durations(self, heart_rate_data):
+        """
+        Seconds spent in each heart rate zone, using the same per-second heart rates as get_shrz
+        :param heart_rate_data: list of HeartRateData
+        :return: array of seconds in zones 1-5
+        """
+        return self.get_zone_durations_from_array(self.get_heart_rate_array(heart_rate_data))
+
+    def get_zone_durations_from_array(self, heart_rates):
+
+        zones = self.get_heart_rate_zones(heart_rates)
+
+        return np.bincount(zones, minlength=self.zone_count + 1)[1:]
+
+    def get_heart_rate_zones(self, heart_rates):
+        """
+        Zone (1-5) of each heart rate; 0 for heart rates below 50% or above 100% of max heart rate
+        """
+        max_heart_rate = self.get_max_heart_rate()
+
+        zone_thresholds = np.array([max_heart_rate * 0.5, max_heart_rate * 0.6, max_heart_rate * 0.7,
+                                    max_heart_rate * 0.8, max_heart_rate * 0.9])
+
+        zones = np.digitize(heart_rates, zone_thresholds)
+        zones[heart_rates > max_heart_rate] = 0
+
+        return zones
+
+    def get_heart_rate_array(self, heart_rate_data):
+        """
+        Heart rate for every second of the session, linearly interpolated between samples
+        :param heart_rate_data: list of HeartRateData
+        :return: numpy array of heart rates
+        """
         heart_rate_data = sorted(heart_rate_data, key=lambda k: k.start_date)
-        new_heart_rate_data = []
 
-        for h in range(0, len(heart_rate_data) - 1):
-            last_date_time = parse_datetime(heart_rate_data[h].start_date)
-            next_date_time = parse_datetime(heart_rate_data[h + 1].start_date)
-            seconds_diff = (next_date_time - last_date_time).seconds
-            new_heart_rate_data.append(heart_rate_data[h].value)
-            if seconds_diff > 0:
-                for s in range(1, seconds_diff):
-                    new_heart_rate = ((heart_rate_data[h + 1].value - heart_rate_data[h].value) / seconds_diff * s) + heart_rate_data[h].value
-                    new_heart_rate_data.append(new_heart_rate)
+        start_date_times = parse_datetimes([h.start_date for h in heart_rate_data])
+        values = np.array([h.value for h in heart_rate_data], dtype=float)
+
+        # each sample fills the whole seconds up to the next one (at least one second, even if they share a timestamp)
+        seconds_diffs = [(start_date_times[h + 1] - start_date_times[h]).seconds for h in range(0, len(heart_rate_data) - 1)]
+        sample_positions = np.concatenate([[0], np.cumsum(np.maximum(seconds_diffs, 1))])
 
-        new_heart_rate_data.append(heart_rate_data[len(heart_rate_data) - 1].value)
+        return np.interp(np.arange(sample_positions[-1] + 1), sample_positions, values)
+
+    def extrapolate_heart_rate_data(self, heart_rate_data):
 
-        return new_heart_rate_data
+        return self.get_heart_rate_array(heart_rate_data).tolist()
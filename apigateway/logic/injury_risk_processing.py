@@ -4,19 +4,40 @@ from logic.functional_anatomy_processing import FunctionalAnatomyProcessor
 from models.soreness_base import BodyPartSide, BodyPartLocation
 from models.session_functional_movement import SessionFunctionalMovement
 from models.body_part_injury_risk import BodyPartInjuryRisk
+from models.athlete_injury_risk import InjuryRiskCheckpoint
 from models.body_parts import BodyPart, BodyPartFactory
 from copy import deepcopy
 from utils import format_date
 from models.functional_movement_stats import InjuryCycleSummary, InjuryCycleSummaryProcessor
 from models.session import SessionType
-from models.training_volume import StandardErrorRange
+from models.training_volume import StandardErrorRange, StandardErrorRangeArray
+from logic.injury_risk_ranking import InjuryRiskRanking, RankingMode
+from serialisable import json_serialise
 from math import floor
+import hashlib
+import json
 import pickle
 
 
 class InjuryRiskProcessor(object):
-    def __init__(self, event_date_time, symptoms_list, training_session_list, injury_risk_dict, athlete_stats, user_id, hist_injury_risk_dict=None):
+    # BodyPartInjuryRisk daily volume: BodyPartFunctionalMovement load it sums over the day's sessions
+    daily_volume_loads = [
+        ('concentric_volume_today', 'concentric_load'),
+        ('isometric_volume_today', 'isometric_load'),
+        ('eccentric_volume_today', 'eccentric_load'),
+        ('compensating_concentric_volume_today', 'compensated_concentric_load'),
+        ('compensating_isometric_volume_today', 'compensated_isometric_load'),
+        ('compensating_eccentric_volume_today', 'compensated_eccentric_load')
+    ]
+
+    def __init__(self, event_date_time, symptoms_list, training_session_list, injury_risk_dict, athlete_stats, user_id, hist_injury_risk_dict=None,
+                 ranking_mode=RankingMode.each_session):
+        """
+        ranking_mode: RankingMode.end_of_day ranks the injury risk dict once after each day's sessions rather than
+        after every session, for replays that only need each day's end state
+        """
         self.user_id = user_id
+        self.ranking_mode = ranking_mode
         self.event_date_time = event_date_time
         self.symptoms = symptoms_list
         self.training_sessions = training_session_list
@@ -33,32 +54,7 @@ class InjuryRiskProcessor(object):
         self.ten_days_ago = self.event_date_time.date() - timedelta(days=9)
         self.twenty_days_ago = self.event_date_time.date() - timedelta(days=19)
         self.functional_anatomy_processor = FunctionalAnatomyProcessor()
-        
-        self.eccentric_volume_dict = {}
-        self.concentric_volume_dict = {}
-        self.isometric_volume_dict = {}
-        self.total_volume_dict = {}
-        self.prime_mover_eccentric_volume_dict = {}
-        self.prime_mover_concentric_volume_dict = {}
-        self.prime_mover_total_volume_dict = {}
-        self.synergist_eccentric_volume_dict = {}
-        self.synergist_compensating_eccentric_volume_dict = {}
-        self.synergist_concentric_volume_dict = {}
-        self.synergist_compensating_concentric_volume_dict = {}
-        self.synergist_total_volume_dict = {}
-        
-        self.eccentric_intensity_dict = {}
-        self.isometric_intensity_dict = {}
-        self.concentric_intensity_dict = {}
-        self.total_intensity_dict = {}
-        self.prime_mover_eccentric_intensity_dict = {}
-        self.prime_mover_concentric_intensity_dict = {}
-        self.prime_mover_total_intensity_dict = {}
-        self.synergist_eccentric_intensity_dict = {}
-        self.synergist_compensating_eccentric_intensity_dict = {}
-        self.synergist_concentric_intensity_dict = {}
-        self.synergist_compensating_concentric_intensity_dict = {}
-        self.synergist_total_intensity_dict = {}
+        self.checkpoint = None
 
     def set_relative_load_level(self, base_date):
 
@@ -129,7 +125,14 @@ class InjuryRiskProcessor(object):
         return consolidated_injury_risk_dict
 
     @xray_recorder.capture('logic.InjuryRiskProcessor.process')
-    def process(self, update_historical_data=False, aggregate_results=False, aggregate_for_viz=False):
+    def process(self, update_historical_data=False, aggregate_results=False, aggregate_for_viz=False, checkpoint=None,
+                earliest_changed_date=None, create_checkpoint=False):
+        """
+        checkpoint, earliest_changed_date: the historical replay resumes from checkpoint when nothing on or before it
+        has changed
+        create_checkpoint: keep the state at the end of the last day before the event date in self.checkpoint, for a
+        later replay of the same event date to resume from
+        """
 
         body_part_factory = BodyPartFactory()
 
@@ -157,7 +160,8 @@ class InjuryRiskProcessor(object):
         self.symptoms = detailed_symptoms
 
         if update_historical_data:
-            self.injury_risk_dict = self.update_historical_data(self.load_stats)
+            self.injury_risk_dict = self.update_historical_data(self.load_stats, checkpoint, earliest_changed_date,
+                                                                create_checkpoint)
         else:
             self.process_todays_symptoms(self.event_date_time.date(), self.injury_risk_dict)
             self.process_todays_sessions(self.event_date_time.date(), self.injury_risk_dict, self.load_stats)
@@ -245,274 +249,11 @@ class InjuryRiskProcessor(object):
             injury_risk_dict[b].short_count_last_0_20_days = 0
 
     def update_injury_risk_dict_rankings(self, injury_risk_dict, base_date):
-        
-        total_compensation_muscles = [c.total_compensation_percent for c in injury_risk_dict.values() if c.total_compensation_percent.observed_value > 0]
-        eccentric_compensation_muscles = [c.eccentric_compensation_percent for c in injury_risk_dict.values() if c.eccentric_compensation_percent.observed_value > 0]
-        total_volume_muscles = [c.total_volume_today() for c in injury_risk_dict.values() if
-                                      c.total_volume_today().observed_value > 0]
-        eccentric_volume_muscles = [c.eccentric_volume_today for c in injury_risk_dict.values() if
-                                          c.eccentric_volume_today.observed_value > 0]
-        
-        max_total_compensation = None
-        max_eccentric_compensation = None
-        max_total_volume = None
-        max_eccentric_volume = None
-
-        two_days_ago = base_date - timedelta(days=1)
-
-        if len(total_compensation_muscles) > 0:
-            min_total_compensation = StandardErrorRange().get_min_from_error_range_list(total_compensation_muscles)
-            max_total_compensation = StandardErrorRange().get_max_from_error_range_list(total_compensation_muscles)
-            total_compensation_tier = ((max_total_compensation - min_total_compensation) / 4)
-            total_compensation_tier_1 = max_total_compensation - total_compensation_tier
-            total_compensation_tier_2 = max_total_compensation - (2 * total_compensation_tier)
-            total_compensation_tier_3 = max_total_compensation - (3 * total_compensation_tier)
-
-        if len(eccentric_compensation_muscles) > 0:
-            min_eccentric_compensation = StandardErrorRange().get_min_from_error_range_list(eccentric_compensation_muscles)
-            max_eccentric_compensation = StandardErrorRange().get_max_from_error_range_list(eccentric_compensation_muscles)
-            eccentric_compensation_tier = ((max_eccentric_compensation - min_eccentric_compensation) / 4)
-            eccentric_compensation_tier_1 = max_eccentric_compensation - eccentric_compensation_tier
-            eccentric_compensation_tier_2 = max_eccentric_compensation - (2 * eccentric_compensation_tier)
-            eccentric_compensation_tier_3 = max_eccentric_compensation - (3 * eccentric_compensation_tier)
-
-        if len(total_volume_muscles) > 0:
-            min_total_volume = StandardErrorRange().get_min_from_error_range_list(total_volume_muscles)
-            max_total_volume = StandardErrorRange().get_max_from_error_range_list(total_volume_muscles)
-            total_volume_tier = ((max_total_volume - min_total_volume) / 4)
-            total_volume_tier_1 = max_total_volume - total_volume_tier
-            total_volume_tier_2 = max_total_volume - (2 * total_volume_tier)
-            total_volume_tier_3 = max_total_volume - (3 * total_volume_tier)
-
-        if len(eccentric_volume_muscles) > 0:
-            min_eccentric_volume = StandardErrorRange().get_min_from_error_range_list(eccentric_volume_muscles)
-            max_eccentric_volume = StandardErrorRange().get_max_from_error_range_list(eccentric_volume_muscles)
-            eccentric_volume_tier = ((max_eccentric_volume - min_eccentric_volume) / 4)
-            eccentric_volume_tier_1 = max_eccentric_volume - eccentric_volume_tier
-            eccentric_volume_tier_2 = max_eccentric_volume - (2 * eccentric_volume_tier)
-            eccentric_volume_tier_3 = max_eccentric_volume - (3 * eccentric_volume_tier)
 
-        for body_part_side, body_part_injury_risk in injury_risk_dict.items():
-            body_part_injury_risk.total_compensation_percent_tier = 0
-            body_part_injury_risk.eccentric_compensation_percent_tier = 0
-            body_part_injury_risk.total_volume_percent_tier = 0
-            body_part_injury_risk.eccentric_volume_percent_tier = 0
-            body_part_injury_risk.limited_mobility_tier = 0
-            body_part_injury_risk.underactive_weak_tier = 0
-
-        if max_total_compensation is not None or max_eccentric_compensation is not None or max_total_volume is not None or max_eccentric_volume is not None:
-
-            for body_part_side, body_part_injury_risk in injury_risk_dict.items():
-                if self.relative_load_level == 1:
-                    if max_total_compensation is not None:
-                        if body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_1:
-                            body_part_injury_risk.total_compensation_percent_tier = 1
-                        elif body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_2:
-                            body_part_injury_risk.total_compensation_percent_tier = 2
-                        elif body_part_injury_risk.total_compensation_percent.lowest_value() >= min_total_compensation:
-                            body_part_injury_risk.total_compensation_percent_tier = 3
-                        # elif body_part_injury_risk.total_compensation_percent >= min_total_compensation:
-                        #     body_part_injury_risk.total_compensation_percent_tier = 4
-                    else:
-                        body_part_injury_risk.total_compensation_percent_tier = 0
-
-                    if max_eccentric_compensation is not None:
-                        if body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_1:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 1
-                        elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_2:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 2
-                        elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= min_eccentric_compensation:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 3
-                        # elif body_part_injury_risk.eccentric_compensation_percent >= min_eccentric_compensation:
-                        #     body_part_injury_risk.eccentric_compensation_percent_tier = 4
-                    else:
-                        body_part_injury_risk.eccentric_compensation_percent_tier = 0
-
-                elif self.relative_load_level == 2:
-                    if max_total_compensation is not None:
-                        if body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_1:
-                            body_part_injury_risk.total_compensation_percent_tier = 2
-                        elif body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_2:
-                            body_part_injury_risk.total_compensation_percent_tier = 3
-                        elif body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_3:
-                            body_part_injury_risk.total_compensation_percent_tier = 4
-                        elif body_part_injury_risk.total_compensation_percent.lowest_value() >= min_total_compensation:
-                            body_part_injury_risk.total_compensation_percent_tier = 5
-                    else:
-                        body_part_injury_risk.total_compensation_percent_tier = 0
-
-                    if max_eccentric_compensation is not None:
-                        if body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_1:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 2
-                        elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_2:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 3
-                        elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_3:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 4
-                        elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= min_eccentric_compensation:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 5
-                    else:
-                        body_part_injury_risk.eccentric_compensation_percent_tier = 0
-
-                else:  # relative load 3
-                    if max_total_compensation is not None:
-                        if body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_1:
-                            body_part_injury_risk.total_compensation_percent_tier = 3
-                        elif body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_2:
-                            body_part_injury_risk.total_compensation_percent_tier = 4
-                        elif body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_3:
-                            body_part_injury_risk.total_compensation_percent_tier = 5
-                        elif body_part_injury_risk.total_compensation_percent.lowest_value() >= min_total_compensation:
-                            body_part_injury_risk.total_compensation_percent_tier = 0
-                        else:
-                            body_part_injury_risk.total_compensation_percent_tier = 0
-                    else:
-                        body_part_injury_risk.total_compensation_percent_tier = 0
-
-                    if max_eccentric_compensation is not None:
-                        if body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_1:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 3
-                        elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_2:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 4
-                        elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_3:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 5
-                        elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= min_eccentric_compensation:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 0
-                        else:
-                            body_part_injury_risk.eccentric_compensation_percent_tier = 0
-
-                    else:
-                        body_part_injury_risk.eccentric_compensation_percent_tier = 0
-
-                if max_total_volume is not None:
-                    total_volume_today = body_part_injury_risk.total_volume_today()
-
-                    if self.relative_load_level == 1:
-
-                        if total_volume_today.lowest_value() >= total_volume_tier_1:
-                            body_part_injury_risk.total_volume_percent_tier = 1
-                            body_part_injury_risk.last_excessive_strain_date = base_date
-                            body_part_injury_risk.last_inhibited_date = base_date
-                            body_part_injury_risk.last_non_functional_overreaching_date = base_date
-
-                        elif total_volume_today.lowest_value() >= total_volume_tier_2:
-                            body_part_injury_risk.total_volume_percent_tier = 2
-                            body_part_injury_risk.last_excessive_strain_date = base_date
-                            body_part_injury_risk.last_inhibited_date = base_date
-                            body_part_injury_risk.last_functional_overreaching_date = base_date
-
-                        elif total_volume_today.lowest_value() >= total_volume_tier_3:
-                            body_part_injury_risk.total_volume_percent_tier = 3
-
-                        elif total_volume_today.lowest_value() >= min_total_volume:
-                            body_part_injury_risk.total_volume_percent_tier = 4
-
-                    elif self.relative_load_level == 2:
-                        if total_volume_today.lowest_value() >= total_volume_tier_1:
-                            body_part_injury_risk.total_volume_percent_tier = 2
-                            body_part_injury_risk.last_excessive_strain_date = base_date
-                            body_part_injury_risk.last_inhibited_date = base_date
-                            body_part_injury_risk.last_functional_overreaching_date = base_date
-
-                        elif total_volume_today.lowest_value() >= total_volume_tier_2:
-                            body_part_injury_risk.total_volume_percent_tier = 3
-
-                        elif total_volume_today.lowest_value() >= total_volume_tier_3:
-                            body_part_injury_risk.total_volume_percent_tier = 4
-
-                        elif total_volume_today.lowest_value() >= min_total_volume:
-                            body_part_injury_risk.total_volume_percent_tier = 5
-
-                    else:
-                        if total_volume_today.lowest_value() >= total_volume_tier_1:
-                            body_part_injury_risk.total_volume_percent_tier = 3
-
-                        elif total_volume_today.lowest_value() >= total_volume_tier_2:
-                            body_part_injury_risk.total_volume_percent_tier = 4
-
-                        elif total_volume_today.lowest_value() >= total_volume_tier_3:
-                            body_part_injury_risk.total_volume_percent_tier = 5
-
-                        elif total_volume_today.lowest_value() >= min_total_volume:
-                            body_part_injury_risk.total_volume_percent_tier = 0
-
-                else:
-                    if body_part_injury_risk.last_non_functional_overreaching_date == two_days_ago:
-                        if body_part_injury_risk.total_volume_percent_tier == 0:
-                            body_part_injury_risk.total_volume_percent_tier = 3
-                        else:
-                            body_part_injury_risk.total_volume_percent_tier = min(body_part_injury_risk.total_volume_percent_tier, 3)
-                    else:
-                        body_part_injury_risk.total_volume_percent_tier = 0
-
-                if max_eccentric_volume is not None:
-                    eccentric_volume_today = body_part_injury_risk.eccentric_volume_today
-
-                    if eccentric_volume_today.lowest_value() >= eccentric_volume_tier_1:
-                        body_part_injury_risk.eccentric_volume_percent_tier = 1
-                    elif eccentric_volume_today.lowest_value() >= eccentric_volume_tier_2:
-                        body_part_injury_risk.eccentric_volume_percent_tier = 2
-                    elif eccentric_volume_today.lowest_value() >= eccentric_volume_tier_3:
-                        body_part_injury_risk.eccentric_volume_percent_tier = 3
-                    elif eccentric_volume_today.lowest_value() >= min_eccentric_volume:
-                        body_part_injury_risk.eccentric_volume_percent_tier = 4
-                else:
-                    body_part_injury_risk.eccentric_volume_percent_tier = 0
-
-        # add prevention and delayed excessive strain ranking
-        for body_part_side, body_part_injury_risk in injury_risk_dict.items():
-            if body_part_injury_risk.last_non_functional_overreaching_date == two_days_ago:
-                if body_part_injury_risk.total_volume_percent_tier == 0:
-                    body_part_injury_risk.total_volume_percent_tier = 3
-                else:
-                    body_part_injury_risk.total_volume_percent_tier = min(body_part_injury_risk.total_volume_percent_tier, 3)
-            if (body_part_injury_risk.overactive_long_count_last_0_20_days >= 3 or
-                    body_part_injury_risk.overactive_short_count_last_0_20_days >= 3 or
-                    body_part_injury_risk.underactive_short_count_last_0_20_days >= 3):
-                # create tier 1
-                body_part_injury_risk.limited_mobility_tier = 1
-            elif (body_part_injury_risk.overactive_long_count_last_0_20_days < 3 and
-                    body_part_injury_risk.overactive_short_count_last_0_20_days < 3 and
-                    body_part_injury_risk.underactive_short_count_last_0_20_days < 3):
-                if (body_part_injury_risk.overactive_long_count_last_0_20_days > 0 or
-                        body_part_injury_risk.overactive_short_count_last_0_20_days > 0 or
-                        body_part_injury_risk.underactive_short_count_last_0_20_days > 0):
-                    # create tier two
-                    body_part_injury_risk.limited_mobility_tier = 2
-                elif (body_part_injury_risk.overactive_long_vote_count > 0 or
-                        body_part_injury_risk.overactive_short_vote_count > 0 or
-                        body_part_injury_risk.underactive_short_vote_count > 0):
-                    # create tier 3
-                    body_part_injury_risk.limited_mobility_tier = 3
-
-            # include joint and ligament issues
-            if (body_part_injury_risk.last_altered_joint_arthokinematics_date is not None and
-                    body_part_injury_risk.last_altered_joint_arthokinematics_date == base_date):
-                body_part_injury_risk.limited_mobility_tier = 1
-
-            if ((body_part_injury_risk.last_tendinopathy_date is not None and
-                 body_part_injury_risk.last_tendinopathy_date == base_date) or
-                    (body_part_injury_risk.last_tendinosis_date is not None and
-                     body_part_injury_risk.last_tendinosis_date == base_date)):
-                body_part_injury_risk.limited_mobility_tier = 1
-
-            # add prevention ranking
-            if (body_part_injury_risk.underactive_long_count_last_0_20_days >= 3 or
-                    body_part_injury_risk.weak_count_last_0_20_days >= 3):
-                # create tier 1
-                body_part_injury_risk.underactive_weak_tier = 1
-            elif (body_part_injury_risk.underactive_long_count_last_0_20_days < 3 and
-                    body_part_injury_risk.weak_count_last_0_20_days < 3):
-                if (body_part_injury_risk.underactive_long_count_last_0_20_days > 0 or
-                        body_part_injury_risk.weak_count_last_0_20_days > 0):
-                    # create tier two
-                    body_part_injury_risk.underactive_weak_tier = 2
-                elif (body_part_injury_risk.underactive_long_vote_count > 0 or
-                        body_part_injury_risk.weak_vote_count > 0):
-                    # create tier 3
-                    body_part_injury_risk.underactive_weak_tier = 3
+        InjuryRiskRanking(injury_risk_dict).rank(self.relative_load_level, base_date)
 
         return injury_risk_dict
-    
+
     def update_historic_session_stats(self, base_date, injury_risk_dict):
 
         twenty_days_ago = base_date - timedelta(days=19)
@@ -642,8 +383,54 @@ class InjuryRiskProcessor(object):
 
         return injury_risk_dict
 
+    def get_checkpoint_context_hash(self):
+
+        # anything besides the symptoms and sessions themselves that changes how a historical day is processed.
+        # load stats are left out: every run updates and saves them, so they never match the next run's, and a
+        # resumed replay restores the load stats kept in the checkpoint anyway
+        context = {
+            'event_date': format_date(self.event_date_time.date()),
+            'high_relative_load_score': self.high_relative_load_score,
+            'high_relative_load_sessions': [h.json_serialise() for h in self.high_relative_load_sessions]
+        }
+        if self.ranking_mode != RankingMode.each_session:
+            context['ranking_mode'] = self.ranking_mode.value
+        context_string = json.dumps(context, sort_keys=True, default=json_serialise)
+
+        return hashlib.sha1(context_string.encode('utf-8')).hexdigest()
+
+    def can_resume_from_checkpoint(self, checkpoint, earliest_changed_date, context_hash):
+
+        if checkpoint is None or checkpoint.last_processed_date is None or earliest_changed_date is None:
+            return False
+
+        if checkpoint.user_id != self.user_id or checkpoint.event_date != self.event_date_time.date():
+            return False
+
+        if earliest_changed_date <= checkpoint.last_processed_date:
+            return False
+
+        return checkpoint.context_hash == context_hash
+
+    def create_checkpoint(self, last_processed_date, injury_risk_dict, context_hash):
+
+        checkpoint = InjuryRiskCheckpoint(self.user_id, self.event_date_time.date(), last_processed_date, context_hash)
+        checkpoint.items = pickle.loads(pickle.dumps(injury_risk_dict, -1))
+        checkpoint.load_stats = pickle.loads(pickle.dumps(self.load_stats, -1))
+
+        return checkpoint
+
+    def restore_checkpoint(self, checkpoint):
+
+        # session loads update the min/max load stats in place as the replay goes, so resume from where they were
+        if checkpoint.load_stats is not None and self.load_stats is not None:
+            for attribute, value in vars(checkpoint.load_stats).items():
+                setattr(self.load_stats, attribute, value)
+
+        return pickle.loads(pickle.dumps(checkpoint.items, -1))
+
     @xray_recorder.capture('logic.InjuryRiskProcessor.update_historical_data')
-    def update_historical_data(self, load_stats):
+    def update_historical_data(self, load_stats, checkpoint=None, earliest_changed_date=None, create_checkpoint=False):
 
         combined_dates = []
         combined_dates.extend([s.event_date.date() for s in self.training_sessions])
@@ -654,7 +441,22 @@ class InjuryRiskProcessor(object):
         combined_dates = list(set(combined_dates))
         combined_dates.sort()
 
-        injury_risk_dict = {}
+        context_hash = self.get_checkpoint_context_hash()
+
+        if self.can_resume_from_checkpoint(checkpoint, earliest_changed_date, context_hash):
+            # nothing on or before the checkpoint has changed, so only replay the days after it
+            injury_risk_dict = self.restore_checkpoint(checkpoint)
+            combined_dates = [d for d in combined_dates if d > checkpoint.last_processed_date]
+            self.checkpoint = checkpoint
+        else:
+            injury_risk_dict = {}
+            self.checkpoint = None
+
+        # checkpoint the last day before the event date, as the event date itself may still receive new data
+        checkpoint_date = None
+        if create_checkpoint:
+            prior_dates = [d for d in combined_dates if d < self.event_date_time.date()]
+            checkpoint_date = prior_dates[-1] if len(prior_dates) > 0 else None
 
         #twenty_days_ago = self.event_date_time.date() - timedelta(days=19)
 
@@ -699,11 +501,15 @@ class InjuryRiskProcessor(object):
                     injury_risk_dict = self.mark_anc_muscle_imbalance(injury_risk_dict,
                                                                       current_session.event_date)
 
-                injury_risk_dict = self.update_injury_risk_dict_rankings(injury_risk_dict, d)
+                if self.ranking_mode == RankingMode.each_session:
+                    injury_risk_dict = self.update_injury_risk_dict_rankings(injury_risk_dict, d)
 
                 # session_mapping_dict[current_session] = session_functional_movement.functional_movement_mappings
                 session_mapping_dict[current_session] = session_functional_movement.session_load_dict
 
+            if self.ranking_mode == RankingMode.end_of_day and len(daily_sessions) > 0:
+                injury_risk_dict = self.update_injury_risk_dict_rankings(injury_risk_dict, d)
+
             daily_injury_risk_dict = self.merge_daily_sessions(d, session_mapping_dict, injury_risk_dict)
 
             daily_injury_risk_dict = self.update_injury_risk_dict_rankings(daily_injury_risk_dict, d)
@@ -713,38 +519,6 @@ class InjuryRiskProcessor(object):
                 if body_part_side not in injury_risk_dict:
                     injury_risk_dict[body_part_side] = BodyPartInjuryRisk()
 
-                self.populate_volume_dictionaries(body_part_injury_risk, body_part_side, d)
-
-                #eccentric_volume_dict = self.eccentric_volume_dict[body_part_side]
-                #concentric_volume_dict = self.concentric_volume_dict[body_part_side]
-                #total_volume_dict = self.total_volume_dict[body_part_side]
-
-                # self.populate_intensity_dictionaries(body_part_injury_risk, body_part_side, d)
-                # eccentric_intensity_dict = self.eccentric_intensity_dict[body_part_side]
-                # concentric_intensity_dict = self.concentric_intensity_dict[body_part_side]
-
-                # last_week_eccentric_volume_dict = dict(
-                #     filter(lambda elem: fourteeen_days_ago <= elem[0] < seven_days_ago, eccentric_volume_dict.items()))
-
-                #current_week_eccentric_volume_dict = dict(
-                #    filter(lambda elem: d > elem[0] >= seven_days_ago, eccentric_volume_dict.items()))
-
-                # last_week_concentric_volume_dict = dict(
-                #     filter(lambda elem: fourteeen_days_ago <= elem[0] < seven_days_ago, concentric_volume_dict.items()))
-
-                #current_week_concentric_volume_dict = dict(
-                #    filter(lambda elem: d > elem[0] >= seven_days_ago, concentric_volume_dict.items()))
-
-                #last_week_eccentric_volume = sum(last_week_eccentric_volume_dict.values())
-                #current_week_eccentric_volume = sum(current_week_eccentric_volume_dict.values())
-                #last_week_concentric_volume = sum(last_week_concentric_volume_dict.values())
-                #current_week_concentric_volume = sum(current_week_concentric_volume_dict.values())
-
-                #injury_risk_dict[body_part_side].eccentric_volume_this_week = current_week_eccentric_volume
-                #injury_risk_dict[body_part_side].eccentric_volume_last_week = last_week_eccentric_volume
-                #injury_risk_dict[body_part_side].concentric_volume_this_week = current_week_concentric_volume
-                #injury_risk_dict[body_part_side].concentric_volume_last_week = last_week_concentric_volume
-                
                 injury_risk_dict[body_part_side].total_compensation_percent = injury_risk_dict[body_part_side].percent_total_compensation()
                 injury_risk_dict[body_part_side].eccentric_compensation_percent = injury_risk_dict[
                     body_part_side].percent_eccentric_compensation()
@@ -752,6 +526,9 @@ class InjuryRiskProcessor(object):
                 #injury_risk_dict[body_part_side].eccentric_volume_ramp_today = injury_risk_dict[body_part_side].eccentric_volume_ramp()
                 #injury_risk_dict[body_part_side].total_volume_ramp_today = injury_risk_dict[body_part_side].total_volume_ramp()
 
+            if d == checkpoint_date:
+                self.checkpoint = self.create_checkpoint(d, injury_risk_dict, context_hash)
+
         # now provide a current day ranking
         self.set_relative_load_level(self.event_date_time.date())
         injury_risk_dict = self.update_injury_risk_dict_rankings(injury_risk_dict, self.event_date_time.date())
@@ -1127,68 +904,6 @@ class InjuryRiskProcessor(object):
 
         return injury_risk_dict
 
-    def populate_volume_dictionaries(self, body_part_injury_risk, body_part_side, d):
-        
-        # eccentric volume
-        if body_part_side not in self.eccentric_volume_dict:
-            self.eccentric_volume_dict[body_part_side] = {}  # now we have a dictionary of dictionaries
-        if d not in self.eccentric_volume_dict[body_part_side]:
-            self.eccentric_volume_dict[body_part_side][d] = 0
-        self.eccentric_volume_dict[body_part_side][d] = body_part_injury_risk.eccentric_volume_today
-        
-        # concentric volume
-        if body_part_side not in self.concentric_volume_dict:
-            self.concentric_volume_dict[body_part_side] = {}  # now we have a dictionary of dictionaries
-        if d not in self.concentric_volume_dict[body_part_side]:
-            self.concentric_volume_dict[body_part_side][d] = 0
-        self.concentric_volume_dict[body_part_side][d] = body_part_injury_risk.concentric_volume_today
-
-        # isometric volume
-        if body_part_side not in self.isometric_volume_dict:
-            self.isometric_volume_dict[body_part_side] = {}  # now we have a dictionary of dictionaries
-        if d not in self.isometric_volume_dict[body_part_side]:
-            self.isometric_volume_dict[body_part_side][d] = 0
-        self.isometric_volume_dict[body_part_side][d] = body_part_injury_risk.isometric_volume_today
-        
-        # total volume
-        if body_part_side not in self.total_volume_dict:
-            self.total_volume_dict[body_part_side] = {}  # now we have a dictionary of dictionaries
-        if d not in self.total_volume_dict[body_part_side]:
-            self.total_volume_dict[body_part_side][d] = 0
-        self.total_volume_dict[body_part_side][
-            d] = body_part_injury_risk.total_volume_today()
-
-    def populate_intensity_dictionaries(self, body_part_injury_risk, body_part_side, d):
-
-        # eccentric intensity
-        if body_part_side not in self.eccentric_intensity_dict:
-            self.eccentric_intensity_dict[body_part_side] = {}  # now we have a dictionary of dictionaries
-        if d not in self.eccentric_intensity_dict[body_part_side]:
-            self.eccentric_intensity_dict[body_part_side][d] = 0
-        self.eccentric_intensity_dict[body_part_side][d] += body_part_injury_risk.eccentric_intensity_today
-
-        # concentric intensity
-        if body_part_side not in self.concentric_intensity_dict:
-            self.concentric_intensity_dict[body_part_side] = {}  # now we have a dictionary of dictionaries
-        if d not in self.concentric_intensity_dict[body_part_side]:
-            self.concentric_intensity_dict[body_part_side][d] = 0
-        self.concentric_intensity_dict[body_part_side][d] += body_part_injury_risk.concentric_intensity_today
-
-        # isometric intensity
-        if body_part_side not in self.isometric_intensity_dict:
-            self.isometric_intensity_dict[body_part_side] = {}  # now we have a dictionary of dictionaries
-        if d not in self.isometric_intensity_dict[body_part_side]:
-            self.isometric_intensity_dict[body_part_side][d] = 0
-        self.isometric_intensity_dict[body_part_side][d] += body_part_injury_risk.isometric_intensity_today
-
-        # total intensity
-        if body_part_side not in self.total_intensity_dict:
-            self.total_intensity_dict[body_part_side] = {}  # now we have a dictionary of dictionaries
-        if d not in self.total_intensity_dict[body_part_side]:
-            self.total_intensity_dict[body_part_side][d] = 0
-        self.total_intensity_dict[body_part_side][
-            d] += body_part_injury_risk.concentric_intensity_today + body_part_injury_risk.eccentric_intensity_today + body_part_injury_risk.isometric_intensity_today
-
     @xray_recorder.capture('logic.InjuryRiskProcessor.process_todays_sessions')
     def process_todays_sessions(self, base_date, injury_risk_dict, load_stats):
 
@@ -1237,11 +952,15 @@ class InjuryRiskProcessor(object):
             injury_risk_dict = self.mark_anc_muscle_imbalance(injury_risk_dict,
                                                               current_session.event_date)
 
-            injury_risk_dict = self.update_injury_risk_dict_rankings(injury_risk_dict, base_date)
+            if self.ranking_mode == RankingMode.each_session:
+                injury_risk_dict = self.update_injury_risk_dict_rankings(injury_risk_dict, base_date)
 
             #session_mapping_dict[current_session] = session_functional_movement.functional_movement_mappings
             session_mapping_dict[current_session] = session_functional_movement.session_load_dict
 
+        if self.ranking_mode == RankingMode.end_of_day and len(daily_sessions) > 0:
+            injury_risk_dict = self.update_injury_risk_dict_rankings(injury_risk_dict, base_date)
+
         injury_risk_dict = self.merge_daily_sessions(base_date, session_mapping_dict, injury_risk_dict)
 
         injury_risk_dict = self.update_injury_risk_dict_rankings(injury_risk_dict, base_date)
@@ -1266,30 +985,24 @@ class InjuryRiskProcessor(object):
             if b not in injury_risk_dict:
                 injury_risk_dict[b] = BodyPartInjuryRisk()
 
-        for body_part_side, body_part_injury_risk in injury_risk_dict.items():
+        # every volume of every body part is summed at once: row per body part, column per daily_volume_loads entry
+        body_part_sides = list(injury_risk_dict.keys())
+        rows = {body_part_side: row for row, body_part_side in enumerate(body_part_sides)}
+        load_attributes = [load_attribute for volume_attribute, load_attribute in self.daily_volume_loads]
+        volumes_today = StandardErrorRangeArray.zeros((len(body_part_sides), len(load_attributes)))
 
-            injury_risk_dict[body_part_side].concentric_volume_today = StandardErrorRange(observed_value=0)
-            injury_risk_dict[body_part_side].isometric_volume_today = StandardErrorRange(observed_value=0)
-            injury_risk_dict[body_part_side].eccentric_volume_today = StandardErrorRange(observed_value=0)
-            injury_risk_dict[body_part_side].compensating_concentric_volume_today = StandardErrorRange(observed_value=0)
-            injury_risk_dict[body_part_side].compensating_isometric_volume_today = StandardErrorRange(observed_value=0)
-
-            injury_risk_dict[body_part_side].compensating_eccentric_volume_today = StandardErrorRange(observed_value=0)
+        for body_part_side in body_part_sides:
             #injury_risk_dict[body_part_side].compensating_causes_volume_today = []
             #injury_risk_dict[body_part_side].compensating_source_volume = None
             injury_risk_dict[body_part_side].last_compensation_date = None
 
         for session, session_load_dict in session_functional_movement_dict_list.items():
 
+            session_rows = []
+            session_loads = []
             for body_part_side, body_part_functional_movement in session_load_dict.items():
-                injury_risk_dict[body_part_side].concentric_volume_today.add(body_part_functional_movement.concentric_load)
-                injury_risk_dict[body_part_side].isometric_volume_today.add(
-                    body_part_functional_movement.isometric_load)
-                injury_risk_dict[body_part_side].eccentric_volume_today.add(body_part_functional_movement.eccentric_load)
-                injury_risk_dict[body_part_side].compensating_concentric_volume_today.add(body_part_functional_movement.compensated_concentric_load)
-                injury_risk_dict[body_part_side].compensating_isometric_volume_today.add(
-                    body_part_functional_movement.compensated_isometric_load)
-                injury_risk_dict[body_part_side].compensating_eccentric_volume_today.add(body_part_functional_movement.compensated_eccentric_load)
+                session_rows.append(rows[body_part_side])
+                session_loads.extend([getattr(body_part_functional_movement, a) for a in load_attributes])
 
                 #injury_risk_dict[body_part_side].compensating_causes_volume_today.extend(
                 #    body_part_functional_movement.compensating_causes_load)
@@ -1299,17 +1012,37 @@ class InjuryRiskProcessor(object):
 
                 #injury_risk_dict[body_part_side].compensating_source_volume = body_part_functional_movement.compensation_source_load
 
-        for body_part_side, body_part_injury_risk in injury_risk_dict.items():
-
-            # injury_risk_dict[body_part_side].eccentric_volume_ramp_today = injury_risk_dict[
-            #     body_part_side].eccentric_volume_ramp()
-            # injury_risk_dict[body_part_side].total_volume_ramp_today = injury_risk_dict[
-            #     body_part_side].total_volume_ramp()
-
-            injury_risk_dict[body_part_side].total_compensation_percent = injury_risk_dict[
-                body_part_side].percent_total_compensation()
-            injury_risk_dict[body_part_side].eccentric_compensation_percent = injury_risk_dict[
-                body_part_side].percent_eccentric_compensation()
+            if len(session_rows) > 0:
+                session_loads = StandardErrorRangeArray.from_ranges(session_loads).reshape(len(session_rows), len(load_attributes))
+                volumes_today.add(session_loads, session_rows)
+
+        # BodyPartInjuryRisk.percent_total_compensation and percent_eccentric_compensation for every body part
+        volume_columns = {volume_attribute: column for column, (volume_attribute, load_attribute) in enumerate(self.daily_volume_loads)}
+        total_volume_today = volumes_today.column(volume_columns['concentric_volume_today'])
+        total_volume_today.add(volumes_today.column(volume_columns['eccentric_volume_today']))
+        total_volume_today.add(volumes_today.column(volume_columns['isometric_volume_today']))
+        total_compensation_percent = volumes_today.column(volume_columns['compensating_concentric_volume_today'])
+        total_compensation_percent.add(volumes_today.column(volume_columns['compensating_eccentric_volume_today']))
+        total_compensation_percent.add(volumes_today.column(volume_columns['compensating_isometric_volume_today']))
+        total_compensation_percent.divide_range(total_volume_today)
+        total_compensation_percent.multiply(100)
+        eccentric_compensation_percent = volumes_today.column(volume_columns['compensating_eccentric_volume_today'])
+        eccentric_compensation_percent.divide_range(volumes_today.column(volume_columns['eccentric_volume_today']))
+        eccentric_compensation_percent.multiply(100)
+
+        volumes_today = iter(volumes_today.to_ranges())
+        for body_part_side, total_percent, eccentric_percent in zip(body_part_sides,
+                                                                    total_compensation_percent.to_ranges(),
+                                                                    eccentric_compensation_percent.to_ranges()):
+            body_part_injury_risk = injury_risk_dict[body_part_side]
+            for volume_attribute, load_attribute in self.daily_volume_loads:
+                setattr(body_part_injury_risk, volume_attribute, next(volumes_today))
+
+            # body_part_injury_risk.eccentric_volume_ramp_today = body_part_injury_risk.eccentric_volume_ramp()
+            # body_part_injury_risk.total_volume_ramp_today = body_part_injury_risk.total_volume_ramp()
+
+            body_part_injury_risk.total_compensation_percent = total_percent
+            body_part_injury_risk.eccentric_compensation_percent = eccentric_percent
 
         return injury_risk_dict
 
@@ -0,0 +1,175 @@
+from enum import Enum
+from datetime import timedelta
+import numpy as np
+
+
+class RankingMode(Enum):
+    each_session = 0
+    end_of_day = 1
+
+
+class InjuryRiskRanking(object):
+    """
+    Ranks every body part side of an injury risk dict from arrays of its metrics, gathered in one pass over the dict,
+    and writes the tiers back in one more.
+
+    Each ranked metric's thresholds split the range of the body parts ranked on it (those with an observed value
+    above 0) into quarters.  A body part's lowest value gets the tier of the first threshold it reaches, in the order
+    the tier chains below check them, as np.digitize over the chain's running minimum.
+    """
+    # (threshold, tier) in the order they're checked; thresholds are 0-2 for the top three quarters and 3 for the
+    # minimum.  Levels other than 1 and 2 rank as level 3.
+    compensation_chains = {1: [(0, 1), (1, 2), (3, 3)],
+                           2: [(0, 2), (1, 3), (2, 4), (3, 5)],
+                           3: [(0, 3), (1, 4), (2, 5), (3, 0)]}
+    total_volume_chains = {1: [(0, 1), (1, 2), (2, 3), (3, 4)],
+                           2: [(0, 2), (1, 3), (2, 4), (3, 5)],
+                           3: [(0, 3), (1, 4), (2, 5), (3, 0)]}
+    eccentric_volume_chain = [(0, 1), (1, 2), (2, 3), (3, 4)]
+
+    def __init__(self, injury_risk_dict):
+        self.body_part_injury_risks = list(injury_risk_dict.values())
+
+        ranges = {'total_compensation_percent': [], 'eccentric_compensation_percent': [], 'concentric_volume': [],
+                  'isometric_volume': [], 'eccentric_volume': []}
+        counts = []
+        dates = []
+        for body_part_injury_risk in self.body_part_injury_risks:
+            for name, error_range in [('total_compensation_percent', body_part_injury_risk.total_compensation_percent),
+                                      ('eccentric_compensation_percent', body_part_injury_risk.eccentric_compensation_percent),
+                                      ('concentric_volume', body_part_injury_risk.concentric_volume_today),
+                                      ('isometric_volume', body_part_injury_risk.isometric_volume_today),
+                                      ('eccentric_volume', body_part_injury_risk.eccentric_volume_today)]:
+                ranges[name].append((error_range.lower_bound, error_range.observed_value, error_range.upper_bound))
+            counts.append((body_part_injury_risk.overactive_long_count_last_0_20_days,
+                           body_part_injury_risk.overactive_short_count_last_0_20_days,
+                           body_part_injury_risk.underactive_short_count_last_0_20_days,
+                           body_part_injury_risk.overactive_long_vote_count,
+                           body_part_injury_risk.overactive_short_vote_count,
+                           body_part_injury_risk.underactive_short_vote_count,
+                           body_part_injury_risk.underactive_long_count_last_0_20_days,
+                           body_part_injury_risk.weak_count_last_0_20_days,
+                           body_part_injury_risk.underactive_long_vote_count,
+                           body_part_injury_risk.weak_vote_count))
+            dates.append((body_part_injury_risk.last_non_functional_overreaching_date,
+                          body_part_injury_risk.last_altered_joint_arthokinematics_date,
+                          body_part_injury_risk.last_tendinopathy_date,
+                          body_part_injury_risk.last_tendinosis_date))
+
+        # columns: lower bound, observed value, upper bound, with None as nan
+        self.ranges = {name: np.array(values, dtype=float).reshape(-1, 3) for name, values in ranges.items()}
+        self.ranges['total_volume'] = self.get_total_volume(self.ranges['concentric_volume'], self.ranges['isometric_volume'],
+                                                            self.ranges['eccentric_volume'])
+        self.counts = np.array(counts, dtype=float).reshape(-1, 10)
+        self.dates = dates
+
+    @staticmethod
+    def get_total_volume(concentric_volume, isometric_volume, eccentric_volume):
+        """
+        BodyPartInjuryRisk.total_volume_today of every body part: concentric volume, add eccentric, add isometric.
+        StandardErrorRange.add fills the added range's missing bounds with its observed value, and a missing value
+        plus a missing value stays missing.
+        """
+        total_volume = concentric_volume
+        for added_volume in [eccentric_volume, isometric_volume]:
+            added_volume = np.where(np.isnan(added_volume), added_volume[:, [1]], added_volume)
+            total_volume = np.where(np.isnan(total_volume), added_volume,
+                                    np.where(np.isnan(added_volume), total_volume, total_volume + added_volume))
+        return total_volume
+
+    @staticmethod
+    def get_thresholds(error_ranges):
+        """
+        The top three quarter thresholds and the minimum of the body parts ranked on a metric, or None if none are
+        """
+        ranked = error_ranges[error_ranges[:, 1] > 0]
+        if len(ranked) == 0:
+            return None
+        # as StandardErrorRange.get_min_from_error_range_list and get_max_from_error_range_list
+        lows = ranked[:, :2].ravel()
+        highs = ranked[:, 1:].ravel()
+        min_value = float(np.min(lows[~np.isnan(lows)]))
+        max_value = float(np.max(highs[~np.isnan(highs)]))
+        tier = (max_value - min_value) / 4
+        return [max_value - tier, max_value - (2 * tier), max_value - (3 * tier), min_value]
+
+    @staticmethod
+    def get_lowest_values(error_ranges):
+        return np.where(np.isnan(error_ranges[:, 0]), error_ranges[:, 1], error_ranges[:, 0])
+
+    @staticmethod
+    def get_chain_positions(lowest_values, thresholds, chain):
+        """
+        Position in chain of the first threshold each value reaches, len(chain) for none
+        """
+        # a value reaches a threshold in the chain iff it reaches the running minimum there, which never increases
+        chain_thresholds = np.minimum.accumulate([thresholds[threshold] for threshold, tier in chain])
+        positions = len(chain) - np.digitize(lowest_values, chain_thresholds[::-1])
+        positions[np.isnan(lowest_values)] = len(chain)
+        return positions
+
+    def get_tiers(self, name, chain):
+        """
+        Tiers of every body part on a ranked metric, with the positions they were found at in chain
+        """
+        error_ranges = self.ranges[name]
+        thresholds = self.get_thresholds(error_ranges)
+        if thresholds is None:
+            return np.zeros(len(error_ranges), dtype=int), None
+        positions = self.get_chain_positions(self.get_lowest_values(error_ranges), thresholds, chain)
+        return np.array([tier for threshold, tier in chain] + [0])[positions], positions
+
+    def rank(self, relative_load_level, base_date):
+        level = relative_load_level if relative_load_level in [1, 2] else 3
+        two_days_ago = base_date - timedelta(days=1)
+        body_part_count = len(self.body_part_injury_risks)
+
+        total_compensation_tiers, _ = self.get_tiers('total_compensation_percent', self.compensation_chains[level])
+        eccentric_compensation_tiers, _ = self.get_tiers('eccentric_compensation_percent', self.compensation_chains[level])
+        total_volume_tiers, total_volume_positions = self.get_tiers('total_volume', self.total_volume_chains[level])
+        eccentric_volume_tiers, _ = self.get_tiers('eccentric_volume', self.eccentric_volume_chain)
+
+        # the top volume tiers at levels 1 and 2 mark strain and overreaching
+        non_functional_overreaching = np.zeros(body_part_count, dtype=bool)
+        functional_overreaching = np.zeros(body_part_count, dtype=bool)
+        if total_volume_positions is not None:
+            if level == 1:
+                non_functional_overreaching = total_volume_positions == 0
+                functional_overreaching = total_volume_positions == 1
+            elif level == 2:
+                functional_overreaching = total_volume_positions == 0
+        strained = non_functional_overreaching | functional_overreaching
+
+        # delayed excessive strain: non-functional overreaching two days ago keeps total volume in the top three tiers
+        delayed_strain = np.array([d[0] == two_days_ago for d in self.dates], dtype=bool).reshape(-1) & ~non_functional_overreaching
+        total_volume_tiers = np.where(delayed_strain, np.where(total_volume_tiers == 0, 3, np.minimum(total_volume_tiers, 3)),
+                                      total_volume_tiers)
+
+        counts = self.counts
+        limited_mobility_tiers = np.select([(counts[:, 0:3] >= 3).any(axis=1), (counts[:, 0:3] > 0).any(axis=1),
+                                            (counts[:, 3:6] > 0).any(axis=1)], [1, 2, 3], 0)
+        joint_issues = np.array([base_date in d[1:] for d in self.dates], dtype=bool).reshape(-1)
+        limited_mobility_tiers = np.where(joint_issues, 1, limited_mobility_tiers)
+        underactive_weak_tiers = np.select([(counts[:, 6:8] >= 3).any(axis=1), (counts[:, 6:8] > 0).any(axis=1),
+                                            (counts[:, 8:10] > 0).any(axis=1)], [1, 2, 3], 0)
+
+        for (body_part_injury_risk, total_compensation_tier, eccentric_compensation_tier, total_volume_tier,
+             eccentric_volume_tier, limited_mobility_tier, underactive_weak_tier, is_strained,
+             is_non_functional_overreaching, is_functional_overreaching) in zip(
+                self.body_part_injury_risks, total_compensation_tiers.tolist(), eccentric_compensation_tiers.tolist(),
+                total_volume_tiers.tolist(), eccentric_volume_tiers.tolist(), limited_mobility_tiers.tolist(),
+                underactive_weak_tiers.tolist(), strained.tolist(), non_functional_overreaching.tolist(),
+                functional_overreaching.tolist()):
+            body_part_injury_risk.total_compensation_percent_tier = total_compensation_tier
+            body_part_injury_risk.eccentric_compensation_percent_tier = eccentric_compensation_tier
+            body_part_injury_risk.total_volume_percent_tier = total_volume_tier
+            body_part_injury_risk.eccentric_volume_percent_tier = eccentric_volume_tier
+            body_part_injury_risk.limited_mobility_tier = limited_mobility_tier
+            body_part_injury_risk.underactive_weak_tier = underactive_weak_tier
+            if is_strained:
+                body_part_injury_risk.last_excessive_strain_date = base_date
+                body_part_injury_risk.last_inhibited_date = base_date
+            if is_non_functional_overreaching:
+                body_part_injury_risk.last_non_functional_overreaching_date = base_date
+            if is_functional_overreaching:
+                body_part_injury_risk.last_functional_overreaching_date = base_date
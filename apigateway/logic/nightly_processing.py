@@ -0,0 +1,317 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import timedelta
+from datastores.bulk_write_datastore import BulkWriteException
+from datastores.datastore_collection import DatastoreCollection
+from datastores.write_stats import write_stats
+from logic.metrics_processing import MetricsProcessing
+from logic.stats_processing import StatsProcessing
+from logic.user_stats_processing import UserStatsProcessing
+from utils import parse_date, format_date
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+
+class StageTimer(object):
+    """
+    Seconds spent in each stage.  Time in a stage entered from inside another counts towards the inner stage only.
+    """
+    def __init__(self):
+        self.stage_seconds = {}
+        self._nested_seconds = []
+
+    @contextmanager
+    def stage(self, name):
+        start_time = time.perf_counter()
+        self._nested_seconds.append(0.0)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start_time
+            self.add({name: seconds - self._nested_seconds.pop()})
+            if len(self._nested_seconds) > 0:
+                self._nested_seconds[-1] += seconds
+
+    def timed(self, name, function):
+
+        def timed_function(*args, **kwargs):
+            with self.stage(name):
+                return function(*args, **kwargs)
+
+        return timed_function
+
+    def add(self, stage_seconds):
+        for name, seconds in stage_seconds.items():
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+
+
+class NightlyCheckpoint(object):
+    """
+    Users done and failed so far in a run, saved to a json file after every chunk so that an interrupted or partly
+    failed run can be resumed: users already done are skipped and failed users are tried again.  A checkpoint left
+    by a run with other settings is ignored.
+    """
+    def __init__(self, file_path, settings):
+        self.file_path = file_path
+        self.settings = settings
+        self.completed = set()
+        self.failed = {}
+        if file_path is not None and os.path.exists(file_path):
+            with open(file_path) as f:
+                saved = json.load(f)
+            if saved.get('settings') == settings:
+                self.completed = set(saved.get('completed', []))
+                self.failed = saved.get('failed', {})
+
+    def record(self, user_id, error):
+        if error is None:
+            self.completed.add(user_id)
+            self.failed.pop(user_id, None)
+        else:
+            self.failed[user_id] = error
+
+    def save(self):
+        if self.file_path is None:
+            return
+        # written next to the checkpoint and renamed over it, so an interrupted save leaves the last one whole
+        temp_file_path = self.file_path + '.tmp'
+        with open(temp_file_path, 'w') as f:
+            json.dump({'settings': self.settings, 'completed': sorted(self.completed), 'failed': self.failed}, f, indent=2)
+        os.replace(temp_file_path, self.file_path)
+
+
+_datastore_collection_factory = DatastoreCollection
+_datastore_collection = None
+_datastore_collection_pid = None
+
+
+def _set_datastore_collection_factory(datastore_collection_factory):
+    global _datastore_collection_factory, _datastore_collection
+    _datastore_collection_factory = datastore_collection_factory
+    _datastore_collection = None
+
+
+def _get_datastore_collection():
+    # built by each process on its first chunk, so forked workers never use a collection (or Mongo client) of their parent
+    global _datastore_collection, _datastore_collection_pid
+    if _datastore_collection is None or _datastore_collection_pid != os.getpid():
+        _datastore_collection = _datastore_collection_factory()
+        _datastore_collection_pid = os.getpid()
+    return _datastore_collection
+
+
+def process_user(user_id, stats_type, event_dates, datastore_collection, timer):
+    """
+    Stats of the user after the nightly processing of each of event_dates in turn, as the athlete stats route runs it.
+    The stats are carried from one day to the next rather than written and read back.
+    """
+    stats = None
+    for event_date in event_dates:
+        # what the injury risk datastore learns of the stored document is only trusted within a request
+        write_stats.start_request()
+        with timer.stage(stats_type):
+            if stats_type == 'athlete_stats':
+                processor = StatsProcessing(user_id, event_date=event_date, datastore_collection=datastore_collection)
+                processor.update_historical_injury_risk = timer.timed('injury_risk', processor.update_historical_injury_risk)
+                stats = processor.process_athlete_stats(current_athlete_stats=stats, force_historical_process=True)
+            else:
+                processor = UserStatsProcessing(user_id, event_date=event_date, datastore_collection=datastore_collection)
+                processor.update_historical_injury_risk = timer.timed('injury_risk', processor.update_historical_injury_risk)
+                stats = processor.process_user_stats(current_user_stats=stats, force_historical_process=True)
+
+    if stats_type == 'athlete_stats':
+        with timer.stage('metrics'):
+            stats.metrics = MetricsProcessing().get_athlete_metrics_from_stats(stats, format_date(event_dates[-1]))
+
+    return stats
+
+
+def process_users(user_ids, stats_type, event_dates):
+    """
+    Processes a chunk of users in a worker, with the worker's DatastoreCollection, and writes the stats of those that
+    succeeded in one bulk put.
+    Returns ({user_id: error message, None if it succeeded}, stage seconds)
+    """
+    datastore_collection = _get_datastore_collection()
+    event_dates = [parse_date(event_date) for event_date in event_dates]
+    timer = StageTimer()
+    errors = {}
+    stats_list = []
+    for user_id in user_ids:
+        try:
+            stats_list.append(process_user(user_id, stats_type, event_dates, datastore_collection, timer))
+            errors[user_id] = None
+        except Exception as e:
+            traceback.print_exc()
+            errors[user_id] = f'{type(e).__name__}: {e}'
+
+    if len(stats_list) > 0:
+        if stats_type == 'athlete_stats':
+            stats_datastore = datastore_collection.athlete_stats_datastore
+        else:
+            stats_datastore = datastore_collection.user_stats_datastore
+        with timer.stage('write'):
+            try:
+                stats_datastore.put(stats_list)
+            except BulkWriteException as e:
+                for error in e.errors:
+                    errors[stats_list[error['index']].athlete_id] = f"BulkWriteError: {error['message']}"
+
+    return errors, timer.stage_seconds
+
+
+class NightlyProcessingRunner(object):
+    """
+    Reprocesses the stats, and with them the injury risk, of a list of users over a range of days, as the nightly
+    stats update does each day.  Users are processed in chunks on a pool of worker processes, each with its own
+    DatastoreCollection, with no more than max_in_flight chunks queued at a time.  workers=0 processes the chunks in
+    this process instead.
+
+    Workers are forked from this process and each builds its own DatastoreCollection, so they share no Mongo client.
+
+    After run: completed and failed ({user_id: error}) hold the users of this run, skipped those done by an earlier
+    run with the same checkpoint file, and stage_seconds the time spent in each stage summed over the workers.
+    """
+    stats_types = ['user_stats', 'athlete_stats']
+
+    def __init__(self, stats_type, start_date, end_date=None, workers=4, chunk_size=10, max_in_flight=None,
+                 checkpoint_file=None, datastore_collection_factory=DatastoreCollection, log=print):
+        if stats_type not in self.stats_types:
+            raise ValueError(f'stats_type must be one of {self.stats_types}')
+        self.stats_type = stats_type
+        self.event_dates = self.get_event_dates(start_date, end_date or start_date)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or 2 * max(1, workers)
+        self.checkpoint = NightlyCheckpoint(checkpoint_file, {'stats_type': stats_type, 'event_dates': self.event_dates})
+        self.datastore_collection_factory = datastore_collection_factory
+        self.log = log
+
+        self.completed = []
+        self.failed = {}
+        self.skipped = []
+        self.elapsed_seconds = 0.0
+        self.stage_seconds = {}
+        self._start_time = None
+
+    @staticmethod
+    def get_event_dates(start_date, end_date):
+        start_date = parse_date(start_date)
+        days = (parse_date(end_date) - start_date).days
+        if days < 0:
+            raise ValueError('end_date is before start_date')
+        return [format_date(start_date + timedelta(days=day)) for day in range(days + 1)]
+
+    @property
+    def users_per_minute(self):
+        if self.elapsed_seconds == 0:
+            return 0.0
+        return 60 * (len(self.completed) + len(self.failed)) / self.elapsed_seconds
+
+    def run(self, user_ids):
+        user_ids = list(dict.fromkeys(user_ids))
+        self.skipped = [user_id for user_id in user_ids if user_id in self.checkpoint.completed]
+        user_ids = [user_id for user_id in user_ids if user_id not in self.checkpoint.completed]
+        chunks = [user_ids[index:index + self.chunk_size] for index in range(0, len(user_ids), self.chunk_size)]
+        self.log(f'processing {len(user_ids)} users over {len(self.event_dates)} days, {len(self.skipped)} already done')
+
+        self._start_time = time.perf_counter()
+        # set before the pool forks its workers, which inherit it
+        _set_datastore_collection_factory(self.datastore_collection_factory)
+        if self.workers == 0:
+            for chunk in chunks:
+                self._record_chunk(chunk, *process_users(chunk, self.stats_type, self.event_dates))
+        else:
+            self._run_on_pool(chunks)
+
+        self.log(f'{len(self.completed)} users processed, {len(self.failed)} failed, '
+                 f'{self.users_per_minute:.1f} users/min')
+        self.log('stage seconds: ' + ', '.join(f'{name} {seconds:.1f}' for name, seconds in sorted(self.stage_seconds.items())))
+        return self
+
+    def _get_executor(self):
+        # workers must be forked to inherit the datastore collection factory. Forking is the only start method of
+        # python 3.6's pool on Linux; mp_context, to ask for it explicitly, is python 3.7+
+        if sys.version_info >= (3, 7):
+            return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork'))
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    def _run_on_pool(self, chunks):
+        chunks = iter(chunks)
+        in_flight = {}
+        with self._get_executor() as executor:
+            while True:
+                while len(in_flight) < self.max_in_flight:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    in_flight[executor.submit(process_users, chunk, self.stats_type, self.event_dates)] = chunk
+                if len(in_flight) == 0:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = in_flight.pop(future)
+                    try:
+                        errors, stage_seconds = future.result()
+                    except BrokenProcessPool:
+                        # a worker died: what's done is in the checkpoint, so the run can be resumed
+                        raise
+                    except Exception as e:
+                        errors, stage_seconds = {user_id: f'{type(e).__name__}: {e}' for user_id in chunk}, {}
+                    self._record_chunk(chunk, errors, stage_seconds)
+
+    def _record_chunk(self, chunk, errors, stage_seconds):
+        for user_id in chunk:
+            error = errors.get(user_id, 'not processed')
+            self.checkpoint.record(user_id, error)
+            if error is None:
+                self.completed.append(user_id)
+            else:
+                self.failed[user_id] = error
+        self.checkpoint.save()
+
+        for name, seconds in stage_seconds.items():
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+        self.elapsed_seconds = time.perf_counter() - self._start_time
+        self.log(f'{len(self.completed) + len(self.failed)} users done, {len(self.failed)} failed, '
+                 f'{self.users_per_minute:.1f} users/min')
+
+
+def main(arguments=None):
+    """
+    Run from apigateway/, as python -m logic.nightly_processing users.txt --start-date 2020-01-01 --end-date 2020-01-07,
+    with the environment set up as for the API (provider info and Mongo credentials).
+    """
+    parser = argparse.ArgumentParser(description='Reprocess the stats and injury risk of users over a range of days')
+    parser.add_argument('users_file', help='file with one user id per line')
+    parser.add_argument('--start-date', required=True)
+    parser.add_argument('--end-date', help='last day to process, start date if not given')
+    parser.add_argument('--stats', choices=NightlyProcessingRunner.stats_types, default='user_stats',
+                        help='athlete_stats for Fathom environments, which process daily plans')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=10, help='users processed and written together')
+    parser.add_argument('--max-in-flight', type=int, help='chunks queued at a time, twice the workers if not given')
+    parser.add_argument('--checkpoint', help='json file of the users done and failed, to resume the run from')
+    arguments = parser.parse_args(arguments)
+
+    from aws_xray_sdk.core import xray_recorder
+    xray_recorder.configure(sampling=False, context_missing='LOG_ERROR')
+
+    with open(arguments.users_file) as f:
+        user_ids = [line.strip() for line in f if line.strip() != '']
+    runner = NightlyProcessingRunner(arguments.stats, arguments.start_date, arguments.end_date,
+                                     workers=arguments.workers, chunk_size=arguments.chunk_size,
+                                     max_in_flight=arguments.max_in_flight, checkpoint_file=arguments.checkpoint)
+    runner.run(user_ids)
+    return 1 if len(runner.failed) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,25 +14,50 @@ class PerformanceDataParser(object):
         self.treadmill_data = None
         self.planned_workout = None
 
+    # the only columns the sections are built from.  heartrate, distance and movingtime keep the types pandas
+    # infers, so whole numbers in them are still written out as ints
+    rower_columns = ['uniqueid', 'datecreated', 'timestamp', 'speed', 'powerperstroke', 'heartrate', 'distance', 'movingtime']
+    treadmill_columns = ['uniqueid', 'datecreated', 'timestamp', 'speed', 'incline', 'heartrate', 'distance']
+    # timestamp is read as float, as a missing one is NaN, and made int64 once the rows without one are dropped
+    column_dtypes = {'uniqueid': str, 'datecreated': str, 'timestamp': np.float64, 'speed': np.float64,
+                     'incline': np.float64, 'powerperstroke': np.float64}
+
     def parse_fileobj(self, fileobj, program_id):
-        # TODO: Standardize the names of the files and update this.
-        unzipped_files = zipfile.ZipFile(fileobj)
-        print('unzipped file')
-        names = unzipped_files.namelist()
-        for name in names:
-            if 'MACOSX' in name:  # Can remove after standardizing names and only checking for specific names
-                print(f"skipping {name}")
-                continue
-            if 'rower' in name:
-                self.rower_data = pd.read_csv(unzipped_files.open(name))
-                print('rower data read')
-            elif 'treadmill' in name:
-                self.treadmill_data = pd.read_csv(unzipped_files.open(name))
-                print('treadmill data read')
+        self.read_performance_data(fileobj)
 
         # TODO: Better strategy to store/retrieve the planned session (probably store in mongo/s3s)
         self.planned_workout = WorkoutDatastore().get(program_id=program_id, json=True)
 
+    def read_performance_data(self, fileobj):
+        """
+        Reads the rower and treadmill csvs straight out of the zip, a member at a time, keeping just the columns
+        that are used
+        """
+        # TODO: Standardize the names of the files and update this.
+        with zipfile.ZipFile(fileobj) as unzipped_files:
+            print('unzipped file')
+            for name in unzipped_files.namelist():
+                if 'MACOSX' in name:  # Can remove after standardizing names and only checking for specific names
+                    print(f"skipping {name}")
+                    continue
+                if 'rower' in name:
+                    self.rower_data = self.read_csv(unzipped_files, name, self.rower_columns)
+                    print('rower data read')
+                elif 'treadmill' in name:
+                    self.treadmill_data = self.read_csv(unzipped_files, name, self.treadmill_columns)
+                    print('treadmill data read')
+
+    @classmethod
+    def read_csv(cls, unzipped_files, name, columns):
+        with unzipped_files.open(name) as csv_file:
+            data = pd.read_csv(csv_file, usecols=columns, dtype={c: t for c, t in cls.column_dtypes.items() if c in columns})
+
+        # a row without a timestamp can't be placed in a section
+        data = data.dropna(subset=['timestamp']).reset_index(drop=True)
+        data['timestamp'] = data['timestamp'].astype(np.int64)
+
+        return data
+
     def get_completed_workout(self, user_id):
         planned_workout = self.planned_workout
         treadmill_sections = self.get_treadmill_section()
@@ -191,7 +216,7 @@ class PerformanceDataParser(object):
         self.sort_data(rower_data)
         timezone = self.get_timezone(rower_data.datecreated[0])
 
-        rower_data = rower_data.loc[:, ['datecreated', 'timestamp', 'speed', 'powerperstroke', 'heartrate', 'distance', 'movingtime']]
+        rower_data = rower_data.loc[:, ['timestamp', 'speed', 'powerperstroke', 'heartrate', 'distance', 'movingtime']]
         rower_data['has_power'] = 0
         non_zero_power = np.where(rower_data.powerperstroke != 0)[0]
         rower_data.loc[non_zero_power, 'has_power'] = 1
@@ -325,37 +350,28 @@ class PerformanceDataParser(object):
 
     @staticmethod
     def sort_data(dataframe):
-        _, dataframe['second_marker'] = dataframe['uniqueid'].str.split('_').str
-        dataframe.second_marker = dataframe.second_marker.astype(int)
+        dataframe['second_marker'] = dataframe['uniqueid'].str.rsplit('_', n=1).str[-1].astype(int)
         dataframe.sort_values(by=['timestamp', 'second_marker'], inplace=True, ignore_index=True)
-        grouped = dataframe.groupby(by='timestamp')
-        group_aggs = grouped.second_marker.agg(['max'])
-        prev = 0
-        dataframe['total_seconds'] = 60
-        for i, row in group_aggs.iterrows():
-            if i - prev > 60:
-                dataframe.loc[np.where(dataframe.timestamp == i)[0], 'total_seconds'] = row['max']
-            prev = i
+
+        # a minute has all 60 seconds, unless it's the first after a gap, when it only has the seconds recorded
+        timestamps = dataframe.timestamp.values
+        minutes, first_rows, row_minutes = np.unique(timestamps, return_index=True, return_inverse=True)
+        last_rows = np.append(first_rows[1:], len(timestamps)) - 1
+        after_gap = np.diff(minutes, prepend=0) > 60
+        minute_seconds = np.where(after_gap, dataframe.second_marker.values[last_rows], 60)
+        dataframe['total_seconds'] = minute_seconds[row_minutes.reshape(-1)]
 
         dataframe.timestamp = dataframe.timestamp + (dataframe.second_marker + 60 - dataframe.total_seconds)
 
     @staticmethod
     def get_block(series, min_change, min_duration=10):
         diff = np.ediff1d(series, to_begin=0)
-        changes = np.where(abs(diff) >= min_change)[0]
-        valid_changes = [changes[0]]
-        for i in range(1, len(changes)):
-            if changes[i] - changes[i-1] > min_duration:
-                valid_changes.append(changes[i])
+        changes = np.flatnonzero(abs(diff) >= min_change)
+        # a change only starts a new block when it's more than min_duration after the change before it
+        valid_changes = changes[np.diff(changes, prepend=-min_duration - 1) > min_duration]
         blocks = np.zeros(len(series))
-        block = 0
-        last_value = 0
-        for change in valid_changes:
-            blocks[last_value:change] = block
-            block += 1
-            last_value = change
-        blocks[last_value:] = block
-        return blocks
+        blocks[valid_changes] = 1
+        return np.cumsum(blocks)
 
     # def get_hr_data(user):
     #     hr_data = pd.read_csv(f'performance_data_06_08/Anonymous{user}-Hr-Detailed.csv')
@@ -1,5 +1,5 @@
 from models.periodization import PeriodizationPlanWeek, PeriodizationModelFactory, PeriodizationPlan, TemplateWorkout
-from itertools import combinations, chain, repeat, islice, count
+from itertools import accumulate, combinations, chain, repeat, islice, count
 from collections import Counter
 from models.training_volume import StandardErrorRange
 from statistics import mean
@@ -11,6 +11,7 @@ from models.body_parts import BodyPartLocation
 from models.ranked_types import RankedBodyPart, RankedAdaptationType
 from math import sqrt
 from datetime import timedelta
+import numpy as np
 
 
 class WorkoutScoringManager(object):
@@ -97,6 +98,81 @@ class WorkoutScoringManager(object):
 
         return average_cosine_similarity
 
+    @staticmethod
+    def cos_sim_rows(A, b):
+        """
+        cos_sim of every row of A against b
+        :param A: 2d array, one row per candidate
+        :param b: 1d array
+        :return: 1d array
+        """
+        magnitudes = np.sqrt(np.sum(A ** 2, axis=1)) * np.sqrt(np.sum(b ** 2))
+        dotprods = A.dot(b)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(magnitudes == 0, 0.0, dotprods / magnitudes)
+
+    @staticmethod
+    def presence_matrix(candidate_keys_list, recommended_keys):
+
+        columns = {}
+        for keys in candidate_keys_list + [recommended_keys]:
+            for k in keys:
+                columns.setdefault(k, len(columns))
+
+        candidate_matrix = np.zeros((len(candidate_keys_list), len(columns)))
+        for c, keys in enumerate(candidate_keys_list):
+            candidate_matrix[c, [columns[k] for k in set(keys)]] = 1
+        recommended_vector = np.zeros(len(columns))
+        recommended_vector[[columns[k] for k in set(recommended_keys)]] = 1
+
+        return candidate_matrix, recommended_vector
+
+    @classmethod
+    def cosine_similarities(cls, candidate_exercise_priorities_list, recommended_exercise_priorities):
+        """
+        cosine_similarity of each candidate's exercise priorities against the same recommended priorities, computed
+        on one matrix per measure instead of candidate by candidate
+        :param candidate_exercise_priorities_list: list of lists of RankedAdaptationType, one list per candidate
+        :param recommended_exercise_priorities: list of RankedAdaptationType
+        :return: 1d array
+        """
+        candidate_count = len(candidate_exercise_priorities_list)
+
+        candidate_types, recommended_types = cls.presence_matrix(
+            [[c.adaptation_type for c in p] for p in candidate_exercise_priorities_list],
+            [r.adaptation_type for r in recommended_exercise_priorities])
+        cosine_similarity_types = cls.cos_sim_rows(candidate_types, recommended_types)
+
+        candidate_ranks, recommended_ranks = cls.presence_matrix(
+            [[(c.adaptation_type.value, c.ranking) for c in p] for p in candidate_exercise_priorities_list],
+            [(r.adaptation_type.value, r.ranking) for r in recommended_exercise_priorities])
+        cosine_similarity_ranks = cls.cos_sim_rows(candidate_ranks, recommended_ranks)
+
+        similarity_duration = np.zeros(candidate_count)
+        recommended_duration_dict = {p.adaptation_type.value: p.duration for p in recommended_exercise_priorities}
+
+        for measure, adaptation_types in [(AdaptationTypeMeasure.sub_adaptation_type, SubAdaptationType),
+                                          (AdaptationTypeMeasure.detailed_adaptation_type, DetailedAdaptationType)]:
+            rows = [c for c, p in enumerate(candidate_exercise_priorities_list)
+                    if len(p) > 0 and p[0].adaptation_type_measure == measure]
+            if len(rows) == 0:
+                continue
+            type_values = [t.value for t in adaptation_types]
+            candidate_durations = np.zeros((len(rows), len(type_values)))
+            for r, c in enumerate(rows):
+                candidate_duration_dict = {p.adaptation_type.value: p.duration for p in candidate_exercise_priorities_list[c]}
+                candidate_durations[r] = [candidate_duration_dict.get(v, 0) or 0 for v in type_values]
+            recommended_durations = np.array([recommended_duration_dict.get(v, 0) or 0 for v in type_values], dtype=float)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                percent_covered = np.where(recommended_durations > 0,
+                                           np.maximum(1 - np.abs(candidate_durations - recommended_durations) / recommended_durations, 0),
+                                           1)
+            similarity_duration[rows] = np.mean(percent_covered, axis=1)
+
+        return (cosine_similarity_ranks + cosine_similarity_types + similarity_duration) / 3
+
     @classmethod
     def muscle_cosine_similarity(cls, test_muscle_load, template_muscle_load):
         # get the muscles separately so we can look for matches of type (but not necessarily ranking)
@@ -945,19 +1021,48 @@ class PeriodizationPlanProcessor(object):
     def get_acceptable_workouts_from_combinations(self, workouts, lowest_weekly_load_target, highest_weekly_load_target,
                                                   lowest_workouts_week, highest_workouts_week):
 
-        # returns the combinations for each number of workouts that week that targets the desired range of load
+        # returns the workouts that appear in at least one combination (for any number of workouts that week) that
+        # targets the desired range of load.  Combinations are searched branch and bound over the workouts sorted
+        # by load, so the next few workouts give the smallest load a branch can reach and the last few the largest
+
+        workouts = sorted(workouts, key=lambda t: t.session_load)
+        load_sums = list(accumulate([0] + [t.session_load for t in workouts]))
+        workout_count = len(workouts)
+        distinct_workout_count = len(set(workouts))
+        unique_workouts = set()
+
+        def search(remaining, start, current_load, current_workouts):
+
+            if remaining == 0:
+                if lowest_weekly_load_target <= current_load <= highest_weekly_load_target:
+                    unique_workouts.update(current_workouts)
+                return
+
+            lowest_load = current_load + load_sums[start + remaining] - load_sums[start]
+            highest_load = current_load + load_sums[workout_count] - load_sums[workout_count - remaining]
+
+            if lowest_load > highest_weekly_load_target or highest_load < lowest_weekly_load_target:
+                return
 
-        workouts_per_week = list(range(lowest_workouts_week, highest_workouts_week + 1))
-        workout_combinations = []
+            if lowest_weekly_load_target <= lowest_load and highest_load <= highest_weekly_load_target:
+                # every completion is acceptable, and every remaining workout is in at least one of them
+                unique_workouts.update(current_workouts)
+                unique_workouts.update(workouts[start:])
+                return
 
-        for w in workouts_per_week:
-            for k in self.combinations_without_repetition(w, iterable=workouts):
-                k = list(k)
-                weekly_load = sum(t.session_load for t in k)
-                if lowest_weekly_load_target <= weekly_load <= highest_weekly_load_target:
-                    workout_combinations.append(k)
+            for i in range(start, workout_count - remaining + 1):
+                if len(unique_workouts) == distinct_workout_count:
+                    return
+                if current_load + load_sums[i + remaining] - load_sums[i] > highest_weekly_load_target:
+                    break
+                if i > start and workouts[i] == workouts[i - 1]:
+                    # the same workout was just tried in this position
+                    continue
+                search(remaining - 1, i + 1, current_load + workouts[i].session_load, current_workouts + [workouts[i]])
 
-        unique_workouts = set(x for l in workout_combinations for x in l)
+        for w in range(lowest_workouts_week, highest_workouts_week + 1):
+            if 0 < w <= workout_count:
+                search(w, 0, 0, [])
 
         return unique_workouts
 
@@ -1033,6 +1138,81 @@ class PeriodizationPlanProcessor(object):
 
         return composite_score
 
+    def get_workout_scores(self, test_workouts, recommended_exercise, target_load_range, one_required_combination=None):
+        """
+        get_workout_score for a batch of candidate workouts against one recommended exercise
+        :param test_workouts: list of PlannedWorkoutLoad
+        :return: 1d array of composite scores, in the same order as test_workouts
+        """
+
+        def bounds(attribute):
+            return np.array([[getattr(getattr(t, attribute), b) for b in ['lower_bound', 'upper_bound']]
+                             for t in test_workouts], dtype=float).reshape(len(test_workouts), 2)
+
+        def upper_limit(value):
+            return np.inf if value is None else value
+
+        session_rpe = bounds('projected_session_rpe')
+        rpe_load = bounds('projected_rpe_load')
+        durations = np.array([t.duration for t in test_workouts], dtype=float)
+
+        if recommended_exercise.rpe is not None:
+            rpe_upper = recommended_exercise.rpe.upper_bound
+            rpe_lower = recommended_exercise.rpe.lower_bound
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rpe_score = np.select([(rpe_upper is not None) & (rpe_lower <= session_rpe[:, 0]) & (rpe_load[:, 1] <= upper_limit(rpe_upper)),
+                                       session_rpe[:, 1] > upper_limit(rpe_upper),
+                                       rpe_lower <= session_rpe[:, 0]],
+                                      [1.0, 0.0, 1.0],
+                                      session_rpe[:, 0] / rpe_lower)
+        else:
+            rpe_score = np.ones(len(test_workouts))
+
+        if recommended_exercise.duration is not None:
+            duration_lower = recommended_exercise.duration.lower_bound
+            duration_upper = recommended_exercise.duration.upper_bound
+            with np.errstate(divide='ignore', invalid='ignore'):
+                duration_score = np.select([(duration_lower <= durations) & (durations <= duration_upper),
+                                            durations > duration_upper],
+                                           [1.0, duration_upper / durations],
+                                           durations / duration_lower)
+        else:
+            duration_score = np.ones(len(test_workouts))
+
+        load_upper = upper_limit(target_load_range.upper_bound)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            load_score = np.select([(target_load_range.lower_bound <= rpe_load[:, 0]) & (rpe_load[:, 1] <= load_upper),
+                                    rpe_load[:, 1] > load_upper,
+                                    target_load_range.lower_bound <= rpe_load[:, 0]],
+                                   [1.0, 0.0, 1.0],
+                                   rpe_load[:, 0] / target_load_range.lower_bound)
+
+        cosine_similarity = WorkoutScoringManager.cosine_similarities(
+            [t.session_detailed_load.sub_adaptation_types for t in test_workouts],
+            [RankedAdaptationType(AdaptationTypeMeasure.sub_adaptation_type, recommended_exercise.sub_adaptation_type, 1, 0)])
+
+        if one_required_combination is None:
+            times_per_week = recommended_exercise.times_per_week.lower_bound / float(5)
+        else:
+            times_per_week = one_required_combination.lower_bound / float(5)
+        times_per_week_score = np.where(cosine_similarity > 0, times_per_week, 0)
+
+        # missing monotony or strain event levels count as nan, which scores the same as no risk
+        monotony = np.array([t.projected_monotony.observed_value if t.projected_monotony is not None else None
+                             for t in test_workouts], dtype=float)
+        monotony_score = np.select([np.isnan(monotony) | (monotony < 1.5), (1.5 <= monotony) & (monotony < 2)],
+                                   [1.0, 0.5], 0.0)
+
+        strain_event_level = np.array([t.projected_strain_event_level.observed_value if t.projected_strain_event_level is not None else None
+                                       for t in test_workouts], dtype=float)
+        strain_event_score = np.select([np.isnan(strain_event_level) | (strain_event_level == 0),
+                                        (1.5 <= strain_event_level) & (strain_event_level < 2)],
+                                       [1.0, 0.5], 0.0)
+
+        composite_scores = ((monotony_score * .1) + (strain_event_score * .1) + (times_per_week_score * .2) + (rpe_score * .2) + (duration_score * .1) + (load_score * .1) + (cosine_similarity * .2)) * 100
+
+        return composite_scores
+
 
 
 
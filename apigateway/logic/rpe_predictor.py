@@ -1,11 +1,34 @@
-import os
 from models.movement_tags import Gender
 from fathomapi.utils.xray import xray_recorder
 from datastores.ml_model_datastore import MLModelsDatastore
+from logic.batch_predictor import BatchPredictor
 
-class RPEPredictor(object):
-    def __init__(self):
-        self.model = MLModelsDatastore.get_hr_model()
+
+class RPEPredictor(BatchPredictor):
+    codebuild_prediction = 4
+
+    def __init__(self, model=None):
+        super().__init__(model or MLModelsDatastore.get_hr_model())
+
+    @staticmethod
+    def get_features(hr, user_weight=60.0, user_age=20.0, vo2_max=40.0, gender=Gender.female):
+        """
+        :return: (gender, user_weight, vo2_max, max_hr, percent_max_hr) as used to train the model
+        """
+        if gender == Gender.female:
+            gender = 1.0
+        else:
+            gender = 0.0
+        max_hr = 207 - .7 * user_age
+        percent_max_hr = hr / max_hr
+        return gender, user_weight, vo2_max, max_hr, percent_max_hr
+
+    def get_feature_matrix(self, features_list):
+        return self.to_matrix(features_list, 5)
+
+    @xray_recorder.capture('logic.RPEPredictor.predict_rpes')
+    def predict_rpes(self, features_list):
+        return self.predict_batch(features_list)
 
     @xray_recorder.capture('logic.RPEPredictor.predict_rpe')
     def predict_rpe(self, hr, user_weight=60.0, user_age=20.0, vo2_max=40.0, gender=Gender.female):
@@ -18,18 +41,4 @@ class RPEPredictor(object):
         :param gender:
         :return:
         """
-        if gender == Gender.female:
-            gender = 1.0
-        else:
-            gender = 0.0
-        max_hr = 207 - .7 * user_age
-        percent_max_hr = hr / max_hr
-        features = [[gender, user_weight, vo2_max, max_hr, percent_max_hr]]
-        if os.environ.get('CODEBUILD_RUN', '') == 'TRUE':
-            return 4
-        else:
-            predicted_rpe = self.model.predict(features)[0]
-            if predicted_rpe < 0:
-                predicted_rpe = 0
-            predicted_rpe = round(predicted_rpe, 1)
-            return predicted_rpe
+        return self.predict_batch([self.get_features(hr, user_weight, user_age, vo2_max, gender)])[0]
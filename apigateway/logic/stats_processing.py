@@ -1,5 +1,6 @@
 import math
 import statistics
+import numpy as np
 from collections import namedtuple
 from datetime import datetime, timedelta
 from models.chart_data import BodyPartChartCollection, MuscularStrainChart, HighRelativeLoadChart, DOMSChart, BodyResponseChart
@@ -12,6 +13,8 @@ from models.soreness_base import HistoricSorenessStatus
 from models.body_parts import BodyPart, BodyPartFactory, BodyPartLocation, BodyPartSide
 from models.historic_soreness import HistoricSoreness, HistoricSeverity, CoOccurrence, SorenessCause
 from models.post_session_survey import PostSessionSurvey
+from models.plan_history import PlanHistory, PlanWindow
+from models.soreness_timeline import SorenessTimeline
 from models.data_series import DataSeries
 from models.asymmetry import HistoricAsymmetry, AsymmetryType
 from utils import parse_date, format_date
@@ -30,6 +33,7 @@ class StatsProcessing(object):
         self.daily_plan_datastore = datastore_collection.daily_plan_datastore
         self.cleared_soreness_datastore = datastore_collection.cleared_soreness_datastore
         self.injury_risk_datastore = datastore_collection.injury_risk_datastore
+        self.injury_risk_checkpoint_datastore = datastore_collection.injury_risk_checkpoint_datastore
         self.start_date = None
         self.end_date = None
         self.start_date_time = None
@@ -94,7 +98,7 @@ class StatsProcessing(object):
         return True
 
     @xray_recorder.capture('logic.StatsProcessing.process_athlete_stats')
-    def process_athlete_stats(self, current_athlete_stats=None, force_historical_process=False):
+    def process_athlete_stats(self, current_athlete_stats=None, force_historical_process=False, earliest_changed_date=None):
         if self.start_date is None:
             self.set_start_end_times()
         self.load_historical_data()
@@ -260,15 +264,7 @@ class StatsProcessing(object):
             current_athlete_stats.session_RPE_event_date = current_athlete_stats.session_RPE_event_date
             if force_historical_process:
                 # New
-                historical_injury_risk_dict = self.injury_risk_datastore.get(self.athlete_id)
-                injury_risk_processor = InjuryRiskProcessor(self.event_date, soreness_list_25, sessions,
-                                                            historical_injury_risk_dict, current_athlete_stats, self.athlete_id)
-                injury_risk_processor.process(update_historical_data=True)
-
-                athlete_injury_risk = AthleteInjuryRisk(self.athlete_id)
-                athlete_injury_risk.items = injury_risk_processor.injury_risk_dict
-
-                self.injury_risk_datastore.put(athlete_injury_risk)
+                self.update_historical_injury_risk(current_athlete_stats, soreness_list_25, sessions, earliest_changed_date)
 
         else:  # nightly process (first update for the day)
             # clear these if it's a new day
@@ -311,15 +307,7 @@ class StatsProcessing(object):
                 current_athlete_stats.muscular_strain.append(most_recent_muscular_strain)
 
             # New
-            historical_injury_risk_dict = self.injury_risk_datastore.get(self.athlete_id)
-            injury_risk_processor = InjuryRiskProcessor(self.event_date, soreness_list_25, sessions,
-                                                        historical_injury_risk_dict, current_athlete_stats, self.athlete_id)
-            injury_risk_processor.process(update_historical_data=True)
-
-            athlete_injury_risk = AthleteInjuryRisk(self.athlete_id)
-            athlete_injury_risk.items = injury_risk_processor.injury_risk_dict
-
-            self.injury_risk_datastore.put(athlete_injury_risk)
+            self.update_historical_injury_risk(current_athlete_stats, soreness_list_25, sessions)
 
             # training_volume_processing.fill_load_monitoring_measures(self.all_daily_readiness_surveys, self.all_plans, parse_date(self.event_date))
             # current_athlete_stats.muscular_strain_increasing = training_volume_processing.muscular_strain_increasing()
@@ -331,6 +319,25 @@ class StatsProcessing(object):
         current_athlete_stats.event_date = self.event_date
         return current_athlete_stats
 
+    def update_historical_injury_risk(self, current_athlete_stats, symptoms, sessions, earliest_changed_date=None):
+        # callers that know what changed resume from the checkpoint of an earlier run of the same event date, and
+        # leave one for the next
+        checkpoint = None
+        if earliest_changed_date is not None:
+            checkpoint = self.injury_risk_checkpoint_datastore.get(self.athlete_id)
+        injury_risk_processor = InjuryRiskProcessor(self.event_date, symptoms, sessions, {}, current_athlete_stats,
+                                                    self.athlete_id)
+        injury_risk_processor.process(update_historical_data=True, checkpoint=checkpoint,
+                                      earliest_changed_date=earliest_changed_date,
+                                      create_checkpoint=earliest_changed_date is not None)
+
+        athlete_injury_risk = AthleteInjuryRisk(self.athlete_id)
+        athlete_injury_risk.items = injury_risk_processor.injury_risk_dict
+
+        self.injury_risk_datastore.put(athlete_injury_risk)
+        if injury_risk_processor.checkpoint is not None and injury_risk_processor.checkpoint is not checkpoint:
+            self.injury_risk_checkpoint_datastore.put(injury_risk_processor.checkpoint)
+
     def add_soreness_cause(self, historic_soreness):
 
         acute_surveys = self.merge_soreness_from_surveys(
@@ -534,53 +541,41 @@ class StatsProcessing(object):
     @xray_recorder.capture('logic.StatsProcessing.get_historic_soreness')
     def get_historic_soreness_list(self, soreness_list_25, existing_historic_soreness=None):
 
-        grouped_soreness = {}
-
         acute_pain_list = []
 
-        ns = namedtuple("ns", ["location", "side", "is_pain"])
+        soreness_timeline = SorenessTimeline(soreness_list_25, self.event_date)
 
         first_reported_date_time = None
         #last_reported_date = None
         last_reported_date_time = None
         days_since_last_report = None
 
-        for s in soreness_list_25:
+        if len(soreness_list_25) > 0:
+            last_reported_date_time = max(s.reported_date_time for s in soreness_list_25)
+            days_since_last_report = (self.event_date.date() - last_reported_date_time.date()).days
 
-            ns_new = ns(s.body_part.location, s.side, s.pain)
-            if ns_new in grouped_soreness:
-                grouped_soreness[ns_new] = grouped_soreness[ns_new] + 1
-            else:
-                grouped_soreness[ns_new] = 1
-            # if last_reported_date_time is None:
-            #     first_reported_date_time = s.reported_date_time
-            if last_reported_date_time is None or s.reported_date_time > last_reported_date_time:
-                last_reported_date_time = s.reported_date_time
-                #last_reported_date = s.reported_date_time
-                days_since_last_report = (self.event_date.date() - last_reported_date_time.date()).days
+        # the last match in existing_historic_soreness is the one used
+        historic_soreness_index = {}
+        if existing_historic_soreness is not None:
+            for h in existing_historic_soreness:
+                historic_soreness_index[(h.body_part_location, h.side, h.is_pain)] = h
 
-        for g in grouped_soreness:
+        ns = namedtuple("ns", ["location", "side", "is_pain"])
 
-            # find any possible matching historic soreness
-            historic_soreness = HistoricSoreness(g.location, g.side, g.is_pain)
+        for key in soreness_timeline.keys():
 
-            if existing_historic_soreness is not None:
-                for h in existing_historic_soreness:
-                    if h.is_pain == g.is_pain and h.side == g.side and h.body_part_location == g.location:
-                        historic_soreness = h
+            g = ns(*key)
+
+            # find any possible matching historic soreness
+            historic_soreness = historic_soreness_index.get(key)
+            if historic_soreness is None:
+                historic_soreness = HistoricSoreness(g.location, g.side, g.is_pain)
 
             ask_acute_pain_question = False
             streak = 0
             streak_start_date = None
-            body_part_history = list(s for s in soreness_list_25 if s.body_part.location ==
-                                     g.location and s.side == g.side and s.pain == g.is_pain)
-            body_part_history.sort(key=lambda x: x.reported_date_time, reverse=True)
-
-            days_skipped = 0
-            last_ten_day_count = 0
-            last_fourteen_day_count = 0
-            last_eight_seventeen_day_count = 0
-            days_diff = 0
+            body_part_history = soreness_timeline.get_reports(key)
+            days_ago = soreness_timeline.get_days_ago(key)
 
             if len(body_part_history) > 0:
                 first_reported_date_time = min([s.reported_date_time for s in body_part_history])
@@ -594,17 +589,10 @@ class StatsProcessing(object):
                    historic_soreness.last_reported_date_time != body_part_history[0].reported_date_time and \
                    historic_soreness.historic_soreness_status == HistoricSorenessStatus.dormant_cleared:
                     body_part_history = []
+                    days_ago = days_ago[:0]
 
-            for b in range(0, len(body_part_history)):
-
-                days_diff = (self.event_date.date() - body_part_history[b].reported_date_time.date()).days
-
-                if days_diff < 14:
-                    last_fourteen_day_count += 1
-                if days_diff < 10:
-                    last_ten_day_count += 1
-                if 8 < days_diff < 17:
-                    last_eight_seventeen_day_count += 1
+            last_ten_day_count, last_fourteen_day_count, last_eight_seventeen_day_count = SorenessTimeline.get_day_counts(days_ago)
+            days_diff = int(days_ago[-1]) if len(days_ago) > 0 else 0
 
             if historic_soreness.is_acute_pain():
 
@@ -660,17 +648,10 @@ class StatsProcessing(object):
 
                 if len(body_part_history) >= 2:
 
-                    for b in range(0, len(body_part_history)):
-                        if days_skipped <= 3:
-                            if (streak_start_date is None or body_part_history[b].reported_date_time
-                                    < streak_start_date):
-                                streak_start_date = body_part_history[b].reported_date_time
-                            if b < (len(body_part_history) - 1):
-                                days_skipped = (body_part_history[b].reported_date_time.date() -
-                                                body_part_history[b + 1].reported_date_time.date()).days
-
-                            if b == 0 or (body_part_history[b - 1].reported_date_time.date() - body_part_history[b].reported_date_time.date()).days > 0:
-                                streak += 1
+                    # the streak runs back while reports are no more than 3 days apart, counting each date once
+                    streak_reports = 1 + SorenessTimeline.get_leading_gaps(soreness_timeline.get_day_ordinals(key), 3)
+                    streak = 1 + int(np.count_nonzero(np.diff(days_ago[:streak_reports]) > 0))
+                    streak_start_date = body_part_history[streak_reports - 1].reported_date_time
 
                 if streak >= 3 and g.is_pain:  # check for acute pain FIRST
                     if days_since_last_report is not None and days_since_last_report > 3:
@@ -1076,40 +1057,27 @@ class StatsProcessing(object):
 
     def get_soreness_streaks(self, soreness_list):
 
-        grouped_soreness = {}
         streak_soreness = {}
         streak_start_soreness = {}
 
         ns = namedtuple("ns", ["location", "is_pain", "side"])
         ns_2 = namedtuple("ns", ["location", "is_pain", "side", "avg_severity"])
 
-        for s in soreness_list:
-            ns_new = ns(s.body_part.location, s.pain, s.side)
-            if ns_new in grouped_soreness:
-                grouped_soreness[ns_new] = grouped_soreness[ns_new] + 1
-            else:
-                grouped_soreness[ns_new] = 1
+        soreness_timeline = SorenessTimeline(soreness_list)
 
-        for g in grouped_soreness:
+        for location, side, is_pain in soreness_timeline.keys():
+            g = ns(location, is_pain, side)
             streak = 1
             streak_start_date = None
-            body_part_history = list(s for s in soreness_list if s.body_part.location ==
-                                     g.location and s.side == g.side and s.pain == g.is_pain)
-            body_part_history.sort(key=lambda x: x.reported_date_time, reverse=True)
-            severity = 0.0
+            body_part_history = soreness_timeline.get_reports((location, side, is_pain))
             if len(body_part_history) >= 2:
-                for b in range(0, len(body_part_history)-1):
-                    if (streak_start_date is None or body_part_history[b].reported_date_time
-                            < streak_start_date):
-                        streak_start_date = body_part_history[b].reported_date_time
-                    days_skipped = (body_part_history[b].reported_date_time.date() -
-                                    body_part_history[b + 1].reported_date_time.date()).days
-
-                    if days_skipped <= 3:
-                        streak += 1
-                    else:
-                        break
+                # reports no more than 3 days apart, back from the newest; the streak starts at the last one
+                # compared, which stops short of the oldest report
+                leading_gaps = SorenessTimeline.get_leading_gaps(soreness_timeline.get_day_ordinals((location, side, is_pain)), 3)
+                streak += leading_gaps
+                streak_start_date = body_part_history[min(leading_gaps, len(body_part_history) - 2)].reported_date_time
 
+            severity = 0.0
             for b in range(0, streak):
                 severity += body_part_history[b].severity
 
@@ -1179,19 +1147,21 @@ class StatsProcessing(object):
 
         weeks_list = []
 
-        if self.chronic_days is not None:
+        if self.chronic_days is not None and self.acute_start_date_time is None:
+            weeks_list = [[], [], [], []]
+
+        elif self.chronic_days is not None:
+
+            chronic_daily_plans = self.chronic_daily_plans
+            if not isinstance(chronic_daily_plans, PlanWindow):
+                chronic_daily_plans = PlanHistory(chronic_daily_plans).get_window()
+
+            week_start_date_times = [self.acute_start_date_time - timedelta(days=min(days, self.chronic_days)) for days in [7, 14, 21, 28]]
 
-            week4_sessions = [d for d in self.chronic_daily_plans if self.acute_start_date_time is not None and
-                              self.acute_start_date_time - timedelta(days=min(28, self.chronic_days)) <=
-                              d.get_event_datetime() < self.acute_start_date_time - timedelta(days=min(21, self.chronic_days))]
-            week3_sessions = [d for d in self.chronic_daily_plans if self.acute_start_date_time is not None and self.acute_start_date_time
-                              - timedelta(days=min(21, self.chronic_days)) <= d.get_event_datetime() < self.acute_start_date_time -
-                              timedelta(days=min(14, self.chronic_days))]
-            week2_sessions = [d for d in self.chronic_daily_plans if self.acute_start_date_time is not None and self.acute_start_date_time
-                              - timedelta(days=min(14, self.chronic_days)) <= d.get_event_datetime() < self.acute_start_date_time -
-                              timedelta(days=min(7, self.chronic_days))]
-            week1_sessions = [d for d in self.chronic_daily_plans if self.acute_start_date_time is not None and self.acute_start_date_time
-                              - timedelta(days=min(7, self.chronic_days)) <= d.get_event_datetime() < self.acute_start_date_time]
+            week1_sessions = chronic_daily_plans.get_window(week_start_date_times[0], self.acute_start_date_time)
+            week2_sessions = chronic_daily_plans.get_window(week_start_date_times[1], week_start_date_times[0])
+            week3_sessions = chronic_daily_plans.get_window(week_start_date_times[2], week_start_date_times[1])
+            week4_sessions = chronic_daily_plans.get_window(week_start_date_times[3], week_start_date_times[2])
 
             weeks_list = [week1_sessions, week2_sessions, week3_sessions, week4_sessions]
 
@@ -1559,18 +1529,22 @@ class StatsProcessing(object):
 
     def load_historical_plans(self):
 
-        self.acute_daily_plans = sorted([p for p in self.all_plans if self.acute_start_date_time is not None and p.get_event_datetime() >=
-                                         self.acute_start_date_time], key=lambda x: x.event_date)
+        plan_history = PlanHistory(self.all_plans)
 
-        self.chronic_daily_plans = sorted([p for p in self.all_plans if self.acute_start_date_time is not None and
-                                           self.chronic_load_start_date_time is not None and self.acute_start_date_time >
-                                           p.get_event_datetime() >= self.chronic_load_start_date_time],
-                                          key=lambda x: x.event_date)
+        if self.acute_start_date_time is not None:
+            self.acute_daily_plans = plan_history.get_window(self.acute_start_date_time)
+        else:
+            self.acute_daily_plans = PlanWindow(plan_history, 0, 0)
+
+        if self.acute_start_date_time is not None and self.chronic_load_start_date_time is not None:
+            self.chronic_daily_plans = plan_history.get_window(self.chronic_load_start_date_time, self.acute_start_date_time)
+        else:
+            self.chronic_daily_plans = PlanWindow(plan_history, 0, 0)
 
-        self.last_6_days_plans = [p for p in self.all_plans if p.get_event_datetime() >= self.last_6_days]
+        self.last_6_days_plans = plan_history.get_window(self.last_6_days)
 
-        self.last_7_days_plans = [p for p in self.all_plans if p.get_event_datetime() >= self.last_week]
+        self.last_7_days_plans = plan_history.get_window(self.last_week)
 
-        self.last_7_13_days_plans = [p for p in self.all_plans if self.last_6_days > p.get_event_datetime() >= self.days_7_13]
+        self.last_7_13_days_plans = plan_history.get_window(self.days_7_13, self.last_6_days)
 
-        self.days_8_14_plans = [p for p in self.all_plans if self.last_week > p.get_event_datetime() >= self.previous_week]
+        self.days_8_14_plans = plan_history.get_window(self.previous_week, self.last_week)
@@ -37,6 +37,15 @@ class SurveyProcessing(object):
         self.datastore_collection = datastore_collection
         self.symptoms = []
 
+    def get_earliest_changed_date(self):
+        """
+        Earliest day whose sessions or soreness this survey changes: the survey's own day, or that of an earlier
+        session in it
+        """
+        dates = [self.event_date_time.date()]
+        dates.extend(s.event_date.date() for s in self.sessions if s.event_date is not None)
+        return min(dates)
+
     def create_session_from_survey(self, session, historic_health_data=False):
         session_obj = self.convert_session(session, historic_health_data)
         self.sessions.append(session_obj)
@@ -385,7 +394,7 @@ def match_sessions(user_sessions, health_session):
 
 def create_plan(user_id, event_date, update_stats=True, athlete_stats=None, stats_processor=None, datastore_collection=None,
                 force_data=False, mobilize_only=False, visualizations=True, hist_update=False, force_on_demand=False,
-                log_symptoms=False):
+                log_symptoms=False, earliest_changed_date=None):
     if datastore_collection is None:
         datastore_collection = DatastoreCollection()
     if update_stats:
@@ -395,7 +404,8 @@ def create_plan(user_id, event_date, update_stats=True, athlete_stats=None, stat
                                               # event_date=format_date(event_date),
                                               event_date=event_date,
                                               datastore_collection=datastore_collection)
-        athlete_stats = stats_processor.process_athlete_stats(current_athlete_stats=athlete_stats, force_historical_process=hist_update)
+        athlete_stats = stats_processor.process_athlete_stats(current_athlete_stats=athlete_stats, force_historical_process=hist_update,
+                                                              earliest_changed_date=earliest_changed_date)
         # update metrics
         metrics = MetricsProcessing().get_athlete_metrics_from_stats(athlete_stats=athlete_stats,
                                                                      event_date=format_date(event_date))
@@ -11,6 +11,7 @@ from operator import itemgetter, attrgetter
 from statistics import stdev, mean
 from models.chart_data import TrainingVolumeChartData, TrainingVolumeChart, WorkoutChart, BiomechanicsAPTChart, BiomechanicsAnklePitchChart, BiomechanicsHipDropChart, BiomechanicsSummaryChart
 from models.stats import SportMaxLoad
+from models.plan_history import PlanWindow
 
 
 class LoadingEvent(object):
@@ -225,8 +226,11 @@ class TrainingVolumeProcessing(object):
         self.internal_load_tuples = []
 
         eight_days_ago = parse_date(self.end_date) - timedelta(days=8)
-        eight_day_plus_plans = list(c for c in chronic_daily_plans if c.get_event_datetime() <= eight_days_ago)
-        if len(eight_day_plus_plans) > 0:
+        if isinstance(chronic_daily_plans, PlanWindow):
+            chronic_date_times = chronic_daily_plans.get_event_date_times()
+        else:
+            chronic_date_times = [c.get_event_datetime() for c in chronic_daily_plans]
+        if any(d <= eight_days_ago for d in chronic_date_times):
             self.plan_exists_days_8_35 = True
 
         last_7_day_training_sessions = self.get_training_sessions(last_7_days_plans)
@@ -1248,96 +1252,57 @@ class TrainingVolumeProcessing(object):
 
         return bound_values
 
-    def get_plan_session_attribute_sum(self, attribute_name, daily_plan_collection):
-
-        sum_value = None
+    def get_session_attribute_values_by_plan(self, attribute_name, daily_plan_collection):
 
-        values = []
+        if isinstance(daily_plan_collection, PlanWindow):
+            return daily_plan_collection.get_column(attribute_name)
 
-        for c in daily_plan_collection:
+        return [self.get_values_for_session_attribute(attribute_name, c.training_sessions) for c in daily_plan_collection]
 
-            values.extend(self.get_values_for_session_attribute(attribute_name, c.training_sessions))
-            #values.extend(self.get_values_for_session_attribute(attribute_name, c.practice_sessions))
-            # values.extend(self.get_values_for_session_attribute(attribute_name, c.strength_conditioning_sessions))
-            #values.extend(self.get_values_for_session_attribute(attribute_name, c.games))
-            #values.extend(self.get_values_for_session_attribute(attribute_name, c.bump_up_sessions))
+    def get_session_attributes_product_by_plan(self, attribute_1_name, attribute_2_name, daily_plan_collection):
 
-        if len(values) > 0:
-            sum_value = sum(values)
+        if isinstance(daily_plan_collection, PlanWindow):
+            return daily_plan_collection.get_product_column(attribute_1_name, attribute_2_name)
 
-        return [sum_value]
+        return [self.get_product_of_session_attributes(attribute_1_name, attribute_2_name, c.training_sessions)
+                for c in daily_plan_collection]
 
-    def get_plan_session_attribute_sum_list(self, attribute_name, daily_plan_collection):
-
-        #sum_value = None
+    def get_plan_session_attribute_sum(self, attribute_name, daily_plan_collection):
 
-        values = []
+        sum_value = None
 
-        for c in daily_plan_collection:
+        values = [v for plan_values in self.get_session_attribute_values_by_plan(attribute_name, daily_plan_collection)
+                  for v in plan_values]
 
-            sub_values = []
+        if len(values) > 0:
+            sum_value = sum(values)
 
-            sub_values.extend(self.get_values_for_session_attribute(attribute_name, c.training_sessions))
-            #sub_values.extend(self.get_values_for_session_attribute(attribute_name, c.practice_sessions))
-            # sub_values.extend(self.get_values_for_session_attribute(attribute_name, c.strength_conditioning_sessions))
-            #sub_values.extend(self.get_values_for_session_attribute(attribute_name, c.games))
-            #sub_values.extend(self.get_values_for_session_attribute(attribute_name, c.bump_up_sessions))
+        return [sum_value]
 
-            if len(sub_values) > 0:
-                sum_value = sum(sub_values)
-                values.append(sum_value)
+    def get_plan_session_attribute_sum_list(self, attribute_name, daily_plan_collection):
 
-        return values
+        return [sum(plan_values) for plan_values in self.get_session_attribute_values_by_plan(attribute_name, daily_plan_collection)
+                if len(plan_values) > 0]
 
     def get_session_attributes_product_sum_list(self, attribute_1_name, attribute_2_name, daily_plan_collection):
 
-        # sum_value = None
-
-        values = []
-
-        for c in daily_plan_collection:
-
-            sub_values = []
-
-            sub_values.extend(self.get_product_of_session_attributes(attribute_1_name, attribute_2_name,
-                                                                     c.training_sessions))
-            #sub_values.extend(self.get_product_of_session_attributes(attribute_1_name, attribute_2_name,
-            #                                                         c.practice_sessions))
-            # sub_values.extend(self.get_product_of_session_attributes(attribute_1_name, attribute_2_name,
-                                                                     # c.strength_conditioning_sessions))
-            #sub_values.extend(self.get_product_of_session_attributes(attribute_1_name, attribute_2_name,
-            #                                                         c.games))
-            #sub_values.extend(self.get_product_of_session_attributes(attribute_1_name, attribute_2_name,
-            #                                                         c.bump_up_sessions))
-            if len(sub_values) > 0:
-                sum_value = sum(sub_values)
-                values.append(sum_value)
-
-        return values
+        return [sum(plan_values) for plan_values in self.get_session_attributes_product_by_plan(attribute_1_name, attribute_2_name,
+                                                                                                daily_plan_collection)
+                if len(plan_values) > 0]
 
     def get_session_attributes_product_sum_tuple_list(self, attribute_1_name, attribute_2_name, daily_plan_collection):
 
-        # sum_value = None
+        if isinstance(daily_plan_collection, PlanWindow):
+            event_date_times = daily_plan_collection.get_event_date_times()
+        else:
+            event_date_times = [c.get_event_datetime() for c in daily_plan_collection]
 
         values = []
 
-        for c in daily_plan_collection:
-
-            #sub_values = []
-
-            values.extend(self.get_tuple_product_of_session_attributes(c.get_event_datetime(), attribute_1_name, attribute_2_name,
-                                                                     c.training_sessions))
-            #values.extend(self.get_tuple_product_of_session_attributes(c.get_event_datetime(), attribute_1_name, attribute_2_name,
-            #                                                         c.practice_sessions))
-            # values.extend(self.get_tuple_product_of_session_attributes(c.get_event_datetime(), attribute_1_name, attribute_2_name,
-            #                                                          c.strength_conditioning_sessions))
-            #values.extend(self.get_tuple_product_of_session_attributes(c.get_event_datetime(), attribute_1_name, attribute_2_name,
-            #                                                         c.games))
-            #values.extend(self.get_tuple_product_of_session_attributes(c.get_event_datetime(), attribute_1_name, attribute_2_name,
-            #                                                         c.bump_up_sessions))
-            #if len(sub_values) > 0:
-            #    sum_value = sum(sub_values)
-            #    values.append(sum_value)
+        for event_date_time, plan_values in zip(event_date_times,
+                                                self.get_session_attributes_product_by_plan(attribute_1_name, attribute_2_name,
+                                                                                            daily_plan_collection)):
+            values.extend((event_date_time, v) for v in plan_values)
 
         return values
 
@@ -1345,19 +1310,10 @@ class TrainingVolumeProcessing(object):
 
         sum_value = None
 
-        values = []
+        values = [v for plan_values in self.get_session_attributes_product_by_plan(attribute_1_name, attribute_2_name,
+                                                                                   daily_plan_collection)
+                  for v in plan_values]
 
-        for c in daily_plan_collection:
-            values.extend(self.get_product_of_session_attributes(attribute_1_name, attribute_2_name,
-                                                                 c.training_sessions))
-            #values.extend(self.get_product_of_session_attributes(attribute_1_name, attribute_2_name,
-            #                                                     c.practice_sessions))
-            # values.extend(self.get_product_of_session_attributes(attribute_1_name, attribute_2_name,
-            #                                                      c.strength_conditioning_sessions))
-            #values.extend(self.get_product_of_session_attributes(attribute_1_name, attribute_2_name,
-            #                                                     c.games))
-            #values.extend(self.get_product_of_session_attributes(attribute_1_name, attribute_2_name,
-            #                                                     c.bump_up_sessions))
         if len(values) > 0:
             sum_value = sum(values)
 
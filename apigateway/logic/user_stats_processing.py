@@ -18,6 +18,7 @@ class UserStatsProcessing(object):
         self.user_stats_datastore = datastore_collection.user_stats_datastore
         self.symptom_datastore = datastore_collection.symptom_datastore
         self.injury_risk_datastore = datastore_collection.injury_risk_datastore
+        self.injury_risk_checkpoint_datastore = datastore_collection.injury_risk_checkpoint_datastore
         self.training_session_datastore = datastore_collection.training_session_datastore
         self.start_date = None
         self.end_date = None
@@ -76,7 +77,7 @@ class UserStatsProcessing(object):
         return True
 
     @xray_recorder.capture('logic.UserStatsProcessing.process_user_stats')
-    def process_user_stats(self, current_user_stats=None, force_historical_process=False):
+    def process_user_stats(self, current_user_stats=None, force_historical_process=False, earliest_changed_date=None):
         if self.start_date is None:
             self.set_start_end_times()
 
@@ -133,36 +134,38 @@ class UserStatsProcessing(object):
             # current_user_stats.session_RPE_event_date = current_user_stats.session_RPE_event_date
             if force_historical_process:
                 # New
-                historical_injury_risk_dict = self.injury_risk_datastore.get(self.athlete_id)
-                injury_risk_processor = InjuryRiskProcessor(self.event_date, self.last_25_days_symptoms,
-                                                            self.training_sessions, historical_injury_risk_dict,
-                                                            current_user_stats, self.athlete_id)
-                injury_risk_processor.process(update_historical_data=True)
-
-                athlete_injury_risk = AthleteInjuryRisk(self.athlete_id)
-                athlete_injury_risk.items = injury_risk_processor.injury_risk_dict
-
-                self.injury_risk_datastore.put(athlete_injury_risk)
+                self.update_historical_injury_risk(current_user_stats, earliest_changed_date)
 
         else:  # nightly process (first update for the day)
             # clear these if it's a new day
             # current_user_stats.session_RPE = None
             # current_user_stats.session_RPE_event_date = None
 
-            historical_injury_risk_dict = self.injury_risk_datastore.get(self.athlete_id)
-            injury_risk_processor = InjuryRiskProcessor(self.event_date, self.last_25_days_symptoms,
-                                                        self.training_sessions, historical_injury_risk_dict,
-                                                        current_user_stats, self.athlete_id)
-            injury_risk_processor.process(update_historical_data=True)
-
-            athlete_injury_risk = AthleteInjuryRisk(self.athlete_id)
-            athlete_injury_risk.items = injury_risk_processor.injury_risk_dict
-
-            self.injury_risk_datastore.put(athlete_injury_risk)
+            self.update_historical_injury_risk(current_user_stats)
 
         current_user_stats.event_date = self.event_date
         return current_user_stats
 
+    def update_historical_injury_risk(self, current_user_stats, earliest_changed_date=None):
+        # callers that know what changed resume from the checkpoint of an earlier run of the same event date, and
+        # leave one for the next
+        checkpoint = None
+        if earliest_changed_date is not None:
+            checkpoint = self.injury_risk_checkpoint_datastore.get(self.athlete_id)
+        injury_risk_processor = InjuryRiskProcessor(self.event_date, self.last_25_days_symptoms,
+                                                    self.training_sessions, {},
+                                                    current_user_stats, self.athlete_id)
+        injury_risk_processor.process(update_historical_data=True, checkpoint=checkpoint,
+                                      earliest_changed_date=earliest_changed_date,
+                                      create_checkpoint=earliest_changed_date is not None)
+
+        athlete_injury_risk = AthleteInjuryRisk(self.athlete_id)
+        athlete_injury_risk.items = injury_risk_processor.injury_risk_dict
+
+        self.injury_risk_datastore.put(athlete_injury_risk)
+        if injury_risk_processor.checkpoint is not None and injury_risk_processor.checkpoint is not checkpoint:
+            self.injury_risk_checkpoint_datastore.put(injury_risk_processor.checkpoint)
+
     @xray_recorder.capture('logic.StatsProcessing.load_historical_data')
     def load_historical_data(self, read_session_load_dict=False):
         if not self.historic_data_loaded:
@@ -13,9 +13,10 @@ from models.exercise import UnitOfMeasure, WeightMeasure
 from models.functional_movement import FunctionalMovementFactory
 from models.training_volume import StandardErrorRange, Assignment
 
-movement_library = MovementLibraryDatastore().get()
+# compiled once per process; movements and actions are cloned for each exercise
+movement_library = MovementLibraryDatastore().get_compiled()
 cardio_data = get_cardio_data()
-action_library = ActionLibraryDatastore().get()
+action_library = ActionLibraryDatastore().get_compiled()
 bodyweight_coefficients = get_bodyweight_coefficients()
 
 
@@ -61,6 +62,7 @@ class WorkoutProcessor(object):
         volume = 0
         session_RPE = StandardErrorRange()
         heart_rate_processing = HeartRateProcessing(self.user_age)
+        library_exercises = []
         for workout_section in session.workout_program_module.workout_sections:
             workout_section.should_assess_load(cardio_data['no_load_sections'])
             section_hr = []
@@ -81,7 +83,16 @@ class WorkoutProcessor(object):
                     hr_values = sorted([hr.value for hr in section_hr])  # TODO: improve this to use exercise specific values, not inherit all from section
                     top_25_percentile_hr = hr_values[int(len(hr_values) * .75):]
                     workout_exercise.end_of_workout_hr = round(sum(top_25_percentile_hr) / len(top_25_percentile_hr), 0)  # use the average of top 25% ideally this is the end of exercise HR
-                self.add_movement_detail_to_exercise(workout_exercise)
+                if workout_exercise.movement_id in movement_library:
+                    self.initialize_exercise_from_library(workout_exercise)
+                    library_exercises.append(workout_exercise)
+
+        self.predict_exercise_intensities(library_exercises)
+
+        for workout_section in session.workout_program_module.workout_sections:
+            for workout_exercise in workout_section.exercises:
+                if workout_exercise.movement_id in movement_library:
+                    self.add_exercise_details(workout_exercise)
                 if workout_section.assess_load:
                     session.add_tissue_load(workout_exercise.tissue_load)
                     session.add_force_load(workout_exercise.force_load)
@@ -138,48 +149,64 @@ class WorkoutProcessor(object):
 
         return session
 
-    def add_movement_detail_to_exercise(self, exercise):
-        if exercise.movement_id in movement_library:
-            movement_json = movement_library[exercise.movement_id]
-            movement = Movement.json_deserialise(movement_json)
-            exercise.initialize_from_movement(movement)
-
-            for action_id in movement.primary_actions:
-                action_json = action_library.get(action_id)
-                if action_json is not None:
-                    action = ExerciseAction.json_deserialise(action_json)
-                    exercise.primary_actions.append(action)
+    @staticmethod
+    def initialize_exercise_from_library(exercise):
+        movement = movement_library[exercise.movement_id].copy()
+        exercise.initialize_from_movement(movement)
 
-            for action_id in movement.secondary_actions:
-                action_json = action_library.get(action_id)
-                if action_json is not None:
-                    action = ExerciseAction.json_deserialise(action_json)
-                    exercise.secondary_actions.append(action)
+        for action_id in movement.primary_actions:
+            action = action_library.get(action_id)
+            if action is not None:
+                exercise.primary_actions.append(action.copy())
 
-            exercise = self.update_exercise_details(exercise)
+        for action_id in movement.secondary_actions:
+            action = action_library.get(action_id)
+            if action is not None:
+                exercise.secondary_actions.append(action.copy())
 
-            self.add_action_details_from_exercise(exercise, exercise.primary_actions)
-            self.add_action_details_from_exercise(exercise, exercise.secondary_actions)
-            # if exercise.adaptation_type == AdaptationType.strength_endurance_cardiorespiratory:
-            #     exercise.convert_reps_to_duration(cardio_data)
+    def add_movement_detail_to_exercise(self, exercise):
+        if exercise.movement_id in movement_library:
+            self.initialize_exercise_from_library(exercise)
+            self.add_exercise_details(exercise)
+
+    def add_exercise_details(self, exercise):
+        exercise = self.update_exercise_details(exercise)
+
+        self.add_action_details_from_exercise(exercise, exercise.primary_actions)
+        self.add_action_details_from_exercise(exercise, exercise.secondary_actions)
+        # if exercise.adaptation_type == AdaptationType.strength_endurance_cardiorespiratory:
+        #     exercise.convert_reps_to_duration(cardio_data)
+
+    def predict_exercise_intensities(self, exercises):
+        """
+        Runs each model once for all exercises initialized from the library; update_exercise_details then reads the
+        predictions from the predictors' caches instead of predicting one exercise at a time
+        """
+        hr_features = []
+        bodyweight_ratio_features = []
+        for exercise in exercises:
+            if exercise.training_type == TrainingType.strength_cardiorespiratory:
+                if exercise.end_of_workout_hr is not None:
+                    hr_features.append(self.get_hr_rpe_features(exercise))
+            elif exercise.weight_measure != WeightMeasure.rep_max:
+                bodyweight_ratio_features.append(self.get_bodyweight_ratio_features(exercise))
+
+        if len(hr_features) > 0:
+            self.hr_rpe_predictor.predict_rpes(hr_features)
+        if len(bodyweight_ratio_features) > 0:
+            self.bodyweight_ratio_predictor.predict_bodyweight_ratios(bodyweight_ratio_features)
+
+    def get_hr_rpe_features(self, exercise):
+        return self.hr_rpe_predictor.get_features(hr=exercise.end_of_workout_hr,
+                                                  user_age=self.user_age,
+                                                  user_weight=self.user_weight,
+                                                  gender=self.gender,
+                                                  vo2_max=self.vo2_max.observed_value)
 
     def add_movement_detail_to_planned_exercise(self, exercise, assignment_type, movement_option=None):
         exercise.update_movement_id(movement_option)
         if exercise.movement_id in movement_library:
-            movement_json = movement_library[exercise.movement_id]
-            movement = Movement.json_deserialise(movement_json)
-            exercise.initialize_from_movement(movement)
-
-            for action_id in movement.primary_actions:
-                action_json = action_library.get(action_id)
-                if action_json is not None:
-                    action = ExerciseAction.json_deserialise(action_json)
-                    exercise.primary_actions.append(action)
-            for action_id in movement.secondary_actions:
-                action_json = action_library.get(action_id)
-                if action_json is not None:
-                    action = ExerciseAction.json_deserialise(action_json)
-                    exercise.secondary_actions.append(action)
+            self.initialize_exercise_from_library(exercise)
 
             exercise = self.update_planned_exercise_details(exercise, assignment_type)
 
@@ -204,11 +231,7 @@ class WorkoutProcessor(object):
                 exercise.distance = exercise.duration * exercise.speed
             exercise.predicted_rpe = StandardErrorRange()
             if exercise.end_of_workout_hr is not None:
-                exercise.predicted_rpe.observed_value = self.hr_rpe_predictor.predict_rpe(hr=exercise.end_of_workout_hr,
-                                                                                          user_age=self.user_age,
-                                                                                          user_weight=self.user_weight,
-                                                                                          gender=self.gender,
-                                                                                          vo2_max=self.vo2_max.observed_value)
+                exercise.predicted_rpe.observed_value = self.hr_rpe_predictor.predict_rpes([self.get_hr_rpe_features(exercise)])[0]
             else:
                 #exercise.predicted_rpe.observed_value = exercise.shrz or 4
                 self.set_planned_cardio_rpe(exercise)
@@ -744,6 +767,9 @@ class WorkoutProcessor(object):
                 prime_movers['fourth_prime_movers'].update(functional_movement.prime_movers)
 
     def get_one_rep_max_bodyweight_ratio(self, exercise):
+        return self.bodyweight_ratio_predictor.predict_bodyweight_ratios([self.get_bodyweight_ratio_features(exercise)])[0]
+
+    def get_bodyweight_ratio_features(self, exercise):
         # get prime movers from action
         prime_movers = {
             "first_prime_movers": set(),
@@ -768,9 +794,8 @@ class WorkoutProcessor(object):
             equipment = Equipment.bodyweight
         if equipment == Equipment.no_equipment:
             equipment = Equipment.bodyweight
-        bodyweight_ratio = self.bodyweight_ratio_predictor.predict_bodyweight_ratio(self.user_weight, self.gender, prime_movers, equipment)
 
-        return bodyweight_ratio
+        return self.bodyweight_ratio_predictor.get_features(self.user_weight, self.gender, prime_movers, equipment)
 
     def get_rpe_from_weight(self, workout_exercise):
         rpe = StandardErrorRange(observed_value=1)
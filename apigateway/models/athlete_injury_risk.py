@@ -1,6 +1,8 @@
 from fathomapi.utils.xray import xray_recorder
 from models.soreness_base import BodyPartSide
 from models.body_part_injury_risk import BodyPartInjuryRisk, BodyPartHistInjuryRisk
+from models.load_stats import LoadStats
+from utils import format_date, parse_date
 
 
 class AthleteInjuryRisk(object):
@@ -48,3 +50,43 @@ class AthleteHistInjuryRisk(object):
             athlete_hist_injury_risk.items[BodyPartSide.json_deserialise(item['body_part'])] = BodyPartHistInjuryRisk.json_deserialise(item['injury_risk'])
 
         return athlete_hist_injury_risk
+
+
+class InjuryRiskCheckpoint(object):
+    """
+    State of the historical injury risk replay (injury risk dict and load stats) at the end of last_processed_date,
+    so a later replay anchored to the same event date and load context only needs to process the days after it
+    """
+    def __init__(self, user_id, event_date=None, last_processed_date=None, context_hash=None):
+        self.user_id = user_id
+        self.event_date = event_date
+        self.last_processed_date = last_processed_date
+        self.context_hash = context_hash
+        self.items = {}
+        self.load_stats = None
+
+    @xray_recorder.capture('datastore.InjuryRiskCheckpoint.json_serialise')
+    def json_serialise(self):
+        ret = {
+            'user_id': self.user_id,
+            'event_date': format_date(self.event_date),
+            'last_processed_date': format_date(self.last_processed_date),
+            'context_hash': self.context_hash,
+            'items': [{"body_part": key.json_serialise(),
+                       "injury_risk": value.json_serialise()} for key, value in self.items.items()],
+            'load_stats': self.load_stats.json_serialise() if self.load_stats is not None else None
+        }
+        return ret
+
+    @classmethod
+    @xray_recorder.capture('datastore.InjuryRiskCheckpoint.json_deserialise')
+    def json_deserialise(cls, input_dict):
+        checkpoint = cls(input_dict['user_id'],
+                         parse_date(input_dict['event_date']).date() if input_dict.get('event_date') is not None else None,
+                         parse_date(input_dict['last_processed_date']).date() if input_dict.get('last_processed_date') is not None else None,
+                         input_dict.get('context_hash'))
+        for item in input_dict.get('items', []):
+            checkpoint.items[BodyPartSide.json_deserialise(item['body_part'])] = BodyPartInjuryRisk.json_deserialise(item['injury_risk'])
+        checkpoint.load_stats = LoadStats.json_deserialise(input_dict['load_stats']) if input_dict.get('load_stats') is not None else None
+
+        return checkpoint
@@ -6,8 +6,144 @@ from models.training_volume import StandardErrorRange
 from utils import format_date, format_datetime, parse_datetime, parse_date
 
 
+class RareAttribute(object):
+    """
+    BodyPartInjuryRisk attribute that most body parts leave at its default.  Values are kept in the instance's
+    _rare_attributes dict, which is only allocated the first time one of them is set to anything else.
+    """
+    __slots__ = ('name', 'default')
+
+    def __init__(self, default=None):
+        self.name = None
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if instance._rare_attributes is None:
+            return self.default
+        return instance._rare_attributes.get(self.name, self.default)
+
+    def __set__(self, instance, value):
+        if instance._rare_attributes is None:
+            if value is self.default or (type(value) is type(self.default) and value == self.default):
+                return
+            object.__setattr__(instance, '_rare_attributes', {})
+        instance._rare_attributes[self.name] = value
+
+
 class BodyPartInjuryRisk(object):
+    # there is one of these for every body part side in every injury risk dict, so attributes are slots rather than a
+    # __dict__, and the symptom groups few body parts ever see are RareAttributes
+    __slots__ = (
+        '_rare_attributes',
+        'concentric_volume_today', 'isometric_volume_today', 'eccentric_volume_today',
+        'compensating_concentric_volume_today', 'compensating_isometric_volume_today', 'compensating_eccentric_volume_today',
+        'total_compensation_percent', 'eccentric_compensation_percent', 'total_compensation_percent_tier',
+        'eccentric_compensation_percent_tier', 'total_volume_percent_tier', 'eccentric_volume_percent_tier',
+        'last_compensation_date',
+        'ache_count_last_0_10_days', 'ache_count_last_0_20_days', 'last_ache_level', 'last_ache_date',
+        'last_excessive_strain_date', 'last_non_functional_overreaching_date', 'last_functional_overreaching_date',
+        'last_inhibited_date',
+        'last_long_date', 'long_count_last_0_20_days',
+        'last_overactive_short_date', 'last_overactive_long_date', 'last_underactive_short_date', 'last_underactive_long_date',
+        'overactive_short_count_last_0_20_days', 'overactive_long_count_last_0_20_days',
+        'underactive_short_count_last_0_20_days', 'underactive_long_count_last_0_20_days',
+        'sharp_count_last_0_10_days', 'sharp_count_last_0_20_days', 'last_sharp_level', 'last_sharp_date',
+        'last_short_date', 'short_count_last_0_20_days',
+        'tight_count_last_0_20_days', 'last_tight_level', 'last_tight_date',
+        'last_weak_date', 'weak_count_last_0_20_days',
+        'last_muscle_imbalance_date',
+        'overactive_short_vote_count', 'overactive_long_vote_count', 'underactive_short_vote_count',
+        'underactive_long_vote_count', 'weak_vote_count', 'last_vote_updated_date_time', 'limited_mobility_tier',
+        'underactive_weak_tier',
+        'max_not_tracked', 'max_strength_endurance_cardiorespiratory', 'max_strength_endurance_strength', 'max_power_drill',
+        'max_maximal_strength_hypertrophic', 'max_power_explosive_action',
+        'max_not_tracked_date', 'max_strength_endurance_cardiorespiratory_date', 'max_strength_endurance_strength_date',
+        'max_power_drill_date', 'max_maximal_strength_hypertrophic_date', 'max_power_explosive_action_date',
+        # set while processing, not serialised
+        'concentric_intensity_today', 'isometric_intensity_today', 'eccentric_intensity_today',
+        'compensating_concentric_intensity_today', 'compensating_isometric_intensity_today',
+        'compensating_eccentric_intensity_today',
+        'overactive_count_0_20_days', 'underactive_inhibited_count_0_20_days', 'underactive_weak_count_0_20_days',
+        'short_count_0_20_days', 'long_count_0_20_days'
+    )
+
+    # inflammation
+    last_inflammation_date = RareAttribute()
+
+    # knots
+    knots_count_last_0_20_days = RareAttribute(0)
+    last_knots_level = RareAttribute(0)
+    last_knots_date = RareAttribute()
+
+    # muscle spasm
+    last_muscle_spasm_date = RareAttribute()
+    last_muscle_spasm_trigger_date = RareAttribute()
+    last_muscle_spasm_level = RareAttribute(0)
+
+    # adhesions
+    last_adhesions_date = RareAttribute()
+
+    # joints and ligaments
+    last_tendinopathy_date = RareAttribute()
+    last_tendinosis_date = RareAttribute()
+    last_altered_joint_arthokinematics_date = RareAttribute()
+
+    # movement dysfunction
+    last_movement_dysfunction_stress_date = RareAttribute()
+    last_dysfunction_cause_date = RareAttribute()
+
+    # serialised as they are, or as formatted dates; None is left out
+    value_attributes = [
+        'total_compensation_percent_tier', 'eccentric_compensation_percent_tier', 'total_volume_percent_tier',
+        'eccentric_volume_percent_tier',
+        'ache_count_last_0_10_days', 'ache_count_last_0_20_days', 'last_ache_level',
+        'knots_count_last_0_20_days', 'last_knots_level',
+        'last_muscle_spasm_level',
+        'long_count_last_0_20_days',
+        'overactive_short_count_last_0_20_days', 'overactive_long_count_last_0_20_days',
+        'underactive_long_count_last_0_20_days', 'underactive_short_count_last_0_20_days',
+        'sharp_count_last_0_10_days', 'sharp_count_last_0_20_days', 'last_sharp_level',
+        'short_count_last_0_20_days',
+        'tight_count_last_0_20_days', 'last_tight_level',
+        'weak_count_last_0_20_days',
+        'overactive_short_vote_count', 'overactive_long_vote_count', 'underactive_short_vote_count',
+        'underactive_long_vote_count', 'weak_vote_count', 'limited_mobility_tier', 'underactive_weak_tier',
+        'max_not_tracked', 'max_strength_endurance_cardiorespiratory', 'max_strength_endurance_strength', 'max_power_drill',
+        'max_maximal_strength_hypertrophic', 'max_power_explosive_action'
+    ]
+    date_attributes = [
+        'last_compensation_date',
+        'last_ache_date',
+        'last_excessive_strain_date', 'last_non_functional_overreaching_date', 'last_functional_overreaching_date',
+        'last_inflammation_date',
+        'last_knots_date',
+        'last_muscle_spasm_date', 'last_muscle_spasm_trigger_date',
+        'last_adhesions_date',
+        'last_inhibited_date',
+        'last_long_date',
+        'last_overactive_short_date', 'last_underactive_short_date', 'last_overactive_long_date', 'last_underactive_long_date',
+        'last_sharp_date',
+        'last_short_date',
+        'last_tight_date',
+        'last_weak_date',
+        'last_muscle_imbalance_date',
+        'last_tendinopathy_date', 'last_tendinosis_date', 'last_altered_joint_arthokinematics_date',
+        'last_movement_dysfunction_stress_date', 'last_dysfunction_cause_date',
+        'max_not_tracked_date', 'max_strength_endurance_cardiorespiratory_date', 'max_strength_endurance_strength_date',
+        'max_power_drill_date', 'max_maximal_strength_hypertrophic_date', 'max_power_explosive_action_date'
+    ]
+    date_time_attributes = ['last_vote_updated_date_time']
+    date_attribute_set = frozenset(date_attributes)
+    date_time_attribute_set = frozenset(date_time_attributes)
+
     def __init__(self):
+        self._rare_attributes = None
+
         # volume
         self.concentric_volume_today = StandardErrorRange(observed_value=0)
         self.isometric_volume_today = StandardErrorRange(observed_value=0)
@@ -136,7 +272,7 @@ class BodyPartInjuryRisk(object):
         self.max_power_explosive_action_date = None
 
     def json_serialise(self):
-        return {
+        ret = {
                 "concentric_volume_today": self.concentric_volume_today.json_serialise(),
                 "isometric_volume_today": self.isometric_volume_today.json_serialise(),
                 "eccentric_volume_today": self.eccentric_volume_today.json_serialise(),
@@ -147,118 +283,26 @@ class BodyPartInjuryRisk(object):
 
                 "total_compensation_percent": self.total_compensation_percent.json_serialise(),
                 "eccentric_compensation_percent": self.eccentric_compensation_percent.json_serialise(),
-                "total_compensation_percent_tier": self.total_compensation_percent_tier,
-                "eccentric_compensation_percent_tier": self.eccentric_compensation_percent_tier,
-                "total_volume_percent_tier": self.total_volume_percent_tier,
-                "eccentric_volume_percent_tier": self.eccentric_volume_percent_tier,
 
                 #"compensating_causes_volume_today": [c.json_serialise() for c in self.compensating_causes_volume_today],
 
                 #"compensating_source_volume": self.compensating_source_volume.value if self.compensating_source_volume is not None else None,
-                "last_compensation_date": format_date(self.last_compensation_date),
                 #"compensation_count_last_0_20_days": self.compensation_count_last_0_20_days,
-
-                # ache
-                "ache_count_last_0_10_days": self.ache_count_last_0_10_days,
-                # "ache_count_last_0_10_days": self.ache_count_last_0_10_days,
-                "ache_count_last_0_20_days": self.ache_count_last_0_20_days,
-                "last_ache_level": self.last_ache_level,
-                "last_ache_date": format_date(self.last_ache_date),
-
-                # excessive strain
-                "last_excessive_strain_date": format_date(self.last_excessive_strain_date),
-                "last_non_functional_overreaching_date": format_date(self.last_non_functional_overreaching_date),
-                "last_functional_overreaching_date": format_date(self.last_functional_overreaching_date),
-
-
-                # inflammation
-                "last_inflammation_date": format_date(self.last_inflammation_date),
-
-                # knots
-                "knots_count_last_0_20_days": self.knots_count_last_0_20_days,
-                "last_knots_level": self.last_knots_level,
-                "last_knots_date": format_date(self.last_knots_date),
-
-                # muscle spasm
-                "last_muscle_spasm_date": format_date(self.last_muscle_spasm_date),
-                "last_muscle_spasm_trigger_date": format_date(self.last_muscle_spasm_trigger_date),
-                "last_muscle_spasm_level": self.last_muscle_spasm_level,
-
-                # adhesions
-                "last_adhesions_date": format_date(self.last_adhesions_date),
-
-                # inhibited
-                "last_inhibited_date": format_date(self.last_inhibited_date),
-
-                # long
-                "last_long_date": format_date(self.last_long_date),
-                "long_count_last_0_20_days": self.long_count_last_0_20_days,
-
-                # overactive / underactive
-                "last_overactive_short_date": format_date(self.last_overactive_short_date),
-                "last_underactive_short_date": format_date(self.last_underactive_short_date),
-                "last_overactive_long_date": format_date(self.last_overactive_long_date),
-                "last_underactive_long_date": format_date(self.last_underactive_long_date),
-                'overactive_short_count_last_0_20_days': self.overactive_short_count_last_0_20_days,
-                'overactive_long_count_last_0_20_days': self.overactive_long_count_last_0_20_days,
-                'underactive_long_count_last_0_20_days': self.underactive_long_count_last_0_20_days,
-                'underactive_short_count_last_0_20_days': self.underactive_short_count_last_0_20_days,
-
-
-                # sharp
-                "sharp_count_last_0_10_days": self.sharp_count_last_0_10_days,
-                "sharp_count_last_0_20_days": self.sharp_count_last_0_20_days,
-                "last_sharp_level": self.last_sharp_level,
-                "last_sharp_date": format_date(self.last_sharp_date),
-
-                # short
-                "last_short_date": format_date(self.last_short_date),
-                "short_count_last_0_20_days": self.short_count_last_0_20_days,
-
-                # tight
-                "tight_count_last_0_20_days": self.tight_count_last_0_20_days,
-                "last_tight_level": self.last_tight_level,
-                "last_tight_date": format_date(self.last_tight_date),
-
-                # weak
-                "last_weak_date": format_date(self.last_weak_date),
-                'weak_count_last_0_20_days': self.weak_count_last_0_20_days,
-
-                # muscle imbalance
-                "last_muscle_imbalance_date": format_date(self.last_muscle_imbalance_date),
-
-                # joints and ligaments
-                "last_tendinopathy_date": format_date(self.last_tendinopathy_date),
-                "last_tendinosis_date": format_date(self.last_tendinosis_date),
-                "last_altered_joint_arthokinematics_date": format_date(self.last_altered_joint_arthokinematics_date),
-
-                "last_movement_dysfunction_stress_date": format_date(self.last_movement_dysfunction_stress_date),
-                "last_dysfunction_cause_date": format_date(self.last_dysfunction_cause_date),
-
-                "overactive_short_vote_count": self.overactive_short_vote_count,
-                "overactive_long_vote_count": self.overactive_long_vote_count,
-                "underactive_short_vote_count": self.underactive_short_vote_count,
-                "underactive_long_vote_count": self.underactive_long_vote_count,
-                "weak_vote_count": self.weak_vote_count,
-                "last_vote_updated_date_time": format_datetime(self.last_vote_updated_date_time),
-                "limited_mobility_tier": self.limited_mobility_tier,
-                "underactive_weak_tier": self.underactive_weak_tier,
-
-                "max_not_tracked": self.max_not_tracked,
-                "max_strength_endurance_cardiorespiratory": self.max_strength_endurance_cardiorespiratory,
-                "max_strength_endurance_strength": self.max_strength_endurance_strength,
-                "max_power_drill": self.max_power_drill,
-                "max_maximal_strength_hypertrophic": self.max_maximal_strength_hypertrophic,
-                "max_power_explosive_action": self.max_power_explosive_action,
-
-                "max_not_tracked_date": format_date(self.max_not_tracked_date) if self.max_not_tracked_date is not None else None,
-                "max_strength_endurance_cardiorespiratory_date": format_date(self.max_strength_endurance_cardiorespiratory_date) if self.max_strength_endurance_cardiorespiratory_date is not None else None,
-                "max_strength_endurance_strength_date": format_date(self.max_strength_endurance_strength_date) if self.max_strength_endurance_strength_date is not None else None,
-                "max_power_drill_date": format_date(self.max_power_drill_date) if self.max_power_drill_date is not None else None,
-                "max_maximal_strength_hypertrophic_date": format_date(self.max_maximal_strength_hypertrophic_date) if self.max_maximal_strength_hypertrophic_date is not None else None,
-                "max_power_explosive_action_date": format_date(self.max_power_explosive_action_date) if self.max_power_explosive_action_date is not None else None
-
         }
+        for name in self.value_attributes:
+            value = getattr(self, name)
+            if value is not None:
+                ret[name] = value
+        for name in self.date_attributes:
+            value = getattr(self, name)
+            if value is not None:
+                ret[name] = format_date(value)
+        for name in self.date_time_attributes:
+            value = getattr(self, name)
+            if value is not None:
+                ret[name] = format_datetime(value)
+
+        return ret
 
     @classmethod
     def json_deserialise(cls, input_dict):
@@ -288,129 +332,32 @@ class BodyPartInjuryRisk(object):
 
         injury_risk.total_compensation_percent = StandardErrorRange.json_deserialise(input_dict.get('total_compensation_percent')) if input_dict.get('total_compensation_percent') is not None else StandardErrorRange()
         injury_risk.eccentric_compensation_percent = StandardErrorRange.json_deserialise(input_dict.get('eccentric_compensation_percent')) if input_dict.get('eccentric_compensation_percent') is not None else StandardErrorRange()
-        injury_risk.total_compensation_percent_tier = input_dict.get('total_compensation_percent_tier', 0)
-        injury_risk.eccentric_compensation_percent_tier = input_dict.get('eccentric_compensation_percent_tier', 0)
-        injury_risk.total_volume_percent_tier = input_dict.get('total_volume_percent_tier', 0)
-        injury_risk.eccentric_volume_percent_tier = input_dict.get('eccentric_volume_percent_tier', 0)
 
         #injury_risk.compensating_causes_volume_today = [BodyPartSide.json_deserialise(c) for c in
         #                                          input_dict.get('compensating_causes_volume_today', [])]
 
-        injury_risk.last_compensation_date = input_dict.get('last_compensation_date')
-
         #injury_risk.compensating_source_volume = CompensationSource(
         #    input_dict['compensating_source_volume']) if input_dict.get(
         #    "compensating_source_volume") is not None else None
 
         #injury_risk.compensation_count_last_0_20_days = input_dict.get('compensation_count_last_0_20_days', 0)
 
-        # ache
-        injury_risk.ache_count_last_0_10_days = input_dict.get('ache_count_last_0_10_days', 0)
-        injury_risk.ache_count_last_0_20_days = input_dict.get('ache_count_last_0_20_days', 0)
-        injury_risk.last_ache_level = input_dict.get('last_ache_level', 0)
-        injury_risk.last_ache_date = input_dict.get('last_ache_date')
-
-        # excessive strain
-        injury_risk.last_excessive_strain_date = input_dict.get('last_excessive_strain_date')
-        injury_risk.last_non_functional_overreaching_date = input_dict.get('last_non_functional_overreaching_date')
-        injury_risk.last_functional_overreaching_date = input_dict.get('last_functional_overreaching_date')
-
-        # inflammation
-        injury_risk.last_inflammation_date = input_dict.get('last_inflammation_date')
-
-        # knots
-        injury_risk.knots_count_last_0_20_days = input_dict.get('knots_count_last_0_20_days', 0)
-        injury_risk.last_knots_level = input_dict.get('last_knots_level', 0)
-        injury_risk.last_knots_date = input_dict.get('last_knots_date')
-
-        # muscle spasm
-        injury_risk.last_muscle_spasm_date = input_dict.get('last_muscle_spasm_date')
-        injury_risk.last_muscle_spasm_trigger_date = input_dict.get('last_muscle_spasm_trigger_date')
-        injury_risk.last_muscle_spasm_level = input_dict.get('last_muscle_spasm_level', 0)
-
-        # adhesions
-        injury_risk.last_adhesions_date = input_dict.get('last_adhesions_date')
-
-        # inhibited
-        injury_risk.last_inhibited_date = input_dict.get('last_inhibited_date')
-
-        # long
-        injury_risk.last_long_date = input_dict.get('last_long_date')
-        injury_risk.long_count_last_0_20_days = input_dict.get('long_count_last_0_20_days', 0)
-
-        # overactive / underactive
-        injury_risk.last_overactive_short_date = input_dict.get('last_overactive_short_date')
-        injury_risk.last_underactive_short_date = input_dict.get('last_underactive_short_date')
-        injury_risk.last_overactive_long_date = input_dict.get('last_overactive_long_date')
-        injury_risk.last_underactive_long_date = input_dict.get('last_underactive_long_date')
-        injury_risk.overactive_short_count_last_0_20_days = input_dict.get('overactive_short_count_last_0_20_days',0)
-        injury_risk.overactive_long_count_last_0_20_days = input_dict.get('overactive_long_count_last_0_20_days',0)
-        injury_risk.underactive_short_count_last_0_20_days = input_dict.get('underactive_short_count_last_0_20_days', 0)
-        injury_risk.underactive_long_count_last_0_20_days = input_dict.get('underactive_long_count_last_0_20_days', 0)
-
-        # sharp
-        injury_risk.sharp_count_last_0_10_days = input_dict.get('sharp_count_last_0_10_days', 0)
-        injury_risk.sharp_count_last_0_20_days = input_dict.get('sharp_count_last_0_20_days', 0)
-        injury_risk.last_sharp_level = input_dict.get('last_sharp_level', 0)
-        injury_risk.last_sharp_date = input_dict.get('last_sharp_date')
-
-        # short
-        injury_risk.last_short_date = input_dict.get('last_short_date')
-        injury_risk.short_count_last_0_20_days = input_dict.get('short_count_last_0_20_days', 0)
-
-        # tight
-        injury_risk.tight_count_last_0_20_days = input_dict.get('tight_count_last_0_20_days', 0)
-        injury_risk.last_tight_level = input_dict.get('last_tight_level', 0)
-        injury_risk.last_tight_date = input_dict.get('last_tight_date')
-
-        # weak
-        injury_risk.last_weak_date = input_dict.get('last_weak_date')
-        injury_risk.weak_count_last_0_20_days = input_dict.get('weak_count_last_0_20_days', 0)
-
-        # muscle imbalance
-        injury_risk.last_muscle_imbalance_date = input_dict.get('last_muscle_imbalance_date')
-
-        # joints and ligaments
-        injury_risk.last_tendinopathy_date = input_dict.get('last_tendinopathy_date')
-        injury_risk.last_tendinosis_date = input_dict.get('last_tendinosis_date')
-        injury_risk.last_altered_joint_arthokinematics_date = input_dict.get('last_altered_joint_arthokinematics_date')
-
-        # movement dysfunction
-        injury_risk.last_movement_dysfunction_stress_date = input_dict.get('last_movement_dysfunction_stress_date')
-        injury_risk.last_dysfunction_cause_date = input_dict.get('last_dysfunction_cause_date')
-
-        injury_risk.overactive_short_vote_count = input_dict.get('overactive_short_vote_count',0)
-        injury_risk.overactive_long_vote_count = input_dict.get('overactive_long_vote_count',0)
-        injury_risk.underactive_short_vote_count = input_dict.get('underactive_short_vote_count',0)
-        injury_risk.underactive_long_vote_count = input_dict.get('underactive_long_vote_count',0)
-        injury_risk.weak_vote_count = input_dict.get('weak_vote_count', 0)
-        injury_risk.last_vote_updated_date_time = input_dict.get('last_vote_updated_date_time')
-        injury_risk.limited_mobility_tier = input_dict.get('limited_mobility_tier', 0)
-        injury_risk.underactive_weak_tier = input_dict.get('underactive_weak_tier', 0)
-
-        injury_risk.max_not_tracked = input_dict.get("max_not_tracked", 0)
-        injury_risk.max_strength_endurance_cardiorespiratory = input_dict.get("max_strength_endurance_cardiorespiratory", 0)
-        injury_risk.max_strength_endurance_strength = input_dict.get("max_strength_endurance_strength", 0)
-        injury_risk.max_power_drill = input_dict.get("max_power_drill", 0)
-        injury_risk.max_maximal_strength_hypertrophic = input_dict.get("max_maximal_strength_hypertrophic", 0)
-        injury_risk.max_power_explosive_action = input_dict.get("max_power_explosive_action", 0)
-
-        injury_risk.max_not_tracked_date = input_dict.get("max_not_tracked_date")
-        injury_risk.max_strength_endurance_cardiorespiratory_date = input_dict.get("max_strength_endurance_cardiorespiratory_date")
-        injury_risk.max_strength_endurance_strength_date = input_dict.get("max_strength_endurance_strength_date")
-        injury_risk.max_power_drill_date = input_dict.get("max_power_drill_date")
-        injury_risk.max_maximal_strength_hypertrophic_date = input_dict.get("max_maximal_strength_hypertrophic_date")
-        injury_risk.max_power_explosive_action_date = input_dict.get("max_power_explosive_action_date")
+        # missing and None values keep the defaults from __init__; dates are parsed by __setattr__
+        for name in cls.value_attributes + cls.date_attributes + cls.date_time_attributes:
+            value = input_dict.get(name)
+            if value is not None:
+                setattr(injury_risk, name, value)
 
         return injury_risk
 
     def __setattr__(self, name, value):
-        if 'date_time' in name:
-            if value is not None and not isinstance(value, datetime):
-                value = parse_datetime(value)
-        elif 'date' in name:
-            if value is not None and not isinstance(value, date):
-                value = parse_date(value).date()
+        if value is not None:
+            if name in self.date_time_attribute_set:
+                if not isinstance(value, datetime):
+                    value = parse_datetime(value)
+            elif name in self.date_attribute_set:
+                if not isinstance(value, date):
+                    value = parse_date(value).date()
         super().__setattr__(name, value)
 
     def merge(self, body_part_injury_risk):
@@ -731,6 +678,10 @@ class BodyPartInjuryRisk(object):
 
 
 class BodyPartHistInjuryRisk(object):
+    __slots__ = ('concentric_volume_this_week', 'isometric_volume_this_week', 'eccentric_volume_this_week',
+                 'synergist_eccentric_volume_this_week', 'concentric_intensity_this_week', 'isometric_intensity_this_week',
+                 'eccentric_intensity_this_week')
+
     def __init__(self):
         #self.concentric_volume_last_week = 0
         self.concentric_volume_this_week = 0
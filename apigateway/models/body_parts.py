@@ -1,5 +1,7 @@
 import os, json
+import threading
 from random import shuffle
+from types import MappingProxyType
 
 from models.exercise import AssignedExercise
 from models.soreness_base import BodyPartLocation, BodyPartSide
@@ -15,6 +17,57 @@ with open(file_path, 'r') as f:
     print('reading body part mapping json')
     body_part_mapping = json.load(f)
 
+
+class BodyPartTemplate(object):
+    """
+    One body_part_mapping entry compiled for reuse: exercise ids per phase and muscle groups as tuples, plus an
+    AssignedExercise prototype per exercise that get_assigned_exercises copies instead of building it again.
+    """
+    phases = ['inhibit', 'static_lengthen', 'active_lengthen', 'dynamic_lengthen', 'isolated_activate',
+              'static_integrate', 'dynamic_integrate', 'dynamic_integrate_with_speed']
+
+    def __init__(self, body_part_location, part_json, bilateral):
+        self.location = body_part_location
+        self.treatment_priority = part_json['treatment_priority']
+        self.bilateral = bilateral
+        self.exercise_ids = {phase: tuple(str(e) for e in part_json[phase]) for phase in self.phases}
+        self.agonists = tuple(part_json['agonists'])
+        self.synergists = tuple(part_json['synergists'])
+        self.stabilizers = tuple(part_json['stabilizers'])
+        self.antagonists = tuple(part_json['antagonists'])
+        self.assigned_exercises = {e: AssignedExercise(e) for ids in self.exercise_ids.values() for e in ids}
+
+    def get_assigned_exercises(self, exercise_ids):
+        # dict.fromkeys drops repeated ids, as the exercise dictionaries used to
+        return [self.assigned_exercises[e].copy() for e in dict.fromkeys(exercise_ids)]
+
+
+# compiled once per process (and so reused across warm Lambda invocations); see get_body_part_templates
+_body_part_templates = None
+_body_part_templates_lock = threading.Lock()
+
+
+def get_body_part_templates():
+    """
+    Shared, read-only BodyPartTemplate index keyed by body_part_mapping key (the BodyPartLocation value as a string)
+    """
+    global _body_part_templates
+
+    if _body_part_templates is None:
+        with _body_part_templates_lock:
+            if _body_part_templates is None:
+                templates = {}
+                for key, part_json in body_part_mapping.items():
+                    try:
+                        location = BodyPartLocation(int(key))
+                    except ValueError:
+                        continue
+                    templates[key] = BodyPartTemplate(location, part_json, BodyPartFactory().get_bilateral(location))
+                _body_part_templates = MappingProxyType(templates)
+
+    return _body_part_templates
+
+
 class BodyPartFactory(object):
     def __init__(self, mapped_body_parts=None):
         self.mapped_body_parts = mapped_body_parts or {}
@@ -267,53 +320,52 @@ class BodyPartFactory(object):
 
     def get_part_mapping_from_json(self, sample, body_part_location):
         try:
-            part_json = body_part_mapping[str(body_part_location.value)]
+            template = get_body_part_templates()[str(body_part_location.value)]
         except KeyError:
             raise KeyError(f"{body_part_location.name} not present in mapping" )
 
-        part = BodyPart(body_part_location, part_json['treatment_priority'])
-        part.bilateral = self.get_bilateral(part.location)
+        part = BodyPart(body_part_location, template.treatment_priority)
+        part.bilateral = template.bilateral
+        exercise_ids = template.exercise_ids
 
-        if body_part_location in [BodyPartLocation.full_body, BodyPartLocation.upper_body, body_part_location.lower_body]:
+        # sampling happens in the same order as before, so a seeded random gives the same exercises
+        if body_part_location in [BodyPartLocation.full_body, BodyPartLocation.upper_body, BodyPartLocation.lower_body]:
             # these three body parts always sample (either 1 or 4(full_dict)
-            inhibit = {}
-            static_stretch = {}
-            active_stretch = {}
-            dynamic_stretch = self.get_full_exercise_dictionary(part_json['dynamic_lengthen'])  # sample 4
-            isolated_activate = {}
-            static_integrate = self.get_exercise_dictionary(part_json['static_integrate'])  # sample 1
-            dynamic_integrate = self.get_full_exercise_dictionary(part_json['dynamic_integrate'])  # sample 4
-            dynamic_integrate_2 = {}
-            dynamic_integrate_with_speed = {}
+            part.dynamic_stretch_exercises = template.get_assigned_exercises(random.sample(exercise_ids['dynamic_lengthen'], 4))
+            part.static_integrate_exercises = template.get_assigned_exercises(self.sample_exercise_ids(exercise_ids['static_integrate']))
+            part.dynamic_integrate_exercises = template.get_assigned_exercises(random.sample(exercise_ids['dynamic_integrate'], 4))
+
+        elif sample:
+            part.inhibit_exercises = template.get_assigned_exercises(self.sample_exercise_ids(exercise_ids['inhibit']))
+            part.static_stretch_exercises = template.get_assigned_exercises(self.sample_exercise_ids(exercise_ids['static_lengthen']))
+            part.active_stretch_exercises = template.get_assigned_exercises(self.sample_exercise_ids(exercise_ids['active_lengthen']))
+            part.dynamic_stretch_exercises = template.get_assigned_exercises(self.sample_exercise_ids(exercise_ids['dynamic_lengthen']))
+            part.isolated_activate_exercises = template.get_assigned_exercises(self.sample_exercise_ids(exercise_ids['isolated_activate']))
+            part.static_integrate_exercises = template.get_assigned_exercises(self.sample_exercise_ids(exercise_ids['static_integrate']))
+            part.dynamic_integrate_exercises = template.get_assigned_exercises(self.sample_exercise_ids(exercise_ids['dynamic_integrate']))
+            part.dynamic_integrate_2_exercises = template.get_assigned_exercises(self.sample_exercise_ids(exercise_ids['dynamic_integrate'], 2))
+            part.dynamic_integrate_with_speed_exercises = template.get_assigned_exercises(self.sample_exercise_ids(exercise_ids['dynamic_integrate_with_speed']))
 
         else:
-            if sample:
-                inhibit = self.get_exercise_dictionary(part_json['inhibit'])
-                static_stretch = self.get_exercise_dictionary(part_json['static_lengthen'])
-                active_stretch = self.get_exercise_dictionary(part_json['active_lengthen'])
-                dynamic_stretch = self.get_exercise_dictionary(part_json['dynamic_lengthen'])
-                isolated_activate = self.get_exercise_dictionary(part_json['isolated_activate'])
-                static_integrate = self.get_exercise_dictionary(part_json['static_integrate'])
-                dynamic_integrate = self.get_exercise_dictionary(part_json['dynamic_integrate'])
-                dynamic_integrate_2 = self.get_exercise_dictionary(part_json['dynamic_integrate'], sample=2)
-                dynamic_integrate_with_speed = self.get_exercise_dictionary(part_json['dynamic_integrate_with_speed'])
-            else:
-                inhibit = self.get_full_exercise_dictionary(part_json['inhibit'], False)
-                static_stretch = self.get_full_exercise_dictionary(part_json['static_lengthen'], False)
-                active_stretch = self.get_full_exercise_dictionary(part_json['active_lengthen'], False)
-                dynamic_stretch = self.get_full_exercise_dictionary(part_json['dynamic_lengthen'], False)
-                isolated_activate = self.get_full_exercise_dictionary(part_json['isolated_activate'], False)
-                static_integrate = self.get_full_exercise_dictionary(part_json['static_integrate'], False)
-                dynamic_integrate = self.get_full_exercise_dictionary(part_json['dynamic_integrate'], False)
-                dynamic_integrate_2 = self.get_exercise_dictionary(part_json['dynamic_integrate'], False)
-                dynamic_integrate_with_speed = self.get_full_exercise_dictionary(part_json['dynamic_integrate_with_speed'], False)
-
-        part.add_extended_exercise_phases(inhibit, static_stretch, active_stretch, dynamic_stretch, isolated_activate, static_integrate)
-        part.add_dynamic_exercise_phases({}, dynamic_integrate, dynamic_integrate_with_speed, dynamic_integrate_2)  # dynamic_stretch is already added above
-
-        part.add_muscle_groups(part_json['agonists'], part_json['synergists'], part_json['stabilizers'], part_json['antagonists'])
+            part.inhibit_exercises = template.get_assigned_exercises(exercise_ids['inhibit'])
+            part.static_stretch_exercises = template.get_assigned_exercises(exercise_ids['static_lengthen'])
+            part.active_stretch_exercises = template.get_assigned_exercises(exercise_ids['active_lengthen'])
+            part.dynamic_stretch_exercises = template.get_assigned_exercises(exercise_ids['dynamic_lengthen'])
+            part.isolated_activate_exercises = template.get_assigned_exercises(exercise_ids['isolated_activate'])
+            part.static_integrate_exercises = template.get_assigned_exercises(exercise_ids['static_integrate'])
+            part.dynamic_integrate_exercises = template.get_assigned_exercises(exercise_ids['dynamic_integrate'])
+            part.dynamic_integrate_with_speed_exercises = template.get_assigned_exercises(exercise_ids['dynamic_integrate_with_speed'])
+
+        part.add_muscle_groups(list(template.agonists), list(template.synergists), list(template.stabilizers), list(template.antagonists))
         return part
 
+    @staticmethod
+    def sample_exercise_ids(exercise_ids, sample=1):
+        # same draw as get_exercise_dictionary
+        if sample < len(exercise_ids):
+            return random.sample(exercise_ids, sample)
+        return exercise_ids
+
     def get_general(self, sample=True):
 
         #############
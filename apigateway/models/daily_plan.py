@@ -7,8 +7,53 @@ from models.soreness import Soreness
 from models.functional_movement_modalities import Modality, ModalityTypeDisplay, ModalityType, IceSessionModalities, HeatSession, ColdWaterImmersionModality
 
 
+class LazyDocumentField(object):
+    """
+    DailyPlan attribute deserialised from the stored document the first time it is read.  The value is then kept
+    in the instance __dict__, which takes precedence over this (non-data) descriptor, so later reads and writes are
+    plain attribute access.
+    """
+    def __init__(self, deserialise, default=None):
+        self.deserialise = deserialise
+        self.default = default
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        stored_value = instance.__dict__['_document'].get(self.name)
+        if stored_value is None:
+            value = self.default() if self.default is not None else None
+        else:
+            value = self.deserialise(stored_value)
+        instance.__dict__[self.name] = value
+        return value
+
+
+def _deserialise_list(deserialise):
+    return lambda values: [deserialise(v) for v in values]
+
+
 class DailyPlan(Serialisable):
-    
+    # fields read by stats processing
+    stats_processing_fields = ['training_sessions', 'daily_readiness_survey', 'symptoms']
+
+    training_sessions = LazyDocumentField(_deserialise_list(Session.json_deserialise), list)
+    heat = LazyDocumentField(HeatSession.json_deserialise)
+    completed_heat = LazyDocumentField(_deserialise_list(HeatSession.json_deserialise), list)
+    ice = LazyDocumentField(IceSessionModalities.json_deserialise)
+    completed_ice = LazyDocumentField(_deserialise_list(IceSessionModalities.json_deserialise), list)
+    cold_water_immersion = LazyDocumentField(ColdWaterImmersionModality.json_deserialise)
+    completed_cold_water_immersion = LazyDocumentField(_deserialise_list(ColdWaterImmersionModality.json_deserialise), list)
+    trends = LazyDocumentField(AthleteTrends.json_deserialise)
+    symptoms = LazyDocumentField(_deserialise_list(Soreness.json_deserialise), list)
+    modalities = LazyDocumentField(_deserialise_list(Modality.json_deserialise), list)
+    completed_modalities = LazyDocumentField(_deserialise_list(Modality.json_deserialise), list)
+    modalities_available_on_demand = LazyDocumentField(_deserialise_list(ModalityTypeDisplay.json_deserialise), list)
+
     def __init__(self, event_date):
         self.user_id = ""
         self.event_date = event_date
@@ -91,28 +136,23 @@ class DailyPlan(Serialisable):
         return ret
 
     @classmethod
-    def json_deserialise(cls, input_dict, stats_processing):
+    def json_deserialise(cls, input_dict, stats_processing=False):
+        """
+        Sessions, modalities, trends and symptoms are only deserialised when first read, so a plan loaded for one of
+        them doesn't build the others.  stats_processing is kept for callers; laziness makes it unnecessary.
+        """
         daily_plan = cls(event_date=input_dict['date'])
         daily_plan.user_id = input_dict.get('user_id', None)
-        daily_plan.training_sessions = [Session.json_deserialise(s) for s in input_dict.get('training_sessions', [])]
-        if not stats_processing:
-            daily_plan.heat = HeatSession.json_deserialise(input_dict['heat']) if input_dict.get('heat', None) is not None else None
-            daily_plan.completed_heat = [HeatSession.json_deserialise(heat) for heat in input_dict.get('completed_heat', [])]
-            daily_plan.ice = IceSessionModalities.json_deserialise(input_dict['ice']) if input_dict.get('ice', None) is not None else None
-            daily_plan.completed_ice = [IceSessionModalities.json_deserialise(ice) for ice in input_dict.get('completed_ice', [])]
-            daily_plan.cold_water_immersion = ColdWaterImmersionModality.json_deserialise(input_dict['cold_water_immersion']) if input_dict.get('cold_water_immersion', None) is not None else None
-            daily_plan.completed_cold_water_immersion = [ColdWaterImmersionModality.json_deserialise(cwi) for cwi in input_dict.get('completed_cold_water_immersion', [])]
-            daily_plan.trends = AthleteTrends.json_deserialise(input_dict['trends']) if input_dict.get('trends', None) is not None else None
-            daily_plan.modalities = [Modality.json_deserialise(m) for m in input_dict.get('modalities', [])]
-            daily_plan.completed_modalities = [Modality.json_deserialise(m) for m in input_dict.get('completed_modalities', [])]
-            daily_plan.modalities_available_on_demand = [ModalityTypeDisplay.json_deserialise(md) for md in input_dict.get('modalities_available_on_demand', [])]
+        daily_plan._document = input_dict
+        for name, attribute in vars(cls).items():
+            if isinstance(attribute, LazyDocumentField):
+                del daily_plan.__dict__[name]
         daily_plan.last_updated = input_dict.get('last_updated', None)
         daily_plan.pre_active_rest_completed = input_dict.get('pre_active_rest_completed', False)
         daily_plan.post_active_rest_completed = input_dict.get('post_active_rest_completed', False)
         daily_plan.last_sensor_sync = input_dict.get('last_sensor_sync', None)
         daily_plan.sessions_planned = input_dict.get('sessions_planned', True)
         daily_plan.train_later = input_dict.get('train_later', True)
-        daily_plan.symptoms = [Soreness.json_deserialise(soreness) for soreness in input_dict.get('symptoms', [])]
 
         return daily_plan
 
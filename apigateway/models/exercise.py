@@ -113,6 +113,16 @@ class Exercise(Serialisable):
             value = UnitOfMeasure[value]
         super().__setattr__(name, value)
 
+    def copy(self):
+        """
+        Copies attribute values without running __init__ or __setattr__ again.  List attributes are new lists.
+        """
+        exercise = object.__new__(type(self))
+        exercise.__dict__.update(self.__dict__)
+        exercise.__dict__['progressions'] = list(self.progressions)
+        exercise.__dict__['equipment_required'] = list(self.equipment_required)
+        return exercise
+
     def json_serialise(self):
         ret = {'library_id': self.id,
                'name': self.name,
@@ -224,6 +234,18 @@ class AssignedExercise(Serialisable):
             value = UnitOfMeasure[value]
         super().__setattr__(name, value)
 
+    def copy(self):
+        """
+        Copies attribute values without running __init__ or __setattr__ again.  List attributes are new lists, but
+        the dosages in them are shared.
+        """
+        assigned_exercise = object.__new__(type(self))
+        assigned_exercise.__dict__.update(self.__dict__)
+        assigned_exercise.__dict__['exercise'] = self.exercise.copy()
+        assigned_exercise.__dict__['equipment_required'] = list(self.equipment_required)
+        assigned_exercise.__dict__['dosages'] = list(self.dosages)
+        return assigned_exercise
+
     @classmethod
     def json_deserialise(cls, input_dict):
         assigned_exercise = cls(input_dict.get("library_id", None))
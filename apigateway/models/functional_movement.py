@@ -1,5 +1,8 @@
 from enum import Enum
 from collections import namedtuple
+from collections.abc import Mapping
+from types import MappingProxyType
+import threading
 
 from models.compensation_source import CompensationSource
 from models.soreness_base import BodyPartSide
@@ -121,6 +124,9 @@ class BodyPartFunction(Enum):
 
 
 class FunctionalMovement(object):
+    list_attributes = ['prime_movers', 'antagonists', 'synergists', 'stabilizers', 'fixators',
+                       'parts_receiving_compensation', 'planes']
+
     def __init__(self, functional_movement_type, priority=0):
         self.functional_movement_type = functional_movement_type
         self.priority = priority
@@ -132,6 +138,27 @@ class FunctionalMovement(object):
         self.parts_receiving_compensation = []
         self.planes = []
 
+    def __setattr__(self, name, value):
+        if self.__dict__.get('frozen', False):
+            raise AttributeError("FunctionalMovement is frozen; use copy() to get an editable movement")
+        object.__setattr__(self, name, value)
+
+    def freeze(self):
+
+        for attribute in self.list_attributes:
+            setattr(self, attribute, tuple(getattr(self, attribute)))
+        self.frozen = True
+
+        return self
+
+    def copy(self):
+
+        functional_movement = FunctionalMovement(self.functional_movement_type, self.priority)
+        for attribute in self.list_attributes:
+            setattr(functional_movement, attribute, list(getattr(self, attribute)))
+
+        return functional_movement
+
 
 class BodyPartFunctionalMovement(Serialisable):
     def __init__(self, body_part_side):
@@ -386,7 +413,8 @@ class FunctionalMovementActionMapping(object):
             # functional_movement.parts_receiving_compensation = self.convert_enums_to_body_part_side_list(
             #     functional_movement.parts_receiving_compensation)
 
-            functional_movement = self.functional_movement_dict[functional_movement_type.value]
+            # the dictionary entries are shared, so take a copy before setting this action's priority
+            functional_movement = self.functional_movement_dict[functional_movement_type.value].copy()
 
             functional_movement.priority = target_joint_action.priority
 
@@ -1130,9 +1158,67 @@ class ActivityFunctionalMovementFactory(object):
         return mapping
 
 
+class CopyOnWriteFunctionalMovementDictionary(Mapping):
+    """
+    Editable view over the shared functional movement dictionary.  Reads fall through to the shared (frozen)
+    movements; get_mutable copies a movement into this view the first time it is edited.
+    """
+    def __init__(self, shared_dictionary):
+        self.shared_dictionary = shared_dictionary
+        self.local_dictionary = {}
+
+    def __getitem__(self, key):
+        if key in self.local_dictionary:
+            return self.local_dictionary[key]
+        return self.shared_dictionary[key]
+
+    def __setitem__(self, key, value):
+        self.local_dictionary[key] = value
+
+    def __iter__(self):
+        for key in self.shared_dictionary:
+            yield key
+        for key in self.local_dictionary:
+            if key not in self.shared_dictionary:
+                yield key
+
+    def __len__(self):
+        return len(self.shared_dictionary) + len([k for k in self.local_dictionary if k not in self.shared_dictionary])
+
+    def get_mutable(self, key):
+        if key not in self.local_dictionary:
+            self.local_dictionary[key] = self.shared_dictionary[key].copy()
+        return self.local_dictionary[key]
+
+
+# built once per process (and so reused across warm Lambda invocations); see get_functional_movement_dictionary
+_functional_movement_dictionary = None
+_functional_movement_dictionary_lock = threading.Lock()
+
+
 class FunctionalMovementFactory(object):
 
     def get_functional_movement_dictionary(self):
+        """
+        Shared, read-only functional movement dictionary keyed by FunctionalMovementType value.  The movements in it
+        are frozen; use get_mutable_functional_movement_dictionary (or FunctionalMovement.copy) to change them.
+        """
+        global _functional_movement_dictionary
+
+        if _functional_movement_dictionary is None:
+            with _functional_movement_dictionary_lock:
+                if _functional_movement_dictionary is None:
+                    dictionary = self.build_functional_movement_dictionary()
+                    _functional_movement_dictionary = MappingProxyType({key: functional_movement.freeze()
+                                                                        for key, functional_movement in dictionary.items()})
+
+        return _functional_movement_dictionary
+
+    def get_mutable_functional_movement_dictionary(self):
+
+        return CopyOnWriteFunctionalMovementDictionary(self.get_functional_movement_dictionary())
+
+    def build_functional_movement_dictionary(self):
 
         dict = {}
 
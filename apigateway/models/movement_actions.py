@@ -218,6 +218,21 @@ class ExerciseAction(object):
             ret.update(additional_params)
         return ret
 
+    def copy(self):
+        """
+        Clone of a library action for one exercise, without deserialising it again.  Lists and load ranges are
+        copied, so the clone's per-exercise fields can be changed; joint actions and enums are shared.
+        """
+        action = object.__new__(type(self))
+        attributes = action.__dict__
+        for name, value in self.__dict__.items():
+            if isinstance(value, list):
+                value = list(value)
+            elif isinstance(value, StandardErrorRange):
+                value = value.plagiarize()
+            attributes[name] = value
+        return action
+
     @classmethod
     def json_deserialise(cls, input_dict):
         action = cls(input_dict.get('id'), input_dict.get('name'))
@@ -700,6 +715,17 @@ class Movement(Serialisable):
         }
         return ret
 
+    def copy(self):
+        """
+        Clone of a library movement, without deserialising it again.  Lists are copied.
+        """
+        movement = object.__new__(type(self))
+        movement.__dict__.update(self.__dict__)
+        movement.primary_actions = list(self.primary_actions)
+        movement.secondary_actions = list(self.secondary_actions)
+        movement.external_weight_implement = list(self.external_weight_implement)
+        return movement
+
     @classmethod
     def json_deserialise(cls, input_dict):
         movement = cls(input_dict.get('id'), input_dict.get('name'))
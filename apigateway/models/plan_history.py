@@ -0,0 +1,81 @@
+from bisect import bisect_left
+
+
+class PlanHistory(object):
+    """
+    Daily plans sorted once by event date, so that any date window is two bisects into the sorted dates.
+
+    Session attributes are read into per-plan columns the first time a window asks for them: column[i] holds the
+    non-None values (or products of two attributes) of plan i's training sessions, in session order, which is what
+    TrainingVolumeProcessing sums per plan.
+    """
+    def __init__(self, plans):
+        event_date_times = [p.get_event_datetime() for p in plans]
+        order = sorted(range(len(plans)), key=event_date_times.__getitem__)
+        self.plans = [plans[i] for i in order]
+        self.event_date_times = [event_date_times[i] for i in order]
+        self._columns = {}
+
+    def get_window(self, start_date_time=None, end_date_time=None):
+        """
+        Plans with start_date_time <= event date < end_date_time; either end may be None for an open window
+        """
+        start = 0 if start_date_time is None else bisect_left(self.event_date_times, start_date_time)
+        end = len(self.plans) if end_date_time is None else bisect_left(self.event_date_times, end_date_time)
+        return PlanWindow(self, start, max(start, end))
+
+    def get_column(self, attribute_name):
+        column = self._columns.get(attribute_name)
+        if column is None:
+            column = []
+            for plan in self.plans:
+                values = []
+                for session in plan.training_sessions:
+                    value = getattr(session, attribute_name, None)
+                    if value is not None:
+                        values.append(value)
+                column.append(values)
+            self._columns[attribute_name] = column
+        return column
+
+    def get_product_column(self, attribute_1_name, attribute_2_name):
+        key = (attribute_1_name, attribute_2_name)
+        column = self._columns.get(key)
+        if column is None:
+            column = []
+            for plan in self.plans:
+                values = []
+                for session in plan.training_sessions:
+                    value_1 = getattr(session, attribute_1_name)
+                    value_2 = getattr(session, attribute_2_name)
+                    if value_1 is not None and value_2 is not None:
+                        values.append(value_1 * value_2)
+                column.append(values)
+            self._columns[key] = column
+        return column
+
+
+class PlanWindow(list):
+    """
+    Slice of a PlanHistory.  Behaves as the list of its plans, and also knows its position in the history so sums can
+    be read from the history's columns.
+    """
+    def __init__(self, history, start, end):
+        super().__init__(history.plans[start:end])
+        self.history = history
+        self.start = start
+        self.end = end
+
+    def get_event_date_times(self):
+        return self.history.event_date_times[self.start:self.end]
+
+    def get_window(self, start_date_time=None, end_date_time=None):
+        window = self.history.get_window(start_date_time, end_date_time)
+        start = min(max(window.start, self.start), self.end)
+        return PlanWindow(self.history, start, max(start, min(window.end, self.end)))
+
+    def get_column(self, attribute_name):
+        return self.history.get_column(attribute_name)[self.start:self.end]
+
+    def get_product_column(self, attribute_1_name, attribute_2_name):
+        return self.history.get_product_column(attribute_1_name, attribute_2_name)[self.start:self.end]
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+class SorenessTimeline(object):
+    """
+    Soreness reports sorted once, newest first, and grouped by (body part location, side, is_pain).
+
+    Groups are kept in the order they're first reported in the list they came from.  Each group also has an array of
+    its reports' dates as day ordinals, so the day counters and streaks are array operations on the group rather
+    than rescans of every report.
+    """
+    def __init__(self, soreness_list, event_date=None):
+        self.event_date = event_date
+        self._reports = {}
+        for s in soreness_list:
+            self._reports.setdefault(self.get_key(s), [])
+        for s in sorted(soreness_list, key=lambda x: x.reported_date_time, reverse=True):
+            self._reports[self.get_key(s)].append(s)
+        self._day_ordinals = {}
+
+    @staticmethod
+    def get_key(soreness):
+        return soreness.body_part.location, soreness.side, soreness.pain
+
+    def keys(self):
+        return list(self._reports.keys())
+
+    def get_reports(self, key):
+        """
+        The group's reports, newest first.  Reports on the same date and time stay in list order.
+        """
+        return list(self._reports.get(key, []))
+
+    def get_day_ordinals(self, key):
+        day_ordinals = self._day_ordinals.get(key)
+        if day_ordinals is None:
+            day_ordinals = np.array([s.reported_date_time.toordinal() for s in self._reports.get(key, [])], dtype=np.int64)
+            self._day_ordinals[key] = day_ordinals
+        return day_ordinals
+
+    def get_days_ago(self, key):
+        """
+        Days between each of the group's reports and event_date, smallest first
+        """
+        return self.event_date.toordinal() - self.get_day_ordinals(key)
+
+    @staticmethod
+    def get_day_counts(days_ago):
+        """
+        Reports in the last 10 days, the last 14 days and between 8 and 17 days ago (exclusive)
+        """
+        return (int(np.count_nonzero(days_ago < 10)), int(np.count_nonzero(days_ago < 14)),
+                int(np.count_nonzero((days_ago > 8) & (days_ago < 17))))
+
+    @staticmethod
+    def get_leading_gaps(day_ordinals, max_days_skipped):
+        """
+        How many reports in a row, from the newest back, follow the one before within max_days_skipped days
+        """
+        days_skipped = day_ordinals[:-1] - day_ordinals[1:]
+        return int(np.count_nonzero(np.logical_and.accumulate(days_skipped <= max_days_skipped)))
@@ -1,6 +1,7 @@
 from enum import Enum, IntEnum
 from serialisable import Serialisable
 from statistics import mean, stdev
+import numpy as np
 
 
 '''deprecated for now
@@ -94,6 +95,9 @@ class IndicatorLevel(IntEnum):
 
 
 class StandardErrorRange(Serialisable):
+    # created and added up for every body part on every day processed; slots keep that cheap
+    __slots__ = ('lower_bound', 'upper_bound', 'observed_value', 'insufficient_data')
+
     def __init__(self, lower_bound=None, upper_bound=None, observed_value=None):
         self.lower_bound = lower_bound
         self.upper_bound = upper_bound
@@ -427,6 +431,129 @@ class StandardErrorRange(Serialisable):
         if standard_error_range is not None:
             self.insufficient_data = min(self.insufficient_data, standard_error_range.insufficient_data)
 
+
+class StandardErrorRangeArray(object):
+    """
+    StandardErrorRanges held as an array of shape (..., 3): lower_bound, observed_value and upper_bound along the last
+    axis, with NaN standing in for None.  Arithmetic follows the StandardErrorRange method of the same name, applied to
+    every range at once.
+    """
+    lower = 0
+    observed = 1
+    upper = 2
+
+    def __init__(self, values, insufficient_data=None):
+        self.values = values
+        if insufficient_data is None:
+            insufficient_data = np.zeros(values.shape[:-1], dtype=bool)
+        self.insufficient_data = insufficient_data
+
+    @classmethod
+    def empty(cls, shape):
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        return cls(np.full(shape + (3,), np.nan))
+
+    @classmethod
+    def zeros(cls, shape):
+        """
+        copies of StandardErrorRange(observed_value=0)
+        """
+        ranges = cls.empty(shape)
+        ranges.values[..., cls.observed] = 0
+        return ranges
+
+    @classmethod
+    def from_ranges(cls, standard_error_ranges):
+        # numpy reads None as NaN in a float array
+        values = np.array([(r.lower_bound, r.observed_value, r.upper_bound) for r in standard_error_ranges], dtype=float)
+        insufficient_data = np.fromiter((r.insufficient_data for r in standard_error_ranges), dtype=bool,
+                                        count=len(standard_error_ranges))
+        return cls(values.reshape(len(standard_error_ranges), 3), insufficient_data)
+
+    def reshape(self, *shape):
+        return StandardErrorRangeArray(self.values.reshape(shape + (3,)), self.insufficient_data.reshape(shape))
+
+    def to_ranges(self):
+        """
+        StandardErrorRanges in row-major order
+        """
+        ranges = []
+        for (lower_bound, observed_value, upper_bound), insufficient_data in zip(self.values.reshape(-1, 3).tolist(),
+                                                                                self.insufficient_data.ravel().tolist()):
+            standard_error_range = StandardErrorRange(lower_bound=None if lower_bound != lower_bound else lower_bound,
+                                                      upper_bound=None if upper_bound != upper_bound else upper_bound,
+                                                      observed_value=None if observed_value != observed_value else observed_value)
+            standard_error_range.insufficient_data = insufficient_data
+            ranges.append(standard_error_range)
+        return ranges
+
+    def __len__(self):
+        return len(self.values)
+
+    def column(self, column):
+        return StandardErrorRangeArray(self.values[:, column].copy(), self.insufficient_data[:, column].copy())
+
+    def add(self, standard_error_ranges, rows=None):
+        """
+        Adds standard_error_ranges range by range, or to the given rows of this array.  As with StandardErrorRange.add, a
+        missing bound on the range being added is taken from its observed value, and None leaves the total unchanged.
+        """
+        values = standard_error_ranges.values.copy()
+        observed_values = values[..., self.observed]
+        for bound in [self.lower, self.upper]:
+            bound_values = values[..., bound]
+            missing = np.isnan(bound_values)
+            bound_values[missing] = observed_values[missing]
+
+        rows = slice(None) if rows is None else rows
+        totals = self.values[rows]
+        self.values[rows] = np.where(np.isnan(values), totals, np.where(np.isnan(totals), values, totals + values))
+        self.insufficient_data[rows] = self.insufficient_data[rows] & standard_error_ranges.insufficient_data
+
+    def multiply(self, factor):
+        self.values *= factor
+
+    def divide(self, factor):
+        # a zero factor leaves None rather than inf, which can't be stored
+        if factor == 0:
+            self.values = np.full(self.values.shape, np.nan)
+        else:
+            self.values /= factor
+
+    def divide_range(self, standard_error_ranges):
+        # every bound over every positive bound of the divisor, as StandardErrorRange.divide_range lists them
+        divisors = np.where(standard_error_ranges.values > 0, standard_error_ranges.values, np.nan)
+        quotients = self.values[..., :, None] / divisors[..., None, :]
+        quotients = quotients.reshape(quotients.shape[:-2] + (9,))
+        present = ~np.isnan(quotients)
+        count = present.sum(axis=-1)
+
+        # summed in list order so the mean rounds the same way
+        total = np.zeros(count.shape)
+        for i in range(9):
+            total += np.where(present[..., i], quotients[..., i], 0)
+        observed_values = self.values[..., self.observed]
+        divisor_observed_values = standard_error_ranges.values[..., self.observed]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            observed_values = np.where(np.isnan(observed_values) | np.isnan(divisor_observed_values),
+                                       total / np.maximum(count, 1), observed_values / divisor_observed_values)
+        # over a zero observed value the observed quotient is None rather than inf, which can't be stored
+        observed_values = np.where(divisor_observed_values == 0, np.nan, observed_values)
+
+        values = np.stack([np.where(present, quotients, np.inf).min(axis=-1), observed_values,
+                           np.where(present, quotients, -np.inf).max(axis=-1)], axis=-1)
+        self.values = np.where((count > 0)[..., None], values, self.values)
+
+    def max(self, standard_error_ranges):
+        # fmax ignores NaN, as max ignores None
+        self.values = np.fmax(self.values, standard_error_ranges.values)
+        self.insufficient_data &= standard_error_ranges.insufficient_data
+
+    def min(self, standard_error_ranges):
+        self.values = np.fmin(self.values, standard_error_ranges.values)
+        self.insufficient_data &= standard_error_ranges.insufficient_data
+
+
 class StandardErrorRangeMetric(StandardErrorRange):
     def __init__(self, lower_bound=None, upper_bound=None, observed_value=None):
         StandardErrorRange.__init__(self, lower_bound, upper_bound, observed_value)
@@ -1,5 +1,5 @@
 import boto3
-import io
+import tempfile
 
 from logic.performance_data_parser import PerformanceDataParser
 # from routes.environments import consolidated_dosage
@@ -8,6 +8,8 @@ from utils import parse_datetime
 
 # consolidated = consolidated_dosage()
 
+SPOOLED_FILE_MAX_BYTES = 8 * 1024 * 1024
+
 
 def lambda_handler(event, _):
     print(f"Starting unzipping for file {event['Records'][0]['s3']['object']['key']}")
@@ -25,15 +27,14 @@ def lambda_handler(event, _):
         s3_resource = boto3.resource('s3')
         s3_object = s3_resource.Object(s3_bucket, s3_key)
 
-        fileobj = s3_object.get()
-        print('Got Fileobj')
-        body = fileobj["Body"].read()
-        print('Read Content')
-        content = io.BytesIO(body)
-        print('Converted Content')
+        # zipfile needs to seek, so stream the object into a file that only spills to disk if it's large
+        with tempfile.SpooledTemporaryFile(max_size=SPOOLED_FILE_MAX_BYTES) as content:
+            s3_object.download_fileobj(content)
+            print('Got Fileobj')
+            content.seek(0)
 
-        data_parser = PerformanceDataParser()
-        data_parser.parse_fileobj(content, program_id)
+            data_parser = PerformanceDataParser()
+            data_parser.parse_fileobj(content, program_id)
         workout_data = data_parser.get_completed_workout(user_id)
         workout_data['session_id'] = session_id
 
@@ -61,9 +61,6 @@ def handle_exercise_modalities_start(user_id=None):
     if not _check_plan_exists(user_id, plan_event_day):
         raise NoSuchEntityException('Plan not found for the user')
 
-    plan = daily_plan_datastore.get(user_id=user_id,
-                                    start_date=plan_event_day,
-                                    end_date=plan_event_day)[0]
     # plans_service = Service('plans', Config.get('API_VERSION'))
     # body = {"event_date": recovery_start_date}
     # if recovery_type == 'pre_active_rest':
@@ -83,12 +80,10 @@ def handle_exercise_modalities_start(user_id=None):
     #                                         body=body)
     #
     # elif recovery_type in ['warm_up', 'cool_down', 'functional_strength']:
-    modalities = [m for m in plan.modalities if m.type.value == recovery_type and not m.completed]
-    if len(modalities) > 0:
-        modality = modalities[0]
-        modality.start_date_time = recovery_start_date
-
-    daily_plan_datastore.put(plan)
+    # starts the first of the plan's modalities of this type that isn't completed
+    daily_plan_datastore.update(user_id, plan_event_day,
+                                set_fields={'modalities.$.start_date_time': recovery_start_date},
+                                conditions={'modalities': {'$elemMatch': {'type': recovery_type, 'completed': {'$ne': True}}}})
 
     return {'message': 'success'}, 200
 
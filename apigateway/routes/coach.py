@@ -4,7 +4,7 @@ from fathomapi.utils.xray import xray_recorder
 from fathomapi.utils.exceptions import NoSuchEntityException, ForbiddenException
 from flask import Blueprint
 from datastores.datastore_collection import DatastoreCollection
-from models.dashboard import TeamDashboardData, AthleteDashboardData
+from logic.dashboard_processing import DashboardProcessor
 from utils import format_date
 import datetime
 import os
@@ -28,33 +28,17 @@ def get_dashboard_data(coach_id):
         minute_offset = _get_offset(tz)
         current_time = datetime.datetime.now() + datetime.timedelta(minutes=minute_offset)
 
-        athlete_stats_datastore = DatastoreCollection().athlete_stats_datastore
-        daily_plan_datastore = DatastoreCollection().daily_plan_datastore
-        teams = []
-        for team_id in team_ids:
+        users_service = Service('users', USERS_API_VERSION)
+        with DashboardProcessor(coach_id, team_ids, format_date(current_time), users_service, DatastoreCollection()) as processor:
             try:
-                team_name, user_ids, users = _get_team_info(coach_id, team_id)
+                team_info = processor.get_team_info()
             except ForbiddenException as e:
                 raise e
             except Exception:
                 return {'message': 'Error Getting users for the team'}, 500
             else:
-                team = TeamDashboardData(team_name)
-                daily_plan_list = daily_plan_datastore.get(user_ids,
-                                                           start_date=format_date(current_time),
-                                                           end_date=format_date(current_time))
-                team.get_compliance_data(user_ids, users, daily_plan_list)
-                athlete_stats_list = athlete_stats_datastore.get(user_ids)
-
-                for athlete_stats in athlete_stats_list:
-                    user_id = athlete_stats.athlete_id
-                    user_dict = users[user_id]
-                    athlete = AthleteDashboardData(user_dict['user_id'], user_dict['first_name'], user_dict['last_name'])
-                    athlete.aggregate(athlete_stats.metrics)
-                    team.insert_user(athlete)
-                    team.athletes.append(athlete)
-
-                teams.append(team.json_serialise())
+                teams = processor.get_dashboard_data(team_info)
+        print(f'dashboard for {len(team_ids)} teams: {processor.stage_seconds}')
         return {'teams': teams}, 200
 
 
@@ -66,20 +50,6 @@ def _get_teams(user_id):
     return team_ids, response['user']['timezone']
 
 
-def _get_team_info(user_id, account_id):
-    response = Service('users', USERS_API_VERSION).call_apigateway_sync('GET', f"account/{account_id}/users")
-    user_ids = response['account']['users']
-    if user_id in user_ids:
-        raise ForbiddenException("Must be a coach to view the dashboard")
-    team_name = response['account']['name']
-    users = {}
-    for user in response['users']:
-        users[user['id']] = {'user_id': user['id'],
-                             'first_name': user['personal_data']['first_name'],
-                             'last_name': user['personal_data']['last_name']}
-    return team_name, user_ids, users
-
-
 def _get_offset(tz):
     if tz is None:
         tz = "-05:00"
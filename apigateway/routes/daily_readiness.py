@@ -31,6 +31,17 @@ sleep_history_datastore = datastore_collection.sleep_history_datastore
 app = Blueprint('daily_readiness', __name__)
 
 
+@app.before_request
+def start_request_cache():
+    # survey processing, stats and plan creation read the same plans, sessions, stats and injury risk repeatedly
+    datastore_collection.enable_request_cache()
+
+
+@app.teardown_request
+def end_request_cache(exception):
+    datastore_collection.end_request_cache()
+
+
 @app.route('/<uuid:user_id>/', methods=['POST'])
 @require.authenticated.self
 @require.body({'date_time': str, "soreness": list})
@@ -153,7 +164,8 @@ def handle_daily_readiness_create(user_id):
                        stats_processor=survey_processor.stats_processor,
                        datastore_collection=datastore_collection,
                        visualizations=visualizations,
-                       hist_update=hist_update)
+                       hist_update=hist_update,
+                       earliest_changed_date=survey_processor.get_earliest_changed_date())
     if is_fathom_environment():
         body = {"timezone": timezone,
                 "plans_api_version": Config.get('API_VERSION')}
@@ -20,21 +20,13 @@ def handle_insights_read(user_id):
     #user_id = principal_id
     event_date = parse_datetime(request.json['event_date'])
     plan_event_day = format_date(event_date)
-    plan = DatastoreCollection().daily_plan_datastore.get(user_id, start_date=plan_event_day, end_date=plan_event_day)[0]
-    athlete_stats = DatastoreCollection().athlete_stats_datastore.get(user_id)
-    exposed_triggers = set(athlete_stats.exposed_triggers)
     insights = request.json['insights']
+    exposed_triggers = []
     for read_insight in insights:
         read_trigger_type = TriggerType(read_insight['trigger_type'])
-        for existing_insight in plan.insights:
-            if read_trigger_type == existing_insight.trigger_type:
-                existing_insight.read = True
-                exposed_triggers.add(read_trigger_type)
-                continue
-    plan.sort_insights()
-    if len(athlete_stats.exposed_triggers) != len(exposed_triggers):
-        athlete_stats.exposed_triggers = list(exposed_triggers)
-        DatastoreCollection().athlete_stats_datastore.put(athlete_stats)
-    DatastoreCollection().daily_plan_datastore.put(plan)
+        if DatastoreCollection().daily_plan_datastore.mark_insights_read(user_id, plan_event_day, read_trigger_type.value):
+            exposed_triggers.append(read_trigger_type.value)
+    if len(exposed_triggers) > 0:
+        DatastoreCollection().athlete_stats_datastore.update(user_id, add_to_set={'exposed_triggers': exposed_triggers})
 
     return {'message': 'success'}, 200
@@ -30,6 +30,17 @@ session_datastore = datastore_collection.session_datastore
 app = Blueprint('session', __name__)
 
 
+@app.before_request
+def start_request_cache():
+    # survey processing, stats and plan creation read the same plans, sessions, stats and injury risk repeatedly
+    datastore_collection.enable_request_cache()
+
+
+@app.teardown_request
+def end_request_cache(exception):
+    datastore_collection.end_request_cache()
+
+
 @app.route('/<uuid:user_id>/', methods=['POST'])
 @require.authenticated.self
 @require.body({'event_date': str, 'sessions': list})
@@ -152,7 +163,8 @@ def handle_session_create(user_id=None):
                            stats_processor=survey_processor.stats_processor,
                            datastore_collection=datastore_collection,
                            visualizations=visualizations,
-                           hist_update=hist_update)
+                           hist_update=hist_update,
+                           earliest_changed_date=survey_processor.get_earliest_changed_date())
     else:
         plan = cleanup_plan(plan, visualizations)
 
@@ -271,7 +283,8 @@ def handle_session_update(session_id, user_id=None):
                                athlete_stats=athlete_stats,
                                datastore_collection=datastore_collection,
                                visualizations=visualizations,
-                               hist_update=hist_update)
+                               hist_update=hist_update,
+                               earliest_changed_date=survey_processor.get_earliest_changed_date())
 
             return {'daily_plans': [plan]}, 200
 
@@ -305,7 +318,8 @@ def handle_session_update(session_id, user_id=None):
                            athlete_stats=athlete_stats,
                            datastore_collection=datastore_collection,
                            visualizations=visualizations,
-                           hist_update=hist_update)
+                           hist_update=hist_update,
+                           earliest_changed_date=survey_processor.get_earliest_changed_date())
 
         return {'daily_plans': [plan]}, 200
 
@@ -25,6 +25,17 @@ session_datastore = datastore_collection.session_datastore
 app = Blueprint('symptoms', __name__)
 
 
+@app.before_request
+def start_request_cache():
+    # survey processing, stats and plan creation read the same plans, sessions, stats and injury risk repeatedly
+    datastore_collection.enable_request_cache()
+
+
+@app.teardown_request
+def end_request_cache(exception):
+    datastore_collection.end_request_cache()
+
+
 @app.route('/<uuid:user_id>/', methods=['POST'])
 @require.authenticated.self
 # @require.body({'event_date': str})
@@ -82,7 +93,8 @@ def handle_add_symptoms(user_id=None):
                            datastore_collection=datastore_collection,
                            visualizations=visualizations,
                            hist_update=hist_update,
-                           log_symptoms=True)
+                           log_symptoms=True,
+                           earliest_changed_date=survey_processor.get_earliest_changed_date())
 
         # update users database if health data received
         Service('users', os.environ['USERS_API_VERSION']).call_apigateway_async(method='PATCH',
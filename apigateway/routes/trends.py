@@ -58,15 +58,16 @@ def handle_fte_category(user_id):
     event_date = parse_datetime(request.json['event_date'])
     plan_event_day = format_date(event_date)
     plan = DatastoreCollection().daily_plan_datastore.get(user_id, start_date=plan_event_day, end_date=plan_event_day)[0]
-    athlete_stats = DatastoreCollection().athlete_stats_datastore.get(user_id)
     fte_insight_type = InsightType(request.json['insight_type'])
     fte_insight_categories = [category for category in plan.trends.insight_categories if category.insight_type == fte_insight_type]
     if len(fte_insight_categories) > 0:
         fte_insight_category = fte_insight_categories[0]
         fte_insight_category.first_time_experience = False
-        athlete_stats.insight_categories = plan.trends.insight_categories
-        DatastoreCollection().athlete_stats_datastore.put(athlete_stats)
-        DatastoreCollection().daily_plan_datastore.put(plan)
+        DatastoreCollection().athlete_stats_datastore.update(user_id, set_fields={
+            'insight_categories': [category.json_serialise() for category in plan.trends.insight_categories]})
+        DatastoreCollection().daily_plan_datastore.update(user_id, plan_event_day,
+                                                          set_fields={'trends.insight_categories.$.first_time_experience': False},
+                                                          conditions={'trends.insight_categories.insight_type': fte_insight_type.value})
     else:
         print(f"Trend Category {fte_insight_type.name} not found")
 
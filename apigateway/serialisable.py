@@ -1,21 +1,75 @@
 from abc import ABCMeta, abstractmethod
+from datetime import datetime
 from decimal import Decimal
+from enum import Enum
+import hashlib
 import json
+import weakref
+from datastores.write_stats import write_stats
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class Serialisable:
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractmethod
     def json_serialise(self):
-        return json.loads(json.dumps(self.__dict__, default=json_serialise))
+        return to_json_value(get_fields(self))
+
+    def track_changes(self, document):
+        """
+        Remembers the content of document, this object as it's stored (loaded from or last written), so has_changed
+        can tell whether the object has been changed since, for the rest of the current request
+        """
+        key = id(self)
+        try:
+            reference = weakref.ref(self, lambda r: _stored_hashes.pop(key, None))
+        except TypeError:
+            # classes with slots but no __weakref__ aren't tracked, so always count as changed
+            return
+        _stored_hashes[key] = (reference, write_stats.request_id, get_content_hash(document))
+
+    def has_changed(self, document):
+        """
+        Whether document, this object serialised, differs from the document given to track_changes.  Objects that
+        were never tracked, or were tracked in an earlier request, count as changed: another writer may have changed
+        the stored document since.
+        """
+        stored = _stored_hashes.get(id(self))
+        return (stored is None or stored[0]() is not self or stored[1] != write_stats.request_id
+                or stored[2] != get_content_hash(document))
+
+
+# id of a tracked object: (weak reference to it, write_stats.request_id when tracked, content hash of its stored document)
+_stored_hashes = {}
+
+
+def get_content_hash(document):
+    """
+    Digest of a document's content, whatever the order of its keys.  Mongo's _id isn't part of the content.
+    """
+    if isinstance(document, dict) and '_id' in document:
+        document = {k: v for k, v in document.items() if k != '_id'}
+    encoded = None
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(document, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    if encoded is None:
+        encoded = json.dumps(document, default=str, sort_keys=True).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=16).digest()
 
 
 def json_serialise(obj):
     """
     JSON serializer for objects not serializable by default json code
     """
-    from datetime import datetime
     if isinstance(obj, datetime):
         serial = obj.isoformat()
         return serial
@@ -27,4 +81,144 @@ def json_serialise(obj):
         return list(obj)
     if isinstance(obj, bytes):
         return obj.decode('utf-8')
+    if isinstance(obj, Enum):
+        return obj.value
     raise TypeError("Type {} is not serializable".format(type(obj).__name__))
+
+
+# class: names of its slots, looked up once per class
+_slot_names = {}
+
+
+def get_fields(obj):
+    """
+    An object's attributes by name: its slots, then its __dict__
+    """
+    cls = type(obj)
+    slot_names = _slot_names.get(cls)
+    if slot_names is None:
+        slot_names = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get('__slots__', ())
+            for name in [slots] if isinstance(slots, str) else slots:
+                if name not in ('__dict__', '__weakref__') and name not in slot_names:
+                    slot_names.append(name)
+        slot_names = tuple(slot_names)
+        _slot_names[cls] = slot_names
+
+    fields = {}
+    for name in slot_names:
+        try:
+            fields[name] = getattr(obj, name)
+        except AttributeError:
+            pass
+    fields.update(getattr(obj, '__dict__', {}))
+    return fields
+
+
+def to_json_value(value):
+    """
+    The same as json.loads(json.dumps(value, default=json_serialise)), built in one pass without the string
+    """
+    converter = _converters.get(type(value))
+    if converter is None:
+        converter = _get_converter(type(value))
+    return converter(value)
+
+
+def _unchanged(value):
+    return value
+
+
+def _list(values):
+    return [to_json_value(v) for v in values]
+
+
+def _dict(values):
+    return {_key(k): to_json_value(v) for k, v in values.items()}
+
+
+def _key(key):
+    # json.dumps only accepts these as keys, and writes them as strings
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, (int, float)):
+        return json.dumps(key)
+    raise TypeError(f'keys must be str, int, float, bool or None, not {type(key).__name__}')
+
+
+def _get_converter(cls):
+    """
+    Works out how json.dumps would handle instances of cls, checking types in the same order it does
+    """
+    if issubclass(cls, str):
+        converter = str.__str__
+    elif issubclass(cls, int):
+        converter = int
+    elif issubclass(cls, float):
+        converter = float
+    elif issubclass(cls, (list, tuple)):
+        converter = _list
+    elif issubclass(cls, dict):
+        converter = _dict
+    elif issubclass(cls, datetime):
+        converter = datetime.isoformat
+    elif issubclass(cls, Serialisable):
+        def converter(obj):
+            return to_json_value(obj.json_serialise())
+    elif issubclass(cls, Decimal):
+        converter = str
+    elif issubclass(cls, set):
+        converter = _list
+    elif issubclass(cls, bytes):
+        def converter(obj):
+            return obj.decode('utf-8')
+    elif issubclass(cls, Enum):
+        def converter(obj):
+            return to_json_value(obj.value)
+    else:
+        def converter(obj):
+            raise TypeError("Type {} is not serializable".format(type(obj).__name__))
+
+    _converters[cls] = converter
+    return converter
+
+
+_converters = {
+    str: _unchanged,
+    int: _unchanged,
+    float: _unchanged,
+    bool: _unchanged,
+    type(None): _unchanged,
+    list: _list,
+    tuple: _list,
+    dict: _dict
+}
+
+
+class FastJsonEncoder(json.JSONEncoder):
+    """
+    JSONEncoder that encodes with orjson when it's installed, using default() for anything orjson can't encode itself.
+    Mix it in ahead of a Flask app's json_encoder to opt route responses in.
+    """
+    def default(self, o):
+        try:
+            return json_serialise(o)
+        except TypeError:
+            return super().default(o)
+
+    def encode(self, o):
+        if orjson is not None and self.indent is None:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+            try:
+                return orjson.dumps(o, default=self.default, option=option).decode('utf-8')
+            except TypeError:
+                # eg integers over 64 bits, which json can still encode
+                pass
+        return super().encode(o)
@@ -1,10 +1,18 @@
 import datetime
+import functools
 import pytz
 import math
+import re
 import uuid
 from fathomapi.utils.exceptions import InvalidSchemaException
 from config import get_mongo_collection
 
+# date and date time shapes that datetime.fromisoformat reads the same way as the strptime formats below
+_iso_date_pattern = re.compile(r'\d{4}-\d{2}-\d{2}')
+_iso_datetime_pattern = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{3}|\.\d{6})?(Z|[+-]\d{2}:\d{2})?')
+# fromisoformat is python 3.7+; the python3.6 lambdas use the strptime formats only
+_has_fromisoformat = hasattr(datetime.datetime, 'fromisoformat')
+
 
 def format_date(date_input):
     """
@@ -21,15 +29,37 @@ def format_date(date_input):
         return date_input.strftime("%Y-%m-%d")
     elif isinstance(date_input, datetime.date):
         return date_input.strftime("%Y-%m-%d")
+    elif isinstance(date_input, str):
+        return _format_date_string(date_input)
     else:
-        for format_string in ('%Y-%m-%d', '%m/%d/%y', '%Y-%m'):
-            try:
-                date_input = datetime.datetime.strptime(date_input, format_string)
-                return date_input.strftime("%Y-%m-%d")
-            except ValueError:
-                pass
-        return None
-        # raise ValueError('no valid date format found')
+        return _format_date_value(date_input)
+
+
+def format_dates(date_inputs):
+    return [format_date(d) for d in date_inputs]
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_date_string(date_string):
+    if _has_fromisoformat and _iso_date_pattern.fullmatch(date_string):
+        try:
+            # already in the output format, if it's a real date
+            datetime.date.fromisoformat(date_string)
+            return date_string
+        except ValueError:
+            pass
+    return _format_date_value(date_string)
+
+
+def _format_date_value(date_input):
+    for format_string in ('%Y-%m-%d', '%m/%d/%y', '%Y-%m'):
+        try:
+            date_input = datetime.datetime.strptime(date_input, format_string)
+            return date_input.strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return None
+    # raise ValueError('no valid date format found')
 
 
 def format_datetime(datetime_input):
@@ -55,6 +85,46 @@ def format_datetime(datetime_input):
 def parse_datetime(datetime_string):
     if isinstance(datetime_string, datetime.datetime):
         return datetime_string
+    if isinstance(datetime_string, str):
+        # plan and session dates repeat constantly, and datetimes are immutable so can be shared
+        return _parse_datetime_string(datetime_string)
+    return _parse_datetime_formats(datetime_string)
+
+
+def parse_datetimes(datetime_strings):
+    """
+    parse_datetime for each of a list, parsing each distinct string once
+    """
+    parsed = {}
+    date_times = []
+    for datetime_string in datetime_strings:
+        if isinstance(datetime_string, datetime.datetime):
+            date_times.append(datetime_string)
+            continue
+        date_time = parsed.get(datetime_string)
+        if date_time is None:
+            date_time = parsed[datetime_string] = parse_datetime(datetime_string)
+        date_times.append(date_time)
+    return date_times
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_datetime_string(datetime_string):
+    if _has_fromisoformat and _iso_datetime_pattern.fullmatch(datetime_string):
+        try:
+            if datetime_string[-1] == 'Z':
+                return datetime.datetime.fromisoformat(datetime_string[:-1]).replace(tzinfo=pytz.utc)
+            date_time = datetime.datetime.fromisoformat(datetime_string)
+            if date_time.tzinfo is None:
+                date_time = date_time.replace(tzinfo=pytz.utc)
+            return date_time
+        except ValueError:
+            # eg an out of range day, which the formats below report
+            pass
+    return _parse_datetime_formats(datetime_string)
+
+
+def _parse_datetime_formats(datetime_string):
     format_strings = [
         "%Y-%m-%dT%H:%M:%SZ",
         "%Y-%m-%dT%H:%M:%S.%fZ",
@@ -85,6 +155,23 @@ def parse_datetime(datetime_string):
 
 
 def parse_date(date_string):
+    if isinstance(date_string, str):
+        return _parse_date_string(date_string)
+    return _parse_date_formats(date_string)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_string(date_string):
+    if _has_fromisoformat and _iso_date_pattern.fullmatch(date_string):
+        try:
+            day = datetime.date.fromisoformat(date_string)
+            return datetime.datetime(day.year, day.month, day.day, tzinfo=pytz.utc)
+        except ValueError:
+            pass
+    return _parse_date_formats(date_string)
+
+
+def _parse_date_formats(date_string):
     for format_string in ('%Y-%m-%d', '%m/%d/%y'):
         try:
             date_time = datetime.datetime.strptime(date_string, format_string)
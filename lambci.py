@@ -46,6 +46,10 @@ def upload_lambda_bundle(local_filepath, s3_filename, pip_install=True):
             replace_in_file(os.path.join(local_filepath, 'pip_requirements'), '{GITHUB_TOKEN}', os.environ['GITHUB_TOKEN'])
             subprocess.check_call('python3 -m pip install --no-cache-dir -t {f} -r {f}/pip_requirements'.format(f=local_filepath), shell=True)
 
+        # Snapshot the compiled movement and action libraries so that cold starts don't have to parse them
+        if os.path.exists(os.path.join(local_filepath, 'datastores', 'library_snapshot.py')):
+            subprocess.check_call('python3 -m datastores.library_snapshot', shell=True, cwd=local_filepath)
+
         # Write the version into the bundle
         with open(os.path.join(local_filepath, 'version'), "w") as file:
             file.write(os.environ['LAMBCI_COMMIT'])
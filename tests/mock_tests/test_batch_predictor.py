@@ -0,0 +1,99 @@
+from logic.batch_predictor import PredictionCache
+from logic.bodyweight_ratio_predictor import BodyWeightRatioPredictor, all_prime_movers
+from logic.rpe_predictor import RPEPredictor
+from models.movement_tags import Equipment, Gender
+import numpy as np
+
+
+class WeightedSumModel(object):
+    def __init__(self, columns):
+        self.weights = np.linspace(-.5, 1, columns)
+        self.predicted_rows = []
+
+    def predict(self, features):
+        features = np.asarray(features, dtype=float)
+        self.predicted_rows.append(len(features))
+        return features.dot(self.weights)
+
+
+def get_prime_movers(first, second=(), third=()):
+    return {
+        "first_prime_movers": set(first),
+        "second_prime_movers": set(second),
+        "third_prime_movers": set(third),
+        "fourth_prime_movers": set()
+    }
+
+
+def get_legacy_features(user_weight, gender, prime_movers, equipment):
+    # feature row as built before batching, one dict lookup per column
+    features = [user_weight] + [1.0 if equipment.name == e else 0.0 for e in ['barbells', 'bodyweight', 'cable', 'dumbbells', 'machine']]
+    features.append(1.0 if gender.name == 'female' else 0.0)
+    prime_mover_features = {}
+    for prime_mover in prime_movers['first_prime_movers']:
+        prime_mover_features[f"prime_mover_{prime_mover}"] = 1
+    for second_prime_mover in prime_movers['second_prime_movers']:
+        prime_mover_features[f"second_prime_mover_{second_prime_mover}"] = 1
+    for third_prime_mover in prime_movers['third_prime_movers']:
+        prime_mover_features[f"third_prime_mover_{third_prime_mover}"] = 1
+    for pm in all_prime_movers:
+        features.append(prime_mover_features.get(f"prime_mover_{pm}", 0))
+        features.append(prime_mover_features.get(f"second_prime_mover_{pm}", 0))
+        features.append(prime_mover_features.get(f"third_prime_mover_{pm}", 0))
+    return features
+
+
+def test_feature_matrix_matches_legacy_features():
+
+    rows = [(70, Gender.female, get_prime_movers({21, 132}, {26}, {21, 999}), Equipment.barbells),
+            (82.5, Gender.male, get_prime_movers(set()), Equipment.bodyweight),
+            (60, Gender.female, get_prime_movers({45, 46}, {45}), Equipment.kettlebells)]
+    predictor = BodyWeightRatioPredictor(WeightedSumModel(157))
+    feature_matrix = predictor.get_feature_matrix([predictor.get_features(*row) for row in rows])
+
+    assert feature_matrix.tolist() == [get_legacy_features(*row) for row in rows]
+    assert BodyWeightRatioPredictor.get_prime_movers_features(rows[0][2]) == get_legacy_features(*rows[0])[7:]
+
+
+def test_batch_predicts_uncached_rows_once():
+
+    model = WeightedSumModel(157)
+    predictor = BodyWeightRatioPredictor(model)
+    features_list = [predictor.get_features(70, Gender.female, get_prime_movers({pm}), Equipment.dumbbells)
+                     for pm in all_prime_movers[:10]]
+
+    predictions = predictor.predict_bodyweight_ratios(features_list + features_list[:3])
+    assert model.predicted_rows == [10]
+    for features, prediction in zip(features_list, predictions):
+        expected = max(model.predict([predictor.get_feature_matrix([features])[0]])[0], 0)
+        assert prediction == round(expected, 3)
+
+    model.predicted_rows = []
+    assert predictor.predict_bodyweight_ratio(70, Gender.female, get_prime_movers({all_prime_movers[0]}), Equipment.dumbbells) == predictions[0]
+    assert predictor.predict_bodyweight_ratios(features_list[5:] + [predictor.get_features(71, Gender.female, get_prime_movers({21}), Equipment.dumbbells)])[:5] == predictions[5:10]
+    assert model.predicted_rows == [1]
+
+
+def test_rpe_batch_matches_single_predictions():
+
+    predictor = RPEPredictor(WeightedSumModel(5))
+    features_list = [predictor.get_features(hr, user_weight=70, user_age=30) for hr in range(100, 200, 10)]
+    rpes = predictor.predict_rpes(features_list)
+
+    cold_predictor = RPEPredictor(WeightedSumModel(5))
+    assert rpes == [cold_predictor.predict_rpe(hr, user_weight=70, user_age=30) for hr in range(100, 200, 10)]
+    assert all(rpe >= 0 for rpe in rpes)
+
+
+def test_prediction_cache_evicts_least_recently_used():
+
+    cache = PredictionCache(None, max_size=2)
+    cache.put(('a',), 1)
+    cache.put(('b',), 2)
+    assert cache.get(('a',)) == 1
+    cache.put(('c',), 3)
+
+    assert cache.get(('b',)) is None
+    assert cache.get(('a',)) == 1
+    assert cache.get(('c',)) == 3
+    assert len(cache) == 2
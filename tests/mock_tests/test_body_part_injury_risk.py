@@ -0,0 +1,57 @@
+from models.body_part_injury_risk import BodyPartInjuryRisk
+from models.training_volume import StandardErrorRange
+from datetime import date, timedelta
+
+
+def get_injury_risk(day):
+
+    injury_risk = BodyPartInjuryRisk()
+    injury_risk.concentric_volume_today = StandardErrorRange(observed_value=day * 1.5)
+    injury_risk.last_ache_date = date(2019, 1, 1) + timedelta(days=day)
+    injury_risk.ache_count_last_0_20_days = 2
+    return injury_risk
+
+
+def test_attributes_are_slots():
+
+    injury_risk = BodyPartInjuryRisk()
+    assert not hasattr(injury_risk, '__dict__')
+
+    try:
+        injury_risk.concentric_volume_tomorrow = StandardErrorRange()
+        assert False
+    except AttributeError:
+        pass
+
+
+def test_rare_attributes_are_allocated_when_set():
+
+    injury_risk = BodyPartInjuryRisk()
+    injury_risk.last_knots_level = 0
+    injury_risk.last_knots_date = None
+    assert injury_risk._rare_attributes is None
+    assert injury_risk.last_knots_level == 0
+
+    injury_risk.last_knots_date = "2019-04-01"
+    injury_risk.last_knots_level = 3
+    assert injury_risk.last_knots_date == date(2019, 4, 1)
+    assert injury_risk.last_knots_level == 3
+    assert injury_risk.get_knots_severity(date(2019, 4, 1)) == 3
+    assert BodyPartInjuryRisk().last_knots_level == 0
+
+
+def test_json_round_trip_skips_none():
+
+    injury_risk = get_injury_risk(10)
+    injury_risk.last_inflammation_date = date(2019, 2, 1)
+    injury_risk.max_power_drill = 4.5
+
+    injury_risk_json = injury_risk.json_serialise()
+    assert 'last_sharp_date' not in injury_risk_json
+    assert injury_risk_json['last_inflammation_date'] == '2019-02-01'
+
+    round_trip = BodyPartInjuryRisk.json_deserialise(injury_risk_json)
+    assert round_trip.json_serialise() == injury_risk_json
+    assert round_trip.last_inflammation_date == date(2019, 2, 1)
+    assert round_trip.last_sharp_date is None
+    assert round_trip.max_power_drill == 4.5
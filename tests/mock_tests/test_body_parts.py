@@ -1,5 +1,6 @@
 
-from models.body_parts import BodyPartFactory, BodyPartLocation, BodyPart
+from models.body_parts import BodyPartFactory, BodyPartLocation, BodyPart, body_part_mapping, get_body_part_templates
+import random
 
 
 def test_lower_back_muscle():
@@ -64,3 +65,87 @@ def test_glutes_sample():
     assert len(glutes.isolated_activate_exercises) == 1
     assert len(glutes.static_integrate_exercises) == 0
     assert len(glutes.dynamic_integrate_exercises) == 1
+
+
+def get_part_mapping_from_json_by_dictionaries(bpf, sample, body_part_location):
+
+    # body part construction before templates, kept as the reference
+    part_json = body_part_mapping[str(body_part_location.value)]
+    part = BodyPart(body_part_location, part_json['treatment_priority'])
+    part.bilateral = bpf.get_bilateral(part.location)
+    if body_part_location in [BodyPartLocation.full_body, BodyPartLocation.upper_body, BodyPartLocation.lower_body]:
+        dynamic_stretch = bpf.get_full_exercise_dictionary(part_json['dynamic_lengthen'])
+        static_integrate = bpf.get_exercise_dictionary(part_json['static_integrate'])
+        dynamic_integrate = bpf.get_full_exercise_dictionary(part_json['dynamic_integrate'])
+        part.add_extended_exercise_phases({}, {}, {}, dynamic_stretch, {}, static_integrate)
+        part.add_dynamic_exercise_phases({}, dynamic_integrate, {}, {})
+    elif sample:
+        phases = [bpf.get_exercise_dictionary(part_json[p]) for p in ['inhibit', 'static_lengthen', 'active_lengthen',
+                                                                      'dynamic_lengthen', 'isolated_activate',
+                                                                      'static_integrate', 'dynamic_integrate']]
+        dynamic_integrate_2 = bpf.get_exercise_dictionary(part_json['dynamic_integrate'], sample=2)
+        dynamic_integrate_with_speed = bpf.get_exercise_dictionary(part_json['dynamic_integrate_with_speed'])
+        part.add_extended_exercise_phases(*phases[:6])
+        part.add_dynamic_exercise_phases({}, phases[6], dynamic_integrate_with_speed, dynamic_integrate_2)
+    else:
+        phases = [bpf.get_full_exercise_dictionary(part_json[p], False) for p in ['inhibit', 'static_lengthen',
+                                                                                  'active_lengthen', 'dynamic_lengthen',
+                                                                                  'isolated_activate', 'static_integrate',
+                                                                                  'dynamic_integrate',
+                                                                                  'dynamic_integrate_with_speed']]
+        part.add_extended_exercise_phases(*phases[:6])
+        part.add_dynamic_exercise_phases({}, phases[6], phases[7], {})
+    part.add_muscle_groups(part_json['agonists'], part_json['synergists'], part_json['stabilizers'], part_json['antagonists'])
+
+    return part
+
+
+def get_exercise_ids(part):
+
+    return [[e.exercise.id for e in exercises] for exercises in [part.inhibit_exercises, part.static_stretch_exercises,
+                                                                 part.active_stretch_exercises,
+                                                                 part.dynamic_stretch_exercises,
+                                                                 part.isolated_activate_exercises,
+                                                                 part.static_integrate_exercises,
+                                                                 part.dynamic_integrate_exercises,
+                                                                 part.dynamic_integrate_2_exercises,
+                                                                 part.dynamic_integrate_with_speed_exercises]]
+
+
+def get_mapped_locations():
+
+    # upper_body has fewer than the 4 dynamic exercises it samples
+    return [BodyPartLocation(int(key)) for key in get_body_part_templates()
+            if BodyPartLocation(int(key)) != BodyPartLocation.upper_body]
+
+
+def test_body_part_templates_match_mapping():
+
+    bpf = BodyPartFactory()
+
+    for sample in [True, False]:
+        for location in get_mapped_locations():
+            random.seed(location.value)
+            expected = get_part_mapping_from_json_by_dictionaries(bpf, sample, location)
+            random.seed(location.value)
+            part = bpf.get_body_part(BodyPart(location, None), sample=sample)
+
+            assert get_exercise_ids(part) == get_exercise_ids(expected)
+            assert part.treatment_priority == expected.treatment_priority
+            assert part.bilateral == expected.bilateral
+            assert (part.agonists, part.synergists, part.stabilizers, part.antagonists) == \
+                   (expected.agonists, expected.synergists, expected.stabilizers, expected.antagonists)
+
+
+def test_body_parts_from_templates_are_independent():
+
+    bpf = BodyPartFactory()
+    hamstrings = bpf.get_body_part(BodyPart(BodyPartLocation.hamstrings, None), sample=False)
+    hamstrings.inhibit_exercises[0].dosages.append("dosage")
+    hamstrings.inhibit_exercises[0].exercise.progressions.append("progression")
+    hamstrings.agonists.append(99)
+
+    hamstrings = bpf.get_body_part(BodyPart(BodyPartLocation.hamstrings, None), sample=False)
+    assert hamstrings.inhibit_exercises[0].dosages == []
+    assert hamstrings.inhibit_exercises[0].exercise.progressions == []
+    assert 99 not in hamstrings.agonists
@@ -0,0 +1,71 @@
+from datastores import bulk_write_datastore, daily_plan_datastore
+from datastores.bulk_write_datastore import BulkWriteException
+from datastores.daily_plan_datastore import DailyPlanDatastore
+from models.daily_plan import DailyPlan
+from tests.mocks.mock_mongo_collection import MongoCollection
+from datetime import datetime, timedelta
+from utils import format_date
+
+
+def get_plans(user_id, days):
+
+    plans = []
+    for d in range(days):
+        plan = DailyPlan(format_date(datetime(2020, 1, 1) + timedelta(days=d)))
+        plan.user_id = user_id
+        plans.append(plan)
+
+    return plans
+
+
+def test_put_writes_in_batches(monkeypatch):
+
+    mongo_collection = MongoCollection()
+    monkeypatch.setattr(bulk_write_datastore, 'get_mongo_collection', lambda collection: mongo_collection)
+
+    DailyPlanDatastore().put(get_plans("tester", 120), batch_size=50)
+
+    assert mongo_collection.bulk_write_count == 3
+    assert len(mongo_collection.documents) == 120
+
+
+def test_put_replaces_existing_documents(monkeypatch):
+
+    mongo_collection = MongoCollection([p.json_serialise() for p in get_plans("tester", 10)])
+    monkeypatch.setattr(bulk_write_datastore, 'get_mongo_collection', lambda collection: mongo_collection)
+    monkeypatch.setattr(daily_plan_datastore, 'get_mongo_collection', lambda collection: mongo_collection)
+
+    plans = get_plans("tester", 10)
+    plans[3].train_later = False
+    # same document twice in one batch: the last one wins, as with sequential writes
+    repeated_plan = get_plans("tester", 10)[3]
+    repeated_plan.train_later = True
+    DailyPlanDatastore().put(plans + [repeated_plan])
+
+    assert mongo_collection.bulk_write_count == 1
+    assert len(mongo_collection.documents) == 10
+    assert DailyPlanDatastore().get("tester", "2020-01-04", "2020-01-04")[0].train_later
+
+
+def test_put_reports_failed_items(monkeypatch):
+
+    def reject_weekends(document):
+        if datetime.strptime(document['date'], "%Y-%m-%d").weekday() >= 5:
+            return "Document failed validation"
+        return None
+
+    mongo_collection = MongoCollection(rejected_document=reject_weekends)
+    monkeypatch.setattr(bulk_write_datastore, 'get_mongo_collection', lambda collection: mongo_collection)
+
+    plans = get_plans("tester", 14)
+    try:
+        DailyPlanDatastore().put(plans, batch_size=5)
+        assert False
+    except BulkWriteException as e:
+        assert [plans[error['index']].event_date for error in e.errors] == ["2020-01-04", "2020-01-05",
+                                                                            "2020-01-11", "2020-01-12"]
+        assert all(error['message'] == "Document failed validation" for error in e.errors)
+
+    # the rest of each batch is still written
+    assert mongo_collection.bulk_write_count == 3
+    assert len(mongo_collection.documents) == 10
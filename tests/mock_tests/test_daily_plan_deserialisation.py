@@ -0,0 +1,73 @@
+from datastores import daily_plan_datastore
+from datastores.daily_plan_datastore import DailyPlanDatastore
+from models.daily_plan import DailyPlan
+from models.session import SportTrainingSession
+from models.sport import SportName
+from tests.mocks.mock_mongo_collection import MongoCollection
+from datetime import datetime
+import pickle
+
+
+def get_plan_document(user_id, event_date):
+
+    plan = DailyPlan(event_date)
+    plan.user_id = user_id
+    session = SportTrainingSession()
+    session.user_id = user_id
+    session.event_date = datetime(2020, 1, 10, 12)
+    session.sport_name = SportName.distance_running
+    session.duration_minutes = 60
+    plan.training_sessions.append(session)
+    plan.sessions_planned = False
+
+    return plan.json_serialise()
+
+
+def test_plan_fields_are_deserialised_on_first_read():
+
+    document = get_plan_document("tester", "2020-01-10")
+    plan = DailyPlan.json_deserialise(document)
+
+    assert 'training_sessions' not in vars(plan)
+    assert 'modalities' not in vars(plan)
+    assert plan.training_sessions[0].duration_minutes == 60
+    assert plan.training_sessions is plan.training_sessions
+    assert 'training_sessions' in vars(plan)
+    assert 'modalities' not in vars(plan)
+    assert plan.modalities == []
+    assert plan.heat is None
+
+
+def test_lazy_plan_round_trips():
+
+    document = get_plan_document("tester", "2020-01-10")
+    plan = DailyPlan.json_deserialise(document)
+
+    assert plan.json_serialise() == DailyPlan.json_deserialise(document).json_serialise()
+    assert plan.json_serialise()['training_sessions'][0]['duration_minutes'] == 60
+
+    copied_plan = pickle.loads(pickle.dumps(DailyPlan.json_deserialise(document), -1))
+    assert copied_plan.training_sessions[0].duration_minutes == 60
+
+    plan = DailyPlan.json_deserialise(document)
+    plan.training_sessions = []
+    assert plan.json_serialise()['training_sessions'] == []
+
+
+def test_datastore_projects_requested_fields(monkeypatch):
+
+    mongo_collection = MongoCollection([get_plan_document("tester", "2020-01-10"),
+                                        get_plan_document("other_tester", "2020-01-10")])
+    monkeypatch.setattr(daily_plan_datastore, 'get_mongo_collection', lambda collection: mongo_collection)
+
+    plans = DailyPlanDatastore().get(["tester", "other_tester"], "2020-01-10", "2020-01-10",
+                                     fields=['training_sessions', 'sessions_planned'])
+    assert sorted(p.user_id for p in plans) == ["other_tester", "tester"]
+    assert all(not p.sessions_planned and len(p.training_sessions) == 1 for p in plans)
+    assert all(set(p._document.keys()) == {'date', 'user_id', 'training_sessions', 'sessions_planned'} for p in plans)
+
+    plans = DailyPlanDatastore().get("tester", "2020-01-10", "2020-01-10", stats_processing=True)
+    assert plans[0].user_id == "tester"
+    assert set(plans[0]._document.keys()) == {'date', 'user_id'} | set(DailyPlan.stats_processing_fields)
+    assert len(plans[0].training_sessions) == 1
+    assert plans[0].sessions_planned
@@ -0,0 +1,127 @@
+from datastores import daily_plan_datastore, athlete_stats_datastore
+from datastores.datastore_collection import DatastoreCollection
+from logic.dashboard_processing import DashboardProcessor, get_team_info
+from models.dashboard import TeamDashboardData, AthleteDashboardData
+from models.daily_plan import DailyPlan
+from models.metrics import AthleteMetric, MetricType, MetricColor, DailyHighLevelInsight, WeeklyHighLevelInsight, SpecificAction
+from models.stats import AthleteStats
+from fathomapi.utils.exceptions import ForbiddenException
+from tests.mocks.mock_mongo_collection import MongoCollection
+from tests.mocks.mock_users_service import UsersService
+
+event_date = "2019-05-01"
+
+
+class RecordingMongoCollection(MongoCollection):
+    """
+    Records every find, to count the round trips to Mongo
+    """
+    def __init__(self, documents):
+        super().__init__(documents)
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append((query, projection))
+        return super().find(query, projection)
+
+
+def get_metric(user_number):
+    if user_number % 3 == 0:
+        metric = AthleteMetric('Metric', MetricType.daily)
+        metric.color = MetricColor.red
+        metric.high_level_insight = DailyHighLevelInsight.seek_med_eval_to_clear_for_training
+    else:
+        metric = AthleteMetric('Metric', MetricType.longitudinal)
+        metric.color = MetricColor.yellow
+        metric.high_level_insight = WeeklyHighLevelInsight.at_risk_of_overtraining
+    metric.specific_insight_recovery = "Metric insight"
+    metric.specific_actions = [SpecificAction("2A", "rec1", True), SpecificAction("5A", "rec2", True)]
+    return metric
+
+
+def get_teams(team_count, athletes_per_team):
+    # the last athlete of each team is on the next team too
+    teams = {}
+    for t in range(team_count):
+        user_ids = [f'user_{t * athletes_per_team + a}' for a in range(athletes_per_team + 1)]
+        teams[f'team_{t}'] = (f'Team {t}', user_ids)
+    return teams
+
+
+def get_collections(teams):
+    user_ids = sorted({user_id for name, team_user_ids in teams.values() for user_id in team_user_ids})
+    plans = []
+    stats = []
+    for user_number, user_id in enumerate(user_ids):
+        if user_number % 4 != 0:
+            plan = DailyPlan(event_date)
+            plan.user_id = user_id
+            plan.sessions_planned = user_number % 2 == 0
+            plans.append(plan.json_serialise())
+        if user_number % 5 != 0:
+            athlete_stats = AthleteStats(user_id)
+            athlete_stats.metrics = [get_metric(user_number)]
+            stats.append(athlete_stats.json_serialise())
+    return RecordingMongoCollection(plans), RecordingMongoCollection(stats)
+
+
+def get_dashboard_data_sequential(coach_id, team_ids, users_service, datastore_collection):
+    # the route before DashboardProcessor: one team at a time, with all of each athlete's stats
+    teams = []
+    for team_id in team_ids:
+        team_name, user_ids, users = get_team_info(users_service, coach_id, team_id)
+        team = TeamDashboardData(team_name)
+        daily_plan_list = datastore_collection.daily_plan_datastore.get(user_ids, start_date=event_date, end_date=event_date,
+                                                                        fields=['daily_readiness_survey', 'sessions_planned', 'training_sessions'])
+        team.get_compliance_data(user_ids, users, daily_plan_list)
+        for athlete_stats in datastore_collection.athlete_stats_datastore.get(user_ids):
+            user_dict = users[athlete_stats.athlete_id]
+            athlete = AthleteDashboardData(user_dict['user_id'], user_dict['first_name'], user_dict['last_name'])
+            athlete.aggregate(athlete_stats.metrics)
+            team.insert_user(athlete)
+            team.athletes.append(athlete)
+        teams.append(team.json_serialise())
+    return teams
+
+
+def get_dashboard_data_parallel(coach_id, team_ids, users_service, datastore_collection):
+    with DashboardProcessor(coach_id, team_ids, event_date, users_service, datastore_collection) as processor:
+        teams = processor.get_dashboard_data(processor.get_team_info())
+    return teams, processor
+
+
+def set_collections(monkeypatch, plan_collection, stats_collection):
+    monkeypatch.setattr(daily_plan_datastore, 'get_mongo_collection', lambda collection: plan_collection)
+    monkeypatch.setattr(athlete_stats_datastore, 'get_mongo_collection', lambda collection: stats_collection)
+
+
+def test_matches_sequential_dashboard(monkeypatch):
+
+    teams = get_teams(4, 6)
+    team_ids = list(teams.keys())
+    plan_collection, stats_collection = get_collections(teams)
+    set_collections(monkeypatch, plan_collection, stats_collection)
+    users_service = UsersService.with_teams('coach', teams)
+
+    expected = get_dashboard_data_sequential('coach', team_ids, users_service, DatastoreCollection())
+    stats_collection.queries = []
+    actual, processor = get_dashboard_data_parallel('coach', team_ids, users_service, DatastoreCollection())
+
+    assert actual == expected
+    assert len(stats_collection.queries) == 1
+    assert stats_collection.queries[0][1] == {'_id': 0, 'athlete_id': 1, 'metrics': 1}
+    assert set(processor.stage_seconds.keys()) == {'team_info', 'daily_plans', 'athlete_stats', 'aggregate'}
+
+
+def test_coach_on_team_is_forbidden(monkeypatch):
+
+    teams = get_teams(3, 2)
+    teams['team_1'][1].append('coach')
+    plan_collection, stats_collection = get_collections(teams)
+    set_collections(monkeypatch, plan_collection, stats_collection)
+
+    try:
+        get_dashboard_data_parallel('coach', list(teams.keys()), UsersService.with_teams('coach', teams), DatastoreCollection())
+        assert False
+    except ForbiddenException:
+        pass
@@ -0,0 +1,96 @@
+import utils
+from utils import parse_datetime, parse_datetimes, parse_date, format_date, format_dates
+from fathomapi.utils.exceptions import InvalidSchemaException
+from datetime import datetime, timedelta
+import datetime as datetime_module
+import types
+import pytz
+
+datetime_strings = [
+    "2019-03-04T05:06:07Z",
+    "2019-03-04T05:06:07.123Z",
+    "2019-03-04T05:06:07.123456Z",
+    "2019-03-04T05:06:07.5Z",
+    "2019-03-04T05:06:07",
+    "2019-03-04T05:06:07.123",
+    "2019-03-04T05:06:07.123456",
+    "2019-03-04T05:06:07+05:30",
+    "2019-03-04T05:06:07-07:00",
+    "2019-03-04T05:06:07+00:00",
+    "2019-03-04T05:06:07.123456-07:00",
+    "2019-03-04T05:06:07.123-0700",
+    "2019-3-4T5:6:7Z",
+    "2019-02-29T05:06:07Z",
+    "2019-03-04 05:06:07",
+    "2019-03-04",
+    "not a date"
+]
+date_strings = ["2019-03-04", "2019-3-4", "03/04/19", "2019-02-29", "2019-03", "04-03-2019"]
+
+
+def parse_without_fast_path(parse, string):
+    try:
+        return parse(string)
+    except InvalidSchemaException:
+        return 'invalid'
+
+
+def test_parsing_matches_strptime_formats():
+
+    for datetime_string in datetime_strings:
+        expected = parse_without_fast_path(utils._parse_datetime_formats, datetime_string)
+        actual = parse_without_fast_path(parse_datetime, datetime_string)
+        assert actual == expected, datetime_string
+        if expected != 'invalid':
+            assert actual.tzinfo.utcoffset(actual) == expected.tzinfo.utcoffset(expected)
+            assert actual.isoformat() == expected.isoformat()
+            assert parse_datetime(datetime_string) is actual
+
+    for date_string in date_strings:
+        assert parse_without_fast_path(parse_date, date_string) == parse_without_fast_path(utils._parse_date_formats, date_string)
+        assert format_date(date_string) == utils._format_date_value(date_string)
+
+
+def test_batches_match_single_calls():
+
+    date_time = datetime(2019, 3, 4, tzinfo=pytz.utc)
+    strings = ["2019-03-04T05:06:07Z", date_time, "2019-03-04T05:06:07Z", "2019-03-04T05:06:08.000123Z"]
+    assert parse_datetimes(strings) == [parse_datetime(s) for s in strings]
+    assert format_dates(["2019-03-04", date_time, None, "03/04/19"]) == ["2019-03-04", "2019-03-04", None, "2019-03-04"]
+
+
+class Python36Date(datetime_module.date):
+    @classmethod
+    def fromisoformat(cls, date_string):
+        raise AttributeError("type object 'datetime.date' has no attribute 'fromisoformat'")
+
+
+class Python36Datetime(datetime_module.datetime):
+    @classmethod
+    def fromisoformat(cls, date_string):
+        raise AttributeError("type object 'datetime.datetime' has no attribute 'fromisoformat'")
+
+
+def clear_parse_caches():
+    utils._format_date_string.cache_clear()
+    utils._parse_datetime_string.cache_clear()
+    utils._parse_date_string.cache_clear()
+
+
+def test_parsing_without_fromisoformat(monkeypatch):
+
+    expected_date_times = [parse_without_fast_path(parse_datetime, s) for s in datetime_strings]
+    expected_dates = [parse_without_fast_path(parse_date, s) for s in date_strings]
+    expected_formatted = [format_date(s) for s in date_strings]
+
+    monkeypatch.setattr(utils, 'datetime', types.SimpleNamespace(date=Python36Date,
+                                                                 datetime=Python36Datetime,
+                                                                 timedelta=timedelta))
+    monkeypatch.setattr(utils, '_has_fromisoformat', False)
+    clear_parse_caches()
+    try:
+        assert [parse_without_fast_path(parse_datetime, s) for s in datetime_strings] == expected_date_times
+        assert [parse_without_fast_path(parse_date, s) for s in date_strings] == expected_dates
+        assert [format_date(s) for s in date_strings] == expected_formatted
+    finally:
+        clear_parse_caches()
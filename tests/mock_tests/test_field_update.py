@@ -0,0 +1,121 @@
+from datastores import daily_plan_datastore, athlete_stats_datastore, field_update_datastore
+from datastores.datastore_collection import DatastoreCollection
+from models.daily_plan import DailyPlan
+from models.functional_movement_modalities import ModalityType
+from models.stats import AthleteStats
+from models.trigger import TriggerType
+from tests.mocks.mock_mongo_collection import MongoCollection
+import bson
+
+event_date = "2020-01-10"
+
+
+def get_plan_document(user_id):
+    plan = DailyPlan(event_date)
+    plan.user_id = user_id
+    document = plan.json_serialise()
+    document['insights'] = [{'trigger_type': t, 'read': False, 'text': 'Insight text ' * 20} for t in [7, 14, 7, 19]]
+    document['modalities'] = [{'type': ModalityType.warm_up.value, 'completed': True, 'start_date_time': None},
+                              {'type': ModalityType.warm_up.value, 'completed': False, 'start_date_time': None},
+                              {'type': ModalityType.cool_down.value, 'start_date_time': None}]
+    document['trends'] = {'insight_categories': [{'insight_type': 0, 'first_time_experience': True},
+                                                 {'insight_type': 1, 'first_time_experience': True}]}
+    return document
+
+
+def get_stats_document(athlete_id):
+    athlete_stats = AthleteStats(athlete_id)
+    athlete_stats.exposed_triggers = [TriggerType(7)]
+    return athlete_stats.json_serialise()
+
+
+def set_collections(monkeypatch):
+    plan_collection = MongoCollection([get_plan_document('tester'), get_plan_document('other')])
+    stats_collection = MongoCollection([get_stats_document('tester')])
+    monkeypatch.setattr(daily_plan_datastore, 'get_mongo_collection', lambda collection: plan_collection)
+    monkeypatch.setattr(athlete_stats_datastore, 'get_mongo_collection', lambda collection: stats_collection)
+    monkeypatch.setattr(field_update_datastore, 'get_mongo_collection',
+                        lambda collection: {'dailyplan': plan_collection, 'athletestats': stats_collection}[collection])
+    return plan_collection, stats_collection
+
+
+def test_mark_insights_read(monkeypatch):
+
+    plan_collection, stats_collection = set_collections(monkeypatch)
+    datastore = DatastoreCollection().daily_plan_datastore
+
+    assert datastore.mark_insights_read('tester', event_date, 7)
+    assert not datastore.mark_insights_read('tester', event_date, 7)
+    assert not datastore.mark_insights_read('tester', event_date, 3)
+
+    tester_plan, other_plan = [plan_collection.find_one({'user_id': u}) for u in ['tester', 'other']]
+    assert [i['read'] for i in tester_plan['insights']] == [True, False, True, False]
+    assert not any(i['read'] for i in other_plan['insights'])
+    # a positional $set per insight of type 7, then one that matches nothing, for each call
+    assert len(plan_collection.updates) == 3 + 1 + 1
+    assert all('$[' not in path for query, update in plan_collection.updates for path in update['$set'])
+
+
+def test_positional_set_with_element_match(monkeypatch):
+
+    plan_collection, stats_collection = set_collections(monkeypatch)
+    datastore = DatastoreCollection().daily_plan_datastore
+
+    for recovery_type in [ModalityType.warm_up.value, ModalityType.cool_down.value, ModalityType.ice.value]:
+        datastore.update('tester', event_date, set_fields={'modalities.$.start_date_time': '2020-01-10T12:00:00Z'},
+                         conditions={'modalities': {'$elemMatch': {'type': recovery_type, 'completed': {'$ne': True}}}})
+    datastore.update('tester', event_date, set_fields={'trends.insight_categories.$.first_time_experience': False},
+                     conditions={'trends.insight_categories.insight_type': 1})
+
+    plan = plan_collection.find_one({'user_id': 'tester'})
+    assert [m['start_date_time'] for m in plan['modalities']] == [None, '2020-01-10T12:00:00Z', '2020-01-10T12:00:00Z']
+    assert [c['first_time_experience'] for c in plan['trends']['insight_categories']] == [True, False]
+
+
+def test_add_to_set_and_set(monkeypatch):
+
+    plan_collection, stats_collection = set_collections(monkeypatch)
+    datastore = DatastoreCollection().athlete_stats_datastore
+
+    assert datastore.update('tester', add_to_set={'exposed_triggers': [7, 14, 19]})
+    assert datastore.update('tester', set_fields={'insight_categories': [{'insight_type': 0}]})
+    assert not datastore.update('nobody', add_to_set={'exposed_triggers': [7]})
+    assert not datastore.update('tester')
+
+    athlete_stats = datastore.get('tester')
+    assert athlete_stats.exposed_triggers == [7, 14, 19]
+    assert stats_collection.find_one({'athlete_id': 'tester'})['insight_categories'] == [{'insight_type': 0}]
+    assert len(stats_collection.updates) == 3
+
+
+def test_update_invalidates_request_cache(monkeypatch):
+
+    plan_collection, stats_collection = set_collections(monkeypatch)
+    datastore_collection = DatastoreCollection()
+
+    with datastore_collection.request_scope():
+        assert datastore_collection.athlete_stats_datastore.get('tester').exposed_triggers == [7]
+        plan_collection.find_count = 0
+        datastore_collection.daily_plan_datastore.get('tester', event_date, event_date)
+        datastore_collection.daily_plan_datastore.get('tester', event_date, event_date)
+        assert plan_collection.find_count == 1
+
+        datastore_collection.athlete_stats_datastore.update('tester', add_to_set={'exposed_triggers': [14]})
+        datastore_collection.daily_plan_datastore.update('tester', event_date, set_fields={'train_later': False})
+
+        assert datastore_collection.athlete_stats_datastore.get('tester').exposed_triggers == [7, 14]
+        datastore_collection.daily_plan_datastore.get('tester', event_date, event_date)
+        assert plan_collection.find_count == 2
+
+
+def test_update_payload_size(monkeypatch):
+
+    plan_collection, stats_collection = set_collections(monkeypatch)
+    datastore = DatastoreCollection().daily_plan_datastore
+
+    datastore.mark_insights_read('tester', event_date, 14)
+
+    query, update = plan_collection.updates[0]
+    update_bytes = len(bson.encode({'q': query, 'u': update}))
+    replace_bytes = len(bson.encode({'q': {'user_id': 'tester', 'date': event_date}, 'u': plan_collection.find_one({'user_id': 'tester'})}))
+    assert update_bytes * 5 < replace_bytes
@@ -0,0 +1,102 @@
+from models import functional_movement
+from models.functional_movement import FunctionalMovementFactory, FunctionalMovementActionMapping
+from models.functional_movement_type import FunctionalMovementType
+from models.movement_actions import ExerciseAction, MuscleAction, PrioritizedJointAction
+from models.training_volume import StandardErrorRange
+from datetime import datetime
+
+
+def get_exercise_action():
+
+    exercise_action = ExerciseAction("1", "squat")
+    exercise_action.primary_muscle_action = MuscleAction.concentric
+    exercise_action.hip_joint_action = [PrioritizedJointAction(1, FunctionalMovementType.hip_extension)]
+    exercise_action.knee_joint_action = [PrioritizedJointAction(1, FunctionalMovementType.knee_extension)]
+    exercise_action.ankle_joint_action = [PrioritizedJointAction(2, FunctionalMovementType.ankle_plantar_flexion)]
+    exercise_action.power_load_left = StandardErrorRange(observed_value=100)
+    exercise_action.power_load_right = StandardErrorRange(observed_value=100)
+    exercise_action.lower_body_stability_rating = 1.1
+    exercise_action.upper_body_stability_rating = 0.6
+
+    return exercise_action
+
+
+def test_functional_movement_dictionary_is_shared():
+
+    first = FunctionalMovementFactory().get_functional_movement_dictionary()
+    second = FunctionalMovementFactory().get_functional_movement_dictionary()
+
+    assert first is second
+    assert len(first) == len(FunctionalMovementFactory().build_functional_movement_dictionary())
+
+
+def test_functional_movement_dictionary_is_read_only():
+
+    functional_movement_dict = FunctionalMovementFactory().get_functional_movement_dictionary()
+    functional_movement = functional_movement_dict[FunctionalMovementType.hip_extension.value]
+
+    try:
+        functional_movement_dict[FunctionalMovementType.hip_extension.value] = None
+        assert False
+    except TypeError:
+        pass
+
+    try:
+        functional_movement.priority = 2
+        assert False
+    except AttributeError:
+        pass
+
+    try:
+        functional_movement.prime_movers.append(None)
+        assert False
+    except AttributeError:
+        pass
+
+
+def test_copy_on_write_dictionary_leaves_shared_movements_untouched():
+
+    factory = FunctionalMovementFactory()
+    shared_dict = factory.get_functional_movement_dictionary()
+    mutable_dict = factory.get_mutable_functional_movement_dictionary()
+    key = FunctionalMovementType.knee_flexion.value
+
+    assert mutable_dict[key] is shared_dict[key]
+
+    prime_mover_count = len(shared_dict[key].prime_movers)
+    functional_movement = mutable_dict.get_mutable(key)
+    functional_movement.priority = 3
+    functional_movement.prime_movers.append(functional_movement.prime_movers[0])
+
+    assert mutable_dict[key] is functional_movement
+    assert shared_dict[key].priority == 0
+    assert len(shared_dict[key].prime_movers) == prime_mover_count
+    assert len(mutable_dict) == len(shared_dict)
+
+
+def test_action_mapping_priorities_do_not_leak_into_shared_dictionary():
+
+    functional_movement_dict = FunctionalMovementFactory().get_functional_movement_dictionary()
+    mapping = FunctionalMovementActionMapping(get_exercise_action(), {}, datetime.now(), functional_movement_dict)
+
+    assert mapping.ankle_joint_functional_movements[0].functional_movement.priority == 2
+    assert functional_movement_dict[FunctionalMovementType.ankle_plantar_flexion.value].priority == 0
+
+
+def test_functional_movement_dictionary_is_built_once(monkeypatch):
+
+    monkeypatch.setattr(functional_movement, '_functional_movement_dictionary', None)
+    builds = []
+    build_functional_movement_dictionary = FunctionalMovementFactory.build_functional_movement_dictionary
+
+    def counting_build(factory):
+        builds.append(factory)
+        return build_functional_movement_dictionary(factory)
+
+    monkeypatch.setattr(FunctionalMovementFactory, 'build_functional_movement_dictionary', counting_build)
+
+    # a new factory for every session, as the processors create them
+    session_dictionaries = [FunctionalMovementFactory().get_functional_movement_dictionary() for _ in range(20)]
+
+    assert len(builds) == 1
+    assert all(d is session_dictionaries[0] for d in session_dictionaries)
@@ -1,6 +1,7 @@
 from models.heart_rate import HeartRateData, SessionHeartRate
 from logic.heart_rate_processing import HeartRateProcessing
 from datetime import datetime, timedelta
+from logic.calculators import Calculators
 from utils import format_datetime
 import random
 
@@ -71,3 +72,59 @@ def test_get_shrz_all_below_zone1():
     shrz = heart_rate_processing.get_shrz(heart_rate_list)
 
     assert shrz is not None
+
+
+def get_shrz_by_second(heart_rate_processing, heart_rate_data):
+
+    # reference implementation: fill each second one at a time and bucket each heart rate separately
+    max_heart_rate = heart_rate_processing.get_max_heart_rate()
+    heart_rate_data = sorted(heart_rate_data, key=lambda k: k.start_date)
+    full_heart_data = []
+
+    for h in range(0, len(heart_rate_data) - 1):
+        seconds_diff = (heart_rate_data[h + 1].start_date - heart_rate_data[h].start_date).seconds
+        full_heart_data.append(heart_rate_data[h].value)
+        for s in range(1, seconds_diff):
+            full_heart_data.append(((heart_rate_data[h + 1].value - heart_rate_data[h].value) / seconds_diff * s) + heart_rate_data[h].value)
+    full_heart_data.append(heart_rate_data[-1].value)
+
+    total_duration = 0
+    for h in full_heart_data:
+        for zone in range(1, 6):
+            upper_limit_reached = h <= max_heart_rate if zone == 5 else h < max_heart_rate * (0.5 + zone * 0.1)
+            if max_heart_rate * (0.4 + zone * 0.1) <= h and upper_limit_reached:
+                total_duration += zone
+
+    return max(1, round((total_duration / (len(full_heart_data) * 5)) * 10, 2)), len(full_heart_data)
+
+
+def test_get_shrz_matches_second_by_second_processing():
+
+    random.seed(4)
+    heart_rate_processing = HeartRateProcessing(30)
+
+    for low_value, high_value in [(60, 95), (103, 145), (145, 200)]:
+        heart_rate_list = get_heart_rate_data(low_value, high_value, 200)
+        # duplicate timestamps and uneven gaps
+        heart_rate_list.append(HeartRateData({'start_date': heart_rate_list[50].start_date,
+                                              'end_date': None, 'value': high_value}))
+        heart_rate_list[120].start_date = heart_rate_list[119].start_date + timedelta(seconds=37)
+
+        shrz, total_seconds = get_shrz_by_second(heart_rate_processing, heart_rate_list)
+
+        assert heart_rate_processing.get_shrz(heart_rate_list) == shrz
+        assert len(heart_rate_processing.extrapolate_heart_rate_data(heart_rate_list)) == total_seconds
+
+
+def test_get_zone_durations():
+
+    heart_rate_processing = HeartRateProcessing(30)  # max heart rate 187
+    start_date_time = datetime.now()
+    heart_rate_list = [HeartRateData({'start_date': format_datetime(start_date_time + timedelta(seconds=s)),
+                                      'end_date': None, 'value': v})
+                       for s, v in [(0, 90), (10, 100), (20, 120), (30, 140), (40, 160), (50, 180), (60, 190)]]
+
+    zone_durations = heart_rate_processing.get_zone_durations(heart_rate_list)
+
+    assert list(zone_durations) == [13, 9, 9, 10, 13]
+    assert Calculators.trimp_edwards(zone_durations) == (13 + 18 + 27 + 40 + 65) / 60.0
@@ -0,0 +1,242 @@
+from models.session import SportTrainingSession
+from datetime import datetime, timedelta
+import pytz
+from models.sport import SportName
+from models.soreness import Soreness
+from models.body_parts import BodyPart
+from models.soreness_base import BodyPartLocation
+from models.stats import AthleteStats
+from models.load_stats import LoadStats
+from models.athlete_injury_risk import InjuryRiskCheckpoint
+from models.user_stats import UserStats
+from logic.injury_risk_processing import InjuryRiskProcessor
+from logic.user_stats_processing import UserStatsProcessing
+from tests.mocks.mock_datastore_collection import DatastoreCollection
+from tests.mock_users import soreness_history as sh
+
+
+def get_sessions(dates, rpes, durations, sport_names):
+
+    sessions = []
+
+    for d in range(0, len(dates)):
+        session = SportTrainingSession()
+        session.event_date = dates[d]
+        session.session_RPE = rpes[d]
+        session.duration_minutes = durations[d]
+        session.sport_name = sport_names[d]
+        sessions.append(session)
+
+    return sessions
+
+
+def get_symptom(location, reported_date_time, tight=None, sharp=None):
+
+    soreness = Soreness()
+    soreness.body_part = BodyPart(BodyPartLocation(location), None)
+    soreness.side = 1
+    soreness.tight = tight
+    soreness.sharp = sharp
+    soreness.reported_date_time = reported_date_time
+
+    return soreness
+
+
+def get_history(now_date):
+
+    dates = [now_date - timedelta(days=12), now_date - timedelta(days=8), now_date - timedelta(days=3),
+             now_date - timedelta(days=1)]
+    sessions = get_sessions(dates, [5, 6, 4, 7], [100, 60, 45, 90], [SportName.distance_running] * 4)
+    symptoms = [get_symptom(6, dates[0], tight=1), get_symptom(7, dates[2], sharp=2)]
+
+    return sessions, symptoms
+
+
+def serialise_injury_risk_dict(injury_risk_dict):
+
+    return {body_part_side.to_string(): body_part_injury_risk.json_serialise() for body_part_side, body_part_injury_risk in injury_risk_dict.items()}
+
+
+def test_checkpoint_is_last_day_before_event_date():
+    now_date = datetime.now()
+    sessions, symptoms = get_history(now_date)
+
+    proc = InjuryRiskProcessor(now_date, symptoms, sessions, {}, AthleteStats('tester'), "tester")
+    proc.process(update_historical_data=True, create_checkpoint=True)
+
+    assert proc.checkpoint is not None
+    assert proc.checkpoint.last_processed_date == (now_date - timedelta(days=1)).date()
+    assert proc.checkpoint.event_date == now_date.date()
+    assert len(proc.checkpoint.items) > 0
+
+
+def test_resume_from_checkpoint_matches_full_replay():
+    now_date = datetime.now()
+    sessions, symptoms = get_history(now_date)
+
+    proc = InjuryRiskProcessor(now_date, list(symptoms), list(sessions), {}, AthleteStats('tester'), "tester")
+    proc.process(update_historical_data=True, create_checkpoint=True)
+    checkpoint = InjuryRiskCheckpoint.json_deserialise(proc.checkpoint.json_serialise())
+
+    # new data today
+    todays_sessions = get_sessions([now_date], [6], [75], [SportName.distance_running])
+    todays_symptoms = [get_symptom(7, now_date, sharp=3)]
+
+    full_proc = InjuryRiskProcessor(now_date, symptoms + todays_symptoms, sessions + todays_sessions, {},
+                                    AthleteStats('tester'), "tester")
+    full_injury_risk_dict = full_proc.process(update_historical_data=True)
+
+    resumed_proc = InjuryRiskProcessor(now_date, symptoms + todays_symptoms, sessions + todays_sessions, {},
+                                       AthleteStats('tester'), "tester")
+    resumed_injury_risk_dict = resumed_proc.process(update_historical_data=True, checkpoint=checkpoint,
+                                                    earliest_changed_date=now_date.date())
+
+    assert resumed_proc.checkpoint is checkpoint
+    assert serialise_injury_risk_dict(resumed_injury_risk_dict) == serialise_injury_risk_dict(full_injury_risk_dict)
+    assert resumed_proc.load_stats.json_serialise() == full_proc.load_stats.json_serialise()
+
+
+def test_resume_with_saved_load_stats_of_earlier_run():
+    now_date = datetime.now()
+    sessions, symptoms = get_history(now_date)
+
+    proc = InjuryRiskProcessor(now_date, list(symptoms), list(sessions), {}, AthleteStats('tester'), "tester")
+    proc.process(update_historical_data=True, create_checkpoint=True)
+    checkpoint = InjuryRiskCheckpoint.json_deserialise(proc.checkpoint.json_serialise())
+
+    # the first run's load stats are saved with the user's stats and passed to the next run
+    athlete_stats = AthleteStats('tester')
+    athlete_stats.load_stats = LoadStats.json_deserialise(proc.load_stats.json_serialise())
+
+    todays_sessions = get_sessions([now_date], [6], [75], [SportName.distance_running])
+    todays_symptoms = [get_symptom(7, now_date, sharp=3)]
+
+    full_proc = InjuryRiskProcessor(now_date, symptoms + todays_symptoms, sessions + todays_sessions, {},
+                                    AthleteStats('tester'), "tester")
+    full_injury_risk_dict = full_proc.process(update_historical_data=True)
+
+    resumed_proc = InjuryRiskProcessor(now_date, symptoms + todays_symptoms, sessions + todays_sessions, {},
+                                       athlete_stats, "tester")
+    resumed_injury_risk_dict = resumed_proc.process(update_historical_data=True, checkpoint=checkpoint,
+                                                    earliest_changed_date=now_date.date())
+
+    assert resumed_proc.checkpoint is checkpoint
+    assert serialise_injury_risk_dict(resumed_injury_risk_dict) == serialise_injury_risk_dict(full_injury_risk_dict)
+    assert resumed_proc.load_stats.json_serialise() == full_proc.load_stats.json_serialise()
+
+
+def test_checkpoint_ignored_when_earlier_data_changed():
+    now_date = datetime.now()
+    sessions, symptoms = get_history(now_date)
+
+    proc = InjuryRiskProcessor(now_date, symptoms, sessions, {}, AthleteStats('tester'), "tester")
+    proc.process(update_historical_data=True, create_checkpoint=True)
+    checkpoint = proc.checkpoint
+
+    proc = InjuryRiskProcessor(now_date, symptoms, sessions, {}, AthleteStats('tester'), "tester")
+    context_hash = proc.get_checkpoint_context_hash()
+
+    assert proc.can_resume_from_checkpoint(checkpoint, now_date.date(), context_hash)
+    assert not proc.can_resume_from_checkpoint(checkpoint, checkpoint.last_processed_date, context_hash)
+    assert not proc.can_resume_from_checkpoint(checkpoint, None, context_hash)
+
+    tomorrows_proc = InjuryRiskProcessor(now_date + timedelta(days=1), symptoms, sessions, {}, AthleteStats('tester'),
+                                         "tester")
+    assert not tomorrows_proc.can_resume_from_checkpoint(checkpoint, now_date.date(),
+                                                         tomorrows_proc.get_checkpoint_context_hash())
+
+
+def get_mock_user_history(start_date):
+    """
+    Sessions and symptoms of the run_a mock user (tests/mock_users/create_test_user_history.py) over 35 days, with
+    the knee soreness of persona 1, painful soreness reported as sharp and the rest as tight
+    """
+    rpes = [5, None, None, 5, None, 3, None,
+            4, None, 6, None, 5, 5, None,
+            None, 4, None, 3, 5, None, None,
+            6, None, 5, None, 4, None, 3,
+            5, None, 6, None, 5, 4, 6]
+    soreness_history = [sh.create_body_part_history(sh.persistent2_question(), 7, 2, True),
+                        sh.create_body_part_history(sh.acute_pain_no_question(), 7, 1, True),
+                        sh.create_body_part_history(sh.persistent_soreness_no_question(), 16, 1, False)]
+
+    sessions = []
+    symptoms = []
+    for day in range(35):
+        event_date = start_date + timedelta(days=day)
+        if rpes[day] is not None:
+            # as Persona.add_session
+            sessions.extend(get_sessions([event_date + timedelta(minutes=40)], [rpes[day]], [30], [SportName(72)]))
+        for body_part in soreness_history:
+            severity = body_part['severity'][day]
+            if severity is not None:
+                if body_part['pain']:
+                    symptom = get_symptom(body_part['body_part'], event_date, sharp=severity)
+                else:
+                    symptom = get_symptom(body_part['body_part'], event_date, tight=severity)
+                symptom.side = body_part['side']
+                symptoms.append(symptom)
+
+    return sessions, symptoms
+
+
+def test_resume_matches_full_replay_over_mock_user_history():
+    start_date = datetime(2020, 3, 2, 9)
+    sessions, symptoms = get_mock_user_history(start_date)
+
+    resumed_days = 0
+    for day in range(7, 35):
+        event_date = start_date + timedelta(days=day)
+        earlier_sessions = [s for s in sessions if s.event_date.date() < event_date.date()]
+        earlier_symptoms = [s for s in symptoms if s.reported_date_time.date() < event_date.date()]
+        todays_sessions = [s for s in sessions if s.event_date.date() == event_date.date()]
+        todays_symptoms = [s for s in symptoms if s.reported_date_time.date() == event_date.date()]
+        if len(todays_sessions) + len(todays_symptoms) == 0:
+            continue
+
+        # the first run of the day, before today's data is in, leaves a checkpoint for today's later runs
+        nightly_proc = InjuryRiskProcessor(event_date, list(earlier_symptoms), list(earlier_sessions), {},
+                                           AthleteStats('tester'), "tester")
+        nightly_proc.process(update_historical_data=True, create_checkpoint=True)
+        checkpoint = InjuryRiskCheckpoint.json_deserialise(nightly_proc.checkpoint.json_serialise())
+        athlete_stats = AthleteStats('tester')
+        athlete_stats.load_stats = LoadStats.json_deserialise(nightly_proc.load_stats.json_serialise())
+
+        full_proc = InjuryRiskProcessor(event_date, earlier_symptoms + todays_symptoms,
+                                        earlier_sessions + todays_sessions, {}, AthleteStats('tester'), "tester")
+        full_injury_risk_dict = full_proc.process(update_historical_data=True)
+
+        resumed_proc = InjuryRiskProcessor(event_date, earlier_symptoms + todays_symptoms,
+                                           earlier_sessions + todays_sessions, {}, athlete_stats, "tester")
+        resumed_injury_risk_dict = resumed_proc.process(update_historical_data=True, checkpoint=checkpoint,
+                                                        earliest_changed_date=event_date.date())
+
+        assert resumed_proc.checkpoint is checkpoint, event_date
+        assert serialise_injury_risk_dict(resumed_injury_risk_dict) == serialise_injury_risk_dict(full_injury_risk_dict), event_date
+        assert resumed_proc.load_stats.json_serialise() == full_proc.load_stats.json_serialise(), event_date
+        resumed_days += 1
+
+    assert resumed_days > 15
+
+
+def test_no_checkpoint_without_earliest_changed_date():
+    now_date = datetime.now(pytz.utc)
+    sessions, symptoms = get_history(now_date)
+
+    proc = InjuryRiskProcessor(now_date, symptoms, sessions, {}, AthleteStats('tester'), "tester")
+    proc.process(update_historical_data=True)
+    assert proc.checkpoint is None
+
+    # the stats processors only read and write checkpoints for callers that say what changed
+    datastore_collection = DatastoreCollection()
+    datastore_collection.symptom_datastore.side_load(symptoms)
+    datastore_collection.training_session_datastore.side_load(sessions)
+    user_stats = UserStats('tester')
+    user_stats.event_date = now_date - timedelta(days=1)
+    UserStatsProcessing('tester', now_date, datastore_collection).process_user_stats(current_user_stats=user_stats)
+    assert datastore_collection.injury_risk_checkpoint_datastore.checkpoints == {}
+
+    user_stats.event_date = now_date
+    UserStatsProcessing('tester', now_date, datastore_collection).process_user_stats(
+        current_user_stats=user_stats, force_historical_process=True, earliest_changed_date=now_date.date())
+    assert datastore_collection.injury_risk_checkpoint_datastore.checkpoints['tester'].event_date == now_date.date()
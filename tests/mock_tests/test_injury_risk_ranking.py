@@ -0,0 +1,417 @@
+from logic import injury_risk_processing
+from logic.injury_risk_processing import InjuryRiskProcessor
+from logic.injury_risk_ranking import InjuryRiskRanking, RankingMode
+from models.body_part_injury_risk import BodyPartInjuryRisk
+from models.session import SportTrainingSession
+from models.sport import SportName
+from models.stats import AthleteStats
+from models.soreness_base import BodyPartSide, BodyPartLocation
+from models.training_volume import StandardErrorRange
+from datetime import date, datetime, timedelta
+import numpy as np
+import pickle
+import random
+
+base_date = date(2020, 3, 10)
+tier_attributes = ['total_compensation_percent_tier', 'eccentric_compensation_percent_tier', 'total_volume_percent_tier',
+                   'eccentric_volume_percent_tier', 'limited_mobility_tier', 'underactive_weak_tier',
+                   'last_excessive_strain_date', 'last_inhibited_date', 'last_non_functional_overreaching_date',
+                   'last_functional_overreaching_date']
+
+
+def get_error_range(random_generator, values):
+    observed_value = random_generator.choice(values)
+    error_range = StandardErrorRange(observed_value=observed_value)
+    if observed_value > 0 and random_generator.random() < .5:
+        error_range.lower_bound = observed_value - random_generator.choice([0, 1, 2.5])
+        error_range.upper_bound = observed_value + random_generator.choice([0, 1, 2.5])
+    return error_range
+
+
+def get_injury_risk_dict(random_generator, body_parts=60):
+    # few distinct values, so ties and values on the thresholds are common
+    values = [0, 0, 0, 1, 2, 3, 4, 5.5, 8, 10, 12.25, 40] if random_generator.random() < .9 else [0]
+    injury_risk_dict = {}
+    for location in list(BodyPartLocation)[:body_parts]:
+        body_part_injury_risk = BodyPartInjuryRisk()
+        body_part_injury_risk.total_compensation_percent = get_error_range(random_generator, values)
+        body_part_injury_risk.eccentric_compensation_percent = get_error_range(random_generator, values)
+        body_part_injury_risk.concentric_volume_today = get_error_range(random_generator, values)
+        body_part_injury_risk.isometric_volume_today = get_error_range(random_generator, values)
+        body_part_injury_risk.eccentric_volume_today = get_error_range(random_generator, values)
+        for attribute in ['overactive_long_count_last_0_20_days', 'overactive_short_count_last_0_20_days',
+                          'underactive_short_count_last_0_20_days', 'underactive_long_count_last_0_20_days',
+                          'weak_count_last_0_20_days']:
+            setattr(body_part_injury_risk, attribute, random_generator.choice([0, 0, 0, 1, 2, 3, 4]))
+        for attribute in ['overactive_long_vote_count', 'overactive_short_vote_count', 'underactive_short_vote_count',
+                          'underactive_long_vote_count', 'weak_vote_count']:
+            setattr(body_part_injury_risk, attribute, random_generator.choice([0, 0, 0, 1]))
+        for attribute in ['last_non_functional_overreaching_date', 'last_altered_joint_arthokinematics_date',
+                          'last_tendinopathy_date', 'last_tendinosis_date']:
+            setattr(body_part_injury_risk, attribute, random_generator.choice([None, None, base_date, base_date - timedelta(days=1)]))
+        body_part_injury_risk.total_volume_percent_tier = random_generator.choice([0, 1, 4])
+        injury_risk_dict[BodyPartSide(location, random_generator.choice([0, 1, 2]))] = body_part_injury_risk
+    return injury_risk_dict
+
+
+# update_injury_risk_dict_rankings walking the dict for each metric, then again for each body part's tiers
+def rank_in_loops(injury_risk_dict, base_date, relative_load_level):
+
+    total_compensation_muscles = [c.total_compensation_percent for c in injury_risk_dict.values() if c.total_compensation_percent.observed_value > 0]
+    eccentric_compensation_muscles = [c.eccentric_compensation_percent for c in injury_risk_dict.values() if c.eccentric_compensation_percent.observed_value > 0]
+    total_volume_muscles = [c.total_volume_today() for c in injury_risk_dict.values() if
+                                  c.total_volume_today().observed_value > 0]
+    eccentric_volume_muscles = [c.eccentric_volume_today for c in injury_risk_dict.values() if
+                                      c.eccentric_volume_today.observed_value > 0]
+
+    max_total_compensation = None
+    max_eccentric_compensation = None
+    max_total_volume = None
+    max_eccentric_volume = None
+
+    two_days_ago = base_date - timedelta(days=1)
+
+    if len(total_compensation_muscles) > 0:
+        min_total_compensation = StandardErrorRange().get_min_from_error_range_list(total_compensation_muscles)
+        max_total_compensation = StandardErrorRange().get_max_from_error_range_list(total_compensation_muscles)
+        total_compensation_tier = ((max_total_compensation - min_total_compensation) / 4)
+        total_compensation_tier_1 = max_total_compensation - total_compensation_tier
+        total_compensation_tier_2 = max_total_compensation - (2 * total_compensation_tier)
+        total_compensation_tier_3 = max_total_compensation - (3 * total_compensation_tier)
+
+    if len(eccentric_compensation_muscles) > 0:
+        min_eccentric_compensation = StandardErrorRange().get_min_from_error_range_list(eccentric_compensation_muscles)
+        max_eccentric_compensation = StandardErrorRange().get_max_from_error_range_list(eccentric_compensation_muscles)
+        eccentric_compensation_tier = ((max_eccentric_compensation - min_eccentric_compensation) / 4)
+        eccentric_compensation_tier_1 = max_eccentric_compensation - eccentric_compensation_tier
+        eccentric_compensation_tier_2 = max_eccentric_compensation - (2 * eccentric_compensation_tier)
+        eccentric_compensation_tier_3 = max_eccentric_compensation - (3 * eccentric_compensation_tier)
+
+    if len(total_volume_muscles) > 0:
+        min_total_volume = StandardErrorRange().get_min_from_error_range_list(total_volume_muscles)
+        max_total_volume = StandardErrorRange().get_max_from_error_range_list(total_volume_muscles)
+        total_volume_tier = ((max_total_volume - min_total_volume) / 4)
+        total_volume_tier_1 = max_total_volume - total_volume_tier
+        total_volume_tier_2 = max_total_volume - (2 * total_volume_tier)
+        total_volume_tier_3 = max_total_volume - (3 * total_volume_tier)
+
+    if len(eccentric_volume_muscles) > 0:
+        min_eccentric_volume = StandardErrorRange().get_min_from_error_range_list(eccentric_volume_muscles)
+        max_eccentric_volume = StandardErrorRange().get_max_from_error_range_list(eccentric_volume_muscles)
+        eccentric_volume_tier = ((max_eccentric_volume - min_eccentric_volume) / 4)
+        eccentric_volume_tier_1 = max_eccentric_volume - eccentric_volume_tier
+        eccentric_volume_tier_2 = max_eccentric_volume - (2 * eccentric_volume_tier)
+        eccentric_volume_tier_3 = max_eccentric_volume - (3 * eccentric_volume_tier)
+
+    for body_part_side, body_part_injury_risk in injury_risk_dict.items():
+        body_part_injury_risk.total_compensation_percent_tier = 0
+        body_part_injury_risk.eccentric_compensation_percent_tier = 0
+        body_part_injury_risk.total_volume_percent_tier = 0
+        body_part_injury_risk.eccentric_volume_percent_tier = 0
+        body_part_injury_risk.limited_mobility_tier = 0
+        body_part_injury_risk.underactive_weak_tier = 0
+
+    if max_total_compensation is not None or max_eccentric_compensation is not None or max_total_volume is not None or max_eccentric_volume is not None:
+
+        for body_part_side, body_part_injury_risk in injury_risk_dict.items():
+            if relative_load_level == 1:
+                if max_total_compensation is not None:
+                    if body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_1:
+                        body_part_injury_risk.total_compensation_percent_tier = 1
+                    elif body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_2:
+                        body_part_injury_risk.total_compensation_percent_tier = 2
+                    elif body_part_injury_risk.total_compensation_percent.lowest_value() >= min_total_compensation:
+                        body_part_injury_risk.total_compensation_percent_tier = 3
+                    # elif body_part_injury_risk.total_compensation_percent >= min_total_compensation:
+                    #     body_part_injury_risk.total_compensation_percent_tier = 4
+                else:
+                    body_part_injury_risk.total_compensation_percent_tier = 0
+
+                if max_eccentric_compensation is not None:
+                    if body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_1:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 1
+                    elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_2:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 2
+                    elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= min_eccentric_compensation:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 3
+                    # elif body_part_injury_risk.eccentric_compensation_percent >= min_eccentric_compensation:
+                    #     body_part_injury_risk.eccentric_compensation_percent_tier = 4
+                else:
+                    body_part_injury_risk.eccentric_compensation_percent_tier = 0
+
+            elif relative_load_level == 2:
+                if max_total_compensation is not None:
+                    if body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_1:
+                        body_part_injury_risk.total_compensation_percent_tier = 2
+                    elif body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_2:
+                        body_part_injury_risk.total_compensation_percent_tier = 3
+                    elif body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_3:
+                        body_part_injury_risk.total_compensation_percent_tier = 4
+                    elif body_part_injury_risk.total_compensation_percent.lowest_value() >= min_total_compensation:
+                        body_part_injury_risk.total_compensation_percent_tier = 5
+                else:
+                    body_part_injury_risk.total_compensation_percent_tier = 0
+
+                if max_eccentric_compensation is not None:
+                    if body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_1:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 2
+                    elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_2:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 3
+                    elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_3:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 4
+                    elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= min_eccentric_compensation:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 5
+                else:
+                    body_part_injury_risk.eccentric_compensation_percent_tier = 0
+
+            else:  # relative load 3
+                if max_total_compensation is not None:
+                    if body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_1:
+                        body_part_injury_risk.total_compensation_percent_tier = 3
+                    elif body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_2:
+                        body_part_injury_risk.total_compensation_percent_tier = 4
+                    elif body_part_injury_risk.total_compensation_percent.lowest_value() >= total_compensation_tier_3:
+                        body_part_injury_risk.total_compensation_percent_tier = 5
+                    elif body_part_injury_risk.total_compensation_percent.lowest_value() >= min_total_compensation:
+                        body_part_injury_risk.total_compensation_percent_tier = 0
+                    else:
+                        body_part_injury_risk.total_compensation_percent_tier = 0
+                else:
+                    body_part_injury_risk.total_compensation_percent_tier = 0
+
+                if max_eccentric_compensation is not None:
+                    if body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_1:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 3
+                    elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_2:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 4
+                    elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= eccentric_compensation_tier_3:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 5
+                    elif body_part_injury_risk.eccentric_compensation_percent.lowest_value() >= min_eccentric_compensation:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 0
+                    else:
+                        body_part_injury_risk.eccentric_compensation_percent_tier = 0
+
+                else:
+                    body_part_injury_risk.eccentric_compensation_percent_tier = 0
+
+            if max_total_volume is not None:
+                total_volume_today = body_part_injury_risk.total_volume_today()
+
+                if relative_load_level == 1:
+
+                    if total_volume_today.lowest_value() >= total_volume_tier_1:
+                        body_part_injury_risk.total_volume_percent_tier = 1
+                        body_part_injury_risk.last_excessive_strain_date = base_date
+                        body_part_injury_risk.last_inhibited_date = base_date
+                        body_part_injury_risk.last_non_functional_overreaching_date = base_date
+
+                    elif total_volume_today.lowest_value() >= total_volume_tier_2:
+                        body_part_injury_risk.total_volume_percent_tier = 2
+                        body_part_injury_risk.last_excessive_strain_date = base_date
+                        body_part_injury_risk.last_inhibited_date = base_date
+                        body_part_injury_risk.last_functional_overreaching_date = base_date
+
+                    elif total_volume_today.lowest_value() >= total_volume_tier_3:
+                        body_part_injury_risk.total_volume_percent_tier = 3
+
+                    elif total_volume_today.lowest_value() >= min_total_volume:
+                        body_part_injury_risk.total_volume_percent_tier = 4
+
+                elif relative_load_level == 2:
+                    if total_volume_today.lowest_value() >= total_volume_tier_1:
+                        body_part_injury_risk.total_volume_percent_tier = 2
+                        body_part_injury_risk.last_excessive_strain_date = base_date
+                        body_part_injury_risk.last_inhibited_date = base_date
+                        body_part_injury_risk.last_functional_overreaching_date = base_date
+
+                    elif total_volume_today.lowest_value() >= total_volume_tier_2:
+                        body_part_injury_risk.total_volume_percent_tier = 3
+
+                    elif total_volume_today.lowest_value() >= total_volume_tier_3:
+                        body_part_injury_risk.total_volume_percent_tier = 4
+
+                    elif total_volume_today.lowest_value() >= min_total_volume:
+                        body_part_injury_risk.total_volume_percent_tier = 5
+
+                else:
+                    if total_volume_today.lowest_value() >= total_volume_tier_1:
+                        body_part_injury_risk.total_volume_percent_tier = 3
+
+                    elif total_volume_today.lowest_value() >= total_volume_tier_2:
+                        body_part_injury_risk.total_volume_percent_tier = 4
+
+                    elif total_volume_today.lowest_value() >= total_volume_tier_3:
+                        body_part_injury_risk.total_volume_percent_tier = 5
+
+                    elif total_volume_today.lowest_value() >= min_total_volume:
+                        body_part_injury_risk.total_volume_percent_tier = 0
+
+            else:
+                if body_part_injury_risk.last_non_functional_overreaching_date == two_days_ago:
+                    if body_part_injury_risk.total_volume_percent_tier == 0:
+                        body_part_injury_risk.total_volume_percent_tier = 3
+                    else:
+                        body_part_injury_risk.total_volume_percent_tier = min(body_part_injury_risk.total_volume_percent_tier, 3)
+                else:
+                    body_part_injury_risk.total_volume_percent_tier = 0
+
+            if max_eccentric_volume is not None:
+                eccentric_volume_today = body_part_injury_risk.eccentric_volume_today
+
+                if eccentric_volume_today.lowest_value() >= eccentric_volume_tier_1:
+                    body_part_injury_risk.eccentric_volume_percent_tier = 1
+                elif eccentric_volume_today.lowest_value() >= eccentric_volume_tier_2:
+                    body_part_injury_risk.eccentric_volume_percent_tier = 2
+                elif eccentric_volume_today.lowest_value() >= eccentric_volume_tier_3:
+                    body_part_injury_risk.eccentric_volume_percent_tier = 3
+                elif eccentric_volume_today.lowest_value() >= min_eccentric_volume:
+                    body_part_injury_risk.eccentric_volume_percent_tier = 4
+            else:
+                body_part_injury_risk.eccentric_volume_percent_tier = 0
+
+    # add prevention and delayed excessive strain ranking
+    for body_part_side, body_part_injury_risk in injury_risk_dict.items():
+        if body_part_injury_risk.last_non_functional_overreaching_date == two_days_ago:
+            if body_part_injury_risk.total_volume_percent_tier == 0:
+                body_part_injury_risk.total_volume_percent_tier = 3
+            else:
+                body_part_injury_risk.total_volume_percent_tier = min(body_part_injury_risk.total_volume_percent_tier, 3)
+        if (body_part_injury_risk.overactive_long_count_last_0_20_days >= 3 or
+                body_part_injury_risk.overactive_short_count_last_0_20_days >= 3 or
+                body_part_injury_risk.underactive_short_count_last_0_20_days >= 3):
+            # create tier 1
+            body_part_injury_risk.limited_mobility_tier = 1
+        elif (body_part_injury_risk.overactive_long_count_last_0_20_days < 3 and
+                body_part_injury_risk.overactive_short_count_last_0_20_days < 3 and
+                body_part_injury_risk.underactive_short_count_last_0_20_days < 3):
+            if (body_part_injury_risk.overactive_long_count_last_0_20_days > 0 or
+                    body_part_injury_risk.overactive_short_count_last_0_20_days > 0 or
+                    body_part_injury_risk.underactive_short_count_last_0_20_days > 0):
+                # create tier two
+                body_part_injury_risk.limited_mobility_tier = 2
+            elif (body_part_injury_risk.overactive_long_vote_count > 0 or
+                    body_part_injury_risk.overactive_short_vote_count > 0 or
+                    body_part_injury_risk.underactive_short_vote_count > 0):
+                # create tier 3
+                body_part_injury_risk.limited_mobility_tier = 3
+
+        # include joint and ligament issues
+        if (body_part_injury_risk.last_altered_joint_arthokinematics_date is not None and
+                body_part_injury_risk.last_altered_joint_arthokinematics_date == base_date):
+            body_part_injury_risk.limited_mobility_tier = 1
+
+        if ((body_part_injury_risk.last_tendinopathy_date is not None and
+             body_part_injury_risk.last_tendinopathy_date == base_date) or
+                (body_part_injury_risk.last_tendinosis_date is not None and
+                 body_part_injury_risk.last_tendinosis_date == base_date)):
+            body_part_injury_risk.limited_mobility_tier = 1
+
+        # add prevention ranking
+        if (body_part_injury_risk.underactive_long_count_last_0_20_days >= 3 or
+                body_part_injury_risk.weak_count_last_0_20_days >= 3):
+            # create tier 1
+            body_part_injury_risk.underactive_weak_tier = 1
+        elif (body_part_injury_risk.underactive_long_count_last_0_20_days < 3 and
+                body_part_injury_risk.weak_count_last_0_20_days < 3):
+            if (body_part_injury_risk.underactive_long_count_last_0_20_days > 0 or
+                    body_part_injury_risk.weak_count_last_0_20_days > 0):
+                # create tier two
+                body_part_injury_risk.underactive_weak_tier = 2
+            elif (body_part_injury_risk.underactive_long_vote_count > 0 or
+                    body_part_injury_risk.weak_vote_count > 0):
+                # create tier 3
+                body_part_injury_risk.underactive_weak_tier = 3
+
+    return injury_risk_dict
+
+
+def test_thresholds_match_error_range_lists():
+
+    random_generator = random.Random(3)
+    for scenario in range(50):
+        error_ranges = [get_error_range(random_generator, [0, 1, 2, 7.5, 9]) for i in range(10)]
+        ranked = [e for e in error_ranges if e.observed_value > 0]
+        ranking = InjuryRiskRanking({i: BodyPartInjuryRisk() for i in range(len(error_ranges))})
+        ranking.ranges['total_volume'][:] = [(e.lower_bound, e.observed_value, e.upper_bound) for e in error_ranges]
+        thresholds = InjuryRiskRanking.get_thresholds(ranking.ranges['total_volume'])
+        if len(ranked) == 0:
+            assert thresholds is None
+        else:
+            assert thresholds[3] == StandardErrorRange.get_min_from_error_range_list(ranked)
+            assert thresholds[0] == StandardErrorRange.get_max_from_error_range_list(ranked) - (StandardErrorRange.get_max_from_error_range_list(ranked) - thresholds[3]) / 4
+
+
+def test_total_volume_matches_error_range_sums():
+
+    random_generator = random.Random(7)
+    injury_risk_dict = get_injury_risk_dict(random_generator)
+    for body_part_injury_risk in list(injury_risk_dict.values())[::3]:
+        body_part_injury_risk.isometric_volume_today = StandardErrorRange()
+        body_part_injury_risk.concentric_volume_today.lower_bound = None
+    ranking = InjuryRiskRanking(injury_risk_dict)
+    for body_part_injury_risk, (lower_bound, observed_value, upper_bound) in zip(injury_risk_dict.values(), ranking.ranges['total_volume'].tolist()):
+        total_volume = body_part_injury_risk.total_volume_today()
+        for expected, actual in [(total_volume.lower_bound, lower_bound), (total_volume.observed_value, observed_value),
+                                 (total_volume.upper_bound, upper_bound)]:
+            assert (expected is None and np.isnan(actual)) or expected == actual
+
+
+def test_rankings_match_loops():
+
+    random_generator = random.Random(12)
+    for scenario in range(150):
+        expected = get_injury_risk_dict(random_generator, body_parts=random_generator.randint(0, 40))
+        relative_load_level = random_generator.choice([1, 2, 3])
+        actual = pickle.loads(pickle.dumps(expected, -1))
+        rank_in_loops(expected, base_date, relative_load_level)
+        InjuryRiskRanking(actual).rank(relative_load_level, base_date)
+        for body_part_side in expected:
+            for attribute in tier_attributes:
+                assert getattr(actual[body_part_side], attribute) == getattr(expected[body_part_side], attribute)
+                assert type(getattr(actual[body_part_side], attribute)) == type(getattr(expected[body_part_side], attribute))
+
+
+def test_chain_positions_follow_first_threshold_reached():
+
+    # the minimum above the bottom quarter threshold, as rounding can leave it
+    thresholds = [3.0, 2.0, 1.0, 1.5]
+    values = np.array([3.5, 2.0, 1.2, 1.0, 0.5, np.nan])
+    assert InjuryRiskRanking.get_chain_positions(values, thresholds, [(0, 1), (1, 2), (2, 3), (3, 4)]).tolist() == [0, 1, 2, 2, 4, 4]
+    assert InjuryRiskRanking.get_chain_positions(values, thresholds, [(0, 1), (1, 2), (3, 3)]).tolist() == [0, 1, 3, 3, 3, 3]
+
+
+def test_end_of_day_mode_ranks_once_a_day(monkeypatch):
+
+    rank_dates = []
+
+    class CountingRanking(InjuryRiskRanking):
+        def rank(self, relative_load_level, base_date):
+            rank_dates.append(base_date)
+            super().rank(relative_load_level, base_date)
+
+    monkeypatch.setattr(injury_risk_processing, 'InjuryRiskRanking', CountingRanking)
+    now_date = datetime(2020, 3, 10, 12)
+    dates = [now_date - timedelta(days=5, hours=h) for h in [0, 3, 6]] + [now_date - timedelta(days=2)]
+    sessions = []
+    for session_date in dates:
+        session = SportTrainingSession()
+        session.event_date = session_date
+        session.session_RPE = 5
+        session.duration_minutes = 60
+        session.sport_name = SportName.distance_running
+        sessions.append(session)
+
+    counts = {}
+    context_hashes = {}
+    for ranking_mode in RankingMode:
+        rank_dates.clear()
+        proc = InjuryRiskProcessor(now_date, [], list(sessions), {}, AthleteStats('tester'), 'tester',
+                                   ranking_mode=ranking_mode)
+        proc.process(update_historical_data=True)
+        counts[ranking_mode] = len(rank_dates)
+        context_hashes[ranking_mode] = proc.get_checkpoint_context_hash()
+
+    # after each session, then the day's merged sessions, then today
+    assert counts[RankingMode.each_session] == 4 + 2 + 1
+    assert counts[RankingMode.end_of_day] == 2 + 2 + 1
+    assert context_hashes[RankingMode.each_session] != context_hashes[RankingMode.end_of_day]
@@ -0,0 +1,74 @@
+from datastores.action_library_datastore import ActionLibraryDatastore, compile_actions
+from datastores.library_snapshot import read_library, write_library_snapshot
+from datastores.movement_library_datastore import MovementLibraryDatastore
+import json
+import os
+import shutil
+
+
+def copy_action_library(tmp_path):
+
+    file_path = os.path.join(str(tmp_path), 'actions_library.json')
+    shutil.copyfile(ActionLibraryDatastore._get_file_path(), file_path)
+
+    return file_path
+
+
+def fail_to_compile(library):
+    raise AssertionError("library compiled instead of read from the snapshot")
+
+
+def test_library_is_compiled_without_snapshot(tmp_path):
+
+    file_path = copy_action_library(tmp_path)
+    actions = read_library(file_path, compile_actions)
+
+    assert set(actions.keys()) == set(ActionLibraryDatastore().get().keys())
+
+
+def test_library_is_read_from_snapshot(tmp_path):
+
+    file_path = copy_action_library(tmp_path)
+    write_library_snapshot(file_path, compile_actions)
+    actions = read_library(file_path, fail_to_compile)
+    compiled_actions = read_library(file_path, compile_actions)
+
+    for action_id, action in actions.items():
+        assert action.json_serialise() == compiled_actions[action_id].json_serialise()
+
+
+def test_stale_snapshot_is_ignored(tmp_path):
+
+    file_path = copy_action_library(tmp_path)
+    write_library_snapshot(file_path, compile_actions)
+    with open(file_path, 'r') as f:
+        all_actions = json.load(f)
+    first_action_id = list(all_actions)[0]
+    all_actions[first_action_id]['name'] = 'renamed'
+    with open(file_path, 'w') as f:
+        json.dump(all_actions, f)
+
+    assert read_library(file_path, compile_actions)[first_action_id].name == 'renamed'
+
+
+def test_library_copies_are_independent():
+
+    actions = ActionLibraryDatastore().get_compiled()
+    action = next(iter(actions.values()))
+    original = action.json_serialise()
+
+    action_copy = action.copy()
+    action_copy.tissue_load_left.add(action_copy.tissue_load_left.plagiarize())
+    action_copy.tissue_load_left.observed_value = 100
+    action_copy.lateral_distribution.append(50)
+    action_copy.hip_joint_action.clear()
+    action_copy.training_volume_left = 10
+
+    assert action.json_serialise() == original
+
+    movement = next(iter(MovementLibraryDatastore().get_compiled().values()))
+    movement_copy = movement.copy()
+    movement_copy.external_weight_implement.append(None)
+    movement_copy.primary_actions.append('0')
+    assert None not in movement.external_weight_implement
+    assert '0' not in movement.primary_actions
@@ -0,0 +1,162 @@
+from datastores import ml_model_datastore
+from datastores.ml_model_datastore import MLModelsDatastore, LocalModelSource, S3ModelSource, hr_rpe_model_filename, bodyweight_ratio_model_filename
+from botocore.exceptions import EndpointConnectionError, NoCredentialsError
+from fathomapi.utils.exceptions import ApplicationException
+import hashlib
+import joblib
+import numpy as np
+import os
+import shutil
+import threading
+
+
+class GatedModelSource(LocalModelSource):
+    """
+    Holds each download until the gate is open, recording which thread asked for it
+    """
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.downloads = []
+        self.download_threads = []
+        self.download_started = threading.Semaphore(0)
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def download_file(self, model_filename, file_location):
+        self.download_threads.append(threading.current_thread().name)
+        self.download_started.release()
+        assert self.gate.wait(timeout=10)
+        self.downloads.append(model_filename)
+        super().download_file(model_filename, file_location)
+
+
+def set_up_models(tmp_path, monkeypatch, checksums=True):
+
+    source_directory = os.path.join(str(tmp_path), 'bucket')
+    cache_directory = os.path.join(str(tmp_path), 'cache')
+    os.mkdir(source_directory)
+    os.mkdir(cache_directory)
+    for index, model_filename in enumerate([hr_rpe_model_filename, bodyweight_ratio_model_filename]):
+        joblib.dump({'weights': np.arange(1000, dtype=float) * index}, os.path.join(source_directory, model_filename))
+        if checksums:
+            with open(os.path.join(source_directory, model_filename), 'rb') as f:
+                checksum = hashlib.sha256(f.read()).hexdigest()
+            with open(os.path.join(source_directory, model_filename + '.sha256'), 'w') as f:
+                f.write(f'{checksum}  {model_filename}\n')
+
+    source = GatedModelSource(source_directory)
+    monkeypatch.setattr(ml_model_datastore, '_model_futures', {})
+    monkeypatch.setattr(ml_model_datastore, '_load_metrics', {})
+    monkeypatch.setattr(MLModelsDatastore, 'source', source)
+    monkeypatch.setattr(MLModelsDatastore, 'file_location', staticmethod(lambda model_filename: os.path.join(cache_directory, model_filename)))
+
+    return source, cache_directory
+
+
+def test_models_are_cached_by_checksum(tmp_path, monkeypatch):
+
+    source, cache_directory = set_up_models(tmp_path, monkeypatch)
+
+    model = MLModelsDatastore.get_bodyweight_ratio_model()
+    assert isinstance(model['weights'], np.memmap)
+    assert model['weights'][10] == 10
+    assert MLModelsDatastore.get_bodyweight_ratio_model() is model
+    assert MLModelsDatastore.get_load_metrics()[bodyweight_ratio_model_filename]['source'] == 'download'
+
+    # a new container with the cache directory still in place
+    monkeypatch.setattr(ml_model_datastore, '_model_futures', {})
+    MLModelsDatastore.get_bodyweight_ratio_model()
+    assert MLModelsDatastore.get_load_metrics()[bodyweight_ratio_model_filename]['source'] == 'cache'
+    assert source.downloads == [bodyweight_ratio_model_filename]
+
+    # a truncated cache file is downloaded again
+    file_location = MLModelsDatastore.get_load_metrics()[bodyweight_ratio_model_filename]['file_location']
+    with open(file_location, 'r+b') as f:
+        f.truncate(100)
+    monkeypatch.setattr(ml_model_datastore, '_model_futures', {})
+    assert MLModelsDatastore.get_bodyweight_ratio_model()['weights'][10] == 10
+    assert source.downloads == [bodyweight_ratio_model_filename] * 2
+
+
+def test_checksum_mismatch_is_not_loaded(tmp_path, monkeypatch):
+
+    source, cache_directory = set_up_models(tmp_path, monkeypatch)
+    with open(os.path.join(source.directory, hr_rpe_model_filename + '.sha256'), 'w') as f:
+        f.write('0' * 64)
+
+    try:
+        MLModelsDatastore.get_hr_model()
+        assert False
+    except ApplicationException:
+        pass
+    assert not any(f.endswith('.joblib') for f in os.listdir(cache_directory))
+
+    # the failure isn't cached, so a fixed source loads on the next request
+    os.remove(os.path.join(source.directory, hr_rpe_model_filename + '.sha256'))
+    assert MLModelsDatastore.get_hr_model()['weights'][10] == 0
+
+
+def test_models_load_in_background(tmp_path, monkeypatch):
+
+    source, cache_directory = set_up_models(tmp_path, monkeypatch, checksums=False)
+
+    source.gate.clear()
+    MLModelsDatastore.load_models(wait=False)
+    assert source.downloads == []
+
+    # both downloads start on load threads while load_models has already returned
+    for _ in range(2):
+        assert source.download_started.acquire(timeout=10)
+    assert source.downloads == []
+    assert len(source.download_threads) == 2
+    assert all(thread_name != 'MainThread' for thread_name in source.download_threads)
+    source.gate.set()
+
+    # requests arriving mid-load wait for the background load instead of downloading again
+    assert MLModelsDatastore.get_hr_model()['weights'][10] == 0
+    assert MLModelsDatastore.get_bodyweight_ratio_model()['weights'][10] == 10
+    assert sorted(source.downloads) == sorted([hr_rpe_model_filename, bodyweight_ratio_model_filename])
+
+    load_metrics = MLModelsDatastore.get_load_metrics()
+    assert all(load_metrics[f]['thread'] != 'MainThread' for f in source.downloads)
+
+
+class UnreachableModelSource(LocalModelSource):
+    def __init__(self):
+        super().__init__(None)
+
+    def download_file(self, model_filename, file_location):
+        raise EndpointConnectionError(endpoint_url='https://s3.amazonaws.com')
+
+    def get_checksum(self, model_filename):
+        return None
+
+
+def test_unreachable_bucket_has_no_checksum(monkeypatch):
+
+    def resource(service_name):
+        raise NoCredentialsError()
+
+    monkeypatch.setattr(ml_model_datastore.boto3, 'resource', resource)
+    assert S3ModelSource('bucket').get_checksum(hr_rpe_model_filename) is None
+
+
+def test_model_already_on_disk_loads_without_the_source(tmp_path, monkeypatch):
+
+    source, cache_directory = set_up_models(tmp_path, monkeypatch, checksums=False)
+    # as the build leaves them in ../data for unit tests, with no .sha256 pointer
+    shutil.copyfile(os.path.join(source.directory, hr_rpe_model_filename), os.path.join(cache_directory, hr_rpe_model_filename))
+    monkeypatch.setattr(MLModelsDatastore, 'source', UnreachableModelSource())
+
+    assert MLModelsDatastore.get_hr_model()['weights'][10] == 0
+    load_metrics = MLModelsDatastore.get_load_metrics()[hr_rpe_model_filename]
+    assert load_metrics['file_location'] == os.path.join(cache_directory, hr_rpe_model_filename)
+    with open(os.path.join(source.directory, hr_rpe_model_filename), 'rb') as f:
+        assert load_metrics['checksum'] == hashlib.sha256(f.read()).hexdigest()
+
+    # a model that isn't on disk still needs the source
+    try:
+        MLModelsDatastore.get_bodyweight_ratio_model()
+        assert False
+    except EndpointConnectionError:
+        pass
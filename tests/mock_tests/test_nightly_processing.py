@@ -0,0 +1,131 @@
+from datastores import bulk_write_datastore, user_stats_datastore, symptom_datastore, training_session_datastore
+from datastores import injury_risk_datastore, injury_risk_checkpoint_datastore
+from logic import nightly_processing
+from logic.nightly_processing import NightlyProcessingRunner, StageTimer
+from tests.mocks.mock_mongo_collection import MongoCollection
+import json
+import os
+import types
+
+user_ids = [f'user_{number}' for number in range(7)]
+
+
+class FailingMongoCollection(MongoCollection):
+    """
+    Fails every query for the users in failing_user_ids
+    """
+    def __init__(self, failing_user_ids):
+        super().__init__()
+        self.failing_user_ids = failing_user_ids
+
+    def find(self, query, projection=None):
+        if query.get('user_id') in self.failing_user_ids:
+            raise ConnectionError('connection reset')
+        return super().find(query, projection)
+
+
+def set_collections(monkeypatch, failing_user_ids=()):
+    collections = {'symptom': FailingMongoCollection(list(failing_user_ids))}
+
+    def get_mongo_collection(collection):
+        return collections.setdefault(collection, MongoCollection())
+
+    for module in [bulk_write_datastore, user_stats_datastore, symptom_datastore, training_session_datastore,
+                   injury_risk_datastore, injury_risk_checkpoint_datastore]:
+        monkeypatch.setattr(module, 'get_mongo_collection', get_mongo_collection)
+    return collections
+
+
+def test_stage_timer_counts_nested_stages_once(monkeypatch):
+
+    clock = [0.0]
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    monkeypatch.setattr(nightly_processing, 'time', types.SimpleNamespace(perf_counter=lambda: clock[0]))
+    timer = StageTimer()
+    with timer.stage('outer'):
+        sleep(2)
+        timer.timed('inner', sleep)(5)
+    assert timer.stage_seconds == {'inner': 5, 'outer': 2}
+
+
+def test_users_processed_and_stats_bulk_written(monkeypatch):
+
+    collections = set_collections(monkeypatch)
+    runner = NightlyProcessingRunner('user_stats', '2020-01-08', '2020-01-10', workers=0, chunk_size=3,
+                                     log=lambda message: None)
+    runner.run(user_ids)
+
+    assert runner.completed == user_ids
+    assert runner.failed == {}
+    stats_documents = collections['athletestats'].documents
+    assert sorted(d['athlete_id'] for d in stats_documents) == user_ids
+    assert all(d['event_date'].startswith('2020-01-10') for d in stats_documents)
+    # one bulk write of stats per chunk of users, rather than a write per user and day
+    assert collections['athletestats'].bulk_write_count == 3
+    assert {'user_stats', 'injury_risk', 'write'} <= set(runner.stage_seconds)
+    assert runner.users_per_minute > 0
+
+
+def test_failed_users_resumed_from_checkpoint(monkeypatch, tmp_path):
+
+    checkpoint_file = str(tmp_path / 'checkpoint.json')
+    set_collections(monkeypatch, failing_user_ids=['user_2', 'user_5'])
+    runner = NightlyProcessingRunner('user_stats', '2020-01-10', workers=0, chunk_size=3,
+                                     checkpoint_file=checkpoint_file, log=lambda message: None)
+    runner.run(user_ids)
+
+    assert sorted(runner.failed) == ['user_2', 'user_5']
+    assert runner.failed['user_2'] == 'ConnectionError: connection reset'
+    with open(checkpoint_file) as f:
+        checkpoint = json.load(f)
+    assert checkpoint['completed'] == ['user_0', 'user_1', 'user_3', 'user_4', 'user_6']
+    assert sorted(checkpoint['failed']) == ['user_2', 'user_5']
+
+    # resumed, only the failed users are processed again
+    collections = set_collections(monkeypatch)
+    runner = NightlyProcessingRunner('user_stats', '2020-01-10', workers=0, chunk_size=3,
+                                     checkpoint_file=checkpoint_file, log=lambda message: None)
+    runner.run(user_ids)
+    assert runner.completed == ['user_2', 'user_5']
+    assert len(runner.skipped) == 5
+    assert sorted(d['athlete_id'] for d in collections['athletestats'].documents) == ['user_2', 'user_5']
+
+    # a run over other days doesn't resume from it
+    runner = NightlyProcessingRunner('user_stats', '2020-01-11', workers=0, checkpoint_file=checkpoint_file,
+                                     log=lambda message: None)
+    runner.run(user_ids)
+    assert runner.skipped == []
+
+
+def test_users_processed_on_worker_processes(monkeypatch, tmp_path):
+
+    checkpoint_file = str(tmp_path / 'checkpoint.json')
+    # the forked workers keep the in-memory collections they start with
+    set_collections(monkeypatch, failing_user_ids=['user_4'])
+    runner = NightlyProcessingRunner('user_stats', '2020-01-09', '2020-01-10', workers=2, chunk_size=2,
+                                     max_in_flight=2, checkpoint_file=checkpoint_file, log=lambda message: None)
+    runner.run(user_ids)
+
+    assert sorted(runner.completed) == [u for u in user_ids if u != 'user_4']
+    assert list(runner.failed) == ['user_4']
+    assert {'user_stats', 'injury_risk', 'write'} <= set(runner.stage_seconds)
+    with open(checkpoint_file) as f:
+        assert len(json.load(f)['completed']) == 6
+
+
+def test_datastore_collection_built_once_per_process(monkeypatch):
+
+    built = []
+    nightly_processing._set_datastore_collection_factory(lambda: built.append(os.getpid()) or len(built))
+
+    assert nightly_processing._get_datastore_collection() == 1
+    assert nightly_processing._get_datastore_collection() == 1
+
+    # a forked worker builds its own rather than using its parent's
+    monkeypatch.setattr(nightly_processing.os, 'getpid', lambda: -1)
+    assert nightly_processing._get_datastore_collection() == 2
+    assert built[-1] == -1
+    nightly_processing._set_datastore_collection_factory(nightly_processing.DatastoreCollection)
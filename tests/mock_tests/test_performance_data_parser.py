@@ -0,0 +1,172 @@
+from logic.performance_data_parser import PerformanceDataParser
+import pandas as pd
+import numpy as np
+import io
+import random
+import zipfile
+
+start_timestamp = 1591614000
+date_created = "2020-06-08T09:00:00.000-05:00"
+
+
+def get_rows(minutes, random_generator, skipped_minutes=(), partial_minutes=()):
+    # one row a second, stamped with the minute and the second within it, as the machines export them
+    rows = []
+    for minute in range(minutes):
+        if minute in skipped_minutes:
+            continue
+        seconds = range(1, 61) if minute not in partial_minutes else range(1, random_generator.randint(10, 50))
+        for second in seconds:
+            rows.append({'uniqueid': f'{minute}_{second}', 'datecreated': date_created,
+                         'timestamp': start_timestamp + minute * 60, 'elapsed': minute * 60 + second,
+                         'memberuuid': 'member', 'equipmentid': 'equipment', 'calories': random_generator.random() * 10,
+                         'splat': random_generator.randint(0, 1), 'heartrate': random_generator.randint(90, 180)})
+    return rows
+
+
+def get_treadmill_csv(minutes, random_generator):
+    rows = get_rows(minutes, random_generator, skipped_minutes=(10, 11), partial_minutes=(12,))
+    speed = 2.5
+    incline = 1
+    distance = 0
+    for row in rows:
+        if row['elapsed'] % 90 == 0:
+            speed = random_generator.choice([0, 2.5, 3.1, 3.8])
+            incline = random_generator.choice([1, 2, 5])
+        distance += speed
+        row.update({'speed': speed, 'incline': incline, 'distance': round(distance, 1)})
+    random_generator.shuffle(rows)
+    return pd.DataFrame(rows).to_csv(index=False)
+
+
+def get_rower_csv(minutes, random_generator):
+    # rowing for 6 minutes in every 9, with 20 second rests, and off the rower in between
+    rows = get_rows(minutes, random_generator, skipped_minutes=[m for m in range(minutes) if m % 9 >= 6])
+    distance = 0
+    moving_time = 0
+    for row in rows:
+        power = random_generator.randint(80, 200) if row['elapsed'] % 80 > 20 else 0
+        moving_time += 1 if power > 0 else 0
+        distance += power / 50
+        row.update({'speed': power / 40, 'powerperstroke': power, 'distance': int(distance), 'movingtime': moving_time})
+    random_generator.shuffle(rows)
+    return pd.DataFrame(rows).to_csv(index=False)
+
+
+def get_zip(minutes, seed=5):
+    random_generator = random.Random(seed)
+    zip_file = io.BytesIO()
+    with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as unzipped_files:
+        unzipped_files.writestr('class/treadmill.csv', get_treadmill_csv(minutes, random_generator))
+        unzipped_files.writestr('class/rower.csv', get_rower_csv(minutes, random_generator))
+        unzipped_files.writestr('__MACOSX/class/._rower.csv', '')
+    zip_file.seek(0)
+    return zip_file
+
+
+def sort_data_loop(dataframe):
+    # sort_data fixing each minute's timestamps in a loop
+    dataframe['second_marker'] = dataframe['uniqueid'].str.split('_').str[1]
+    dataframe.second_marker = dataframe.second_marker.astype(int)
+    dataframe.sort_values(by=['timestamp', 'second_marker'], inplace=True, ignore_index=True)
+    grouped = dataframe.groupby(by='timestamp')
+    group_aggs = grouped.second_marker.agg(['max'])
+    prev = 0
+    dataframe['total_seconds'] = 60
+    for i, row in group_aggs.iterrows():
+        if i - prev > 60:
+            dataframe.loc[np.where(dataframe.timestamp == i)[0], 'total_seconds'] = row['max']
+        prev = i
+
+    dataframe.timestamp = dataframe.timestamp + (dataframe.second_marker + 60 - dataframe.total_seconds)
+
+
+def get_block_loop(series, min_change, min_duration=10):
+    # get_block filtering the changes and filling the blocks in loops
+    diff = np.ediff1d(series, to_begin=0)
+    changes = np.where(abs(diff) >= min_change)[0]
+    valid_changes = [changes[0]]
+    for i in range(1, len(changes)):
+        if changes[i] - changes[i-1] > min_duration:
+            valid_changes.append(changes[i])
+    blocks = np.zeros(len(series))
+    block = 0
+    last_value = 0
+    for change in valid_changes:
+        blocks[last_value:change] = block
+        block += 1
+        last_value = change
+    blocks[last_value:] = block
+    return blocks
+
+
+def read_data(zip_file):
+    data_parser = PerformanceDataParser()
+    data_parser.read_performance_data(zip_file)
+    return data_parser
+
+
+def test_reads_used_columns_with_types():
+
+    data_parser = read_data(get_zip(20))
+
+    assert set(data_parser.treadmill_data.columns) == set(PerformanceDataParser.treadmill_columns)
+    assert set(data_parser.rower_data.columns) == set(PerformanceDataParser.rower_columns)
+    assert data_parser.treadmill_data.timestamp.dtype == np.int64
+    assert data_parser.rower_data.powerperstroke.dtype == np.float64
+    assert data_parser.rower_data.heartrate.dtype == np.int64
+
+
+def test_rows_without_timestamps_are_dropped():
+
+    random_generator = random.Random(5)
+    treadmill_data = pd.read_csv(io.StringIO(get_treadmill_csv(20, random_generator)))
+    treadmill_data.loc[[3, 10], 'timestamp'] = None
+    zip_file = io.BytesIO()
+    with zipfile.ZipFile(zip_file, 'w') as unzipped_files:
+        unzipped_files.writestr('class/treadmill.csv', treadmill_data.to_csv(index=False))
+        unzipped_files.writestr('class/rower.csv', get_rower_csv(20, random_generator))
+    zip_file.seek(0)
+
+    data_parser = read_data(zip_file)
+
+    assert len(data_parser.treadmill_data) == len(treadmill_data) - 2
+    assert data_parser.treadmill_data.timestamp.dtype == np.int64
+    assert list(data_parser.treadmill_data.index) == list(range(len(treadmill_data) - 2))
+
+
+def test_sort_data_matches_loop():
+
+    data_parser = read_data(get_zip(30))
+    for dataframe in [data_parser.treadmill_data, data_parser.rower_data]:
+        expected = dataframe.copy()
+        sort_data_loop(expected)
+        PerformanceDataParser.sort_data(dataframe)
+        pd.testing.assert_frame_equal(expected, dataframe)
+
+
+def test_get_block_matches_loop():
+
+    random_generator = random.Random(2)
+    data_parser = read_data(get_zip(30))
+    PerformanceDataParser.sort_data(data_parser.rower_data)
+    has_power = (data_parser.rower_data.powerperstroke != 0).astype(int)
+    steps = pd.Series(np.repeat([random_generator.randint(0, 5) for i in range(200)], [random_generator.randint(1, 30) for i in range(200)]))
+
+    for series, min_change, min_duration in [(data_parser.rower_data.timestamp, 20, 1), (has_power, 1, 1),
+                                             (steps, 1, 10), (steps, 2, 0), (steps, 1, 25)]:
+        assert np.array_equal(get_block_loop(series, min_change, min_duration), PerformanceDataParser.get_block(series, min_change, min_duration))
+
+    assert np.array_equal(PerformanceDataParser.get_block(pd.Series([1, 1, 1]), 1), np.zeros(3))
+
+
+def test_sections_from_zip():
+
+    data_parser = read_data(get_zip(45))
+
+    treadmill_section = data_parser.get_treadmill_section()[0]
+    assert treadmill_section['name'] == 'treadmill'
+    assert len(treadmill_section['exercises']) > 1
+
+    rower_floor_sections = data_parser.get_rowing_floor_sections()
+    assert [s['name'] for s in rower_floor_sections] == ['rower', 'floor'] * 4 + ['rower']
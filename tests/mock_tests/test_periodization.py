@@ -10,6 +10,7 @@ from tests.mocks.mock_workout_library_datastore import PlannedWorkoutLibraryData
 from tests.mocks.mock_completed_session_details_datastore import CompletedSessionDetailsDatastore
 from tests.mocks.mock_workout_datastore import WorkoutDatastore
 from datetime import datetime, timedelta
+import random
 from tests.mocks.planned_workout_utilities import get_planned_workout
 from models.soreness_base import BodyPartLocation
 
@@ -473,3 +474,38 @@ def test_muscle_cosine_similarity():
     score = WorkoutScoringManager.muscle_cosine_similarity(candidate_muscles, required_muscles)
 
     assert 0.0 < score < 1
+
+
+def test_batch_workout_scores_match_single_workout_scores():
+
+    random.seed(11)
+    proc = PeriodizationPlanProcessor(datetime.now(), None, None, None, CompletedSessionDetailsDatastore(), None)
+    detailed_adaptation_types = list(DetailedAdaptationType)
+
+    workouts = []
+    for w in range(200):
+        ranked_types = [RankedAdaptationType(AdaptationTypeMeasure.detailed_adaptation_type, d, random.randint(1, 3), random.randint(0, 40))
+                        for d in random.sample(detailed_adaptation_types, random.randint(0, 4))]
+        session_rpe_lower = random.uniform(2, 8)
+        session_rpe = StandardErrorRange(lower_bound=session_rpe_lower, upper_bound=session_rpe_lower + random.uniform(0, 2))
+        duration = random.randint(20, 120)
+        rpe_load = StandardErrorRange(lower_bound=session_rpe.lower_bound * duration, upper_bound=session_rpe.upper_bound * duration)
+        workout = SimpleWorkout(w, session_rpe, duration, ranked_types, [], session_rpe_load=rpe_load)
+        if w % 3 == 0:
+            workout.projected_monotony = StandardErrorRange(observed_value=random.choice([None, 1.2, 1.7, 2.5]))
+            workout.projected_strain_event_level = StandardErrorRange(observed_value=random.choice([None, 0, 1, 1.8]))
+        workouts.append(workout)
+
+    exercises = [PeriodizedExercise(None, SubAdaptationType.strength, times_per_week_range=StandardErrorRange(lower_bound=2),
+                                    duration_range=None, rpe_range=None),
+                 PeriodizedExercise(None, SubAdaptationType.cardiorespiratory_training,
+                                    times_per_week_range=StandardErrorRange(lower_bound=3, upper_bound=5),
+                                    duration_range=StandardErrorRange(lower_bound=30, upper_bound=60),
+                                    rpe_range=StandardErrorRange(lower_bound=4, upper_bound=6))]
+
+    for exercise in exercises:
+        for one_required_combination in [None, StandardErrorRange(lower_bound=1, upper_bound=2)]:
+            target_load_range = StandardErrorRange(lower_bound=200, upper_bound=450)
+            scores = proc.get_workout_scores(workouts, exercise, target_load_range, one_required_combination)
+            for workout, score in zip(workouts, scores):
+                assert abs(score - proc.get_workout_score(workout, exercise, target_load_range, one_required_combination)) < 1e-9
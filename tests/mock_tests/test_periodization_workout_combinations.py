@@ -0,0 +1,63 @@
+from logic.periodization_processor import PeriodizationPlanProcessor
+from models.planned_exercise import PlannedWorkoutLoad
+from tests.mocks.mock_completed_session_details_datastore import CompletedSessionDetailsDatastore
+from datetime import datetime
+import random
+
+
+def get_workout_library(workout_count, seed=7):
+
+    random.seed(seed)
+    workouts = []
+
+    for w in range(workout_count):
+        workout = PlannedWorkoutLoad(str(w))
+        workout.session_load = random.randint(100, 900)
+        workouts.append(workout)
+
+    return workouts
+
+
+def get_processor():
+
+    return PeriodizationPlanProcessor(datetime.now(), None, None, None, CompletedSessionDetailsDatastore(), None)
+
+
+def get_acceptable_workouts_by_enumeration(proc, workouts, lowest_weekly_load_target, highest_weekly_load_target,
+                                           lowest_workouts_week, highest_workouts_week):
+
+    workout_combinations = []
+
+    for w in range(lowest_workouts_week, highest_workouts_week + 1):
+        for k in proc.combinations_without_repetition(w, iterable=workouts):
+            if lowest_weekly_load_target <= sum(t.session_load for t in k) <= highest_weekly_load_target:
+                workout_combinations.append(k)
+
+    return set(x for l in workout_combinations for x in l)
+
+
+def test_acceptable_workouts_match_full_enumeration():
+
+    proc = get_processor()
+
+    for seed in range(5):
+        workouts = get_workout_library(14, seed)
+        # repeated workouts can be used as many times as they appear
+        workouts.extend(workouts[:3])
+
+        for lowest_target, highest_target in [(1000, 1200), (2400, 2500), (100, 300), (3500, 3600), (0, 10000)]:
+            expected = get_acceptable_workouts_by_enumeration(proc, workouts, lowest_target, highest_target, 2, 4)
+            acceptable_workouts = proc.get_acceptable_workouts_from_combinations(workouts, lowest_target,
+                                                                                 highest_target, 2, 4)
+
+            assert acceptable_workouts == expected
+
+
+def test_no_acceptable_workouts_outside_target():
+
+    proc = get_processor()
+    workouts = get_workout_library(20)
+
+    assert len(proc.get_acceptable_workouts_from_combinations(workouts, 50000, 60000, 3, 5)) == 0
+    assert len(proc.get_acceptable_workouts_from_combinations(workouts, 0, 50, 3, 5)) == 0
+    assert len(proc.get_acceptable_workouts_from_combinations([], 0, 5000, 3, 5)) == 0
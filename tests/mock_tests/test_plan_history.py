@@ -0,0 +1,70 @@
+from models.daily_plan import DailyPlan
+from models.plan_history import PlanHistory
+from models.session import SportTrainingSession
+from models.sport import SportName
+from models.load_stats import LoadStats
+from logic.training_volume_processing import TrainingVolumeProcessing
+from datetime import datetime, timedelta
+from utils import format_date, parse_date
+import random
+
+
+def get_plans(start_date, days, seed=1):
+
+    random.seed(seed)
+    plans = []
+    for d in range(days):
+        day = start_date + timedelta(days=d)
+        if random.random() < .2:
+            continue
+        plan = DailyPlan(event_date=format_date(day))
+        for k in range(random.randint(0, 3)):
+            session = SportTrainingSession()
+            session.event_date = day + timedelta(hours=8 + k)
+            session.sport_name = SportName.distance_running
+            session.duration_minutes = random.choice([None, random.randint(10, 90)])
+            session.session_RPE = random.choice([None, random.randint(1, 10)])
+            plan.training_sessions.append(session)
+        plans.append(plan)
+    random.shuffle(plans)
+
+    return plans
+
+
+def test_windows_match_filtered_plans():
+
+    plans = get_plans(datetime(2019, 3, 1), 40)
+    plan_history = PlanHistory(plans)
+    start_date_time = parse_date("2019-03-10")
+    end_date_time = parse_date("2019-03-24")
+
+    window = plan_history.get_window(start_date_time, end_date_time)
+    expected = sorted([p for p in plans if start_date_time <= p.get_event_datetime() < end_date_time], key=lambda p: p.event_date)
+    assert list(window) == expected
+    assert window.get_event_date_times() == [p.get_event_datetime() for p in expected]
+
+    assert list(plan_history.get_window(start_date_time)) == sorted([p for p in plans if p.get_event_datetime() >= start_date_time],
+                                                                     key=lambda p: p.event_date)
+    assert len(plan_history.get_window(end_date_time, start_date_time)) == 0
+
+    # a window of a window stays within its parent
+    sub_window = window.get_window(parse_date("2019-03-01"), parse_date("2019-03-12"))
+    assert list(sub_window) == [p for p in expected if p.get_event_datetime() < parse_date("2019-03-12")]
+
+
+def test_window_sums_match_plan_list_sums():
+
+    plans = get_plans(datetime(2019, 3, 1), 40, seed=2)
+    window = PlanHistory(plans).get_window(parse_date("2019-03-05"), parse_date("2019-04-01"))
+    window_plans = list(window)
+    training_volume_processing = TrainingVolumeProcessing("2019-03-01", "2019-04-10", LoadStats())
+
+    for method, arguments in [('get_plan_session_attribute_sum', ('duration_minutes',)),
+                              ('get_plan_session_attribute_sum_list', ('session_RPE',)),
+                              ('get_session_attributes_product_sum', ('session_RPE', 'duration_minutes')),
+                              ('get_session_attributes_product_sum_list', ('session_RPE', 'duration_minutes')),
+                              ('get_session_attributes_product_sum_tuple_list', ('session_RPE', 'duration_minutes'))]:
+        window_values = getattr(training_volume_processing, method)(*arguments, window)
+        list_values = getattr(training_volume_processing, method)(*arguments, window_plans)
+        assert window_values == list_values
+        assert len(window_values) > 0
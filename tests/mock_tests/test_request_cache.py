@@ -0,0 +1,154 @@
+from datastores import bulk_write_datastore, daily_plan_datastore, training_session_datastore, athlete_stats_datastore
+from datastores.datastore_collection import DatastoreCollection
+from datastores.request_cache import RequestCache
+from routes import symptoms
+from models.daily_plan import DailyPlan
+from models.session import SportTrainingSession
+from models.sport import SportName
+from models.stats import AthleteStats
+from tests.mocks.mock_mongo_collection import MongoCollection
+from datetime import datetime, timedelta
+from flask import Flask
+from utils import format_date
+
+
+def get_plan_collection(user_id, start_date, days):
+
+    documents = []
+    for d in range(days):
+        plan = DailyPlan(format_date(start_date + timedelta(days=d)))
+        plan.user_id = user_id
+        documents.append(plan.json_serialise())
+
+    return MongoCollection(documents)
+
+
+def get_session_collection(user_id, start_date, days):
+
+    documents = []
+    for d in range(days):
+        session = SportTrainingSession()
+        session.id = str(d)
+        session.user_id = user_id
+        session.event_date = start_date + timedelta(days=d, hours=12)
+        session.sport_name = SportName.distance_running
+        documents.append(session.json_serialise())
+
+    return MongoCollection(documents)
+
+
+def test_missing_windows():
+
+    windows = [("2020-01-05", "2020-01-10"), ("2020-01-15", "2020-01-20")]
+
+    assert RequestCache.get_missing_windows(windows, "2020-01-06", "2020-01-09") == []
+    assert RequestCache.get_missing_windows(windows, "2020-01-01", "2020-01-07") == [("2020-01-01", "2020-01-05")]
+    assert RequestCache.get_missing_windows(windows, "2020-01-08", "2020-01-25") == [("2020-01-10", "2020-01-15"),
+                                                                                    ("2020-01-20", "2020-01-25")]
+    assert RequestCache.merge_windows([("2020-01-05", "2020-01-10"), ("2020-01-01", "2020-01-05"),
+                                       ("2020-01-12", "2020-01-13")]) == [("2020-01-01", "2020-01-10"),
+                                                                          ("2020-01-12", "2020-01-13")]
+
+
+def test_daily_plan_range_reads_come_from_request_cache(monkeypatch):
+
+    mongo_collection = get_plan_collection("tester", datetime(2020, 1, 1), 40)
+    monkeypatch.setattr(daily_plan_datastore, 'get_mongo_collection', lambda collection: mongo_collection)
+
+    datastore_collection = DatastoreCollection()
+    datastore = datastore_collection.daily_plan_datastore
+
+    with datastore_collection.request_scope() as request_cache:
+        plans = datastore.get("tester", "2020-01-10", "2020-01-20")
+        same_plans = datastore.get("tester", "2020-01-12", "2020-01-18")
+        assert mongo_collection.find_count == 1
+        assert len(plans) == 11
+        assert len(same_plans) == 7
+        assert same_plans[0] is plans[2]
+
+        # overlapping both ends: the uncovered days are fetched in one query
+        wider_plans = datastore.get("tester", "2020-01-05", "2020-01-25")
+        assert mongo_collection.find_count == 2
+        assert [p.event_date for p in wider_plans] == [format_date(datetime(2020, 1, 5) + timedelta(days=d)) for d in range(21)]
+        assert wider_plans[5] is plans[0]
+
+        # nothing stored: same default plan as an uncached read
+        empty_plans = datastore.get("tester", "2020-03-01", "2020-03-02")
+        assert len(empty_plans) == 1
+        assert empty_plans[0].event_date == "2020-03-02"
+
+        assert request_cache.hits['dailyplan'] == 1
+        assert request_cache.misses['dailyplan'] == 3
+
+    assert datastore.request_cache is None
+    datastore.get("tester", "2020-01-12", "2020-01-18")
+    assert mongo_collection.find_count == 4
+
+
+def test_put_invalidates_request_cache(monkeypatch):
+
+    mongo_collection = get_plan_collection("tester", datetime(2020, 1, 1), 10)
+    monkeypatch.setattr(daily_plan_datastore, 'get_mongo_collection', lambda collection: mongo_collection)
+    monkeypatch.setattr(bulk_write_datastore, 'get_mongo_collection', lambda collection: mongo_collection)
+
+    datastore_collection = DatastoreCollection(request_cache=True)
+    datastore = datastore_collection.daily_plan_datastore
+
+    plans = datastore.get("tester", "2020-01-01", "2020-01-10")
+    plans[0].train_later = False
+    datastore.put(plans[0])
+    plans = datastore.get("tester", "2020-01-01", "2020-01-10")
+
+    assert mongo_collection.find_count == 2
+    assert not plans[0].train_later
+
+    datastore_collection.end_request_cache()
+
+
+def test_training_session_and_athlete_stats_reads_come_from_request_cache(monkeypatch):
+
+    session_collection = get_session_collection("tester", datetime(2020, 1, 1), 30)
+    stats_collection = MongoCollection([AthleteStats("tester").json_serialise()])
+    monkeypatch.setattr(training_session_datastore, 'get_mongo_collection', lambda collection: session_collection)
+    monkeypatch.setattr(athlete_stats_datastore, 'get_mongo_collection', lambda collection: stats_collection)
+
+    datastore_collection = DatastoreCollection()
+
+    with datastore_collection.request_scope() as request_cache:
+        sessions = datastore_collection.training_session_datastore.get(user_id="tester",
+                                                                       start_date_time=datetime(2020, 1, 5),
+                                                                       end_date_time=datetime(2020, 1, 15))
+        later_sessions = datastore_collection.training_session_datastore.get(user_id="tester",
+                                                                             start_date_time=datetime(2020, 1, 10),
+                                                                             end_date_time=datetime(2020, 1, 20))
+        assert len(sessions) == 10
+        assert len(later_sessions) == 10
+        assert later_sessions[0] is sessions[5]
+        assert session_collection.find_count == 2
+
+        athlete_stats = datastore_collection.athlete_stats_datastore.get("tester")
+        assert datastore_collection.athlete_stats_datastore.get("tester") is athlete_stats
+        assert stats_collection.find_count == 1
+
+        assert request_cache.hits == {'athletestats': 1}
+        assert request_cache.misses == {'trainingsession': 2, 'athletestats': 1}
+
+
+def test_survey_routes_cache_reads_for_the_request(monkeypatch):
+    mongo_collection = get_plan_collection("tester", datetime(2020, 1, 1), 10)
+    monkeypatch.setattr(daily_plan_datastore, 'get_mongo_collection', lambda collection: mongo_collection)
+
+    app = Flask(__name__)
+    app.register_blueprint(symptoms.app, url_prefix='/symptoms')
+    datastore = symptoms.datastore_collection.daily_plan_datastore
+
+    with app.test_request_context('/symptoms/a4bc4c4e-7fb8-4d0f-a2b1-0e7b7e1b3c55/', method='POST'):
+        assert app.preprocess_request() is None
+        plans = datastore.get("tester", "2020-01-01", "2020-01-10")
+        assert datastore.get("tester", "2020-01-03", "2020-01-05")[0] is plans[2]
+        assert mongo_collection.find_count == 1
+
+    # the cache ends with the request
+    assert datastore.request_cache is None
+    datastore.get("tester", "2020-01-03", "2020-01-05")
+    assert mongo_collection.find_count == 2
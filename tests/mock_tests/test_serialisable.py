@@ -0,0 +1,85 @@
+import serialisable
+from serialisable import Serialisable, FastJsonEncoder, json_serialise, to_json_value
+from models.training_volume import StandardErrorRange
+from models.soreness_base import BodyPartLocation
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum, IntEnum
+import json
+import pytz
+
+
+class Colour(Enum):
+    red = 'red'
+
+
+class Level(IntEnum):
+    high = 3
+
+
+class Reading(Serialisable):
+    def __init__(self):
+        self.taken = datetime(2020, 1, 10, 12, 30, tzinfo=pytz.utc)
+        self.value = Decimal('1.25')
+        self.error_range = StandardErrorRange(lower_bound=1, upper_bound=2, observed_value=1.5)
+
+    def json_serialise(self):
+        return super().json_serialise()
+
+
+class SlotReading(Reading):
+    __slots__ = ('level',)
+
+    def __init__(self):
+        super().__init__()
+        self.level = Level.high
+
+
+def get_value():
+    return {
+        'reading': Reading(),
+        'slot_reading': SlotReading(),
+        'tags': {'a'},
+        'raw': b'abc',
+        'pair': (1, 2.5),
+        'level': Level.high,
+        1: None,
+        2.5: True,
+        None: [False, 'x']
+    }
+
+
+def test_to_json_value_matches_json_round_trip():
+
+    value = get_value()
+    expected = json.loads(json.dumps(value, default=json_serialise))
+
+    assert to_json_value(value) == expected
+    assert expected['slot_reading']['level'] == 3
+    assert expected['reading']['error_range']['observed_value'] == 1.5
+
+
+def test_enums_are_serialised_by_value():
+
+    assert to_json_value({'colour': Colour.red, 'location': BodyPartLocation.knee}) == {'colour': 'red', 'location': BodyPartLocation.knee.value}
+
+
+def test_unserialisable_types_raise():
+
+    try:
+        to_json_value({'function': test_unserialisable_types_raise})
+        assert False
+    except TypeError:
+        pass
+
+
+def test_fast_encoder_matches_json(monkeypatch):
+
+    value = {'reading': Reading(), 'colour': Colour.red, 'big': 2 ** 70, 'level': Level.high}
+    expected = json.loads(json.dumps(value, default=json_serialise))
+
+    assert json.loads(FastJsonEncoder().encode(value)) == expected
+    assert json.loads(FastJsonEncoder(sort_keys=True).encode(value)) == expected
+
+    monkeypatch.setattr(serialisable, 'orjson', None)
+    assert json.loads(FastJsonEncoder().encode(value)) == expected
@@ -0,0 +1,123 @@
+from models.soreness import Soreness
+from models.soreness_base import BodyPartLocation
+from models.body_parts import BodyPart
+from models.soreness_timeline import SorenessTimeline
+from logic.stats_processing import StatsProcessing
+from tests.mocks.mock_datastore_collection import DatastoreCollection
+from collections import namedtuple
+from datetime import datetime, timedelta
+import numpy as np
+import random
+
+event_date = datetime(2019, 6, 26)
+
+
+def get_soreness_list(random_generator, reports, locations=4):
+    soreness_list = []
+    for i in range(reports):
+        soreness = Soreness()
+        soreness.body_part = BodyPart(random_generator.choice(list(BodyPartLocation)[:locations]), 1)
+        soreness.side = random_generator.choice([0, 1, 2])
+        soreness.pain = random_generator.choice([True, False])
+        soreness.severity = random_generator.randint(1, 5)
+        soreness.reported_date_time = event_date - timedelta(days=random_generator.randint(0, 25), hours=random_generator.choice([0, 0, 12]))
+        soreness_list.append(soreness)
+    return soreness_list
+
+
+def get_groups_by_rescanning(soreness_list):
+    # grouping as get_historic_soreness_list did: count the groups, then filter and sort the whole list for each
+    grouped_soreness = {}
+    for s in soreness_list:
+        key = (s.body_part.location, s.side, s.pain)
+        grouped_soreness[key] = grouped_soreness.get(key, 0) + 1
+
+    groups = {}
+    for location, side, is_pain in grouped_soreness:
+        body_part_history = list(s for s in soreness_list if s.body_part.location == location and s.side == side and s.pain == is_pain)
+        body_part_history.sort(key=lambda x: x.reported_date_time, reverse=True)
+        last_ten_day_count = 0
+        last_fourteen_day_count = 0
+        last_eight_seventeen_day_count = 0
+        for b in body_part_history:
+            days_diff = (event_date.date() - b.reported_date_time.date()).days
+            if days_diff < 14:
+                last_fourteen_day_count += 1
+            if days_diff < 10:
+                last_ten_day_count += 1
+            if 8 < days_diff < 17:
+                last_eight_seventeen_day_count += 1
+        groups[(location, side, is_pain)] = (body_part_history, (last_ten_day_count, last_fourteen_day_count, last_eight_seventeen_day_count))
+    return groups
+
+
+def get_groups_from_timeline(soreness_list):
+    soreness_timeline = SorenessTimeline(soreness_list, event_date)
+    return {key: (soreness_timeline.get_reports(key), SorenessTimeline.get_day_counts(soreness_timeline.get_days_ago(key)))
+            for key in soreness_timeline.keys()}
+
+
+def get_soreness_streaks_in_loops(soreness_list):
+    # get_soreness_streaks walking each group's reports until one is more than 3 days before the next
+    streak_soreness = {}
+    streak_start_soreness = {}
+    ns_2 = namedtuple("ns", ["location", "is_pain", "side", "avg_severity"])
+    for (location, side, is_pain), (body_part_history, counts) in get_groups_by_rescanning(soreness_list).items():
+        streak = 1
+        streak_start_date = None
+        severity = 0.0
+        if len(body_part_history) >= 2:
+            for b in range(0, len(body_part_history) - 1):
+                if streak_start_date is None or body_part_history[b].reported_date_time < streak_start_date:
+                    streak_start_date = body_part_history[b].reported_date_time
+                days_skipped = (body_part_history[b].reported_date_time.date() - body_part_history[b + 1].reported_date_time.date()).days
+                if days_skipped <= 3:
+                    streak += 1
+                else:
+                    break
+        for b in range(0, streak):
+            severity += body_part_history[b].severity
+        streak_soreness[ns_2(location, is_pain, side, severity / float(streak))] = streak
+        streak_start_soreness[ns_2(location, is_pain, side, severity / float(streak))] = streak_start_date
+    return streak_soreness, streak_start_soreness
+
+
+def test_timeline_matches_rescanning():
+
+    random_generator = random.Random(4)
+    for scenario in range(50):
+        soreness_list = get_soreness_list(random_generator, random_generator.randint(0, 60))
+        expected = get_groups_by_rescanning(soreness_list)
+        actual = get_groups_from_timeline(soreness_list)
+        assert list(actual.keys()) == list(expected.keys())
+        for key, (body_part_history, counts) in expected.items():
+            assert actual[key][0] == body_part_history
+            assert actual[key][1] == counts
+
+
+def test_leading_gaps():
+
+    day_ordinals = np.array([datetime(2019, 6, d).toordinal() for d in [20, 20, 18, 15, 10, 9]])
+    assert SorenessTimeline.get_leading_gaps(day_ordinals, 3) == 3
+    assert SorenessTimeline.get_leading_gaps(day_ordinals, 5) == 5
+    assert SorenessTimeline.get_leading_gaps(day_ordinals, 1) == 1
+    assert SorenessTimeline.get_leading_gaps(day_ordinals[:1], 3) == 0
+
+
+def test_soreness_streaks_match_loops():
+
+    random_generator = random.Random(9)
+    stats_processing = StatsProcessing('tester', event_date, DatastoreCollection())
+    for scenario in range(50):
+        soreness_list = get_soreness_list(random_generator, random_generator.randint(1, 60))
+        expected = get_soreness_streaks_in_loops(soreness_list)
+        actual = stats_processing.get_soreness_streaks(soreness_list)
+        assert list(actual[0].items()) == list(expected[0].items())
+        assert list(actual[1].items()) == list(expected[1].items())
+
+
+def test_timeline_matches_rescanning_many_reports():
+
+    soreness_list = get_soreness_list(random.Random(1), 1500, locations=20)
+
+    assert get_groups_from_timeline(soreness_list) == get_groups_by_rescanning(soreness_list)
@@ -0,0 +1,131 @@
+from models.training_volume import StandardErrorRange, StandardErrorRangeArray
+from models.functional_movement import BodyPartFunctionalMovement
+from models.soreness_base import BodyPartSide, BodyPartLocation
+from models.body_part_injury_risk import BodyPartInjuryRisk
+from models.stats import AthleteStats
+from logic.injury_risk_processing import InjuryRiskProcessor
+from datetime import datetime, timedelta
+from copy import deepcopy
+import random
+
+
+def get_range(random_generator, observed=False):
+    observed_value = random_generator.randint(1, 200)
+    if not observed:
+        observed_value = random_generator.choice([None, observed_value])
+    lower_bound = random_generator.choice([None, observed_value - 10 if observed_value is not None else 5])
+    upper_bound = random_generator.choice([None, observed_value + 10 if observed_value is not None else 15])
+    standard_error_range = StandardErrorRange(lower_bound=lower_bound, upper_bound=upper_bound, observed_value=observed_value)
+    standard_error_range.insufficient_data = random_generator.random() < .3
+    return standard_error_range
+
+
+def assert_ranges_equal(expected, actual):
+    for attribute in ['lower_bound', 'observed_value', 'upper_bound', 'insufficient_data']:
+        assert getattr(expected, attribute) == getattr(actual, attribute), attribute
+
+
+def test_array_matches_scalar_arithmetic():
+
+    random_generator = random.Random(3)
+    totals = [get_range(random_generator) for i in range(200)]
+    others = [get_range(random_generator) for i in range(200)]
+
+    for method in ['add', 'max', 'min', 'divide_range']:
+        expected = [t.plagiarize() for t in totals]
+        for e, o in zip(expected, others):
+            getattr(e, method)(o.plagiarize())
+        array = StandardErrorRangeArray.from_ranges(totals)
+        getattr(array, method)(StandardErrorRangeArray.from_ranges(others))
+        for e, a in zip(expected, array.to_ranges()):
+            assert_ranges_equal(e, a)
+
+    for method, factor in [('multiply', 3), ('divide', 4)]:
+        expected = [t.plagiarize() for t in totals]
+        for e in expected:
+            getattr(e, method)(factor)
+        array = StandardErrorRangeArray.from_ranges(totals)
+        getattr(array, method)(factor)
+        for e, a in zip(expected, array.to_ranges()):
+            assert_ranges_equal(e, a)
+
+
+def test_zero_divisors_leave_none():
+
+    array = StandardErrorRangeArray.from_ranges([StandardErrorRange(lower_bound=4, upper_bound=8, observed_value=6),
+                                                 StandardErrorRange(observed_value=6)])
+    array.divide_range(StandardErrorRangeArray.from_ranges([StandardErrorRange(lower_bound=1, upper_bound=4, observed_value=0),
+                                                            StandardErrorRange(observed_value=0)]))
+    ranges = array.to_ranges()
+
+    assert_ranges_equal(StandardErrorRange(lower_bound=1, upper_bound=8, observed_value=None), ranges[0])
+    assert_ranges_equal(StandardErrorRange(observed_value=6), ranges[1])
+
+    array.divide(0)
+    assert all(r.lower_bound is None and r.observed_value is None and r.upper_bound is None for r in array.to_ranges())
+
+
+def test_add_to_rows():
+
+    array = StandardErrorRangeArray.zeros(4)
+    array.add(StandardErrorRangeArray.from_ranges([StandardErrorRange(observed_value=5), StandardErrorRange()]), [2, 0])
+    ranges = array.to_ranges()
+
+    assert_ranges_equal(StandardErrorRange(lower_bound=5, upper_bound=5, observed_value=5), ranges[2])
+    for row in [0, 1, 3]:
+        assert_ranges_equal(StandardErrorRange(observed_value=0), ranges[row])
+
+
+def get_daily_sessions(body_part_sides, days, sessions_per_day=2, seed=7):
+
+    random_generator = random.Random(seed)
+    daily_sessions = []
+    for d in range(days):
+        sessions = {}
+        for s in range(sessions_per_day):
+            session_load_dict = {}
+            for body_part_side in random_generator.sample(body_part_sides, int(len(body_part_sides) * .75)):
+                body_part_functional_movement = BodyPartFunctionalMovement(body_part_side)
+                for load_attribute in [l for v, l in InjuryRiskProcessor.daily_volume_loads]:
+                    setattr(body_part_functional_movement, load_attribute, get_range(random_generator, observed=True))
+                if random_generator.random() < .1:
+                    body_part_functional_movement.compensating_causes_load.append(body_part_side)
+                session_load_dict[body_part_side] = body_part_functional_movement
+            sessions[(d, s)] = session_load_dict
+        daily_sessions.append(sessions)
+    return daily_sessions
+
+
+def merge_daily_sessions_scalar(session_load_dicts, injury_risk_dict):
+    # merge_daily_sessions summing one StandardErrorRange at a time
+    for body_part_injury_risk in injury_risk_dict.values():
+        for volume_attribute, load_attribute in InjuryRiskProcessor.daily_volume_loads:
+            setattr(body_part_injury_risk, volume_attribute, StandardErrorRange(observed_value=0))
+    for session_load_dict in session_load_dicts.values():
+        for body_part_side, body_part_functional_movement in session_load_dict.items():
+            for volume_attribute, load_attribute in InjuryRiskProcessor.daily_volume_loads:
+                getattr(injury_risk_dict[body_part_side], volume_attribute).add(getattr(body_part_functional_movement, load_attribute))
+    for body_part_injury_risk in injury_risk_dict.values():
+        body_part_injury_risk.total_compensation_percent = body_part_injury_risk.percent_total_compensation()
+        body_part_injury_risk.eccentric_compensation_percent = body_part_injury_risk.percent_eccentric_compensation()
+
+
+def test_merge_daily_sessions_matches_scalar_sums():
+
+    body_part_sides = [BodyPartSide(location, side) for location in list(BodyPartLocation)[:30] for side in [1, 2]]
+    base_date = datetime(2019, 5, 1)
+    days = 90
+    daily_sessions = get_daily_sessions(body_part_sides, days)
+    processor = InjuryRiskProcessor(base_date, [], [], {}, AthleteStats('tester'), 'tester')
+
+    scalar_dict = {b: BodyPartInjuryRisk() for b in body_part_sides}
+    array_dict = {b: BodyPartInjuryRisk() for b in body_part_sides}
+    for d, sessions in enumerate(daily_sessions):
+        # scalar add fills in its argument's bounds, so give each path its own copy of the loads
+        scalar_sessions = deepcopy(sessions)
+        merge_daily_sessions_scalar(scalar_sessions, scalar_dict)
+        processor.merge_daily_sessions((base_date + timedelta(days=d)).date(), sessions, array_dict)
+
+        for b in body_part_sides:
+            for volume_attribute in [v for v, l in InjuryRiskProcessor.daily_volume_loads] + ['total_compensation_percent', 'eccentric_compensation_percent']:
+                assert_ranges_equal(getattr(scalar_dict[b], volume_attribute), getattr(array_dict[b], volume_attribute))
@@ -0,0 +1,160 @@
+from datastores import bulk_write_datastore, daily_plan_datastore, athlete_stats_datastore, injury_risk_datastore
+from datastores.datastore_collection import DatastoreCollection
+from datastores.write_stats import write_stats
+from models.athlete_injury_risk import AthleteInjuryRisk
+from models.body_part_injury_risk import BodyPartInjuryRisk
+from models.daily_plan import DailyPlan
+from models.soreness_base import BodyPartSide, BodyPartLocation
+from models.stats import AthleteStats
+from serialisable import get_content_hash
+from tests.mocks.mock_mongo_collection import MongoCollection
+from datetime import date
+import bson
+
+
+def get_injury_risk(user_id, body_parts=20):
+    athlete_injury_risk = AthleteInjuryRisk(user_id)
+    for location in list(BodyPartLocation)[:body_parts]:
+        body_part_injury_risk = BodyPartInjuryRisk()
+        body_part_injury_risk.last_sharp_level = 1
+        body_part_injury_risk.last_sharp_date = date(2020, 1, 5)
+        athlete_injury_risk.items[BodyPartSide(location, 1)] = body_part_injury_risk
+    return athlete_injury_risk
+
+
+def set_collection(monkeypatch, module, mongo_collection):
+    monkeypatch.setattr(module, 'get_mongo_collection', lambda collection: mongo_collection)
+    if module in [daily_plan_datastore, injury_risk_datastore, athlete_stats_datastore]:
+        monkeypatch.setattr(bulk_write_datastore, 'get_mongo_collection', lambda collection: mongo_collection)
+
+
+def test_content_hash_ignores_key_order_and_id():
+
+    assert get_content_hash({'a': 1, 'b': [1, {'c': 2, 'd': None}]}) == get_content_hash({'_id': 'x', 'b': [1, {'d': None, 'c': 2}], 'a': 1})
+    assert get_content_hash({'a': 1}) != get_content_hash({'a': 1.0})
+    assert get_content_hash({'a': [1, 2]}) != get_content_hash({'a': [2, 1]})
+
+
+def test_unchanged_athlete_stats_are_not_written(monkeypatch):
+
+    athlete_stats = AthleteStats('tester')
+    athlete_stats.event_date = '2020-01-10'
+    # as written by a put of loaded stats, which fills in the empty internal load ranges
+    mongo_collection = MongoCollection([AthleteStats.json_deserialise(athlete_stats.json_serialise()).json_serialise()])
+    set_collection(monkeypatch, athlete_stats_datastore, mongo_collection)
+    datastore = DatastoreCollection().athlete_stats_datastore
+    write_stats.start_request()
+
+    loaded_stats = datastore.get('tester')
+    datastore.put(loaded_stats)
+    assert write_stats.skipped == {'athletestats': 1}
+
+    loaded_stats.session_RPE = 5
+    datastore.put(loaded_stats)
+    datastore.put(loaded_stats)
+    assert write_stats.written == {'athletestats': 1}
+    assert write_stats.skipped == {'athletestats': 2}
+    assert datastore.get('tester').session_RPE == 5
+
+    # objects that weren't loaded from Mongo are always written
+    datastore.put(AthleteStats('tester'))
+    assert write_stats.written == {'athletestats': 2}
+
+
+def test_tracked_objects_are_written_in_a_later_request(monkeypatch):
+
+    athlete_stats = AthleteStats('tester')
+    athlete_stats.event_date = '2020-01-10'
+    mongo_collection = MongoCollection([AthleteStats.json_deserialise(athlete_stats.json_serialise()).json_serialise()])
+    set_collection(monkeypatch, athlete_stats_datastore, mongo_collection)
+    datastore = DatastoreCollection().athlete_stats_datastore
+    write_stats.start_request()
+
+    loaded_stats = datastore.get('tester')
+    datastore.put(loaded_stats)
+    assert write_stats.skipped == {'athletestats': 1}
+
+    # a warm container's next request can't know whether another writer changed the document since
+    write_stats.start_request()
+    assert loaded_stats.has_changed(loaded_stats.json_serialise())
+    datastore.put(loaded_stats)
+    assert write_stats.written == {'athletestats': 1}
+    assert write_stats.skipped == {}
+
+
+def test_unchanged_plans_are_not_written(monkeypatch):
+
+    plans = []
+    for day in range(1, 6):
+        plan = DailyPlan(f'2020-01-0{day}')
+        plan.user_id = 'tester'
+        plans.append(plan.json_serialise())
+    mongo_collection = MongoCollection(plans)
+    set_collection(monkeypatch, daily_plan_datastore, mongo_collection)
+    datastore = DatastoreCollection().daily_plan_datastore
+    write_stats.start_request()
+
+    loaded_plans = datastore.get('tester', '2020-01-01', '2020-01-05')
+    datastore.put(loaded_plans)
+    assert mongo_collection.bulk_write_count == 0
+
+    loaded_plans[2].train_later = False
+    datastore.put(loaded_plans)
+    assert mongo_collection.bulk_write_count == 1
+    assert write_stats.written == {'dailyplan': 1}
+    assert write_stats.skipped == {'dailyplan': 9}
+
+    # plans read with a projection are only part of the document, so are always written
+    projected_plans = datastore.get('tester', '2020-01-01', '2020-01-01', fields=['training_sessions'])
+    datastore.put(projected_plans)
+    assert write_stats.written == {'dailyplan': 2}
+
+
+def test_injury_risk_writes_changed_body_parts(monkeypatch):
+
+    mongo_collection = MongoCollection([get_injury_risk('tester').json_serialise()])
+    set_collection(monkeypatch, injury_risk_datastore, mongo_collection)
+    datastore = DatastoreCollection().injury_risk_datastore
+    write_stats.start_request()
+
+    athlete_injury_risk = AthleteInjuryRisk('tester')
+    athlete_injury_risk.items = datastore.get('tester')
+    datastore.put(athlete_injury_risk)
+    assert mongo_collection.bulk_write_count == 0
+
+    changed_body_parts = list(athlete_injury_risk.items.keys())[3:5]
+    for body_part_side in changed_body_parts:
+        athlete_injury_risk.items[body_part_side].last_sharp_level = 4
+    datastore.put(athlete_injury_risk)
+
+    query, update = mongo_collection.updates[0]
+    assert query == {'user_id': 'tester'}
+    assert list(update['$set'].keys()) == ['items.3.injury_risk', 'items.4.injury_risk']
+    assert mongo_collection.find_one({'user_id': 'tester'}) == athlete_injury_risk.json_serialise()
+    assert len(bson.encode(update)) * 5 < len(bson.encode(athlete_injury_risk.json_serialise()))
+
+    # the stored entries it knows are updated by the write
+    datastore.put(athlete_injury_risk)
+    assert write_stats.written == {'injuryrisk': 1}
+    assert write_stats.skipped == {'injuryrisk': 2}
+
+
+def test_injury_risk_replaced_when_body_parts_differ(monkeypatch):
+
+    mongo_collection = MongoCollection([get_injury_risk('tester').json_serialise()])
+    set_collection(monkeypatch, injury_risk_datastore, mongo_collection)
+    datastore = DatastoreCollection().injury_risk_datastore
+    write_stats.start_request()
+
+    athlete_injury_risk = AthleteInjuryRisk('tester')
+    athlete_injury_risk.items = datastore.get('tester')
+    added_risk = get_injury_risk('tester', body_parts=21)
+    datastore.put(added_risk)
+    assert len(mongo_collection.updates) == 0
+    assert mongo_collection.find_one({'user_id': 'tester'}) == added_risk.json_serialise()
+
+    # what was read in an earlier request isn't trusted
+    datastore.get('tester')
+    write_stats.start_request()
+    datastore.put(added_risk)
+    assert write_stats.written == {'injuryrisk': 1}
@@ -9,6 +9,11 @@ class AthleteStatsDatastore(object):
     def get(self, athlete_id):
         return self._query_mongodb()
 
+    def get_metrics(self, athlete_ids):
+        athlete_stats_list = self.athlete_stats if isinstance(self.athlete_stats, list) else [self.athlete_stats]
+        return {athlete_stats.athlete_id: athlete_stats.metrics for athlete_stats in athlete_stats_list
+                if athlete_stats is not None and athlete_stats.athlete_id in athlete_ids}
+
     def put(self, items):
         if not isinstance(items, list):
             items = [items]
@@ -16,7 +16,7 @@ class DailyPlanDatastore(object):
                     #t.session_RPE = t.post_session_survey.survey.RPE this is for fake data
                     t.session_RPE = t.post_session_survey.RPE
 
-    def get(self, user_id=None, start_date=None, end_date=None, stats_processing=True):
+    def get(self, user_id=None, start_date=None, end_date=None, stats_processing=True, fields=None):
         return self._query_mongodb(user_id, start_date, end_date)
 
     def put(self, items):
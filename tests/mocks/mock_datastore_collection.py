@@ -1,7 +1,7 @@
 from tests.mocks import mock_athlete_stats_datastore, mock_completed_exercise_datastore, mock_daily_plan_datastore
 from tests.mocks import mock_daily_readiness_datastore, mock_exercise_datastore
 from tests.mocks import mock_post_session_survey_datastore, mock_cleared_soreness_datastore
-from tests.mocks import mock_injury_risk_datastore
+from tests.mocks import mock_injury_risk_datastore, mock_injury_risk_checkpoint_datastore
 from tests.mocks import mock_workout_datastore
 from tests.mocks import mock_user_stats_datastore
 from tests.mocks import mock_symptom_datastore
@@ -9,10 +9,12 @@ from tests.mocks import mock_training_session_datastore
 from tests.mocks import mock_movement_prep_datastore
 from tests.mocks import mock_mobility_wod_datastore
 from tests.mocks import mock_responsive_recovery_datastore
+from datastores.request_cache import RequestCache
+from contextlib import contextmanager
 
 class DatastoreCollection(object):
 
-    def __init__(self):
+    def __init__(self, request_cache=False):
         self.athlete_stats_datastore = mock_athlete_stats_datastore.AthleteStatsDatastore()
         self.completed_exercise_datastore = mock_completed_exercise_datastore.CompletedExerciseDatastore()
         self.daily_plan_datastore = mock_daily_plan_datastore.DailyPlanDatastore()
@@ -21,6 +23,7 @@ class DatastoreCollection(object):
         self.post_session_survey_datastore = mock_post_session_survey_datastore.PostSessionSurveyDatastore()
         self.cleared_soreness_datastore = mock_cleared_soreness_datastore.ClearedSorenessDatastore()
         self.injury_risk_datastore = mock_injury_risk_datastore.InjuryRiskDatastore()
+        self.injury_risk_checkpoint_datastore = mock_injury_risk_checkpoint_datastore.InjuryRiskCheckpointDatastore()
         self.workout_datastore = mock_workout_datastore.WorkoutDatastore()
         self.user_stats_datastore = mock_user_stats_datastore.UserStatsDatastore()
         self.symptom_datastore = mock_symptom_datastore.SymptomDatastore()
@@ -29,3 +32,32 @@ class DatastoreCollection(object):
         self.mobility_wod_datastore = mock_mobility_wod_datastore.MobilityWodDatastore()
         self.responsive_recovery_datastore = mock_responsive_recovery_datastore.ResponsiveRecoveryDatastore()
 
+        self.request_cache = None
+        if request_cache:
+            self.enable_request_cache()
+
+    def get_request_cached_datastores(self):
+        return [self.daily_plan_datastore, self.training_session_datastore, self.athlete_stats_datastore,
+                self.injury_risk_datastore]
+
+    def enable_request_cache(self):
+        self.request_cache = RequestCache()
+        for datastore in self.get_request_cached_datastores():
+            datastore.request_cache = self.request_cache
+
+        return self.request_cache
+
+    def end_request_cache(self):
+        if self.request_cache is not None:
+            self.request_cache.annotate()
+        self.request_cache = None
+        for datastore in self.get_request_cached_datastores():
+            datastore.request_cache = None
+
+    @contextmanager
+    def request_scope(self):
+        request_cache = self.enable_request_cache()
+        try:
+            yield request_cache
+        finally:
+            self.end_request_cache()
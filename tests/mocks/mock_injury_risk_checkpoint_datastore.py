@@ -0,0 +1,22 @@
+class InjuryRiskCheckpointDatastore(object):
+
+    def __init__(self):
+        self.checkpoints = {}
+
+    def get(self, user_id):
+        return self._query_mongodb(user_id)
+
+    def put(self, items):
+        if not isinstance(items, list):
+            items = [items]
+        try:
+            for item in items:
+                self._put_mongodb(item)
+        except Exception as e:
+            raise e
+
+    def _query_mongodb(self, user_id):
+        return self.checkpoints.get(user_id)
+
+    def _put_mongodb(self, item):
+        self.checkpoints[item.user_id] = item
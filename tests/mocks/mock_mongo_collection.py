@@ -0,0 +1,143 @@
+import copy
+import re
+from pymongo.errors import BulkWriteError
+from pymongo import UpdateOne
+from pymongo.results import UpdateResult
+
+
+class MongoCollection(object):
+    """
+    In-memory stand-in for the small part of a pymongo collection the datastores use.  Counts find and bulk_write
+    calls, and keeps the updates sent to update_one, so tests can check how often Mongo would have been called and
+    with what.  rejected_document, if set, is called with each document written by bulk_write and returns an error
+    message for the documents Mongo should refuse.
+    """
+    def __init__(self, documents=None, rejected_document=None):
+        self.documents = list(documents or [])
+        self.rejected_document = rejected_document
+        self.find_count = 0
+        self.bulk_write_count = 0
+        self.updates = []
+
+    def find(self, query, projection=None):
+        self.find_count += 1
+        return [self._project(d, projection) for d in self.documents if self._matches(d, query)]
+
+    def find_one(self, query, projection=None):
+        self.find_count += 1
+        for d in self.documents:
+            if self._matches(d, query):
+                return self._project(d, projection)
+        return None
+
+    def replace_one(self, query, document, upsert=False):
+        self.documents = [d for d in self.documents if not self._matches(d, query)]
+        self.documents.append(copy.deepcopy(document))
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_write_count += 1
+        write_errors = []
+        for index, operation in enumerate(operations):
+            message = self.rejected_document(operation._doc) if self.rejected_document is not None else None
+            if message is not None:
+                write_errors.append({'index': index, 'code': 121, 'errmsg': message})
+                if ordered:
+                    break
+            elif isinstance(operation, UpdateOne):
+                self.update_one(operation._filter, operation._doc)
+            else:
+                self.replace_one(operation._filter, operation._doc, upsert=operation._upsert)
+        if len(write_errors) > 0:
+            raise BulkWriteError({'writeErrors': write_errors})
+
+    def update_one(self, query, update):
+        self.updates.append((query, update))
+        for d in self.documents:
+            if self._matches(d, query):
+                for path, value in update.get('$set', {}).items():
+                    self._set(d, path.split('.'), copy.deepcopy(value), query)
+                for path, values in update.get('$addToSet', {}).items():
+                    array = self._get_array(d, path.split('.'))
+                    array.extend(copy.deepcopy(v) for v in values['$each'] if v not in array)
+                return UpdateResult({'n': 1, 'nModified': 1}, True)
+        return UpdateResult({'n': 0, 'nModified': 0}, True)
+
+    def delete_many(self, query):
+        self.documents = [d for d in self.documents if not self._matches(d, query)]
+
+    @staticmethod
+    def _project(document, projection):
+        if projection is None:
+            return copy.deepcopy(document)
+        if all(v == 0 for v in projection.values()):
+            return {k: copy.deepcopy(v) for k, v in document.items() if k not in projection}
+        return {k: copy.deepcopy(v) for k, v in document.items() if projection.get(k) == 1}
+
+    @classmethod
+    def _matches(cls, document, query):
+        for key, condition in query.items():
+            if '.' in key:
+                if not any(cls._matches({'value': v}, {'value': condition}) for v in cls._get_values(document, key.split('.'))):
+                    return False
+                continue
+            value = document.get(key)
+            if isinstance(condition, dict):
+                if '$in' in condition and value not in condition['$in']:
+                    return False
+                if '$gte' in condition and (value is None or value < condition['$gte']):
+                    return False
+                if '$lte' in condition and (value is None or value > condition['$lte']):
+                    return False
+                if '$regex' in condition and (value is None or re.match(condition['$regex'], value) is None):
+                    return False
+                if '$ne' in condition and value == condition['$ne']:
+                    return False
+                if '$elemMatch' in condition and not any(cls._matches(v, condition['$elemMatch']) for v in value or []):
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    @classmethod
+    def _get_values(cls, document, parts):
+        # every value at a dotted path, looking inside each element of the arrays on the way
+        if isinstance(document, list):
+            return [v for d in document for v in cls._get_values(d, parts)]
+        if len(parts) == 0:
+            return [document]
+        if not isinstance(document, dict) or parts[0] not in document:
+            return []
+        return cls._get_values(document[parts[0]], parts[1:])
+
+    @classmethod
+    def _get_array(cls, document, parts):
+        for part in parts[:-1]:
+            document = document.setdefault(part, {})
+        return document.setdefault(parts[-1], [])
+
+    @classmethod
+    def _set(cls, document, parts, value, query, path=()):
+        part = parts[0]
+        if part == '$':
+            # the first element matched by the query's condition on this array
+            array_path = '.'.join(path)
+            indexes = []
+            for key, condition in query.items():
+                if key == array_path and isinstance(condition, dict) and '$elemMatch' in condition:
+                    indexes = [i for i, e in enumerate(document) if cls._matches(e, condition['$elemMatch'])][:1]
+                elif key.startswith(array_path + '.'):
+                    element_query = {key[len(array_path) + 1:]: condition}
+                    indexes = [i for i, e in enumerate(document) if cls._matches(e, element_query)][:1]
+        elif isinstance(document, list):
+            indexes = [int(part)]
+        else:
+            if len(parts) == 1:
+                document[part] = value
+            else:
+                cls._set(document.setdefault(part, {}), parts[1:], value, query, path + (part,))
+            return
+        for i in indexes:
+            if len(parts) == 1:
+                document[i] = value
+            else:
+                cls._set(document[i], parts[1:], value, query, path)
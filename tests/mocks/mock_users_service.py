@@ -0,0 +1,26 @@
+class UsersService(object):
+    """
+    In-memory stand-in for the users service's account endpoints.  Each call is counted.
+    """
+    def __init__(self, accounts):
+        self.accounts = accounts
+        self.call_count = 0
+
+    @classmethod
+    def with_teams(cls, coach_id, teams):
+        # teams: team name by account id, with the user ids in each
+        accounts = {}
+        for account_id, (name, user_ids) in teams.items():
+            accounts[account_id] = {
+                'account': {'id': account_id, 'name': name, 'users': list(user_ids), 'coaches': [coach_id]},
+                'users': [{'id': user_id, 'personal_data': {'first_name': f'first_{user_id}', 'last_name': f'last_{user_id}'}}
+                          for user_id in user_ids]
+            }
+        return cls(accounts)
+
+    def call_apigateway_sync(self, method, endpoint, body=None):
+        self.call_count += 1
+        parts = endpoint.split('/')
+        if method == 'GET' and len(parts) == 3 and parts[0] == 'account' and parts[2] == 'users':
+            return self.accounts[parts[1]]
+        raise ValueError(f'{method} {endpoint} is not faked')